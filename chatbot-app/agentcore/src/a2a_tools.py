@@ -23,6 +23,8 @@ from a2a.types import Message, Part, Role, TextPart, AgentCard
 
 # Import SigV4 auth for IAM authentication
 from agent.gateway.sigv4_auth import get_sigv4_auth
+from agent.request_context import get_session_id, get_user_id, run_in_executor
+from agent.config.parameters import get_ssm_parameter
 
 logger = logging.getLogger(__name__)
 
@@ -104,9 +106,7 @@ def get_cached_agent_arn(agent_id: str, region: str = "us-west-2") -> Optional[s
         ssm_param = config['runtime_arn_ssm']
 
         try:
-            ssm = boto3.client('ssm', region_name=region)
-            response = ssm.get_parameter(Name=ssm_param)
-            _cache['agent_arns'][agent_id] = response['Parameter']['Value']
+            _cache['agent_arns'][agent_id] = get_ssm_parameter(ssm_param, region)
             logger.info(f"Cached ARN for {agent_id}: {_cache['agent_arns'][agent_id]}")
         except Exception as e:
             logger.error(f"Failed to get ARN for {agent_id}: {e}")
@@ -115,6 +115,27 @@ def get_cached_agent_arn(agent_id: str, region: str = "us-west-2") -> Optional[s
     return _cache['agent_arns'][agent_id]
 
 
+def get_cached_agent_card(agent_arn: str, region: str = "us-west-2") -> AgentCard:
+    """Get and cache the A2A agent card of a runtime ARN (raises on failure)"""
+    if agent_arn not in _cache['agent_cards']:
+        logger.debug(f"Fetching agent card for ARN: {agent_arn}")
+
+        # Use boto3 SDK to get agent card directly
+        bedrock_agentcore = boto3.client('bedrock-agentcore', region_name=region)
+        response = bedrock_agentcore.get_agent_card(agentRuntimeArn=agent_arn)
+
+        agent_card_dict = response.get('agentCard', {})
+
+        if not agent_card_dict:
+            raise ValueError(f"No agent card found in boto3 response")
+
+        # Convert dict to AgentCard object and cache it
+        _cache['agent_cards'][agent_arn] = AgentCard(**agent_card_dict)
+        logger.debug(f"Cached agent card for ARN: {agent_arn}")
+
+    return _cache['agent_cards'][agent_arn]
+
+
 def get_http_client(region: str = "us-west-2"):
     """Reuse HTTP client with SigV4 IAM authentication"""
     if not _cache['http_client']:
@@ -206,29 +227,8 @@ async def send_a2a_message(
 
         # Get or cache agent card (skip for local testing)
         if agent_arn and agent_arn not in _cache['agent_cards']:
-            logger.debug(f"Fetching agent card for ARN: {agent_arn}")
-
             try:
-                # Use boto3 SDK to get agent card directly
-                bedrock_agentcore = boto3.client('bedrock-agentcore', region_name=region)
-                response = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: bedrock_agentcore.get_agent_card(agentRuntimeArn=agent_arn)
-                )
-
-                agent_card_dict = response.get('agentCard', {})
-
-                if not agent_card_dict:
-                    raise ValueError(f"No agent card found in boto3 response")
-
-                logger.debug(f"Retrieved agent card for {agent_id}")
-
-                # Convert dict to AgentCard object
-                agent_card = AgentCard(**agent_card_dict)
-
-                # Cache the agent card object
-                _cache['agent_cards'][agent_arn] = agent_card
-
+                await run_in_executor(None, get_cached_agent_card, agent_arn, region)
             except Exception as e:
                 logger.error(f"Error fetching agent card: {e}")
                 raise
@@ -380,12 +380,12 @@ async def send_a2a_message(
                                                 from workspace import ImageManager
                                                 # Use session_id from function parameter (already available in send_a2a_message)
                                                 screenshot_session_id = session_id or 'unknown'
-                                                # Get user_id from artifact metadata (priority), then function metadata, then environment variable
+                                                # Get user_id from artifact metadata (priority), then function metadata, then request context
                                                 # Use 'or' to skip None values and try next fallback
                                                 screenshot_user_id = (
                                                     (artifact_metadata.get('user_id') if artifact_metadata else None)
                                                     or (metadata.get('user_id') if metadata else None)
-                                                    or os.environ.get('USER_ID', 'default_user')
+                                                    or get_user_id('default_user')
                                                 )
                                                 image_manager = ImageManager(user_id=screenshot_user_id, session_id=screenshot_session_id)
                                                 image_manager.save_to_s3(filename, screenshot_bytes)
@@ -610,11 +610,11 @@ def create_a2a_tool(agent_id: str):
                 elif hasattr(tool_context.agent, 'model') and hasattr(tool_context.agent.model, 'model_id'):
                     model_id = tool_context.agent.model.model_id
 
-        # Fallback to environment variable
+        # Fallback to request context
         if not session_id:
-            session_id = os.environ.get('SESSION_ID')
+            session_id = get_session_id()
         if not user_id:
-            user_id = os.environ.get('USER_ID')
+            user_id = get_user_id()
 
         return session_id, user_id, model_id
 
@@ -13,6 +13,7 @@ Usage:
     from agent.voice_agent import VoiceAgent
     from agent.swarm_agents import create_chatbot_swarm
     from agent.stop_signal import get_stop_signal_provider
+    from agent.request_context import get_session_id, get_user_id
 
     from agent.config.constants import DEFAULT_AGENT_ID
     from agent.config.prompt_builder import build_text_system_prompt
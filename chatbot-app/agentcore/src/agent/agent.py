@@ -14,6 +14,7 @@ from strands import Agent
 from strands.models import BedrockModel, CacheConfig
 from strands.session.file_session_manager import FileSessionManager
 from streaming.event_processor import StreamEventProcessor
+from streaming.sse import encode_event
 from agent.hooks import ResearchApprovalHook
 from agent.config.prompt_builder import (
     build_text_system_prompt,
@@ -31,14 +32,9 @@ try:
 except ImportError:
     AGENTCORE_MEMORY_AVAILABLE = False
 
-# Import Strands built-in tools
-from strands_tools.calculator import calculator
-
-# Import local tools module (general-purpose, agent-core integrated)
-import local_tools
-
-# Import built-in tools module (AWS Bedrock-powered tools)
-import builtin_tools
+# Lazy tool registry (Strands built-in, local and builtin tools imported on first use)
+from agent.tool_registry import get_tool_registry
+from agent.request_context import set_request_context, get_stream_processor
 
 # Import unified tool filter
 from agent.tool_filter import filter_tools
@@ -47,36 +43,18 @@ from agent.session.unified_file_session_manager import UnifiedFileSessionManager
 
 logger = logging.getLogger(__name__)
 
-# Global stream processor instance
-_global_stream_processor = None
-
 # Global cache for Memory Strategy IDs (loaded once per container lifecycle)
 _cached_strategy_ids: Optional[Dict[str, str]] = None
 
 def get_global_stream_processor():
-    """Get the global stream processor instance"""
-    return _global_stream_processor
-
+    """Get the stream processor of the current stream (per-request, see agent.request_context)"""
+    return get_stream_processor()
 
-# Tool ID to tool object mapping
-# Start with Strands built-in tools (externally managed)
-TOOL_REGISTRY = {
-    "calculator": calculator,
-}
 
-# Dynamically load all local tools from local_tools.__all__
-# This ensures we only need to maintain the list in one place (__init__.py)
-for tool_name in local_tools.__all__:
-    tool_obj = getattr(local_tools, tool_name)
-    TOOL_REGISTRY[tool_name] = tool_obj
-    logger.debug(f"Registered local tool: {tool_name}")
-
-# Dynamically load all builtin tools from builtin_tools.__all__
-# This ensures we only need to maintain the list in one place (__init__.py)
-for tool_name in builtin_tools.__all__:
-    tool_obj = getattr(builtin_tools, tool_name)
-    TOOL_REGISTRY[tool_name] = tool_obj
-    logger.debug(f"Registered builtin tool: {tool_name}")
+# Tool ID to tool object mapping (read-only, lazy)
+# Tool IDs come from local_tools/builtin_tools _TOOL_MODULES; a tool module is
+# only imported the first time a request enables one of its tools
+TOOL_REGISTRY = get_tool_registry()
 
 
 class ChatbotAgent:
@@ -108,9 +86,7 @@ class ChatbotAgent:
             compaction_enabled: Whether to enable context compaction (default: True)
             use_null_conversation_manager: Use NullConversationManager instead of default SlidingWindow (default: False)
         """
-        global _global_stream_processor
         self.stream_processor = StreamEventProcessor()
-        _global_stream_processor = self.stream_processor
         self.agent = None
         self.session_id = session_id
         self.user_id = user_id or session_id  # Use session_id as user_id if not provided
@@ -402,7 +378,7 @@ class ChatbotAgent:
             logger.error(f"Error creating agent: {e}")
             raise
 
-    async def stream_async(self, message: str, session_id: str = None, files: Optional[List] = None) -> AsyncGenerator[str, None]:
+    async def stream_async(self, message: str, session_id: str = None, files: Optional[List] = None) -> AsyncGenerator[bytes, None]:
         """
         Stream responses using StreamEventProcessor
 
@@ -414,10 +390,9 @@ class ChatbotAgent:
         if not self.agent:
             self.create_agent()
 
-        # Set SESSION_ID for browser session isolation (each conversation has isolated browser)
-        import os
-        os.environ['SESSION_ID'] = self.session_id
-        os.environ['USER_ID'] = self.user_id or self.session_id
+        # Bind session to this stream's context (browser session isolation, tool lookups).
+        # Context vars are per task, so concurrent streams in one container stay isolated.
+        set_request_context(self.session_id, self.user_id, self.stream_processor)
 
         try:
             # Reset context token tracking for new turn
@@ -468,12 +443,10 @@ class ChatbotAgent:
             logger.error(f"Traceback: {traceback.format_exc()}")
 
             # Send error event
-            import json
-            error_event = {
+            yield encode_event({
                 "type": "error",
                 "message": str(e)
-            }
-            yield f"data: {json.dumps(error_event)}\n\n"
+            })
 
     def _update_compaction_state(self):
         """Update compaction state after turn completion (if using CompactingSessionManager).
@@ -493,7 +466,11 @@ class ChatbotAgent:
             logger.debug(f"_update_compaction_state: context_tokens={context_tokens:,} (from last LLM call)")
 
             if context_tokens > 0:
-                self.session_manager.update_after_turn(context_tokens, self.agent.agent_id)
+                self.session_manager.update_after_turn(
+                    context_tokens,
+                    self.agent.agent_id,
+                    llm_calls=self.stream_processor.llm_call_tokens,
+                )
                 logger.debug(f"Compaction updated: context={context_tokens:,} tokens")
             else:
                 # Skip compaction if no token data available
@@ -557,16 +534,14 @@ class ChatbotAgent:
 
         # Try Parameter Store
         try:
-            import boto3
+            from agent.config.parameters import get_ssm_parameter
             project_name = os.getenv('PROJECT_NAME', 'strands-agent-chatbot')
             environment = os.getenv('ENVIRONMENT', 'dev')
             region = os.getenv('AWS_REGION', 'us-west-2')
             param_name = f"/{project_name}/{environment}/agentcore/code-interpreter-id"
 
             logger.debug(f"Checking Parameter Store for Code Interpreter ID: {param_name}")
-            ssm = boto3.client('ssm', region_name=region)
-            response = ssm.get_parameter(Name=param_name)
-            code_interpreter_id = response['Parameter']['Value']
+            code_interpreter_id = get_ssm_parameter(param_name, region)  # Cached per process
             logger.debug(f"Found CODE_INTERPRETER_ID in Parameter Store: {code_interpreter_id}")
             return code_interpreter_id
         except Exception as e:
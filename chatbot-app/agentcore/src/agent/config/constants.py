@@ -74,6 +74,151 @@ DEFAULT_COMPACTION_PROTECTED_TURNS = 2
 # Maximum characters for tool content before truncation
 DEFAULT_MAX_TOOL_CONTENT_LENGTH = 500
 
+# Apply the checkpoint before the model call when the locally estimated input
+# tokens of the loaded context already exceed the threshold
+DEFAULT_COMPACTION_PRE_TURN = True
+
+# Prepare the checkpoint summary in a background worker once a turn crosses the
+# threshold; it waits up to this long for the LTM session summary to catch up
+DEFAULT_COMPACTION_BACKGROUND = True
+DEFAULT_COMPACTION_SUMMARY_WAIT_SECONDS = 45
+
+# Container-local history cache of parsed session messages, per (actor, session).
+# Later loads only fetch events newer than the cached watermark (0 disables).
+DEFAULT_HISTORY_CACHE_MAX_SESSIONS = 128
+DEFAULT_HISTORY_CACHE_TTL_SECONDS = 1800
+
+# Container-local cache of Stage 1 truncation results, per (actor, session).
+# History is append-only, so old messages are truncated once (0 disables).
+DEFAULT_TRUNCATION_CACHE_MAX_SESSIONS = 128
+DEFAULT_TRUNCATION_CACHE_TTL_SECONDS = 1800
+
+# Write-behind persistence: messages and agent state syncs are queued per
+# session and written in order by background workers, batched into as few
+# create_event calls as the per-event limits allow. Every history reader
+# parses all payloads of an event (CompactingSessionManager, frontend
+# utils/historyParser).
+DEFAULT_MEMORY_WRITE_BEHIND = True
+DEFAULT_MEMORY_WRITE_MAX_BATCH_ITEMS = 50
+DEFAULT_MEMORY_WRITE_MAX_BATCH_BYTES = 1024 * 1024
+DEFAULT_MEMORY_WRITE_WORKERS = 8
+
+# Uploaded images/documents are kept out of persisted history: messages store an
+# <attachment sha256=...> stub and the bytes live in the session blob store.
+# "first_turn": sent inline on the turn they were uploaded, afterwards the model
+#               sees the stub and can call reattach_file
+# "inline": stubs are resolved back to the file for every model call
+# "off": bytes stay in the persisted messages
+# Stubs are only written once the bytes are durable: the session's blobs/ directory
+# (local) or S3 (cloud, ATTACHMENT_BUCKET or DOCUMENT_BUCKET); without a bucket,
+# cloud messages keep their bytes whatever the policy.
+DEFAULT_ATTACHMENT_POLICY = "first_turn"
+
+# In-memory cache in front of the durable tier (separate from the SSE blob store)
+DEFAULT_ATTACHMENT_CACHE_MAX_SESSION_BYTES = 32 * 1024 * 1024
+DEFAULT_ATTACHMENT_CACHE_MAX_TOTAL_BYTES = 256 * 1024 * 1024
+DEFAULT_ATTACHMENT_CACHE_TTL_SECONDS = 1800
+
+# Tool result images kept in the model context (browser screenshots): once more
+# than KEEP_LAST + EVICT_BATCH images are in the messages, all but the newest
+# KEEP_LAST become text placeholders (batched, so the prompt cache prefix only
+# changes every EVICT_BATCH images). Kept images other than the newest can be
+# downscaled to DOWNSCALE_PX on their longest edge (0 = keep full size).
+# KEEP_LAST = 0 disables the policy.
+DEFAULT_IMAGE_HISTORY_KEEP_LAST = 5
+DEFAULT_IMAGE_HISTORY_EVICT_BATCH = 5
+DEFAULT_IMAGE_HISTORY_DOWNSCALE_PX = 0
+DEFAULT_IMAGE_HISTORY_TOOLS = "browser_navigate,browser_act,browser_extract,browser_manage_tabs"
+
+
+# =============================================================================
+# Agent Pool Configuration
+# =============================================================================
+
+# Maximum number of warm ChatAgents kept per container (LRU eviction beyond this)
+DEFAULT_AGENT_POOL_MAX_SIZE = 32
+
+# Seconds a pooled agent may stay idle before it is evicted
+DEFAULT_AGENT_POOL_IDLE_TTL_SECONDS = 900
+
+
+# =============================================================================
+# Bedrock Client Configuration
+# =============================================================================
+
+# HTTP connection pool size per shared bedrock-runtime client
+# (botocore default is 10, which concurrent sessions exhaust quickly)
+DEFAULT_BEDROCK_MAX_POOL_CONNECTIONS = 50
+
+# Keep idle connections alive at the TCP level so they survive between turns
+DEFAULT_BEDROCK_TCP_KEEPALIVE = True
+
+# BedrockModels kept by the model registry (least recently used are dropped)
+DEFAULT_BEDROCK_MAX_MODELS = 64
+
+
+# =============================================================================
+# Prewarm Configuration
+# =============================================================================
+
+# Per-item timeout for the startup/warmup prewarm stage
+DEFAULT_PREWARM_TIMEOUT_SECONDS = 30
+
+# Seconds a Gateway MCP tool listing (filled by prewarm, reused by every
+# FilteredMCPClient) is served before Gateway is listed again
+DEFAULT_GATEWAY_TOOLS_CACHE_TTL_SECONDS = 300
+
+
+# =============================================================================
+# SSE Coalescing Configuration
+# =============================================================================
+
+# Buffered text deltas are sent as one response frame once the oldest delta is
+# this old (about one display frame) or the buffer reaches the size budget.
+# A delay of 0 sends every delta as its own frame.
+DEFAULT_SSE_COALESCE_MAX_DELAY_MS = 16
+DEFAULT_SSE_COALESCE_MAX_BYTES = 1024
+
+# While a tool input streams in, a tool_progress event is sent each time the
+# accumulated input grows by this many bytes (0 disables progress events).
+DEFAULT_TOOL_INPUT_PROGRESS_BYTES = 4096
+
+
+# =============================================================================
+# Image Blob Store Configuration
+# =============================================================================
+
+# "inline": base64 images inside SSE events (works through /invocations only)
+# "blob": SSE events carry a hash + thumbnail, bytes are served by GET /blobs/{hash}
+DEFAULT_SSE_IMAGE_TRANSPORT = "inline"
+
+DEFAULT_BLOB_STORE_MAX_SESSION_BYTES = 64 * 1024 * 1024
+DEFAULT_BLOB_STORE_MAX_TOTAL_BYTES = 512 * 1024 * 1024
+DEFAULT_BLOB_STORE_TTL_SECONDS = 3600
+
+# Longest edge of the JPEG thumbnail sent inline with a blob reference
+DEFAULT_BLOB_THUMBNAIL_PX = 64
+
+
+# =============================================================================
+# Resumable SSE Configuration
+# =============================================================================
+
+# Each stream keeps its newest events for Last-Event-ID replay, bounded by
+# count and bytes (0 events disables ids and replay).
+DEFAULT_SSE_REPLAY_MAX_EVENTS = 2048
+DEFAULT_SSE_REPLAY_MAX_BYTES = 16 * 1024 * 1024
+
+# After the last client detaches, the run keeps going this long waiting for a
+# reconnect before it is cancelled (0 = cancel on disconnect). Only for dropped
+# BFF <-> AgentCore connections, which the BFF resumes with action="resume" /
+# last_event_id: when the browser goes away the BFF sends action="stop", and a
+# new message on the session stops a run still waiting here.
+DEFAULT_SSE_RESUME_GRACE_SECONDS = 30
+
+# A finished stream stays resumable this long, so a reconnect can fetch the tail
+DEFAULT_SSE_REPLAY_RETAIN_SECONDS = 60
+
 
 # =============================================================================
 # Environment Variable Names
@@ -106,6 +251,60 @@ class EnvVars:
     COMPACTION_TOKEN_THRESHOLD = "COMPACTION_TOKEN_THRESHOLD"
     COMPACTION_PROTECTED_TURNS = "COMPACTION_PROTECTED_TURNS"
     COMPACTION_MAX_TOOL_LENGTH = "COMPACTION_MAX_TOOL_LENGTH"
+    COMPACTION_PRE_TURN = "COMPACTION_PRE_TURN"
+    COMPACTION_BACKGROUND = "COMPACTION_BACKGROUND"
+    COMPACTION_SUMMARY_WAIT_SECONDS = "COMPACTION_SUMMARY_WAIT_SECONDS"
+    HISTORY_CACHE_MAX_SESSIONS = "HISTORY_CACHE_MAX_SESSIONS"
+    HISTORY_CACHE_TTL_SECONDS = "HISTORY_CACHE_TTL_SECONDS"
+    TRUNCATION_CACHE_MAX_SESSIONS = "TRUNCATION_CACHE_MAX_SESSIONS"
+    TRUNCATION_CACHE_TTL_SECONDS = "TRUNCATION_CACHE_TTL_SECONDS"
+    MEMORY_WRITE_BEHIND = "MEMORY_WRITE_BEHIND"
+    MEMORY_WRITE_MAX_BATCH_ITEMS = "MEMORY_WRITE_MAX_BATCH_ITEMS"
+    MEMORY_WRITE_MAX_BATCH_BYTES = "MEMORY_WRITE_MAX_BATCH_BYTES"
+    MEMORY_WRITE_WORKERS = "MEMORY_WRITE_WORKERS"
+    ATTACHMENT_POLICY = "ATTACHMENT_POLICY"
+    ATTACHMENT_BUCKET = "ATTACHMENT_BUCKET"
+    DOCUMENT_BUCKET = "DOCUMENT_BUCKET"
+    ATTACHMENT_CACHE_MAX_SESSION_BYTES = "ATTACHMENT_CACHE_MAX_SESSION_BYTES"
+    ATTACHMENT_CACHE_MAX_TOTAL_BYTES = "ATTACHMENT_CACHE_MAX_TOTAL_BYTES"
+    IMAGE_HISTORY_KEEP_LAST = "IMAGE_HISTORY_KEEP_LAST"
+    IMAGE_HISTORY_EVICT_BATCH = "IMAGE_HISTORY_EVICT_BATCH"
+    IMAGE_HISTORY_DOWNSCALE_PX = "IMAGE_HISTORY_DOWNSCALE_PX"
+    IMAGE_HISTORY_TOOLS = "IMAGE_HISTORY_TOOLS"
+
+    # Agent Pool
+    AGENT_POOL_ENABLED = "AGENT_POOL_ENABLED"
+    AGENT_POOL_MAX_SIZE = "AGENT_POOL_MAX_SIZE"
+    AGENT_POOL_IDLE_TTL_SECONDS = "AGENT_POOL_IDLE_TTL_SECONDS"
+
+    # Bedrock client
+    BEDROCK_MAX_POOL_CONNECTIONS = "BEDROCK_MAX_POOL_CONNECTIONS"
+    BEDROCK_TCP_KEEPALIVE = "BEDROCK_TCP_KEEPALIVE"
+    BEDROCK_MAX_MODELS = "BEDROCK_MAX_MODELS"
+
+    # Prewarm
+    PREWARM_ON_STARTUP = "PREWARM_ON_STARTUP"
+    PREWARM_ITEMS = "PREWARM_ITEMS"
+    PREWARM_TIMEOUT_SECONDS = "PREWARM_TIMEOUT_SECONDS"
+    GATEWAY_TOOLS_CACHE_TTL_SECONDS = "GATEWAY_TOOLS_CACHE_TTL_SECONDS"
+
+    # SSE coalescing
+    SSE_COALESCE_MAX_DELAY_MS = "SSE_COALESCE_MAX_DELAY_MS"
+    SSE_COALESCE_MAX_BYTES = "SSE_COALESCE_MAX_BYTES"
+    TOOL_INPUT_PROGRESS_BYTES = "TOOL_INPUT_PROGRESS_BYTES"
+
+    # Image blob store
+    SSE_IMAGE_TRANSPORT = "SSE_IMAGE_TRANSPORT"
+    BLOB_STORE_MAX_SESSION_BYTES = "BLOB_STORE_MAX_SESSION_BYTES"
+    BLOB_STORE_MAX_TOTAL_BYTES = "BLOB_STORE_MAX_TOTAL_BYTES"
+    BLOB_STORE_TTL_SECONDS = "BLOB_STORE_TTL_SECONDS"
+    BLOB_THUMBNAIL_PX = "BLOB_THUMBNAIL_PX"
+
+    # Resumable SSE
+    SSE_REPLAY_MAX_EVENTS = "SSE_REPLAY_MAX_EVENTS"
+    SSE_REPLAY_MAX_BYTES = "SSE_REPLAY_MAX_BYTES"
+    SSE_RESUME_GRACE_SECONDS = "SSE_RESUME_GRACE_SECONDS"
+    SSE_REPLAY_RETAIN_SECONDS = "SSE_REPLAY_RETAIN_SECONDS"
 
     # Nova Sonic
     NOVA_SONIC_MODEL_ID = "NOVA_SONIC_MODEL_ID"
@@ -0,0 +1,28 @@
+"""
+Environment Settings - Typed readers for from_env() constructors
+
+Usage:
+    from agent.config.env import env_bool, env_float, env_int
+
+    max_size = env_int(EnvVars.AGENT_POOL_MAX_SIZE, DEFAULT_AGENT_POOL_MAX_SIZE)
+    enabled = env_bool(EnvVars.AGENT_POOL_ENABLED, True)
+"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default)))
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """True for "true" in any case, False for anything else."""
+    return os.environ.get(name, str(default)).lower() == "true"
+
+
+def env_str(name: str, default: str) -> str:
+    return os.environ.get(name, default)
@@ -0,0 +1,103 @@
+"""
+Parameter Store cache - process-wide SSM lookups
+
+Gateway URL, Code Interpreter ID, document bucket and A2A runtime ARNs are
+read from SSM Parameter Store. These values do not change during a container's
+lifetime, but every agent/tool creation used to build an SSM client and call
+get_parameter again.
+
+Successful lookups are cached per (region, name). Failures are not cached, so
+a parameter created later is still picked up. The startup prewarm stage
+(agent/prewarm.py) fills this cache before the first request.
+
+Usage:
+    from agent.config.parameters import get_ssm_parameter, code_interpreter_id_param
+
+    try:
+        value = get_ssm_parameter(code_interpreter_id_param())
+    except Exception as e:
+        logger.warning(f"Parameter not found: {e}")
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+
+from agent.config.constants import DEFAULT_AWS_REGION, DEFAULT_PROJECT_NAME, EnvVars
+
+logger = logging.getLogger(__name__)
+
+_values: Dict[Tuple[str, str], str] = {}
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def _parameter_prefix() -> str:
+    project_name = os.getenv(EnvVars.PROJECT_NAME, DEFAULT_PROJECT_NAME)
+    environment = os.getenv(EnvVars.ENVIRONMENT, 'dev')
+    return f"/{project_name}/{environment}"
+
+
+def gateway_url_param() -> str:
+    """SSM parameter name of the AgentCore Gateway URL."""
+    return f"{_parameter_prefix()}/mcp/gateway-url"
+
+
+def code_interpreter_id_param() -> str:
+    """SSM parameter name of the custom Code Interpreter ID."""
+    return f"{_parameter_prefix()}/agentcore/code-interpreter-id"
+
+
+def document_bucket_param() -> str:
+    """SSM parameter name of the workspace document bucket."""
+    return f"{_parameter_prefix()}/agentcore/document-bucket"
+
+
+def _get_client(region: str) -> Any:
+    """Shared SSM client per region (boto3 clients are thread-safe)."""
+    client = _clients.get(region)
+    if client is None:
+        with _lock:
+            client = _clients.get(region)
+            if client is None:
+                client = boto3.client('ssm', region_name=region)
+                _clients[region] = client
+    return client
+
+
+def get_ssm_parameter(name: str, region: Optional[str] = None) -> str:
+    """
+    Get an SSM parameter value, cached for the lifetime of the process.
+
+    Args:
+        name: Full parameter name
+        region: AWS region (defaults to AWS_REGION)
+
+    Returns:
+        Parameter value
+
+    Raises:
+        Exception: Whatever get_parameter raises (not found, access denied, ...)
+    """
+    region = region or os.getenv(EnvVars.AWS_REGION, DEFAULT_AWS_REGION)
+    key = (region, name)
+
+    value = _values.get(key)
+    if value is not None:
+        return value
+
+    response = _get_client(region).get_parameter(Name=name)
+    value = response['Parameter']['Value']
+    _values[key] = value
+    logger.debug(f"[Parameters] Cached {name}")
+    return value
+
+
+def clear_parameter_cache() -> None:
+    """Drop cached values and clients (tests, credential rotation)."""
+    with _lock:
+        _values.clear()
+        _clients.clear()
@@ -13,8 +13,10 @@ This module provides:
 import logging
 import os
 import json
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, TypedDict
+from typing import Any, List, Dict, Optional, TypedDict
 from pathlib import Path
 
 # Import timezone support (zoneinfo for Python 3.9+, fallback to pytz)
@@ -161,34 +163,48 @@ def _is_tool_group_enabled(tool_group_id: str, tool_group: Dict, enabled_tools:
 # Tool Guidance Loading
 # =============================================================================
 
-def load_tool_guidance(enabled_tools: Optional[List[str]]) -> List[Dict[str, str]]:
-    """
-    Load tool-specific system prompt guidance based on enabled tools.
+# Tool registry config cache (tools-config.json / DynamoDB TOOL_REGISTRY record).
+# Refreshed after TOOL_CONFIG_CACHE_TTL_SECONDS so registry syncs are picked up.
+TOOL_CONFIG_CACHE_TTL_SECONDS = 300
+_tool_config_cache: Dict[str, Any] = {"config": None, "loaded_at": 0.0}
+_tool_config_lock = threading.Lock()
 
-    - Local mode: Load from tools-config.json (required)
-    - Cloud mode: Load from DynamoDB {PROJECT_NAME}-users-v2 table (required)
 
-    Also loads shared guidance (e.g., citation instructions) when any tool
-    with usesCitation=true is enabled.
+def load_tool_registry_config(force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Load the tool registry config, cached for TOOL_CONFIG_CACHE_TTL_SECONDS.
+
+    - Local mode: tools-config.json
+    - Cloud mode: toolRegistry field of the DynamoDB TOOL_REGISTRY record
 
     Args:
-        enabled_tools: List of enabled tool IDs
+        force_refresh: Ignore the cached value
 
     Returns:
-        List of {"id": tool_id, "guidance": guidance_text} dicts for each enabled tool group
+        Tool registry dict, or None if it could not be loaded (not cached)
     """
-    if not enabled_tools or len(enabled_tools) == 0:
-        return []
-
-    # Get environment variables
+    now = time.monotonic()
+    cached = _tool_config_cache["config"]
+    if (
+        not force_refresh
+        and cached is not None
+        and now - _tool_config_cache["loaded_at"] < TOOL_CONFIG_CACHE_TTL_SECONDS
+    ):
+        return cached
+
+    with _tool_config_lock:
+        tools_config = _read_tool_registry_config()
+        if tools_config is not None:
+            _tool_config_cache["config"] = tools_config
+            _tool_config_cache["loaded_at"] = time.monotonic()
+        return tools_config
+
+
+def _read_tool_registry_config() -> Optional[Dict[str, Any]]:
+    """Read the tool registry config from its source (no caching)."""
     aws_region = os.environ.get('AWS_REGION', 'us-west-2')
     # Determine mode by MEMORY_ID presence (consistent with agent.py)
-    memory_id = os.environ.get('MEMORY_ID')
-    is_cloud = memory_id is not None
-
-    guidance_sections = []
-    needs_citation = False  # Track if any citation-enabled tool is active
-    shared_guidance = {}  # Store shared guidance for later use
+    is_cloud = os.environ.get('MEMORY_ID') is not None
 
     # Local mode: load from tools-config.json (required)
     if not is_cloud:
@@ -197,79 +213,85 @@ def load_tool_guidance(enabled_tools: Optional[List[str]]) -> List[Dict[str, str
 
         if not config_path.exists():
             logger.error(f"TOOL CONFIG NOT FOUND: {config_path}")
-            return []
+            return None
 
         with open(config_path, 'r') as f:
-            tools_config = json.load(f)
+            return json.load(f)
+
+    # Cloud mode: load from DynamoDB (required)
+    dynamodb_table = _get_dynamodb_table_name()
+    logger.debug(f"Loading tool guidance from DynamoDB table: {dynamodb_table}")
 
-        # Load shared guidance
-        shared_guidance = tools_config.get('shared_guidance', {})
+    dynamodb = boto3.resource('dynamodb', region_name=aws_region)
+    table = dynamodb.Table(dynamodb_table)
 
-        # Check all tool categories for systemPromptGuidance
-        for category in ['local_tools', 'builtin_tools', 'browser_automation', 'gateway_targets', 'agentcore_runtime_a2a']:
-            if category in tools_config:
-                for tool_group in tools_config[category]:
-                    tool_id = tool_group.get('id')
+    try:
+        # Load tool registry from DynamoDB (userId='TOOL_REGISTRY', sk='CONFIG')
+        response = table.get_item(Key={'userId': 'TOOL_REGISTRY', 'sk': 'CONFIG'})
+    except ClientError as e:
+        logger.error(f"DynamoDB error loading tool guidance: {e}")
+        return None
 
-                    # Check if any enabled tool matches this group
-                    if tool_id and _is_tool_group_enabled(tool_id, tool_group, enabled_tools):
-                        guidance = tool_group.get('systemPromptGuidance')
-                        if guidance:
-                            guidance_sections.append({"id": tool_id, "guidance": guidance})
-                            logger.debug(f"Added guidance for tool group: {tool_id}")
+    if 'Item' not in response:
+        logger.error(f"TOOL_REGISTRY NOT FOUND in DynamoDB table: {dynamodb_table}")
+        return None
 
-                        # Check if this tool needs citation
-                        if tool_group.get('usesCitation'):
-                            needs_citation = True
-                            logger.debug(f"Tool {tool_id} requires citation")
+    if 'toolRegistry' not in response['Item']:
+        logger.error(f"toolRegistry field NOT FOUND in TOOL_REGISTRY record")
+        return None
 
-    # Cloud mode: load from DynamoDB (required)
-    else:
-        dynamodb_table = _get_dynamodb_table_name()
-        logger.debug(f"Loading tool guidance from DynamoDB table: {dynamodb_table}")
-
-        dynamodb = boto3.resource('dynamodb', region_name=aws_region)
-        table = dynamodb.Table(dynamodb_table)
-
-        try:
-            # Load tool registry from DynamoDB (userId='TOOL_REGISTRY', sk='CONFIG')
-            response = table.get_item(Key={'userId': 'TOOL_REGISTRY', 'sk': 'CONFIG'})
-
-            if 'Item' not in response:
-                logger.error(f"TOOL_REGISTRY NOT FOUND in DynamoDB table: {dynamodb_table}")
-                return []
-
-            if 'toolRegistry' not in response['Item']:
-                logger.error(f"toolRegistry field NOT FOUND in TOOL_REGISTRY record")
-                return []
-
-            tool_registry = response['Item']['toolRegistry']
-            logger.debug(f"Loaded tool registry from DynamoDB: {dynamodb_table}")
-
-            # Load shared guidance
-            shared_guidance = tool_registry.get('shared_guidance', {})
-
-            # Check all tool categories
-            for category in ['local_tools', 'builtin_tools', 'browser_automation', 'gateway_targets', 'agentcore_runtime_a2a']:
-                if category in tool_registry:
-                    for tool_group in tool_registry[category]:
-                        tool_id = tool_group.get('id')
-
-                        # Check if any enabled tool matches this group
-                        if tool_id and _is_tool_group_enabled(tool_id, tool_group, enabled_tools):
-                            guidance = tool_group.get('systemPromptGuidance')
-                            if guidance:
-                                guidance_sections.append({"id": tool_id, "guidance": guidance})
-                                logger.debug(f"Added guidance for tool group: {tool_id}")
-
-                            # Check if this tool needs citation
-                            if tool_group.get('usesCitation'):
-                                needs_citation = True
-                                logger.debug(f"Tool {tool_id} requires citation")
-
-        except ClientError as e:
-            logger.error(f"DynamoDB error loading tool guidance: {e}")
-            return []
+    logger.debug(f"Loaded tool registry from DynamoDB: {dynamodb_table}")
+    return response['Item']['toolRegistry']
+
+
+def load_tool_guidance(enabled_tools: Optional[List[str]]) -> List[Dict[str, str]]:
+    """
+    Load tool-specific system prompt guidance based on enabled tools.
+
+    - Local mode: Load from tools-config.json (required)
+    - Cloud mode: Load from DynamoDB {PROJECT_NAME}-users-v2 table (required)
+
+    The registry itself is cached (see load_tool_registry_config).
+
+    Also loads shared guidance (e.g., citation instructions) when any tool
+    with usesCitation=true is enabled.
+
+    Args:
+        enabled_tools: List of enabled tool IDs
+
+    Returns:
+        List of {"id": tool_id, "guidance": guidance_text} dicts for each enabled tool group
+    """
+    if not enabled_tools or len(enabled_tools) == 0:
+        return []
+
+    tools_config = load_tool_registry_config()
+    if tools_config is None:
+        return []
+
+    guidance_sections = []
+    needs_citation = False  # Track if any citation-enabled tool is active
+
+    # Load shared guidance
+    shared_guidance = tools_config.get('shared_guidance', {})
+
+    # Check all tool categories for systemPromptGuidance
+    for category in ['local_tools', 'builtin_tools', 'browser_automation', 'gateway_targets', 'agentcore_runtime_a2a']:
+        if category in tools_config:
+            for tool_group in tools_config[category]:
+                tool_id = tool_group.get('id')
+
+                # Check if any enabled tool matches this group
+                if tool_id and _is_tool_group_enabled(tool_id, tool_group, enabled_tools):
+                    guidance = tool_group.get('systemPromptGuidance')
+                    if guidance:
+                        guidance_sections.append({"id": tool_id, "guidance": guidance})
+                        logger.debug(f"Added guidance for tool group: {tool_id}")
+
+                    # Check if this tool needs citation
+                    if tool_group.get('usesCitation'):
+                        needs_citation = True
+                        logger.debug(f"Tool {tool_id} requires citation")
 
     # Add citation instructions if any citation-enabled tool is active
     if needs_citation and 'citation_instructions' in shared_guidance:
@@ -0,0 +1,38 @@
+"""
+Process Singletons - Lazily created, process-wide shared instances
+
+Caches, pools and registries (history cache, blob store, agent pool, model
+registry, ...) exist once per process and are built from the environment on
+first use. process_singleton turns the getter that builds one into the
+double-checked-lock accessor, so the locking lives in one place.
+
+Usage:
+    from agent.config.singleton import process_singleton
+
+    @process_singleton
+    def get_blob_store() -> BlobStore:
+        return BlobStore.from_env()       # runs on the first call only
+"""
+
+import functools
+import threading
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def process_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """Getter that calls factory once (thread-safe) and returns that instance afterwards."""
+    instance: Optional[T] = None
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get() -> T:
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return get
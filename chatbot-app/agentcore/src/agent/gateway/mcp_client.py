@@ -5,14 +5,59 @@ Creates MCP client with SigV4 authentication for Gateway tools
 
 import logging
 import os
-import boto3
+import threading
+import time
 from typing import Optional, List, Callable, Any
 from mcp.client.streamable_http import streamablehttp_client
-from strands.tools.mcp import MCPClient
+from strands.tools.mcp import MCPAgentTool, MCPClient
 from agent.gateway.sigv4_auth import get_sigv4_auth, get_gateway_region_from_url
+from agent.config.constants import DEFAULT_GATEWAY_TOOLS_CACHE_TTL_SECONDS, EnvVars
+from agent.config.env import env_float
+from agent.config.parameters import get_ssm_parameter
 
 logger = logging.getLogger(__name__)
 
+# Complete Gateway tool listing (MCP tool definitions) shared by all clients
+_tool_listing: Optional[List[Any]] = None
+_tool_listing_expires_at = 0.0
+_tool_listing_lock = threading.Lock()
+
+
+def cache_gateway_tool_listing(tools: List[MCPAgentTool], pagination_token: Optional[str] = None) -> bool:
+    """
+    Keep a Gateway list_tools result for later FilteredMCPClients.
+
+    Only complete listings (no pagination token) are kept. The prewarm stage
+    fills this before the first request; every FilteredMCPClient refills it
+    once the TTL (GATEWAY_TOOLS_CACHE_TTL_SECONDS) has expired.
+
+    Returns:
+        True if the listing was cached
+    """
+    global _tool_listing, _tool_listing_expires_at
+    if pagination_token is not None:
+        return False
+    ttl = env_float(EnvVars.GATEWAY_TOOLS_CACHE_TTL_SECONDS, DEFAULT_GATEWAY_TOOLS_CACHE_TTL_SECONDS)
+    with _tool_listing_lock:
+        _tool_listing = [tool.mcp_tool for tool in tools]
+        _tool_listing_expires_at = time.monotonic() + ttl
+    return True
+
+
+def get_cached_gateway_tool_listing() -> Optional[List[Any]]:
+    """MCP tool definitions of the cached Gateway listing, or None if absent/expired."""
+    with _tool_listing_lock:
+        if _tool_listing is None or time.monotonic() >= _tool_listing_expires_at:
+            return None
+        return list(_tool_listing)
+
+
+def clear_gateway_tool_listing() -> None:
+    """Forget the cached Gateway listing."""
+    global _tool_listing
+    with _tool_listing_lock:
+        _tool_listing = None
+
 
 class FilteredMCPClient(MCPClient):
     """
@@ -69,10 +114,19 @@ class FilteredMCPClient(MCPClient):
         Also simplifies tool names by removing the Gateway namespace prefix.
         For example: "search-places___search_places" becomes "search_places"
         This makes tool names cleaner for Claude, Frontend UI, and logs.
+
+        The Gateway listing is shared through a process-wide cache (filled by
+        the prewarm stage), so new agents skip the list_tools round trip.
         """
         from strands.types import PaginatedList
 
-        paginated_result = super().list_tools_sync()
+        cached_tools = get_cached_gateway_tool_listing()
+        if cached_tools is not None:
+            paginated_result = PaginatedList([MCPAgentTool(mcp_tool, self) for mcp_tool in cached_tools])
+            logger.debug(f"Using cached Gateway listing ({len(cached_tools)} tools)")
+        else:
+            paginated_result = super().list_tools_sync()
+            cache_gateway_tool_listing(paginated_result, paginated_result.pagination_token)
 
         # Filter tools based on enabled_tool_ids
         # Support both full names and simplified names:
@@ -176,11 +230,8 @@ def get_gateway_url_from_ssm(
         Gateway URL or None if not found
     """
     try:
-        ssm = boto3.client('ssm', region_name=region)
-        response = ssm.get_parameter(
-            Name=f'/{project_name}/{environment}/mcp/gateway-url'
-        )
-        gateway_url = response['Parameter']['Value']
+        # Cached per process (filled by the startup prewarm stage)
+        gateway_url = get_ssm_parameter(f'/{project_name}/{environment}/mcp/gateway-url', region)
         logger.debug(f"Gateway URL retrieved from SSM: {gateway_url}")
         return gateway_url
     except Exception as e:
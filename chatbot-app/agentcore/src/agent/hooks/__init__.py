@@ -1,5 +1,7 @@
 """Strands Agent Hooks"""
 
+from .attachment_history import AttachmentHistoryHook
+from .image_history import ImageHistoryHook
 from .research_approval import ResearchApprovalHook
 
-__all__ = ['ResearchApprovalHook']
+__all__ = ['AttachmentHistoryHook', 'ImageHistoryHook', 'ResearchApprovalHook']
@@ -0,0 +1,131 @@
+"""Hook applying the attachment policy to uploaded files before each model call"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from strands import tool
+from strands.hooks import BeforeModelCallEvent, HookProvider, HookRegistry
+
+from agent.session.attachments import (
+    REATTACH_TOOL_NAME,
+    AttachmentScope,
+    AttachmentStore,
+    get_attachment_store,
+    is_user_prompt,
+    parse_attachment_stub,
+    reattached_content,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentHistoryHook(HookProvider):
+    """Keep uploaded files of earlier turns out of model requests (ATTACHMENT_POLICY).
+
+    Persisted history already holds <attachment .../> stubs (see
+    agent/session/attachments.py); warm agents still hold the bytes of earlier
+    turns in memory. Before each model call:
+    - "first_turn": file blocks of earlier user prompts and files re-attached
+      on earlier turns become stubs, and stubs of the current prompt are
+      resolved; the agent gets reattach_file up front (see tools()), so the
+      tool list stays the same for the whole session
+    - "inline": every stub whose bytes are available is resolved
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        blobs_dir: Optional[str] = None,
+        store: Optional[AttachmentStore] = None,
+    ):
+        self.session_id = session_id
+        self.scope = AttachmentScope(session_id, user_id=user_id, blobs_dir=blobs_dir)
+        self._store = store
+        # sha256 -> stub attributes of every attachment seen in the history
+        self._attachments: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def store(self) -> AttachmentStore:
+        return self._store if self._store is not None else get_attachment_store()
+
+    def tools(self) -> List[Any]:
+        """Tools to create the agent with: reattach_file when earlier uploads are detached."""
+        store = self.store
+        if store.policy != "first_turn" or not store.is_durable(self.scope):
+            return []
+        return [self._reattach_tool()]
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self.apply_policy)
+
+    def apply_policy(self, event: BeforeModelCallEvent) -> None:
+        """Rewrite the file blocks of the agent's user prompts according to the policy"""
+        store = self.store
+        if not store.enabled:
+            return
+
+        messages = event.agent.messages
+        prompts = [index for index, message in enumerate(messages) if is_user_prompt(message)]
+        if not prompts:
+            return
+
+        current = prompts[-1]
+        detach_earlier = store.policy == "first_turn"
+
+        if detach_earlier:
+            # reattach_file results of earlier turns (warm agents still hold their bytes)
+            for index in range(current):
+                if not is_user_prompt(messages[index]):
+                    messages[index] = store.detach_reattached(messages[index])
+
+        for index in prompts:
+            message = messages[index]
+            content = message["content"]
+            rewritten = None
+            for position, block in enumerate(content):
+                if detach_earlier and index != current:
+                    replacement = store.stub_block(block, self.scope)
+                else:
+                    replacement = store.resolve_block(block, self.scope)
+                if replacement is not None:
+                    if rewritten is None:
+                        rewritten = list(content)
+                    rewritten[position] = replacement
+
+            if rewritten is not None:
+                message["content"] = rewritten
+
+            for block in message["content"]:
+                attributes = parse_attachment_stub(block)
+                if attributes is not None:
+                    self._attachments[attributes["sha256"]] = attributes
+
+    def _reattach_tool(self):
+        """reattach_file tool bound to this session's attachments."""
+
+        @tool(name=REATTACH_TOOL_NAME)
+        def reattach_file(sha256: str) -> Dict[str, Any]:
+            """Attach a file the user uploaded earlier in this conversation again, to look at its content.
+
+            Earlier uploads appear in the conversation as <attachment sha256="..."> placeholders.
+            Only call this when the current request needs the file's content.
+
+            Args:
+                sha256: The sha256 attribute of the attachment placeholder
+            """
+            attributes = self._attachments.get(sha256)
+            data = None
+            if attributes is not None:
+                data = self.store.get(self.scope, sha256, attributes.get("format", "png"))
+
+            if data is None:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Attachment {sha256} is no longer available. Ask the user to upload the file again."}],
+                }
+
+            # Persisted as the plain stub again (AttachmentStore.detach_reattached)
+            return {"status": "success", "content": reattached_content(attributes, data)}
+
+        return reattach_file
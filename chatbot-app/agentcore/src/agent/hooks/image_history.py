@@ -0,0 +1,59 @@
+"""Hook bounding tool result images (browser screenshots) before each model call"""
+
+import logging
+from typing import Any, Optional
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from agent.session.image_history import ImageEviction, ImageHistoryPolicy, get_image_history_policy
+
+logger = logging.getLogger(__name__)
+
+
+class ImageHistoryHook(HookProvider):
+    """Apply an image history policy to the agent's messages before every model call.
+
+    The policy is pluggable: anything with apply(messages) -> ImageEviction
+    (default: the process-wide ImageHistoryPolicy from IMAGE_HISTORY_* settings).
+    last_turn holds what was removed during the current/last invocation.
+    """
+
+    def __init__(self, policy: Optional[ImageHistoryPolicy] = None):
+        self._policy = policy
+        self.last_turn = ImageEviction()
+
+    @property
+    def policy(self) -> ImageHistoryPolicy:
+        return self._policy if self._policy is not None else get_image_history_policy()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.start_turn)
+        registry.add_callback(BeforeModelCallEvent, self.apply_policy)
+        registry.add_callback(AfterInvocationEvent, self.end_turn)
+
+    def start_turn(self, event: BeforeInvocationEvent) -> None:
+        self.last_turn = ImageEviction()
+
+    def apply_policy(self, event: BeforeModelCallEvent) -> None:
+        """Evict/downscale older images of the agent's messages"""
+        eviction = self.policy.apply(event.agent.messages)
+        if eviction:
+            self.last_turn.add(eviction)
+            logger.debug(
+                f"[ImageHistory] Removed {eviction.images_removed} images ({eviction.bytes_removed:,} bytes), "
+                f"downscaled {eviction.images_downscaled} (-{eviction.bytes_downscaled:,} bytes)"
+            )
+
+    def end_turn(self, event: AfterInvocationEvent) -> None:
+        if self.last_turn:
+            turn = self.last_turn
+            logger.info(
+                f"[ImageHistory] Turn: {turn.images_removed} images removed ({turn.bytes_removed:,} bytes), "
+                f"{turn.images_downscaled} downscaled (-{turn.bytes_downscaled:,} bytes)"
+            )
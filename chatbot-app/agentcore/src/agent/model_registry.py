@@ -0,0 +1,267 @@
+"""
+Model Registry - Shared Bedrock clients and BedrockModel instances
+
+Every ChatAgent turn, swarm run (three models) and composer LLM call used to
+build its own BedrockModel, and with it a new bedrock-runtime client, a new
+HTTP connection pool and a new TLS handshake on the first request.
+
+The registry keeps, per process:
+- One boto3 Session (credentials and service models resolved once)
+- One bedrock-runtime client per (region, retry, timeout) profile, with a
+  larger connection pool and TCP keep-alive
+- One BedrockModel per (model_id, temperature, max_tokens, retry/timeouts,
+  cache_config), bound to the shared client of its profile; at most
+  max_models of them, least recently used dropped first
+
+BedrockModel only holds configuration plus the client, and boto3 clients are
+thread-safe, so instances can be shared by concurrent agents.
+
+Usage:
+    from agent.model_registry import get_model_registry
+
+    model = get_model_registry().get_model(
+        model_id="us.anthropic.claude-haiku-4-5-20251001-v1:0",
+        temperature=0.7,
+        cache_config=CacheConfig(strategy="auto"),
+    )
+    agent = Agent(model=model, ...)
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from strands.models import BedrockModel
+
+from agent.config.constants import (
+    DEFAULT_AWS_REGION,
+    DEFAULT_BEDROCK_MAX_MODELS,
+    DEFAULT_BEDROCK_MAX_POOL_CONNECTIONS,
+    DEFAULT_BEDROCK_TCP_KEEPALIVE,
+    EnvVars,
+)
+from agent.config.env import env_bool, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[Any, ...]
+ModelKey = Tuple[Any, ...]
+
+
+class _SharedClientSession:
+    """boto3 Session stand-in handed to BedrockModel so it binds the shared client.
+
+    BedrockModel always creates its client through boto_session.client();
+    this returns the registry's client for the model's profile instead of
+    opening another connection pool.
+    """
+
+    def __init__(self, client: Any, region_name: str):
+        self._client = client
+        self.region_name = region_name
+
+    def client(self, *args: Any, **kwargs: Any) -> Any:
+        return self._client
+
+
+class ModelRegistry:
+    """Process-wide cache of bedrock-runtime clients and BedrockModels."""
+
+    def __init__(
+        self,
+        region: Optional[str] = None,
+        max_pool_connections: int = DEFAULT_BEDROCK_MAX_POOL_CONNECTIONS,
+        tcp_keepalive: bool = DEFAULT_BEDROCK_TCP_KEEPALIVE,
+        max_models: int = DEFAULT_BEDROCK_MAX_MODELS,
+    ):
+        self.region = region or os.environ.get(EnvVars.AWS_REGION, DEFAULT_AWS_REGION)
+        self.max_pool_connections = max_pool_connections
+        self.tcp_keepalive = tcp_keepalive
+        self.max_models = max_models
+
+        self._session: Optional[boto3.Session] = None
+        self._clients: Dict[ClientKey, Any] = {}
+        self._models: "OrderedDict[ModelKey, BedrockModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.client_hits = 0
+        self.client_misses = 0
+        self.model_hits = 0
+        self.model_misses = 0
+        self.model_evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """Create registry from environment variables."""
+        return cls(
+            max_pool_connections=env_int(EnvVars.BEDROCK_MAX_POOL_CONNECTIONS, DEFAULT_BEDROCK_MAX_POOL_CONNECTIONS),
+            tcp_keepalive=env_bool(EnvVars.BEDROCK_TCP_KEEPALIVE, DEFAULT_BEDROCK_TCP_KEEPALIVE),
+            max_models=env_int(EnvVars.BEDROCK_MAX_MODELS, DEFAULT_BEDROCK_MAX_MODELS),
+        )
+
+    def get_model(
+        self,
+        model_id: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_attempts: int = 10,
+        retry_mode: str = "adaptive",
+        connect_timeout: int = 30,
+        read_timeout: int = 300,
+        cache_config: Any = None,
+    ) -> BedrockModel:
+        """
+        Get a shared BedrockModel, building it (and its client) on first use.
+
+        Args:
+            model_id: Bedrock model ID
+            temperature: Sampling temperature (None = model default)
+            max_tokens: Max output tokens (None = model default)
+            max_attempts: botocore retry attempts
+            retry_mode: botocore retry mode ("adaptive", "standard", ...)
+            connect_timeout: Connect timeout in seconds
+            read_timeout: Read timeout in seconds
+            cache_config: Optional strands CacheConfig for prompt caching
+
+        Returns:
+            BedrockModel bound to the shared client for its retry/timeout profile
+        """
+        client_key: ClientKey = (self.region, max_attempts, retry_mode, connect_timeout, read_timeout)
+        model_key: ModelKey = (
+            model_id,
+            temperature,
+            max_tokens,
+            client_key,
+            repr(cache_config) if cache_config is not None else None,
+        )
+
+        with self._lock:
+            model = self._models.get(model_key)
+            if model is not None:
+                self._models.move_to_end(model_key)
+                self.model_hits += 1
+                return model
+            self.model_misses += 1
+
+            client_config = self._build_client_config(max_attempts, retry_mode, connect_timeout, read_timeout)
+            client = self._get_client_locked(client_key, client_config)
+
+            model_config: Dict[str, Any] = {"model_id": model_id}
+            if temperature is not None:
+                model_config["temperature"] = temperature
+            if max_tokens is not None:
+                model_config["max_tokens"] = max_tokens
+            if cache_config is not None:
+                model_config["cache_config"] = cache_config
+
+            model = BedrockModel(
+                boto_session=_SharedClientSession(client, self.region),
+                boto_client_config=client_config,
+                **model_config,
+            )
+            self._models[model_key] = model
+            # Dropped models keep working for agents still holding them; the client stays shared
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.model_evictions += 1
+
+        logger.debug(
+            f"[ModelRegistry] Built model: {model_id} (temperature={temperature}, "
+            f"max_tokens={max_tokens}, read_timeout={read_timeout})"
+        )
+        return model
+
+    def get_client(
+        self,
+        max_attempts: int = 10,
+        retry_mode: str = "adaptive",
+        connect_timeout: int = 30,
+        read_timeout: int = 300,
+    ) -> Any:
+        """Get the shared bedrock-runtime client for a retry/timeout profile."""
+        client_key: ClientKey = (self.region, max_attempts, retry_mode, connect_timeout, read_timeout)
+        client_config = self._build_client_config(max_attempts, retry_mode, connect_timeout, read_timeout)
+        with self._lock:
+            return self._get_client_locked(client_key, client_config)
+
+    def clear(self) -> None:
+        """Drop all cached models and clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._models.clear()
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"[ModelRegistry] Error closing client: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry counters for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "models": len(self._models),
+                "clients": len(self._clients),
+                "model_hits": self.model_hits,
+                "model_misses": self.model_misses,
+                "model_evictions": self.model_evictions,
+                "max_models": self.max_models,
+                "client_hits": self.client_hits,
+                "client_misses": self.client_misses,
+                "max_pool_connections": self.max_pool_connections,
+                "tcp_keepalive": self.tcp_keepalive,
+            }
+
+    def _build_client_config(
+        self,
+        max_attempts: int,
+        retry_mode: str,
+        connect_timeout: int,
+        read_timeout: int,
+    ) -> Config:
+        return Config(
+            retries={"max_attempts": max_attempts, "mode": retry_mode},
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_pool_connections=self.max_pool_connections,
+            tcp_keepalive=self.tcp_keepalive,
+        )
+
+    def _get_session_locked(self) -> boto3.Session:
+        """Lazily create the shared boto3 Session. Caller holds the lock."""
+        if self._session is None:
+            self._session = boto3.Session()
+        return self._session
+
+    def _get_client_locked(self, client_key: ClientKey, client_config: Config) -> Any:
+        """Get or create the shared client for client_key. Caller holds the lock."""
+        client = self._clients.get(client_key)
+        if client is not None:
+            self.client_hits += 1
+            return client
+
+        self.client_misses += 1
+        client = self._get_session_locked().client(
+            service_name="bedrock-runtime",
+            region_name=self.region,
+            # Same user agent suffix BedrockModel adds to its own clients
+            config=client_config.merge(Config(user_agent_extra="strands-agents")),
+        )
+        self._clients[client_key] = client
+        logger.info(
+            f"[ModelRegistry] Created bedrock-runtime client: region={self.region}, "
+            f"retries={client_key[1]}/{client_key[2]}, read_timeout={client_key[4]}, "
+            f"max_pool_connections={self.max_pool_connections}"
+        )
+        return client
+
+
+@process_singleton
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide ModelRegistry singleton."""
+    return ModelRegistry.from_env()
@@ -0,0 +1,260 @@
+"""
+Prewarm - Fill one-time caches before the first request
+
+The first request of a container used to pay for a series of AWS lookups:
+memory strategy IDs, SSM parameters (Gateway URL, Code Interpreter ID,
+document bucket, A2A runtime ARNs), the tool registry config (tools-config.json
+or DynamoDB TOOL_REGISTRY), A2A agent cards and the Gateway MCP tool listing.
+
+The prewarm stage runs all of these concurrently (each in a worker thread) and
+fills the shared caches their normal call sites read from. It runs at startup
+(FastAPI lifespan, in the background so /ping answers immediately) and on the
+`warmup` invocation. Per-item timings and a readiness flag are reported on
+/health. Items that completed ("ok" or "skipped") are not run again; later
+runs (every warmup ping) only retry the ones that failed or timed out.
+
+Configuration:
+- PREWARM_ON_STARTUP: "true" (default) / "false"
+- PREWARM_ITEMS: comma-separated subset of PREWARM_ITEMS (default: all)
+- PREWARM_TIMEOUT_SECONDS: per-item timeout (default: 30)
+
+Usage:
+    from agent.prewarm import get_prewarmer
+
+    prewarmer = get_prewarmer()
+    prewarmer.start()              # background task (lifespan)
+    status = await prewarmer.run() # wait for completion (warmup invocation)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from agent.config.constants import DEFAULT_AWS_REGION, DEFAULT_PREWARM_TIMEOUT_SECONDS, EnvVars
+from agent.config.env import env_bool, env_float
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# An item returns a short detail string, or None when it does not apply here
+PrewarmItem = Callable[[], Optional[str]]
+
+# Item results that are not retried by later runs
+COMPLETED_STATUSES = ("ok", "skipped")
+
+
+# =============================================================================
+# Prewarm Items
+# =============================================================================
+
+def _region() -> str:
+    return os.environ.get(EnvVars.AWS_REGION, DEFAULT_AWS_REGION)
+
+
+def prewarm_memory_strategies() -> Optional[str]:
+    """Memory strategy map used for AgentCore Memory retrieval config."""
+    memory_id = os.environ.get(EnvVars.MEMORY_ID)
+    if not memory_id:
+        return None
+    from agents.chat_agent import get_memory_strategy_ids
+    strategy_map = get_memory_strategy_ids(memory_id, _region())
+    return f"{len(strategy_map)} strategies"
+
+
+def prewarm_gateway_url() -> Optional[str]:
+    """Gateway URL from SSM."""
+    from agent.gateway.mcp_client import GATEWAY_ENABLED, get_gateway_url_from_ssm
+    if not GATEWAY_ENABLED:
+        return None
+    if not get_gateway_url_from_ssm():
+        raise ValueError("Gateway URL not found in Parameter Store")
+    return "cached"
+
+
+def prewarm_code_interpreter_id() -> Optional[str]:
+    """Code Interpreter ID from env or SSM."""
+    from agent.processor.file_processor import get_code_interpreter_id
+    if not get_code_interpreter_id():
+        raise ValueError("Code Interpreter ID not configured")
+    return "cached"
+
+
+def prewarm_document_bucket() -> Optional[str]:
+    """Workspace document bucket from env or SSM."""
+    from workspace.config import get_workspace_bucket
+    get_workspace_bucket()
+    return "cached"
+
+
+def prewarm_a2a_arns() -> Optional[str]:
+    """A2A runtime ARNs from SSM."""
+    if os.environ.get('LOCAL_RESEARCH_AGENT_URL'):
+        return None
+    import a2a_tools
+    found = [
+        agent_id for agent_id in a2a_tools.A2A_AGENTS_CONFIG
+        if a2a_tools.get_cached_agent_arn(agent_id, _region())
+    ]
+    return f"{len(found)}/{len(a2a_tools.A2A_AGENTS_CONFIG)} ARNs"
+
+
+def prewarm_a2a_agent_cards() -> Optional[str]:
+    """A2A agent cards (needs the runtime ARNs)."""
+    if os.environ.get('LOCAL_RESEARCH_AGENT_URL'):
+        return None
+    import a2a_tools
+    count = 0
+    for agent_id in a2a_tools.A2A_AGENTS_CONFIG:
+        agent_arn = a2a_tools.get_cached_agent_arn(agent_id, _region())
+        if agent_arn:
+            a2a_tools.get_cached_agent_card(agent_arn, _region())
+            count += 1
+    return f"{count} agent cards"
+
+
+def prewarm_tool_config() -> Optional[str]:
+    """Tool registry config (tools-config.json locally, DynamoDB TOOL_REGISTRY in cloud)."""
+    from agent.config.prompt_builder import load_tool_registry_config
+    if load_tool_registry_config(force_refresh=True) is None:
+        raise ValueError("Tool registry config could not be loaded")
+    return "cached"
+
+
+def prewarm_gateway_tools() -> Optional[str]:
+    """Gateway MCP tool listing, kept for the FilteredMCPClient of every new agent."""
+    from agent.gateway.mcp_client import GATEWAY_ENABLED, cache_gateway_tool_listing, create_gateway_mcp_client
+    if not GATEWAY_ENABLED:
+        return None
+    client = create_gateway_mcp_client()
+    if client is None:
+        return None
+    with client:
+        tools = client.list_tools_sync()
+    if not cache_gateway_tool_listing(tools, tools.pagination_token):
+        return f"{len(tools)} tools (paginated, not cached)"
+    return f"{len(tools)} tools"
+
+
+PREWARM_ITEMS: Dict[str, PrewarmItem] = {
+    "memory_strategies": prewarm_memory_strategies,
+    "gateway_url": prewarm_gateway_url,
+    "code_interpreter_id": prewarm_code_interpreter_id,
+    "document_bucket": prewarm_document_bucket,
+    "a2a_arns": prewarm_a2a_arns,
+    "a2a_agent_cards": prewarm_a2a_agent_cards,
+    "tool_config": prewarm_tool_config,
+    "gateway_tools": prewarm_gateway_tools,
+}
+
+
+# =============================================================================
+# Prewarmer
+# =============================================================================
+
+class Prewarmer:
+    """Runs prewarm items concurrently and keeps per-item results for /health."""
+
+    def __init__(
+        self,
+        items: Optional[Dict[str, PrewarmItem]] = None,
+        on_startup: bool = True,
+        timeout_seconds: float = DEFAULT_PREWARM_TIMEOUT_SECONDS,
+    ):
+        self.items = dict(PREWARM_ITEMS if items is None else items)
+        self.on_startup = on_startup
+        self.timeout_seconds = timeout_seconds
+
+        # Nothing pending when startup prewarm is off
+        self.ready = not on_startup
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.total_ms: Optional[float] = None
+        self.runs = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "Prewarmer":
+        """Create prewarmer from environment variables."""
+        items = dict(PREWARM_ITEMS)
+        selected = os.environ.get(EnvVars.PREWARM_ITEMS)
+        if selected is not None:
+            names = [name.strip() for name in selected.split(",") if name.strip()]
+            unknown = [name for name in names if name not in PREWARM_ITEMS]
+            if unknown:
+                logger.warning(f"[Prewarm] Ignoring unknown items: {unknown}")
+            items = {name: PREWARM_ITEMS[name] for name in names if name in PREWARM_ITEMS}
+
+        return cls(
+            items=items,
+            on_startup=env_bool(EnvVars.PREWARM_ON_STARTUP, True),
+            timeout_seconds=env_float(EnvVars.PREWARM_TIMEOUT_SECONDS, DEFAULT_PREWARM_TIMEOUT_SECONDS),
+        )
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Schedule a background run (no-op if one is already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_all())
+        return self._task
+
+    async def run(self) -> Dict[str, Any]:
+        """Run (or join the running) prewarm and return the status."""
+        await asyncio.shield(self.start())
+        return self.get_status()
+
+    async def stop(self) -> None:
+        """Cancel a running prewarm (shutdown). Worker threads finish on their own."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness flag and per-item results for /health."""
+        return {
+            "ready": self.ready,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "total_ms": self.total_ms,
+            "items": dict(self.results),
+        }
+
+    async def _run_all(self) -> None:
+        pending = {
+            name: fn for name, fn in self.items.items()
+            if self.results.get(name, {}).get("status") not in COMPLETED_STATUSES
+        }
+        if not pending:
+            self.ready = True
+            return
+
+        logger.info(f"[Prewarm] Starting: {list(pending)}")
+        start = time.perf_counter()
+        await asyncio.gather(*(self._run_item(name, fn) for name, fn in pending.items()))
+        self.total_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.runs += 1
+        self.ready = True
+
+        summary = ", ".join(f"{name}={r['status']}({r['ms']}ms)" for name, r in self.results.items())
+        logger.info(f"[Prewarm] Completed in {self.total_ms}ms: {summary}")
+
+    async def _run_item(self, name: str, fn: PrewarmItem) -> None:
+        start = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(asyncio.to_thread(fn), timeout=self.timeout_seconds)
+            result = {"status": "ok" if detail is not None else "skipped", "detail": detail}
+        except asyncio.TimeoutError:
+            result = {"status": "timeout", "detail": f"exceeded {self.timeout_seconds}s"}
+        except Exception as e:
+            result = {"status": "error", "detail": str(e)}
+            logger.warning(f"[Prewarm] {name} failed: {e}")
+        result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.results[name] = result
+
+
+@process_singleton
+def get_prewarmer() -> Prewarmer:
+    """Get the process-wide Prewarmer singleton."""
+    return Prewarmer.from_env()
@@ -106,16 +106,14 @@ def get_code_interpreter_id() -> Optional[str]:
 
     # Try Parameter Store
     try:
-        import boto3
+        from agent.config.parameters import get_ssm_parameter
         project_name = os.getenv(EnvVars.PROJECT_NAME, 'strands-agent-chatbot')
         environment = os.getenv(EnvVars.ENVIRONMENT, 'dev')
         region = os.getenv(EnvVars.AWS_REGION, DEFAULT_AWS_REGION)
         param_name = f"/{project_name}/{environment}/agentcore/code-interpreter-id"
 
         logger.debug(f"Checking Parameter Store for Code Interpreter ID: {param_name}")
-        ssm = boto3.client('ssm', region_name=region)
-        response = ssm.get_parameter(Name=param_name)
-        code_interpreter_id = response['Parameter']['Value']
+        code_interpreter_id = get_ssm_parameter(param_name, region)  # Cached per process
         logger.debug(f"Found CODE_INTERPRETER_ID in Parameter Store: {code_interpreter_id}")
         return code_interpreter_id
     except Exception as e:
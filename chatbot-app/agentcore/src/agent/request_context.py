@@ -0,0 +1,102 @@
+"""
+Request Context - Per-stream session state via contextvars
+
+ChatAgent used to publish the current session through os.environ['SESSION_ID']
+/ os.environ['USER_ID'] and a module-global stream processor. Those are
+process-wide, so two overlapping streams in one container saw each other's
+session (e.g. a browser tool attaching to the other conversation's browser).
+
+Context variables are per asyncio task and are copied into:
+- Tasks created while the context is set (asyncio.create_task, Strands event loop)
+- Threads started via asyncio.to_thread (Strands runs sync @tool functions this way)
+
+Plain executors (loop.run_in_executor, ThreadPoolExecutor.submit) do not copy
+the context - use run_in_executor() / submit_with_context() from this module.
+
+Usage:
+    from agent.request_context import set_request_context, get_session_id
+
+    # Agent side (start of a stream)
+    set_request_context(session_id, user_id, stream_processor)
+
+    # Tool side
+    session_id = get_session_id()           # None outside a request
+    user_id = get_user_id("default_user")
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+_user_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("user_id", default=None)
+_stream_processor: contextvars.ContextVar[Any] = contextvars.ContextVar("stream_processor", default=None)
+
+
+@dataclass
+class RequestContextTokens:
+    """Tokens returned by set_request_context(), for reset_request_context()."""
+    session_id: contextvars.Token
+    user_id: contextvars.Token
+    stream_processor: contextvars.Token
+
+
+def set_request_context(
+    session_id: Optional[str],
+    user_id: Optional[str] = None,
+    stream_processor: Any = None,
+) -> RequestContextTokens:
+    """
+    Bind session/user/stream processor to the current context.
+
+    Args:
+        session_id: Session identifier
+        user_id: User identifier (defaults to session_id)
+        stream_processor: StreamEventProcessor of the running stream
+
+    Returns:
+        Tokens to restore the previous values with reset_request_context()
+    """
+    return RequestContextTokens(
+        session_id=_session_id.set(session_id),
+        user_id=_user_id.set(user_id or session_id),
+        stream_processor=_stream_processor.set(stream_processor),
+    )
+
+
+def reset_request_context(tokens: RequestContextTokens) -> None:
+    """Restore the values active before set_request_context()."""
+    _stream_processor.reset(tokens.stream_processor)
+    _user_id.reset(tokens.user_id)
+    _session_id.reset(tokens.session_id)
+
+
+def get_session_id(default: Optional[str] = None) -> Optional[str]:
+    """Session ID of the current request, or default outside a request."""
+    return _session_id.get() or default
+
+
+def get_user_id(default: Optional[str] = None) -> Optional[str]:
+    """User ID of the current request, or default outside a request."""
+    return _user_id.get() or default
+
+
+def get_stream_processor() -> Any:
+    """StreamEventProcessor of the current stream (None outside a stream)."""
+    return _stream_processor.get()
+
+
+async def run_in_executor(executor: Optional[Executor], func: Callable, *args: Any) -> Any:
+    """loop.run_in_executor() that carries the request context into the worker thread."""
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args))
+
+
+def submit_with_context(executor: Executor, func: Callable, *args: Any, **kwargs: Any) -> Future:
+    """executor.submit() that carries the request context into the worker thread."""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, func, *args, **kwargs)
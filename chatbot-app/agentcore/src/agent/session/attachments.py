@@ -0,0 +1,437 @@
+"""
+Session Attachments - Uploaded files kept out of the conversation history
+
+ChatAgent._build_prompt puts the raw bytes of uploaded images and documents
+into image/document content blocks of the user message. Those blocks were
+persisted with the message (base64 in local session files, blob payloads in
+AgentCore Memory), loaded back on every session load and re-sent to Bedrock
+on every later turn until Stage 1 truncation dropped them.
+
+Uploads are now stored once per session, addressed by SHA-256, and persisted
+messages keep a short text stub instead of the bytes:
+
+    <attachment sha256="<hex>" kind="image" format="png" size="48213">...</attachment>
+
+A stub is only written once the bytes are stored durably:
+- Local sessions: the session's content-addressed blobs/ directory that the
+  message segments already use
+- Cloud sessions: S3 (ATTACHMENT_BUCKET, default DOCUMENT_BUCKET) under
+  documents/<user_id>/<session_id>/attachments/<sha256>
+Without a durable tier (no bucket configured) or when the write fails, the
+message keeps its bytes, as before. A bounded in-memory cache, separate from
+the SSE screenshot BlobStore, sits in front of both tiers.
+
+- detach() turns the file blocks of a user prompt into stubs; the session
+  managers call it before a message is written. Files that reattach_file put
+  into a tool result are written as their stub too (see reattached_content)
+- AttachmentHistoryHook (agent/hooks) applies ATTACHMENT_POLICY to the
+  agent's messages before each model call:
+  - "first_turn" (default): files go inline on the turn they were uploaded
+    or re-attached; afterwards the model sees the stub and can call
+    reattach_file
+  - "inline": stubs are resolved back into image/document blocks
+  - "off": nothing is detached, messages keep their bytes as before
+
+Usage:
+    from agent.session.attachments import get_attachment_store
+
+    store = get_attachment_store()
+    scope = AttachmentScope(session_id, user_id=actor_id)        # or blobs_dir=... (local)
+    message = store.detach(message, scope)                       # before persisting
+    block = store.resolve_block(block, scope)                    # stub -> file block (or None)
+"""
+
+import hashlib
+import html
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agent.config.constants import (
+    DEFAULT_ATTACHMENT_CACHE_MAX_SESSION_BYTES,
+    DEFAULT_ATTACHMENT_CACHE_MAX_TOTAL_BYTES,
+    DEFAULT_ATTACHMENT_CACHE_TTL_SECONDS,
+    DEFAULT_ATTACHMENT_POLICY,
+    DEFAULT_AWS_REGION,
+    EnvVars,
+)
+from agent.config.env import env_int
+from agent.config.singleton import process_singleton
+from agent.session.message_segments import read_blob, write_blob
+from streaming.blob_store import BlobStore
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_POLICIES = ("first_turn", "inline", "off")
+ATTACHMENT_KINDS = ("image", "document")
+REATTACH_TOOL_NAME = "reattach_file"
+
+# Same layout as the workspace documents: documents/<user>/<session>/...
+ATTACHMENT_S3_PREFIX = "documents"
+# S3 keys remembered as already uploaded
+MAX_UPLOADED_KEYS = 4096
+
+_STUB_PREFIX = "<attachment "
+_STUB = re.compile(r'<attachment ((?:\w+="[^"]*" ?)+)>[^<]*</attachment>')
+_STUB_ATTRIBUTE = re.compile(r'(\w+)="([^"]*)"')
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def attachment_stub(
+    kind: str, sha256: str, format: str, size: int, name: Optional[str] = None, note: Optional[str] = None
+) -> str:
+    """Text that stands in for an uploaded file in persisted history (note: body text, no "<")."""
+    attributes = {"sha256": sha256, "kind": kind, "format": format, "size": str(size)}
+    if name:
+        attributes["name"] = name
+    rendered = " ".join(f'{key}="{html.escape(value, quote=True)}"' for key, value in attributes.items())
+    if note is None:
+        note = (
+            f"Uploaded {kind} from an earlier turn, not included again. "
+            f"Call {REATTACH_TOOL_NAME} with this sha256 to look at it."
+        )
+    return f"<attachment {rendered}>{note}</attachment>"
+
+
+def parse_attachment_stub(block: Any) -> Optional[Dict[str, str]]:
+    """Attributes of a content block that is exactly one attachment stub, else None."""
+    if not isinstance(block, dict) or len(block) != 1:
+        return None
+    text = block.get("text")
+    if not isinstance(text, str) or not text.startswith(_STUB_PREFIX):
+        return None
+
+    match = _STUB.fullmatch(text)
+    if match is None:
+        return None
+    attributes = {key: html.unescape(value) for key, value in _STUB_ATTRIBUTE.findall(match.group(1))}
+    if attributes.get("kind") not in ATTACHMENT_KINDS or not _SHA256.fullmatch(attributes.get("sha256", "")):
+        return None
+    return attributes
+
+
+def is_user_prompt(message: Any) -> bool:
+    """User message typed by the user (not a tool result message)."""
+    if not isinstance(message, dict) or message.get("role") != "user":
+        return False
+    content = message.get("content")
+    return isinstance(content, list) and not any(isinstance(block, dict) and "toolResult" in block for block in content)
+
+
+def file_block(attributes: Dict[str, str], data: bytes) -> Dict[str, Any]:
+    """Image/document content block for stub attributes and the file's bytes."""
+    if attributes["kind"] == "image":
+        return {"image": {"format": attributes.get("format", "png"), "source": {"bytes": data}}}
+    return {
+        "document": {
+            "format": attributes.get("format", "txt"),
+            "name": attributes.get("name") or "document",
+            "source": {"bytes": data},
+        }
+    }
+
+
+def reattached_content(attributes: Dict[str, str], data: bytes) -> List[Dict[str, Any]]:
+    """
+    toolResult content of reattach_file: the file's stub followed by the file.
+
+    The stub marks the file block as a stored attachment, so detach() writes
+    the result as the plain stub and the bytes are not persisted again.
+    """
+    name = attributes.get("name") or f"{attributes['kind']}.{attributes.get('format', '')}"
+    stub = attachment_stub(
+        attributes["kind"], attributes["sha256"], attributes.get("format", ""), len(data),
+        attributes.get("name"), note=f"Re-attached {name} ({len(data)} bytes).",
+    )
+    return [{"text": stub}, file_block(attributes, data)]
+
+
+def _file_bytes(block: Any, kind: str) -> Optional[bytes]:
+    """Bytes of an image/document block of the given kind, else None."""
+    if not isinstance(block, dict) or not isinstance(block.get(kind), dict):
+        return None
+    data = (block[kind].get("source") or {}).get("bytes")
+    return bytes(data) if isinstance(data, (bytes, bytearray)) else None
+
+
+@dataclass(frozen=True)
+class AttachmentScope:
+    """Where one session's attachments are stored durably."""
+    session_id: str
+    user_id: Optional[str] = None     # S3 key prefix (cloud sessions)
+    blobs_dir: Optional[str] = None   # Local sessions: session_<id>/blobs
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.user_id or ''}/{self.session_id}"
+
+
+class AttachmentStore:
+    """Moves uploaded files between user messages and durable, content-addressed storage."""
+
+    def __init__(
+        self,
+        policy: str = DEFAULT_ATTACHMENT_POLICY,
+        bucket: Optional[str] = None,
+        s3_client: Any = None,
+        cache: Optional[BlobStore] = None,
+    ):
+        """
+        Args:
+            policy: "first_turn", "inline" or "off" (see module docstring)
+            bucket: S3 bucket of the durable tier for sessions without a blobs_dir
+            s3_client: boto3 S3 client (default: created on first use)
+            cache: In-memory tier in front of the durable one
+        """
+        if policy not in ATTACHMENT_POLICIES:
+            logger.warning(f"[Attachments] Unknown policy {policy!r}, using {DEFAULT_ATTACHMENT_POLICY!r}")
+            policy = DEFAULT_ATTACHMENT_POLICY
+        self.policy = policy
+        self.bucket = bucket
+        self._s3_client = s3_client
+        self.cache = cache if cache is not None else BlobStore(
+            max_session_bytes=DEFAULT_ATTACHMENT_CACHE_MAX_SESSION_BYTES,
+            max_total_bytes=DEFAULT_ATTACHMENT_CACHE_MAX_TOTAL_BYTES,
+            ttl_seconds=DEFAULT_ATTACHMENT_CACHE_TTL_SECONDS,
+            thumbnail_px=0,
+        )
+        # S3 keys written by this process, so re-detaching a warm agent's file skips the upload
+        self._uploaded: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.detached = 0
+        self.detached_bytes = 0
+        self.not_durable = 0
+        self.resolved = 0
+        self.unavailable = 0
+
+    @classmethod
+    def from_env(cls) -> "AttachmentStore":
+        """Create store from environment variables."""
+        return cls(
+            policy=os.environ.get(EnvVars.ATTACHMENT_POLICY, DEFAULT_ATTACHMENT_POLICY).lower(),
+            bucket=os.environ.get(EnvVars.ATTACHMENT_BUCKET) or os.environ.get(EnvVars.DOCUMENT_BUCKET) or None,
+            cache=BlobStore(
+                max_session_bytes=env_int(EnvVars.ATTACHMENT_CACHE_MAX_SESSION_BYTES, DEFAULT_ATTACHMENT_CACHE_MAX_SESSION_BYTES),
+                max_total_bytes=env_int(EnvVars.ATTACHMENT_CACHE_MAX_TOTAL_BYTES, DEFAULT_ATTACHMENT_CACHE_MAX_TOTAL_BYTES),
+                ttl_seconds=DEFAULT_ATTACHMENT_CACHE_TTL_SECONDS,
+                thumbnail_px=0,
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.policy != "off"
+
+    @property
+    def s3_client(self) -> Any:
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client(
+                "s3", region_name=os.environ.get(EnvVars.AWS_REGION, DEFAULT_AWS_REGION)
+            )
+        return self._s3_client
+
+    def is_durable(self, scope: AttachmentScope) -> bool:
+        """Whether files of this scope survive the process (local blobs dir or S3)."""
+        return bool(scope.blobs_dir or (self.bucket and scope.user_id))
+
+    def _s3_key(self, scope: AttachmentScope, sha256: str) -> str:
+        return f"{ATTACHMENT_S3_PREFIX}/{scope.user_id}/{scope.session_id}/attachments/{sha256}"
+
+    def put(self, scope: AttachmentScope, data: bytes, format: str) -> Optional[str]:
+        """
+        Store a file's bytes; returns their SHA-256 hex digest once they are durable.
+
+        Returns None when the scope has no durable tier or the write failed:
+        the caller then keeps the bytes in the message.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        if not self.is_durable(scope):
+            return None
+
+        try:
+            if scope.blobs_dir:
+                write_blob(scope.blobs_dir, data)
+            else:
+                key = self._s3_key(scope, sha256)
+                with self._lock:
+                    uploaded = key in self._uploaded
+                if not uploaded:
+                    self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=data)
+                    with self._lock:
+                        self._uploaded[key] = None
+                        while len(self._uploaded) > MAX_UPLOADED_KEYS:
+                            self._uploaded.popitem(last=False)
+        except Exception as e:
+            logger.warning(f"[Attachments] Could not store {sha256[:12]} durably, keeping it inline: {e}")
+            return None
+
+        self.cache.put(scope.cache_key, data, format)
+        return sha256
+
+    def get(self, scope: AttachmentScope, sha256: str, format: str = "png") -> Optional[bytes]:
+        """Bytes of a stored file, or None when they are not available."""
+        if not _SHA256.fullmatch(sha256 or ""):
+            return None
+
+        blob = self.cache.get(sha256, scope.cache_key)
+        if blob is not None:
+            return blob.data
+
+        try:
+            if scope.blobs_dir:
+                data = read_blob(scope.blobs_dir, sha256)
+            elif self.bucket and scope.user_id:
+                response = self.s3_client.get_object(Bucket=self.bucket, Key=self._s3_key(scope, sha256))
+                data = response["Body"].read()
+            else:
+                return None
+        except Exception as e:
+            logger.debug(f"[Attachments] {sha256[:12]} not available: {e}")
+            return None
+
+        if hashlib.sha256(data).hexdigest() != sha256:
+            logger.warning(f"[Attachments] Stored bytes of {sha256[:12]} do not match their hash")
+            return None
+        self.cache.put(scope.cache_key, data, format)
+        return data
+
+    def stub_block(self, block: Any, scope: AttachmentScope) -> Optional[Dict[str, str]]:
+        """Stub text block for an image/document block whose bytes were stored durably, else None."""
+        if not isinstance(block, dict):
+            return None
+        kind = next((kind for kind in ATTACHMENT_KINDS if kind in block), None)
+        data = _file_bytes(block, kind) if kind is not None else None
+        if data is None:
+            return None
+
+        format = block[kind].get("format") or ("png" if kind == "image" else "txt")
+        sha256 = self.put(scope, data, format)
+        with self._lock:
+            if sha256 is None:
+                self.not_durable += 1
+                return None
+            self.detached += 1
+            self.detached_bytes += len(data)
+        return {"text": attachment_stub(kind, sha256, format, len(data), block[kind].get("name"))}
+
+    def resolve_block(self, block: Any, scope: AttachmentScope) -> Optional[Dict[str, Any]]:
+        """File block for a stub block whose bytes are available, else None."""
+        attributes = parse_attachment_stub(block)
+        if attributes is None:
+            return None
+
+        data = self.get(scope, attributes["sha256"], attributes.get("format", "png"))
+        with self._lock:
+            if data is None:
+                self.unavailable += 1
+                return None
+            self.resolved += 1
+        return file_block(attributes, data)
+
+    def detach(self, message: Dict[str, Any], scope: AttachmentScope) -> Dict[str, Any]:
+        """
+        Copy of a user prompt with its file blocks replaced by stubs.
+
+        Tool result messages go through detach_reattached(). Returns the
+        message itself when there is nothing to detach, the policy is "off"
+        or the scope has no durable tier; the input is never modified.
+        """
+        if not self.enabled or not self.is_durable(scope):
+            return message
+        if not is_user_prompt(message):
+            return self.detach_reattached(message)
+
+        content = message["content"]
+        detached = None
+        for index, block in enumerate(content):
+            stub = self.stub_block(block, scope)
+            if stub is None:
+                continue
+            if detached is None:
+                detached = list(content)
+            detached[index] = stub
+
+        if detached is None:
+            return message
+        return {**message, "content": detached}
+
+    def detach_reattached(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of a tool result message with the files of reattach_file results replaced by their stub.
+
+        Only a file block right after the stub of the same bytes (see
+        reattached_content) is replaced: its bytes are already stored. Other
+        tool result files (e.g. screenshots) are kept. Returns the message
+        itself when there is nothing to detach.
+        """
+        content = message.get("content") if isinstance(message, dict) else None
+        if message.get("role") != "user" or not isinstance(content, list):
+            return message
+
+        detached = None
+        for index, block in enumerate(content):
+            result = block.get("toolResult") if isinstance(block, dict) else None
+            if not isinstance(result, dict) or not isinstance(result.get("content"), list):
+                continue
+            stubbed = self._stub_reattached(result["content"])
+            if stubbed is None:
+                continue
+            if detached is None:
+                detached = list(content)
+            detached[index] = {**block, "toolResult": {**result, "content": stubbed}}
+
+        if detached is None:
+            return message
+        return {**message, "content": detached}
+
+    def _stub_reattached(self, blocks: List[Any]) -> Optional[List[Any]]:
+        """Tool result content with each (stub, file) pair collapsed into the plain stub, else None."""
+        stubbed = []
+        changed = False
+        position = 0
+        while position < len(blocks):
+            block = blocks[position]
+            attributes = parse_attachment_stub(block)
+            following = blocks[position + 1] if position + 1 < len(blocks) else None
+            data = _file_bytes(following, attributes["kind"]) if attributes is not None else None
+            if data is not None and hashlib.sha256(data).hexdigest() == attributes["sha256"]:
+                stubbed.append({"text": attachment_stub(
+                    attributes["kind"], attributes["sha256"], attributes.get("format", ""), len(data),
+                    attributes.get("name"),
+                )})
+                with self._lock:
+                    self.detached += 1
+                    self.detached_bytes += len(data)
+                changed = True
+                position += 2
+                continue
+            stubbed.append(block)
+            position += 1
+        return stubbed if changed else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store counters for health/metrics endpoints."""
+        with self._lock:
+            stats = {
+                "policy": self.policy,
+                "s3": bool(self.bucket),
+                "detached": self.detached,
+                "detached_bytes": self.detached_bytes,
+                "not_durable": self.not_durable,
+                "resolved": self.resolved,
+                "unavailable": self.unavailable,
+            }
+        stats["cache"] = self.cache.get_stats()
+        return stats
+
+
+@process_singleton
+def get_attachment_store() -> AttachmentStore:
+    """Get the process-wide AttachmentStore singleton."""
+    return AttachmentStore.from_env()
@@ -4,24 +4,40 @@ Compacting Session Manager for Long Context Optimization
 Simplified two-feature compaction with DynamoDB checkpoint persistence.
 """
 
-import copy
 import json
 import logging
 import os
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, Optional, Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Collection, Optional, Dict, List
 
 from strands.hooks import MessageAddedEvent
-from strands.hooks.events import AfterInvocationEvent, AgentInitializedEvent
+from strands.hooks.events import AfterInvocationEvent, AgentInitializedEvent, BeforeInvocationEvent
 from strands.hooks.registry import HookRegistry
 from strands.types.session import Session, SessionAgent, SessionMessage
 from typing_extensions import override
 
 from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
-from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
+from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig, PersistenceMode
 from bedrock_agentcore.memory.integrations.strands.bedrock_converter import AgentCoreMemoryConverter
+from strands.types.exceptions import SessionException
+
+from agent.config.constants import (
+    DEFAULT_COMPACTION_BACKGROUND,
+    DEFAULT_COMPACTION_PRE_TURN,
+    DEFAULT_COMPACTION_SUMMARY_WAIT_SECONDS,
+    DEFAULT_MEMORY_WRITE_BEHIND,
+    EnvVars,
+)
+from agent.config.env import env_bool, env_float
+from agent.session.attachments import AttachmentScope, get_attachment_store
+from agent.session.compaction_worker import compaction_key, get_compaction_worker
+from agent.session.history_cache import get_session_history_cache
+from agent.session.token_estimator import get_token_estimator, model_key_for
+from agent.session.truncation import ToolContentTruncator, get_truncation_cache, truncate_text
+from agent.session.write_behind import MemoryWriteQueue, PendingWrite
 
 if TYPE_CHECKING:
     from strands.agent.agent import Agent
@@ -33,6 +49,17 @@ PAYLOAD_TYPE_MESSAGE = "message"
 PAYLOAD_TYPE_AGENT_STATE = "agent_state"
 PAYLOAD_TYPE_SESSION = "session"
 
+# Upper bound of events read for a full history load (same as the SDK's list_messages)
+MAX_HISTORY_EVENTS = 10000
+
+# list_events page sizes: incremental loads start small (usually only a turn's
+# worth of events is newer than the watermark) and grow up to the API maximum
+HISTORY_FIRST_PAGE_SIZE = 10
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Interval between LTM summary lookups of a background compaction job
+SUMMARY_POLL_SECONDS = 5.0
+
 
 @dataclass
 class CompactionState:
@@ -41,13 +68,22 @@ class CompactionState:
 
     Simplified state tracking:
     - checkpoint: Message index to load from (0 = load all)
+    - checkpointEventId: Memory event holding the checkpoint message, so the
+      post-checkpoint tail can be loaded without reading older events
+    - checkpointEventOffset: Position of the checkpoint message among the
+      messages of that event (write-behind batches several into one event)
     - summary: Summary of messages before checkpoint
     - lastInputTokens: For tracking token growth
+    - lastEstimatedTokens: Local estimate of the messages behind lastInputTokens,
+      anchoring the next pre-turn token prediction
     """
     checkpoint: int = 0                      # Message index to load from (0 = load all)
     summary: Optional[str] = None            # Compressed history summary
     lastInputTokens: int = 0                 # Last turn's actual input tokens
     updatedAt: Optional[str] = None          # Last update timestamp
+    checkpointEventId: Optional[str] = None  # Event id of the checkpoint message
+    checkpointEventOffset: int = 0           # Checkpoint message position within that event
+    lastEstimatedTokens: int = 0             # Raw local estimate of lastInputTokens' messages
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for DynamoDB storage."""
@@ -55,7 +91,10 @@ class CompactionState:
             "checkpoint": self.checkpoint,
             "summary": self.summary,
             "lastInputTokens": self.lastInputTokens,
-            "updatedAt": self.updatedAt
+            "updatedAt": self.updatedAt,
+            "checkpointEventId": self.checkpointEventId,
+            "checkpointEventOffset": self.checkpointEventOffset,
+            "lastEstimatedTokens": self.lastEstimatedTokens,
         }
 
     @classmethod
@@ -68,7 +107,10 @@ class CompactionState:
             checkpoint=int(data.get("checkpoint", 0)),
             summary=data.get("summary"),
             lastInputTokens=int(data.get("lastInputTokens", 0)),
-            updatedAt=data.get("updatedAt")
+            updatedAt=data.get("updatedAt"),
+            checkpointEventId=data.get("checkpointEventId"),
+            checkpointEventOffset=int(data.get("checkpointEventOffset", 0)),
+            lastEstimatedTokens=int(data.get("lastEstimatedTokens", 0)),
         )
 
 
@@ -81,6 +123,11 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
     - Accurate token-based threshold triggering
     - Efficient checkpoint-based message loading
 
+    Parsed history is kept in a container-local write-through cache
+    (agent.session.history_cache), so later loads only fetch new events.
+    Without a cached history, a session with a checkpoint only reads the events
+    from the checkpoint message onwards (anchored by checkpointEventId).
+
     Flow:
     1. initialize(): Load compaction state, apply if enabled
     2. After turn: Update lastInputTokens, trigger compaction if threshold exceeded
@@ -100,6 +147,10 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         user_id: Optional[str] = None,
         summarization_strategy_id: Optional[str] = None,
         metrics_only: bool = False,
+        write_behind: Optional[bool] = None,
+        pre_turn_compaction: Optional[bool] = None,
+        background_compaction: Optional[bool] = None,
+        summary_wait_seconds: Optional[float] = None,
         **kwargs: Any,
     ):
         """
@@ -114,6 +165,14 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             user_id: User ID for DynamoDB operations
             summarization_strategy_id: Strategy ID for LTM summarization (optional)
             metrics_only: If True, only track metrics without applying compaction (for baseline testing)
+            write_behind: Queue Memory writes and persist them in the background, batched
+                (default: MEMORY_WRITE_BEHIND env var)
+            pre_turn_compaction: Apply the checkpoint in initialize() when the estimated input
+                tokens already exceed token_threshold (default: COMPACTION_PRE_TURN env var)
+            background_compaction: Prepare the checkpoint and its summary in the background
+                after the turn that crossed token_threshold (default: COMPACTION_BACKGROUND env var)
+            summary_wait_seconds: How long a background job waits for a fresh LTM summary
+                (default: COMPACTION_SUMMARY_WAIT_SECONDS env var)
             **kwargs: Additional arguments passed to parent
         """
         super().__init__(
@@ -129,9 +188,20 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         self.region_name = region_name
         self.summarization_strategy_id = summarization_strategy_id
         self.metrics_only = metrics_only
+        if pre_turn_compaction is None:
+            pre_turn_compaction = env_bool(EnvVars.COMPACTION_PRE_TURN, DEFAULT_COMPACTION_PRE_TURN)
+        self.pre_turn_compaction = pre_turn_compaction
+        if background_compaction is None:
+            background_compaction = env_bool(EnvVars.COMPACTION_BACKGROUND, DEFAULT_COMPACTION_BACKGROUND)
+        self.background_compaction = background_compaction
+        if summary_wait_seconds is None:
+            summary_wait_seconds = env_float(EnvVars.COMPACTION_SUMMARY_WAIT_SECONDS, DEFAULT_COMPACTION_SUMMARY_WAIT_SECONDS)
+        self.summary_wait_seconds = summary_wait_seconds
 
         # Current compaction state (loaded from DynamoDB in initialize)
         self.compaction_state: Optional[CompactionState] = None
+        # Serializes state updates of the request path and the background compaction job
+        self._state_lock = threading.Lock()
 
         # Last initialization info (for external metrics collection)
         self.last_init_info: Optional[Dict[str, Any]] = None
@@ -143,25 +213,71 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         self._total_message_count_at_init: int = 0
         # All messages loaded at initialize (for summary generation)
         self._all_messages_for_summary: List[Dict] = []
+        # Memory event id of each message in _all_messages_for_summary (None if unknown,
+        # the PendingWrite while a write-behind message is still queued)
+        self._message_event_ids: List[Any] = []
+        # Absolute index of _all_messages_for_summary[0] (> 0 when only the
+        # post-checkpoint tail was loaded)
+        self._loaded_base_index: int = 0
+        # Last message write (for _track_appended_message): its event id, or the
+        # PendingWrite whose event_id is set once the write-behind queue wrote it
+        self._last_message_write: Any = None
+        # Newest event this manager has seen (its last history load or write),
+        # checked by the history cache on write-through
+        self._history_watermark: Optional[str] = None
+
+        # Token estimate calibration: model of the agent, and (raw estimate, actual
+        # inputTokens) of the last known LLM call; the pre-turn prediction from
+        # initialize() is compared with the first call of the turn
+        self._model_key: str = "default"
+        self._token_anchor: Optional[tuple] = None
+        self._pre_turn_estimate: Optional[int] = None
+        # Context built by initialize() and not yet used by an invocation
+        self._context_fresh = False
+        # Messages the conversation manager restored ahead of the history (kept for warm rebuilds)
+        self._prepend_messages: List[Dict] = []
 
         # API call metrics for performance measurement
         self._api_call_count = 0
         self._api_call_total_ms = 0.0
+        # Time the agent loop spent waiting on persistence (hooks + flushes)
+        self._write_blocking_ms = 0.0
+
+        # Write-behind queue for message / agent state events (None = write inline)
+        if write_behind is None:
+            write_behind = env_bool(EnvVars.MEMORY_WRITE_BEHIND, DEFAULT_MEMORY_WRITE_BEHIND)
+        config = getattr(self, "config", None)
+        if write_behind and config is not None and config.batch_size > 1:
+            logger.debug("SDK batching configured (batch_size > 1), write-behind disabled")
+            write_behind = False
+        self._write_queue: Optional[MemoryWriteQueue] = MemoryWriteQueue(self._write_event) if write_behind else None
 
         mode_str = "metrics_only" if metrics_only else "full_compaction"
-        logger.debug(f"CompactingSessionManager: mode={mode_str}")
+        logger.debug(f"CompactingSessionManager: mode={mode_str}, write_behind={write_behind}")
 
     def reset_api_metrics(self):
         """Reset API call metrics."""
         self._api_call_count = 0
         self._api_call_total_ms = 0.0
+        self._write_blocking_ms = 0.0
 
     def get_api_metrics(self) -> Dict[str, Any]:
-        """Get API call metrics."""
-        return {
+        """
+        Get API call metrics.
+
+        api_call_count / api_call_total_ms count Memory write requests and their
+        latency; blocking_ms is how long the agent loop waited on them (equal to
+        api_call_total_ms without write-behind).
+        """
+        metrics = {
             "api_call_count": self._api_call_count,
             "api_call_total_ms": self._api_call_total_ms,
+            "blocking_ms": self._write_blocking_ms,
+            "write_behind": self._write_queue is not None,
         }
+        if self._write_queue is not None:
+            metrics["write_queue"] = self._write_queue.get_stats()
+        return metrics
 
     def _track_api_call(self, func, *args, **kwargs):
         """Execute function and track API call metrics."""
@@ -177,11 +293,20 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
     def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
         """Register hooks for session management."""
         registry.add_callback(AgentInitializedEvent, lambda event: self.initialize(event.agent))
+        registry.add_callback(BeforeInvocationEvent, lambda event: self._refresh_warm_context(event.agent))
+        if self._write_queue is not None:
+            # After-invocation callbacks run in reverse order: registered before the
+            # final state sync below, the flush runs after it
+            registry.add_callback(AfterInvocationEvent, lambda event: self._flush_after_turn())
         registry.add_callback(MessageAddedEvent, lambda event: self._append_message_tracked(event.message, event.agent))
         registry.add_callback(MessageAddedEvent, lambda event: self._sync_agent_tracked(event.agent))
         registry.add_callback(MessageAddedEvent, lambda event: self.retrieve_customer_context(event))
         registry.add_callback(AfterInvocationEvent, lambda event: self._sync_agent_tracked(event.agent))
 
+    def append_message(self, message: Dict, agent: "Agent", **kwargs: Any) -> None:
+        """Persist a message written outside the hooks (e.g. a partial response) and track it."""
+        self._append_message_tracked(message, agent)
+
     def _append_message_tracked(self, message: Dict, agent: "Agent") -> None:
         """Append message with API call tracking."""
         # Filter out empty content blocks before saving
@@ -196,16 +321,172 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         start = time.time()
         super().append_message(filtered_message, agent)
         elapsed_ms = (time.time() - start) * 1000
-        self._api_call_count += 1
-        self._api_call_total_ms += elapsed_ms
+        self._write_blocking_ms += elapsed_ms
+        if self._write_queue is None:
+            self._api_call_count += 1
+            self._api_call_total_ms += elapsed_ms
+
+        self._track_appended_message(filtered_message)
+
+    def _track_appended_message(self, message: Dict) -> None:
+        """Extend the cutoff/summary caches from initialize() with a newly persisted message.
+
+        Keeps update_after_turn() accurate when the same agent serves several turns
+        (warm agents from AgentPool) instead of being re-initialized every turn.
+        """
+        message_idx = self._total_message_count_at_init
+        self._total_message_count_at_init += 1
+
+        if self.metrics_only or self.compaction_state is None:
+            return
+
+        self._all_messages_for_summary.append(message)
+        self._message_event_ids.append(self._last_message_write)
+        if message.get('role') == 'user' and not self._has_tool_result(message):
+            self._valid_cutoff_message_ids.append(message_idx)
 
     def _sync_agent_tracked(self, agent: "Agent") -> None:
         """Sync agent with API call tracking."""
         start = time.time()
         super().sync_agent(agent)
         elapsed_ms = (time.time() - start) * 1000
+        self._write_blocking_ms += elapsed_ms
+        if self._write_queue is None:
+            self._api_call_count += 1
+            self._api_call_total_ms += elapsed_ms
+
+    def flush(self) -> None:
+        """
+        Write everything in the write-behind queue (turn end, stop, shutdown).
+
+        Raises:
+            SessionException: Queued writes could not be persisted (they stay queued)
+        """
+        if self._write_queue is None:
+            return
+
+        start = time.time()
+        try:
+            self._write_queue.flush()
+        except SessionException:
+            raise
+        except Exception as e:
+            raise SessionException(f"Failed to flush queued Memory writes: {e}") from e
+        finally:
+            self._write_blocking_ms += (time.time() - start) * 1000
+
+    def _flush_after_turn(self) -> None:
+        try:
+            self.flush()
+        except SessionException as e:
+            # The answer is already streamed; writes stay queued for the next flush
+            logger.error(f"[WriteBehind] Turn-end flush failed for session {self.session_id}: {e}")
+
+    def _write_event(self, batch: List[PendingWrite]) -> Optional[str]:
+        """Write queued items as one Memory event (runs on a write-behind worker)."""
+        # Only the newest state of each agent in the batch matters
+        latest = {item.coalesce_key: idx for idx, item in enumerate(batch) if item.coalesce_key}
+        items = [
+            item for idx, item in enumerate(batch)
+            if not item.coalesce_key or latest[item.coalesce_key] == idx
+        ]
+
+        metadata: Dict[str, Any] = {}
+        for item in items:
+            if item.metadata:
+                metadata.update(item.metadata)
+
+        params = {
+            "memoryId": self.config.memory_id,
+            "actorId": self.config.actor_id,
+            "sessionId": self.session_id,
+            "payload": [item.payload for item in items],
+            "eventTimestamp": self._get_monotonic_timestamp(),
+        }
+        if metadata:
+            params["metadata"] = metadata
+
+        start = time.time()
+        response = self.memory_client.gmdp_client.create_event(**params)
         self._api_call_count += 1
-        self._api_call_total_ms += elapsed_ms
+        self._api_call_total_ms += (time.time() - start) * 1000
+
+        event_id = response.get("event", {}).get("eventId")
+        for item in batch:
+            item.event_id = event_id
+
+        # Write-through in queue order: messages first, then the watermark
+        get_session_history_cache().append_event(
+            self.config.actor_id,
+            self.session_id,
+            [item.message for item in items if item.message is not None],
+            event_id,
+            self._history_watermark,
+        )
+        self._history_watermark = event_id
+        logger.debug(f"[WriteBehind] session={self.session_id}: {len(items)} items in event {event_id}")
+        return event_id
+
+    @override
+    def create_message(
+        self,
+        session_id: str,
+        agent_id: str,
+        session_message: SessionMessage,
+        **kwargs: Any,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Create message, queued for write-behind or written immediately.
+
+        Uploaded files are detached into attachment stubs first.
+        Written messages go through to the container-local history cache.
+        Queued messages return {} (no event id yet), like SDK batching.
+        """
+        self._last_message_write = None
+        # Uploaded files are written as <attachment> stubs once their bytes are in S3
+        detached = get_attachment_store().detach(
+            session_message.message, AttachmentScope(session_id, user_id=self.config.actor_id)
+        )
+        if detached is not session_message.message:
+            session_message = replace(session_message, message=detached)
+        # What a reload of this event would parse to
+        cached = replace(session_message, message=self._filter_empty_text(session_message.message))
+        cached = cached if cached.message.get("content") else None
+
+        if self._write_queue is not None and self.persistence_mode is not PersistenceMode.NONE:
+            if session_id != self.config.session_id:
+                raise SessionException(f"Session ID mismatch: expected {self.config.session_id}, got {session_id}")
+
+            messages = self.converter.message_to_payload(session_message)
+            if not messages:
+                return None
+
+            if self.converter.exceeds_conversational_limit(messages[0]):
+                payload = {"blob": json.dumps(messages[0])}
+            else:
+                text, role = messages[0]
+                payload = {"conversational": {"content": {"text": text}, "role": role.upper()}}
+
+            item = PendingWrite(
+                payload=payload,
+                size=self.converter.total_length(messages[0]),
+                metadata=self._build_metadata(per_call_metadata=kwargs.get("metadata")),
+                message=cached,
+            )
+            self._write_queue.put(item)
+            self._last_message_write = item
+            return {}
+
+        event = super().create_message(session_id, agent_id, session_message, **kwargs)
+        if event is not None:
+            # Conversational events come back unwrapped, blob events as {"event": {...}}
+            event_id = event.get("eventId") or event.get("event", {}).get("eventId")
+            self._last_message_write = event_id
+            get_session_history_cache().append(
+                self.config.actor_id, session_id, cached, event_id, self._history_watermark
+            )
+            self._history_watermark = event_id
+        return event
 
     @override
     def list_messages(
@@ -229,29 +510,246 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         offset: int = 0,
     ) -> List[SessionMessage]:
         """List messages from unified storage format."""
-        max_results = (limit + offset) if limit else 10000
+        cache = get_session_history_cache()
+        cached = cache.snapshot(self.config.actor_id, session_id)
+
+        if cached is None and limit is not None:
+            # Bounded read of the newest messages: not a full history to cache
+            events = self.memory_client.list_events(
+                memory_id=self.config.memory_id,
+                actor_id=self.config.actor_id,
+                session_id=session_id,
+                max_results=limit + offset,
+            )
+            messages, _ = self._parse_messages_from_events(events)
+        else:
+            messages, _ = self._load_history(session_id, cached)
 
-        events = self.memory_client.list_events(
-            memory_id=self.config.memory_id,
-            actor_id=self.config.actor_id,
-            session_id=session_id,
-            max_results=max_results,
+        # Apply offset and limit
+        if limit is not None:
+            return messages[offset : offset + limit]
+        return messages[offset:]
+
+    def list_recent_messages(
+        self,
+        session_id: str,
+        n: int,
+        roles: Optional[Collection[str]] = None,
+        agent_id: Optional[str] = None,
+    ) -> List[SessionMessage]:
+        """
+        The newest n messages of the session, oldest first.
+
+        Served from the history cache when the session is cached; otherwise
+        list_events is paged newest first and stops as soon as n messages
+        (of the given roles) are found, instead of loading the whole history.
+
+        Args:
+            session_id: Session to read
+            n: Number of messages
+            roles: Only count and return messages with these roles (default: all)
+            agent_id: Ignored - unified-format events are shared by all agents of the
+                session (like list_messages)
+        """
+        if n <= 0:
+            return []
+
+        def wanted(message: SessionMessage) -> bool:
+            return roles is None or message.message.get("role") in roles
+
+        cached = get_session_history_cache().snapshot(self.config.actor_id, session_id)
+        if cached is not None:
+            messages, _ = self._load_history(session_id, cached)
+            return [message for message in messages if wanted(message)][-n:]
+
+        chunks: List[List[SessionMessage]] = []  # Messages of each event read, newest event first
+        found = 0
+
+        def enough(event: Dict[str, Any]) -> bool:
+            nonlocal found
+            messages, _ = self._parse_messages_from_events([event])
+            chunks.append([message for message in messages if wanted(message)])
+            found += len(chunks[-1])
+            return found >= n
+
+        # Some slack in the first page for agent-state events between the messages
+        self._list_events_since(
+            session_id, None, first_page_size=min(n + HISTORY_FIRST_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE), stop_when=enough
+        )
+        recent = [message for chunk in reversed(chunks) for message in chunk]
+        logger.debug(f"[CompactingSessionManager] Read {len(chunks)} events for the last {n} messages")
+        return recent[-n:]
+
+    def _load_history(
+        self,
+        session_id: str,
+        cached: Optional[tuple],
+    ) -> tuple:
+        """
+        Full chronological history via the history cache.
+
+        On a hit only events newer than the cached watermark are fetched and
+        parsed; on a miss (or when the watermark is not found any more) the
+        whole history is loaded and cached.
+
+        Returns:
+            (messages, event id of each message)
+        """
+        cache = get_session_history_cache()
+        actor_id = self.config.actor_id
+        cached_messages, cached_event_ids, watermark = cached if cached is not None else ([], [], None)
+
+        events, reached = self._list_events_since(session_id, watermark)
+        new_messages, new_event_ids = self._parse_messages_from_events(events)
+        newest_event_id = events[0].get("eventId") if events else watermark
+        if session_id == self.config.session_id:
+            self._history_watermark = newest_event_id
+
+        if watermark is not None and reached:
+            if events:
+                cache.extend(actor_id, session_id, new_messages, new_event_ids, newest_event_id, since_event_id=watermark)
+            logger.debug(
+                f"[HistoryCache] session={session_id}: {len(cached_messages)} cached + "
+                f"{len(new_messages)} new messages ({len(events)} events fetched)"
+            )
+            return cached_messages + new_messages, cached_event_ids + new_event_ids
+
+        if watermark is not None:
+            logger.info(f"[HistoryCache] Watermark not found for session={session_id}, reloaded full history")
+        cache.store(actor_id, session_id, new_messages, new_event_ids, newest_event_id)
+        return new_messages, new_event_ids
+
+    def _load_history_tail(
+        self,
+        session_id: str,
+        anchor_event_id: str,
+        anchor_offset: int = 0,
+    ) -> Optional[tuple]:
+        """
+        Messages from the checkpoint message onwards, without reading older events.
+
+        Pages list_events newest-first and stops at the anchor (the event that
+        holds the checkpoint message, at anchor_offset among its messages).
+
+        Returns:
+            (messages, event ids) with the checkpoint message first, or None when
+            the anchor can't be located (caller falls back to a full load)
+        """
+        # The checkpoint is usually several turns back: start with full pages
+        events, reached = self._list_events_since(
+            session_id, anchor_event_id, include_stop=True, first_page_size=HISTORY_MAX_PAGE_SIZE
+        )
+        if not reached:
+            logger.info(f"[Compaction] Checkpoint event not found for session={session_id}, loading full history")
+            return None
+
+        messages, event_ids = self._parse_messages_from_events(events)
+        anchor_messages = event_ids.count(anchor_event_id)
+        if anchor_offset >= anchor_messages:
+            logger.info(
+                f"[Compaction] Checkpoint event holds {anchor_messages} messages "
+                f"(offset {anchor_offset}), loading full history"
+            )
+            return None
+        return messages[anchor_offset:], event_ids[anchor_offset:]
+
+    @staticmethod
+    def _event_anchor(event_ids: List[Any], position: int) -> tuple:
+        """
+        (event id, offset within the event) of the message at position.
+
+        Entries are event ids or PendingWrites (write-behind); the event id is
+        None while the message is still queued.
+        """
+        if position >= len(event_ids):
+            return None, 0
+
+        def resolve(entry):
+            return entry.event_id if isinstance(entry, PendingWrite) else entry
+
+        event_id = resolve(event_ids[position])
+        if event_id is None:
+            return None, 0
+        offset = 0
+        while position - offset - 1 >= 0 and resolve(event_ids[position - offset - 1]) == event_id:
+            offset += 1
+        return event_id, offset
+
+    def _list_events_since(
+        self,
+        session_id: str,
+        stop_event_id: Optional[str],
+        include_stop: bool = False,
+        first_page_size: Optional[int] = None,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> tuple:
+        """
+        Page list_events (newest first) until stop_event_id.
+
+        Args:
+            session_id: Session to read
+            stop_event_id: Stop at this event (None = read everything)
+            include_stop: Also return the stop event itself
+            first_page_size: Size of the first page (default: small when stopping
+                at an event, else the maximum)
+            stop_when: Called with each returned event; stop after the event it returns True for
+
+        Returns:
+            (events newer than stop_event_id, newest first; whether the stop was reached)
+        """
+        events: List[Dict[str, Any]] = []
+        next_token = None
+        page_size = first_page_size or (
+            HISTORY_FIRST_PAGE_SIZE if stop_event_id is not None else HISTORY_MAX_PAGE_SIZE
         )
 
+        while len(events) < MAX_HISTORY_EVENTS:
+            params = {
+                "memoryId": self.config.memory_id,
+                "actorId": self.config.actor_id,
+                "sessionId": session_id,
+                "maxResults": page_size,
+                "includePayloads": True,
+            }
+            if next_token:
+                params["nextToken"] = next_token
+
+            response = self.memory_client.gmdp_client.list_events(**params)
+
+            for event in response.get("events", []):
+                if stop_event_id is not None and event.get("eventId") == stop_event_id:
+                    if include_stop:
+                        events.append(event)
+                    return events, True
+                events.append(event)
+                if stop_when is not None and stop_when(event):
+                    return events, True
+
+            next_token = response.get("nextToken")
+            if not next_token:
+                break
+            page_size = min(page_size * 4, HISTORY_MAX_PAGE_SIZE)
+
+        return events, False
+
+    def _parse_messages_from_events(self, events: List[Dict[str, Any]]) -> tuple:
+        """
+        Parse messages from events (newest first) into chronological order.
+
+        Returns:
+            (messages, event id of each message)
+        """
         messages = []
-        for event in events:
+        event_ids = []
+        # Oldest event first; payloads of one (batched) event are already in order
+        for event in reversed(events):
+            event_id = event.get("eventId")
             for payload_item in event.get("payload", []):
                 msg = self._parse_message_from_payload(payload_item)
                 if msg:
                     messages.append(msg)
-
-        # Reverse to chronological order (list_events returns newest first)
-        messages = list(reversed(messages))
-
-        # Apply offset and limit
-        if limit is not None:
-            return messages[offset : offset + limit]
-        return messages[offset:]
+                    event_ids.append(event_id)
+        return messages, event_ids
 
     @staticmethod
     def _filter_empty_text(message: dict) -> dict:
@@ -345,9 +843,9 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             max_results=100,
         )
 
-        # Find latest agent state for this agent_id
+        # Find latest agent state for this agent_id (batched events hold payloads oldest first)
         for event in events:
-            for payload_item in event.get("payload", []):
+            for payload_item in reversed(event.get("payload", [])):
                 if "blob" in payload_item:
                     try:
                         blob_data = json.loads(payload_item["blob"])
@@ -388,6 +886,15 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         agent_data["_payload_type"] = PAYLOAD_TYPE_AGENT_STATE
         agent_data["_agent_id"] = session_agent.agent_id
 
+        if self._write_queue is not None:
+            blob = json.dumps(agent_data)
+            self._write_queue.put(PendingWrite(
+                payload={"blob": blob},
+                size=len(blob),
+                coalesce_key=f"{PAYLOAD_TYPE_AGENT_STATE}:{session_agent.agent_id}",
+            ))
+            return
+
         self.memory_client.gmdp_client.create_event(
             memoryId=self.config.memory_id,
             actorId=self.config.actor_id,  # Unified actorId
@@ -550,33 +1057,31 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             logger.error(f"Failed to get SUMMARIZATION strategy ID: {e}")
             return None
 
-    def _retrieve_session_summaries(self) -> List[str]:
+    def _list_session_summary_records(self) -> Optional[List[Dict[str, Any]]]:
         """
-        Retrieve session summaries from AgentCore LTM using list_memory_records.
+        List session summary records from AgentCore LTM using list_memory_records.
 
         Uses SUMMARIZATION strategy namespace (session-level):
         /strategies/{summarization_strategy_id}/actors/{actor_id}/sessions/{session_id}
 
         Returns:
-            List of summary texts for this session
+            Memory record summaries, or None if the SUMMARIZATION strategy is not configured
         """
         strategy_id = self._get_summarization_strategy_id()
         if not strategy_id:
             logger.warning("Cannot retrieve summaries: SUMMARIZATION strategy not configured")
-            return []
+            return None
 
         try:
-            import boto3
-
             # Build namespace path for session-level summaries
             # Pattern: /strategies/{strategyId}/actors/{actorId}/sessions/{sessionId}
             namespace = f"/strategies/{strategy_id}/actors/{self.config.actor_id}/sessions/{self.session_id}"
 
             logger.debug(f"Listing summaries from namespace: {namespace}")
 
-            # Use boto3 directly for list_memory_records (not available in MemoryClient)
-            gmdp = boto3.client('bedrock-agentcore', region_name=self.region_name)
-            response = gmdp.list_memory_records(
+            # list_memory_records is not wrapped by MemoryClient: use its data plane
+            # client (created once per manager) instead of a new one per poll
+            response = self.memory_client.gmdp_client.list_memory_records(
                 memoryId=self.config.memory_id,
                 namespace=namespace,
                 maxResults=100  # Get all summary chunks for this session
@@ -584,23 +1089,72 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
 
             records = response.get('memoryRecordSummaries', [])
             logger.debug(f"Found {len(records)} summary records in session namespace")
-
-            # Extract texts
-            summaries = []
-            for record in records:
-                content = record.get("content", {})
-                if isinstance(content, dict):
-                    text = content.get("text", "").strip()
-                    if text:
-                        summaries.append(text)
-
-            logger.debug(f"Retrieved {len(summaries)} summaries from LTM")
-            return summaries
+            return records
 
         except Exception as e:
             logger.error(f"Failed to retrieve summaries: {e}")
             return []
 
+    @staticmethod
+    def _summary_texts(records: List[Dict[str, Any]]) -> List[str]:
+        """Non-empty texts of summary records."""
+        summaries = []
+        for record in records:
+            content = record.get("content", {})
+            if isinstance(content, dict):
+                text = content.get("text", "").strip()
+                if text:
+                    summaries.append(text)
+        return summaries
+
+    @staticmethod
+    def _records_fresh(records: List[Dict[str, Any]], since: datetime) -> bool:
+        """Whether a summary record was written at or after `since` (no timestamps: assume fresh)."""
+        timestamps = []
+        for record in records:
+            value = record.get("updatedAt") or record.get("createdAt")
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                except ValueError:
+                    continue
+            if isinstance(value, datetime):
+                timestamps.append(value if value.tzinfo else value.replace(tzinfo=timezone.utc))
+        return not timestamps or max(timestamps) >= since
+
+    def _retrieve_session_summaries(self) -> List[str]:
+        """
+        Retrieve session summaries from AgentCore LTM using list_memory_records.
+
+        Returns:
+            List of summary texts for this session
+        """
+        summaries = self._summary_texts(self._list_session_summary_records() or [])
+        logger.debug(f"Retrieved {len(summaries)} summaries from LTM")
+        return summaries
+
+    def _wait_for_session_summaries(self, since: datetime, hurry: threading.Event) -> tuple:
+        """
+        Poll LTM until the session summary was updated after `since`.
+
+        Gives up after summary_wait_seconds, or as soon as `hurry` is set (the
+        next turn is waiting), returning what LTM has at that point.
+
+        Returns:
+            (summary texts, "ltm_fresh" | "ltm_stale")
+        """
+        deadline = time.time() + self.summary_wait_seconds
+        while True:
+            records = self._list_session_summary_records()
+            if records is None:
+                return [], "ltm_stale"
+            if records and self._records_fresh(records, since):
+                return self._summary_texts(records), "ltm_fresh"
+            remaining = deadline - time.time()
+            if hurry.is_set() or remaining <= 0:
+                return self._summary_texts(records), "ltm_stale"
+            hurry.wait(min(SUMMARY_POLL_SECONDS, remaining))
+
     def _prepend_summary_to_first_message(self, messages: List[Dict], summary_prefix: str) -> List[Dict]:
         """
         Prepend summary to the first user message's text content.
@@ -615,20 +1169,20 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         if not messages or not summary_prefix:
             return messages
 
-        # Deep copy to avoid modifying original
-        modified_messages = copy.deepcopy(messages)
-
-        first_msg = modified_messages[0]
-        if first_msg.get('role') != 'user':
+        if messages[0].get('role') != 'user':
             logger.warning("First message is not user role, cannot prepend summary")
             return messages
 
-        content = first_msg.get('content', [])
-        if isinstance(content, list) and len(content) > 0:
+        # Copy only the first message (and the block that changes) to avoid modifying the original
+        first_msg = {**messages[0], 'content': list(messages[0].get('content', []))}
+        modified_messages = [first_msg] + messages[1:]
+
+        content = first_msg['content']
+        if len(content) > 0:
             # Find first text block and prepend summary
-            for block in content:
+            for block_idx, block in enumerate(content):
                 if isinstance(block, dict) and 'text' in block:
-                    block['text'] = summary_prefix + block['text']
+                    content[block_idx] = {**block, 'text': summary_prefix + block['text']}
                     logger.debug(" Summary prepended to first user message")
                     return modified_messages
 
@@ -641,9 +1195,7 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
 
     def _truncate_text(self, text: str, max_length: int) -> str:
         """Truncate text to max_length with indicator."""
-        if len(text) <= max_length:
-            return text
-        return text[:max_length] + f"\n... [truncated, {len(text) - max_length} chars removed]"
+        return truncate_text(text, max_length)
 
     def _find_protected_message_indices(self, messages: List[Dict], protected_turns: int) -> set:
         """
@@ -684,7 +1236,12 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
 
         return protected_indices
 
-    def _truncate_tool_contents(self, messages: List[Dict], protected_indices: Optional[set] = None) -> tuple:
+    def _truncate_tool_contents(
+        self,
+        messages: List[Dict],
+        protected_indices: Optional[set] = None,
+        base_index: Optional[int] = None,
+    ) -> tuple:
         """
         Stage 1 Compaction: Truncate long tool inputs/results and replace images with placeholders.
 
@@ -694,114 +1251,22 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         - Replacing image blocks with text placeholders
 
         Protected messages (recent turns) are NOT truncated to preserve latest context.
+        Only rewritten blocks are copied; the input messages are not modified.
 
         Args:
             messages: List of message dicts
             protected_indices: Set of message indices to skip truncation (optional)
+            base_index: Position of messages[0] in the session history; enables the
+                container-local cache of per-message results (optional)
 
         Returns:
             Tuple of (modified_messages, truncation_count, chars_saved)
         """
-        modified_messages = copy.deepcopy(messages)
-        truncation_count = 0
-        total_chars_saved = 0
-
-        if protected_indices is None:
-            protected_indices = set()
-
-        for msg_idx, msg in enumerate(modified_messages):
-            # Skip protected messages (recent turns)
-            if msg_idx in protected_indices:
-                continue
-            content = msg.get('content', [])
-            if not isinstance(content, list):
-                continue
-
-            # Process content blocks - need index for replacement
-            for block_idx, block in enumerate(content):
-                if not isinstance(block, dict):
-                    continue
-
-                # Replace image blocks with placeholder
-                if 'image' in block:
-                    image_data = block['image']
-                    image_format = image_data.get('format', 'unknown')
-                    # Estimate original size from base64 bytes
-                    source = image_data.get('source', {})
-                    original_bytes = source.get('bytes', b'')
-                    if isinstance(original_bytes, bytes):
-                        original_size = len(original_bytes)
-                    else:
-                        original_size = 0
-
-                    # Replace with text placeholder
-                    content[block_idx] = {
-                        'text': f'[Image placeholder: format={image_format}, original_size={original_size} bytes]'
-                    }
-                    truncation_count += 1
-                    # Estimate token savings (base64 images are ~1.33x original, then tokenized)
-                    total_chars_saved += original_size
-
-                # Truncate toolUse input
-                elif 'toolUse' in block:
-                    tool_use = block['toolUse']
-                    tool_input = tool_use.get('input', {})
-
-                    if isinstance(tool_input, dict):
-                        # Serialize to check length
-                        input_str = json.dumps(tool_input, ensure_ascii=False)
-                        if len(input_str) > self.max_tool_content_length:
-                            original_len = len(input_str)
-                            # Replace with truncated string representation
-                            tool_use['input'] = {"_truncated": self._truncate_text(input_str, self.max_tool_content_length)}
-                            truncation_count += 1
-                            total_chars_saved += original_len - self.max_tool_content_length
-
-                # Truncate toolResult content
-                elif 'toolResult' in block:
-                    tool_result = block['toolResult']
-                    result_content = tool_result.get('content', [])
-
-                    if isinstance(result_content, list):
-                        for result_idx, result_block in enumerate(result_content):
-                            if not isinstance(result_block, dict):
-                                continue
-
-                            # Replace image in toolResult with placeholder
-                            if 'image' in result_block:
-                                image_data = result_block['image']
-                                image_format = image_data.get('format', 'unknown')
-                                source = image_data.get('source', {})
-                                original_bytes = source.get('bytes', b'')
-                                if isinstance(original_bytes, bytes):
-                                    original_size = len(original_bytes)
-                                else:
-                                    original_size = 0
-
-                                result_content[result_idx] = {
-                                    'text': f'[Image placeholder: format={image_format}, original_size={original_size} bytes]'
-                                }
-                                truncation_count += 1
-                                total_chars_saved += original_size
-
-                            elif 'text' in result_block:
-                                text = result_block['text']
-                                if len(text) > self.max_tool_content_length:
-                                    original_len = len(text)
-                                    result_block['text'] = self._truncate_text(text, self.max_tool_content_length)
-                                    truncation_count += 1
-                                    total_chars_saved += original_len - self.max_tool_content_length
-
-                            elif 'json' in result_block:
-                                json_content = result_block['json']
-                                json_str = json.dumps(json_content, ensure_ascii=False)
-                                if len(json_str) > self.max_tool_content_length:
-                                    original_len = len(json_str)
-                                    # Simply convert to truncated text instead of recursive dict processing
-                                    result_block.pop('json')
-                                    result_block['text'] = self._truncate_text(json_str, self.max_tool_content_length)
-                                    truncation_count += 1
-                                    total_chars_saved += original_len - self.max_tool_content_length
+        truncator = ToolContentTruncator(self.max_tool_content_length, cache=get_truncation_cache())
+        cache_key = (self.config.actor_id, self.session_id) if base_index is not None else None
+        modified_messages, truncation_count, total_chars_saved = truncator.truncate(
+            messages, protected_indices, cache_key=cache_key, base_index=base_index or 0
+        )
 
         if truncation_count > 0:
             logger.debug(
@@ -828,6 +1293,7 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
         1. Load compaction state from DynamoDB
         2. Feature 1 - Message Loading:
            - If checkpoint > 0: Load messages[checkpoint:] + prepend summary
+             (only the tail is read from Memory when the checkpoint event is known)
            - Else: Load all messages
         3. Feature 2 - Truncation (always applied):
            - Truncate old tool contents (protect recent 2 turns)
@@ -844,6 +1310,7 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             raise SessionException("The `agent_id` of an agent must be unique in a session.")
 
         self._latest_agent_message[agent.agent_id] = None
+        self._model_key = model_key_for(agent)
 
         # Check if agent exists in session
         session_agent = self.session_repository.read_agent(self.session_id, agent.agent_id)
@@ -876,6 +1343,9 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             self._valid_cutoff_message_ids = []
             self._total_message_count_at_init = 0
             self._all_messages_for_summary = []
+            self._message_event_ids = []
+            self._loaded_base_index = 0
+            self._prepend_messages = []
 
         else:
             # Existing agent - restore with compaction (or metrics_only mode)
@@ -894,25 +1364,41 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
             )
             if prepend_messages is None:
                 prepend_messages = []
+            self._prepend_messages = prepend_messages
 
-            # Load ALL messages from Session Memory (limit=None fetches all)
-            all_session_messages = self.session_repository.list_messages(
-                session_id=self.session_id,
-                agent_id=agent.agent_id,
-            )
+            if self.metrics_only:
+                # Load ALL messages from Session Memory (limit=None fetches all)
+                all_session_messages = self.session_repository.list_messages(
+                    session_id=self.session_id,
+                    agent_id=agent.agent_id,
+                )
+                event_ids = []
+                base_index = 0
+                load_mode = "full"
+            else:
+                # Checkpoint must be known before loading: only the tail after it is needed.
+                # A checkpoint still being prepared in the background is stored first
+                # (/invocations already settled it off the event loop: no wait here).
+                get_compaction_worker().settle(self._compaction_key())
+                self.compaction_state = self.load_compaction_state()
+                all_session_messages, event_ids, base_index, load_mode = self._load_messages_for_init(
+                    agent.agent_id, self.compaction_state
+                )
 
             # Update latest message tracking
             if len(all_session_messages) > 0:
                 self._latest_agent_message[agent.agent_id] = all_session_messages[-1]
 
-            # Cache total message count
-            self._total_message_count_at_init = len(all_session_messages)
+            # Cache total message count (absolute, including messages before a tail load)
+            self._total_message_count_at_init = base_index + len(all_session_messages)
+            self._loaded_base_index = base_index
 
             if self.metrics_only:
                 # Metrics-only mode: Load all messages without compaction
                 self.compaction_state = CompactionState()
                 self._valid_cutoff_message_ids = []
                 self._all_messages_for_summary = []
+                self._message_event_ids = []
                 messages_to_process = [sm.to_message() for sm in all_session_messages]
                 original_message_count = len(messages_to_process)
                 agent.messages = prepend_messages + messages_to_process
@@ -927,27 +1413,114 @@ class CompactingSessionManager(AgentCoreMemorySessionManager):
                 }
             else:
                 # Full compaction mode
-                self.compaction_state = self.load_compaction_state()
                 conv_manager_offset = agent.conversation_manager.removed_message_count
-                checkpoint = self.compaction_state.checkpoint
-                effective_offset = max(conv_manager_offset, checkpoint)
 
-                stage = "none"
                 self._valid_cutoff_message_ids = []
                 self._all_messages_for_summary = [sm.to_message() for sm in all_session_messages]
+                self._message_event_ids = list(event_ids)
 
-                for idx, sm in enumerate(all_session_messages):
-                    msg = sm.to_message()
+                for pos, msg in enumerate(self._all_messages_for_summary):
                     if msg.get('role') == 'user' and not self._has_tool_result(msg):
-                        self._valid_cutoff_message_ids.append(idx)
+                        self._valid_cutoff_message_ids.append(base_index + pos)
 
-                session_messages = all_session_messages[effective_offset:] if effective_offset > 0 else all_session_messages
-                messages_to_process = [sm.to_message() for sm in session_messages]
-                original_message_count = len(messages_to_process)
+                (
+                    agent.messages, stage, truncation_count, original_message_count,
+                    estimated_tokens, pre_turn_checkpoint,
+                ) = self._compose_context(conv_manager_offset)
+                compaction_overhead_ms = (time.time() - compaction_start_time) * 1000
 
-                if checkpoint > 0 and effective_offset >= checkpoint:
-                    if self.compaction_state.summary and messages_to_process:
-                        summary_prefix = f"""<conversation_summary>
+                self.last_init_info = {
+                    "stage": stage,
+                    "original_messages": original_message_count,
+                    "final_messages": len(agent.messages),
+                    "truncation_count": truncation_count,
+                    "compaction_overhead_ms": compaction_overhead_ms,
+                    "load_mode": load_mode,
+                    "loaded_messages": len(all_session_messages),
+                    "estimated_input_tokens": estimated_tokens,
+                    "pre_turn_checkpoint": pre_turn_checkpoint,
+                }
+
+        # Mark that we have an existing agent
+        self.has_existing_agent = True
+        # The context was just built; the first invocation does not refresh it
+        self._context_fresh = True
+
+    def _refresh_warm_context(self, agent: "Agent") -> None:
+        """
+        Rebuild the context of a warm turn the way initialize() builds a cold one.
+
+        A warm agent (AgentPool) serves later turns without initialize(); its
+        messages grew by the turns served since, whose tool contents have left
+        the protected turns. The context is rebuilt from the tracked history
+        through _compose_context, so a warm turn sees exactly what a reload
+        would: restored prepend messages, summary, truncation and the pre-turn
+        checkpoint.
+        """
+        if self._context_fresh:
+            self._context_fresh = False
+            return
+        if self.metrics_only or self.compaction_state is None:
+            return
+
+        agent.messages, _, truncation_count, _, estimated_tokens, _ = self._compose_context(
+            agent.conversation_manager.removed_message_count
+        )
+
+        logger.debug(
+            f"Warm context refreshed: {len(agent.messages)} messages, "
+            f"{truncation_count} truncated, ~{estimated_tokens:,} tokens"
+        )
+
+    def _compose_context(self, conv_manager_offset: int) -> tuple:
+        """
+        Full agent context: prepend messages plus _build_context, with the pre-turn check.
+
+        Estimates the context before the first model call; past the threshold the
+        checkpoint is applied now instead of after this (oversized) turn.
+
+        Returns:
+            (messages, stage, truncation_count, original_message_count,
+             estimated_tokens, pre_turn_checkpoint)
+        """
+        truncated_messages, stage, truncation_count, original_message_count = self._build_context(
+            conv_manager_offset
+        )
+        estimated_tokens = self._estimate_pre_turn(self._prepend_messages + truncated_messages)
+        pre_turn_checkpoint = False
+        if self.pre_turn_compaction and estimated_tokens > self.token_threshold:
+            logger.info(f" Pre-turn estimate exceeds threshold: {estimated_tokens:,} > {self.token_threshold:,}")
+            if self._advance_checkpoint(estimated_tokens):
+                pre_turn_checkpoint = True
+                self.save_compaction_state(self.compaction_state)
+                truncated_messages, stage, truncation_count, original_message_count = self._build_context(
+                    conv_manager_offset
+                )
+                estimated_tokens = self._estimate_pre_turn(self._prepend_messages + truncated_messages)
+
+        return (
+            self._prepend_messages + truncated_messages, stage, truncation_count, original_message_count,
+            estimated_tokens, pre_turn_checkpoint,
+        )
+
+    def _build_context(self, conv_manager_offset: int) -> tuple:
+        """
+        Messages handed to the agent: history from the checkpoint (or the conversation
+        manager's offset) onwards, summary prepended, old tool contents truncated.
+
+        Returns:
+            (messages, stage, truncation_count, original_message_count)
+        """
+        checkpoint = self.compaction_state.checkpoint
+        effective_offset = max(conv_manager_offset, checkpoint)
+
+        stage = "none"
+        messages_to_process = self._all_messages_for_summary[effective_offset - self._loaded_base_index:]
+        original_message_count = len(messages_to_process)
+
+        if checkpoint > 0 and effective_offset >= checkpoint:
+            if self.compaction_state.summary and messages_to_process:
+                summary_prefix = f"""<conversation_summary>
 The following is a summary of our previous conversation:
 
 {self.compaction_state.summary}
@@ -956,33 +1529,79 @@ Please continue the conversation with this context in mind.
 </conversation_summary>
 
 """
-                        messages_to_process = self._prepend_summary_to_first_message(messages_to_process, summary_prefix)
-                    stage = "checkpoint"
+                messages_to_process = self._prepend_summary_to_first_message(messages_to_process, summary_prefix)
+            stage = "checkpoint"
 
-                # Apply truncation
-                protected_indices = self._find_protected_message_indices(messages_to_process, self.protected_turns)
-                truncated_messages, truncation_count, chars_saved = self._truncate_tool_contents(
-                    messages_to_process, protected_indices=protected_indices
-                )
+        # Apply truncation
+        protected_indices = self._find_protected_message_indices(messages_to_process, self.protected_turns)
+        truncated_messages, truncation_count, chars_saved = self._truncate_tool_contents(
+            messages_to_process, protected_indices=protected_indices, base_index=effective_offset
+        )
 
-                if truncation_count > 0:
-                    stage = "checkpoint+truncation" if stage == "checkpoint" else "truncation"
+        if truncation_count > 0:
+            stage = "checkpoint+truncation" if stage == "checkpoint" else "truncation"
 
-                agent.messages = prepend_messages + truncated_messages
-                compaction_overhead_ms = (time.time() - compaction_start_time) * 1000
+        return truncated_messages, stage, truncation_count, original_message_count
 
-                self.last_init_info = {
-                    "stage": stage,
-                    "original_messages": original_message_count,
-                    "final_messages": len(agent.messages),
-                    "truncation_count": truncation_count,
-                    "compaction_overhead_ms": compaction_overhead_ms,
-                }
+    def _estimate_pre_turn(self, messages: List[Dict]) -> int:
+        """
+        Predicted input tokens of the first model call (before the new prompt).
 
-        # Mark that we have an existing agent
-        self.has_existing_agent = True
+        Anchored on the last turn's actual inputTokens when it is known.
+        """
+        estimator = get_token_estimator()
+        state = self.compaction_state
+        if state.lastInputTokens > 0 and state.lastEstimatedTokens > 0:
+            self._token_anchor = (state.lastEstimatedTokens, state.lastInputTokens)
+        else:
+            self._token_anchor = None
+
+        self._pre_turn_estimate = estimator.predict(
+            self._model_key, estimator.estimate_messages(messages), anchor=self._token_anchor
+        )
+        return self._pre_turn_estimate
+
+    def _load_messages_for_init(self, agent_id: str, state: CompactionState) -> tuple:
+        """
+        Load the session history needed by initialize().
+
+        With a checkpoint anchored to its event (and no cached history), only
+        the events from the checkpoint onwards are read. Otherwise the full
+        history is loaded and a missing checkpoint anchor is backfilled, so
+        the next initialize can load just the tail.
+
+        Returns:
+            (messages, event ids, absolute index of messages[0], "tail" | "full")
+        """
+        cached = get_session_history_cache().snapshot(self.config.actor_id, self.session_id)
+
+        if cached is None and state.checkpoint > 0 and state.checkpointEventId:
+            tail = self._load_history_tail(self.session_id, state.checkpointEventId, state.checkpointEventOffset)
+            if tail is not None:
+                messages, event_ids = tail
+                logger.info(
+                    f"[Compaction] Loaded {len(messages)} messages from checkpoint {state.checkpoint} "
+                    f"(session={self.session_id})"
+                )
+                return messages, event_ids, state.checkpoint, "tail"
 
-    def update_after_turn(self, input_tokens: int, agent_id: str) -> None:
+        messages, event_ids = self._load_history(self.session_id, cached)
+        if not messages:
+            # Legacy storage format (no event ids)
+            messages = super().list_messages(self.session_id, agent_id)
+            event_ids = [None] * len(messages)
+
+        if 0 < state.checkpoint < len(event_ids) and not state.checkpointEventId:
+            state.checkpointEventId, state.checkpointEventOffset = self._event_anchor(event_ids, state.checkpoint)
+
+        return messages, event_ids, 0, "full"
+
+    def update_after_turn(
+        self,
+        input_tokens: int,
+        agent_id: str,
+        llm_calls: Optional[List[tuple]] = None,
+    ) -> None:
         """
         Update compaction state after turn completion.
 
@@ -991,9 +1610,11 @@ Please continue the conversation with this context in mind.
 
         Flow:
         - Always update lastInputTokens
+        - Calibrate the local token estimator with this turn's LLM calls
         - If input_tokens > token_threshold:
           - Use cached valid cutoff points to find checkpoint
-          - Generate summary from cached messages
+          - Generate summary from cached messages (in the background compaction
+            worker unless background_compaction is off)
           - Update checkpoint + save to DynamoDB
 
         In metrics_only mode, only tracks tokens without triggering compaction or saving state.
@@ -1001,72 +1622,182 @@ Please continue the conversation with this context in mind.
         Args:
             input_tokens: Actual input tokens from this turn
             agent_id: Agent ID (for logging)
+            llm_calls: (estimated, actual inputTokens) of each LLM call of the turn, in order
         """
         if self.compaction_state is None:
             self.compaction_state = CompactionState()
 
-        # Update lastInputTokens (for metrics tracking)
-        self.compaction_state.lastInputTokens = input_tokens
-
-        # In metrics_only mode, skip compaction logic and DynamoDB save
-        if self.metrics_only:
-            logger.debug(f" Metrics-only: context_tokens={input_tokens:,} (no compaction)")
-            return
+        if llm_calls:
+            self._calibrate_token_estimate(llm_calls)
 
-        # Check if checkpoint should be set or updated
-        if input_tokens > self.token_threshold:
-            logger.info(f" Threshold exceeded: {input_tokens:,} > {self.token_threshold:,}")
-            logger.info(f" Cached cutoff points: {len(self._valid_cutoff_message_ids)}, protected_turns: {self.protected_turns}")
+        with self._state_lock:
+            # Update lastInputTokens (for metrics tracking)
+            self.compaction_state.lastInputTokens = input_tokens
+            self.compaction_state.lastEstimatedTokens = llm_calls[-1][0] if llm_calls else 0
 
-            # Use cached valid cutoff points from initialize()
-            if not self._valid_cutoff_message_ids:
-                logger.info(" No valid cutoff points cached, skipping checkpoint update")
-                self.save_compaction_state(self.compaction_state)
+            # In metrics_only mode, skip compaction logic and DynamoDB save
+            if self.metrics_only:
+                logger.debug(f" Metrics-only: context_tokens={input_tokens:,} (no compaction)")
                 return
 
-            total_turns = len(self._valid_cutoff_message_ids)
+            # Check if checkpoint should be set or updated
+            if input_tokens > self.token_threshold:
+                logger.info(f" Threshold exceeded: {input_tokens:,} > {self.token_threshold:,}")
+                if self.background_compaction:
+                    self._schedule_checkpoint(input_tokens)
+                else:
+                    self._advance_checkpoint(input_tokens)
 
-            # Need at least protected_turns + 1 turns to make a cutoff
-            if total_turns <= self.protected_turns:
-                logger.debug(
-                    f" Only {total_turns} turns available (need > {self.protected_turns}), "
-                    f"keeping all messages"
-                )
-                self.save_compaction_state(self.compaction_state)
-                return
+            # Save state to DynamoDB
+            self.save_compaction_state(self.compaction_state)
 
-            # Keep last N turns, checkpoint at the start of (N+1)th turn from end
-            new_checkpoint = self._valid_cutoff_message_ids[-(self.protected_turns)]
-            current_checkpoint = self.compaction_state.checkpoint
+    def _plan_checkpoint(self, input_tokens: int) -> Optional[int]:
+        """
+        Next checkpoint keeping only the last protected_turns turns.
 
-            logger.info(f" Cutoff IDs: {self._valid_cutoff_message_ids}, new_checkpoint={new_checkpoint}, current={current_checkpoint}")
+        Uses the cutoff points cached by initialize() (extended by appended messages).
 
-            # Only update if new checkpoint is further ahead
-            if new_checkpoint > current_checkpoint:
-                logger.info(
-                    f" Checkpoint update: {input_tokens:,} tokens > {self.token_threshold:,} threshold, "
-                    f"checkpoint {current_checkpoint} → {new_checkpoint}"
-                )
+        Args:
+            input_tokens: Actual or estimated input tokens that crossed the threshold
 
-                # Generate summary for messages before checkpoint
-                # New summary REPLACES existing summary (no accumulation)
-                messages_to_summarize = self._all_messages_for_summary[:new_checkpoint] if self._all_messages_for_summary else []
+        Returns:
+            New checkpoint, or None if it would not move forward
+        """
+        logger.info(f" Cached cutoff points: {len(self._valid_cutoff_message_ids)}, protected_turns: {self.protected_turns}")
 
-                summary = self._generate_summary_for_compaction(messages_to_summarize)
+        # Use cached valid cutoff points from initialize()
+        if not self._valid_cutoff_message_ids:
+            logger.info(" No valid cutoff points cached, skipping checkpoint update")
+            return None
 
-                # Update compaction state
-                self.compaction_state.checkpoint = new_checkpoint
-                self.compaction_state.summary = summary
+        total_turns = len(self._valid_cutoff_message_ids)
 
-                logger.debug(
-                    f" Checkpoint updated: {new_checkpoint}, "
-                    f"summary_length={len(summary) if summary else 0}"
-                )
+        # Need at least protected_turns + 1 turns to make a cutoff
+        if total_turns <= self.protected_turns:
+            logger.debug(
+                f" Only {total_turns} turns available (need > {self.protected_turns}), "
+                f"keeping all messages"
+            )
+            return None
 
-        # Save state to DynamoDB
-        self.save_compaction_state(self.compaction_state)
+        # Keep last N turns, checkpoint at the start of (N+1)th turn from end
+        new_checkpoint = self._valid_cutoff_message_ids[-(self.protected_turns)]
+        current_checkpoint = self.compaction_state.checkpoint
+
+        logger.info(f" Cutoff IDs: {self._valid_cutoff_message_ids}, new_checkpoint={new_checkpoint}, current={current_checkpoint}")
+
+        # Only update if new checkpoint is further ahead
+        if new_checkpoint <= current_checkpoint:
+            return None
+
+        logger.info(
+            f" Checkpoint update: {input_tokens:,} tokens > {self.token_threshold:,} threshold, "
+            f"checkpoint {current_checkpoint} → {new_checkpoint}"
+        )
+        return new_checkpoint
+
+    def _apply_checkpoint(self, new_checkpoint: int, summary: Optional[str]) -> None:
+        """Set checkpoint, summary and the checkpoint's event anchor (state is not saved here)."""
+        position = new_checkpoint - self._loaded_base_index
+        self.compaction_state.summary = summary
+        (
+            self.compaction_state.checkpointEventId,
+            self.compaction_state.checkpointEventOffset,
+        ) = self._event_anchor(self._message_event_ids, position)
+        self.compaction_state.checkpoint = new_checkpoint
 
-    def _generate_summary_for_compaction(self, messages: List[Dict]) -> Optional[str]:
+        logger.debug(
+            f" Checkpoint updated: {new_checkpoint}, "
+            f"summary_length={len(summary) if summary else 0}"
+        )
+
+    def _advance_checkpoint(self, input_tokens: int) -> bool:
+        """
+        Move the checkpoint and summarize the messages before it, synchronously.
+
+        Args:
+            input_tokens: Actual or estimated input tokens that crossed the threshold
+
+        Returns:
+            True if the checkpoint moved (state is not saved here)
+        """
+        new_checkpoint = self._plan_checkpoint(input_tokens)
+        if new_checkpoint is None:
+            return False
+
+        # Generate summary for messages before checkpoint
+        # New summary REPLACES existing summary (no accumulation)
+        # Cached messages start at _loaded_base_index (the old checkpoint after a tail load)
+        summary = self._generate_summary_for_compaction(
+            self._all_messages_for_summary[:new_checkpoint - self._loaded_base_index],
+            previous_summary=self.compaction_state.summary if self._loaded_base_index else None,
+        )
+        self._apply_checkpoint(new_checkpoint, summary)
+        return True
+
+    def _schedule_checkpoint(self, input_tokens: int) -> bool:
+        """
+        Prepare the next checkpoint in the background compaction worker.
+
+        The job waits (up to summary_wait_seconds, less if the next turn
+        settles it) for an LTM summary written after this turn, falls back to
+        the local topic summary, then stores checkpoint and summary.
+
+        Returns:
+            True if a job was scheduled
+        """
+        new_checkpoint = self._plan_checkpoint(input_tokens)
+        if new_checkpoint is None:
+            return False
+
+        messages_to_summarize = self._all_messages_for_summary[:new_checkpoint - self._loaded_base_index]
+        previous_summary = self.compaction_state.summary if self._loaded_base_index else None
+        turn_ended_at = datetime.now(timezone.utc)
+
+        def job(hurry: threading.Event) -> str:
+            summaries, outcome = self._wait_for_session_summaries(turn_ended_at, hurry)
+            summary = self._generate_summary_for_compaction(
+                messages_to_summarize, previous_summary=previous_summary, summaries=summaries
+            )
+            with self._state_lock:
+                if new_checkpoint <= self.compaction_state.checkpoint:
+                    return "superseded"
+                self._apply_checkpoint(new_checkpoint, summary)
+                self.save_compaction_state(self.compaction_state)
+            return outcome if summaries else "fallback"
+
+        return get_compaction_worker().submit(self._compaction_key(), job)
+
+    def _compaction_key(self) -> tuple:
+        """Background compaction jobs are per (actor, session)."""
+        return compaction_key(self.config.actor_id, self.session_id)
+
+    def compaction_pending(self) -> bool:
+        """Whether a checkpoint of this session is still being prepared in the background."""
+        return get_compaction_worker().pending(self._compaction_key())
+
+    def _calibrate_token_estimate(self, llm_calls: List[tuple]) -> None:
+        """Record the pre-turn estimate's error and calibrate on this turn's LLM calls."""
+        estimator = get_token_estimator()
+
+        if self._pre_turn_estimate is not None:
+            # The first call also carries the new prompt: predict it from the same anchor
+            first_estimated, first_actual = llm_calls[0]
+            predicted = estimator.predict(self._model_key, first_estimated, anchor=self._token_anchor)
+            estimator.record_error(self._model_key, predicted, first_actual)
+            self._pre_turn_estimate = None
+
+        chain = ([self._token_anchor] if self._token_anchor else []) + list(llm_calls)
+        estimator.observe(self._model_key, chain)
+        # Warm agents skip initialize(): the next turn chains on from here
+        self._token_anchor = tuple(llm_calls[-1])
+
+    def _generate_summary_for_compaction(
+        self,
+        messages: List[Dict],
+        previous_summary: Optional[str] = None,
+        summaries: Optional[List[str]] = None,
+    ) -> Optional[str]:
         """
         Generate a summary of messages for compaction.
 
@@ -1078,16 +1809,20 @@ Please continue the conversation with this context in mind.
 
         Args:
             messages: Messages to summarize (those before the checkpoint)
+            previous_summary: Summary of messages before `messages` (set when only
+                the post-checkpoint tail was loaded); its topics are carried over
+            summaries: LTM summaries already retrieved (None: retrieve them now)
 
         Returns:
             Summary text or None if generation fails
         """
         if not messages:
-            return None
+            return previous_summary
 
         # Try to retrieve existing summaries from LTM first
         # Note: New summary REPLACES existing summary (no accumulation)
-        summaries = self._retrieve_session_summaries()
+        if summaries is None:
+            summaries = self._retrieve_session_summaries()
         if summaries:
             combined = "\n\n".join(summaries)
             logger.debug(f" Retrieved {len(summaries)} summaries from LTM for compaction")
@@ -1097,6 +1832,11 @@ Please continue the conversation with this context in mind.
         # This is a basic fallback - LTM summaries are preferred
         try:
             key_points = []
+            if previous_summary:
+                key_points = [
+                    line for line in previous_summary.splitlines()
+                    if line.startswith("- User asked about: ")
+                ]
             for msg in messages:
                 role = msg.get('role', '')
                 content = msg.get('content', [])
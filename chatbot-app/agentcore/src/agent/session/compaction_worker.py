@@ -0,0 +1,172 @@
+"""
+Compaction Worker - Prepare the next checkpoint and its summary in the background
+
+When a turn crossed token_threshold, update_after_turn used to move the
+checkpoint right away and build its summary from LTM (list_memory_records)
+on the request path. The SUMMARIZATION strategy runs asynchronously, so the
+summary was often empty or did not cover the latest turns yet.
+
+CompactingSessionManager now hands that work to this worker as soon as the
+threshold is crossed. A job waits (bounded) for a fresh LTM summary while the
+user reads the answer, then stores the new checkpoint and summary in the
+compaction state. The next turn's initialize() only reads the ready state:
+- One job per (actor, session); a turn that crosses the threshold while a job
+  is running does not start another
+- settle() is called before the compaction state is loaded: it tells a
+  running job to stop waiting for LTM (it finishes with what LTM has, or the
+  local fallback summary) and waits for it to be stored. The /invocations
+  route settles with settle_async() before building the agent, so the wait
+  happens in a worker thread instead of on the event loop
+
+Usage:
+    from agent.session.compaction_worker import get_compaction_worker
+
+    worker = get_compaction_worker()
+    worker.submit((actor_id, session_id), job)   # job(hurry: threading.Event) -> outcome str
+    worker.settle((actor_id, session_id))        # before load_compaction_state()
+    await worker.settle_async(compaction_key(actor_id, session_id))   # from async code
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from agent.config.singleton import process_singleton
+from agent.request_context import submit_with_context
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for settle(): a hurried job only has to finish one summary
+# lookup and one DynamoDB write
+SETTLE_TIMEOUT_SECONDS = 10.0
+WORKER_THREADS = 2
+
+
+def compaction_key(actor_id: str, session_id: str) -> tuple:
+    """Jobs are per (actor, session)."""
+    return (actor_id, session_id)
+
+
+class _Job:
+    """One scheduled checkpoint of a session."""
+
+    def __init__(self):
+        self.hurry = threading.Event()
+        self.done = threading.Event()
+        self.submitted_at = time.time()
+
+
+class CompactionWorker:
+    """Runs per-session compaction jobs off the request path (thread-safe)."""
+
+    def __init__(self, max_workers: int = WORKER_THREADS, settle_timeout: float = SETTLE_TIMEOUT_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compaction")
+        self.settle_timeout = settle_timeout
+        self._jobs: Dict[Hashable, _Job] = {}
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._coalesced = 0
+        self._completed = 0
+        self._failed = 0
+        self._settle_waits = 0
+        self._settle_timeouts = 0
+        self._outcomes: Dict[str, int] = {}
+        self._last_job_ms = 0.0
+
+    def submit(self, key: Hashable, job: Callable[[threading.Event], Optional[str]]) -> bool:
+        """
+        Run job in the background unless one is already running for key.
+
+        Args:
+            key: (actor_id, session_id)
+            job: Called with the job's hurry event (set by settle()); returns an outcome label
+
+        Returns:
+            True if the job was scheduled
+        """
+        with self._lock:
+            if key in self._jobs:
+                self._coalesced += 1
+                return False
+            entry = self._jobs[key] = _Job()
+            self._submitted += 1
+
+        submit_with_context(self._executor, self._run, key, entry, job)
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        """Whether a job is scheduled or running for key."""
+        with self._lock:
+            return key in self._jobs
+
+    def settle(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """
+        Finish the running job of key now (no more waiting for LTM) and wait for it.
+
+        Returns:
+            True if no job is left running
+        """
+        with self._lock:
+            entry = self._jobs.get(key)
+        if entry is None:
+            return True
+
+        entry.hurry.set()
+        done = entry.done.wait(self.settle_timeout if timeout is None else timeout)
+        with self._lock:
+            self._settle_waits += 1
+            if not done:
+                self._settle_timeouts += 1
+        if not done:
+            logger.warning(f"[CompactionWorker] Job for {key} still running after settle timeout")
+        return done
+
+    async def settle_async(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """settle() for async callers: the wait runs in a worker thread."""
+        if not self.pending(key):
+            return True
+        return await asyncio.to_thread(self.settle, key, timeout)
+
+    def _run(self, key: Hashable, entry: _Job, job: Callable[[threading.Event], Optional[str]]) -> None:
+        start = time.time()
+        outcome, failed = None, False
+        try:
+            outcome = job(entry.hurry)
+        except Exception as e:
+            failed = True
+            logger.error(f"[CompactionWorker] Job for {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._jobs.pop(key, None)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                if outcome:
+                    self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+                self._last_job_ms = (time.time() - start) * 1000
+            entry.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Job counters, for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "running": len(self._jobs),
+                "submitted": self._submitted,
+                "coalesced": self._coalesced,
+                "completed": self._completed,
+                "failed": self._failed,
+                "settle_waits": self._settle_waits,
+                "settle_timeouts": self._settle_timeouts,
+                "summaries": dict(self._outcomes),
+                "last_job_ms": round(self._last_job_ms, 1),
+            }
+
+
+@process_singleton
+def get_compaction_worker() -> CompactionWorker:
+    """Get the process-wide CompactionWorker singleton."""
+    return CompactionWorker()
@@ -0,0 +1,292 @@
+"""
+Session History Cache - Container-local write-through cache of parsed messages
+
+Every CompactingSessionManager.initialize used to fetch the whole session
+(up to 10,000 events) from AgentCore Memory and JSON-parse every payload, so
+session-load time grew with conversation length.
+
+AgentCore Runtime gives sessions container affinity, and every write of this
+container goes through CompactingSessionManager.create_message. The cache
+keeps, per (actor_id, session_id):
+- The parsed SessionMessages in chronological order, with the event id of each
+- The newest event id whose content is reflected (the watermark)
+
+A load then fetches only events newer than the watermark (list_events pages
+newest-first, so it stops at the watermark), and written messages are appended
+as they are persisted (write-through). Anything that cannot be reconciled -
+a batched write without an event id, a write whose writer had not seen the
+entry's watermark (another writer got in between), a watermark that is
+never reached - drops the entry and the next load starts from scratch.
+
+Messages are copied in and out: agents mutate their message dicts in place,
+cached state never aliases them.
+
+Usage:
+    from agent.session.history_cache import get_session_history_cache
+
+    cache = get_session_history_cache()
+    cached = cache.snapshot(actor_id, session_id)   # (messages, event_ids, watermark) or None
+    cache.store(actor_id, session_id, messages, event_ids, newest_event_id)        # full load
+    cache.extend(actor_id, session_id, new_messages, new_ids, newest, watermark)   # incremental load
+    cache.append(actor_id, session_id, session_message, event_id, previous)        # write-through
+    cache.append_event(actor_id, session_id, session_messages, event_id, previous) # batched write-through
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands.types.session import SessionMessage
+
+from agent.config.constants import (
+    DEFAULT_HISTORY_CACHE_MAX_SESSIONS,
+    DEFAULT_HISTORY_CACHE_TTL_SECONDS,
+    EnvVars,
+)
+from agent.config.env import env_float, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+def _clone(value: Any) -> Any:
+    """Copy the dict/list structure of a message; leaves (str, bytes, numbers) are shared."""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+def clone_session_message(session_message: SessionMessage) -> SessionMessage:
+    """Independent copy of a SessionMessage (faster than copy.deepcopy)."""
+    return SessionMessage(
+        message=_clone(session_message.message),
+        message_id=session_message.message_id,
+        redact_message=_clone(session_message.redact_message),
+        created_at=session_message.created_at,
+        updated_at=session_message.updated_at,
+    )
+
+
+@dataclass
+class CachedHistory:
+    """Parsed history of one session."""
+    messages: List[SessionMessage]
+    event_ids: List[str]         # Event each message was read from / written to
+    newest_event_id: str
+    last_used: float
+
+
+class SessionHistoryCache:
+    """LRU + TTL bounded map of (actor_id, session_id) -> CachedHistory."""
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_HISTORY_CACHE_MAX_SESSIONS,
+        ttl_seconds: float = DEFAULT_HISTORY_CACHE_TTL_SECONDS,
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept before LRU eviction (0 disables the cache)
+            ttl_seconds: Entries unused for this long are dropped
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[CacheKey, CachedHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.appended = 0
+        self.invalidated = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_sessions > 0
+
+    @classmethod
+    def from_env(cls) -> "SessionHistoryCache":
+        """Create cache from environment variables."""
+        return cls(
+            max_sessions=env_int(EnvVars.HISTORY_CACHE_MAX_SESSIONS, DEFAULT_HISTORY_CACHE_MAX_SESSIONS),
+            ttl_seconds=env_float(EnvVars.HISTORY_CACHE_TTL_SECONDS, DEFAULT_HISTORY_CACHE_TTL_SECONDS),
+        )
+
+    def snapshot(self, actor_id: str, session_id: str) -> Optional[Tuple[List[SessionMessage], List[str], str]]:
+        """Copy of the cached (messages, event_ids, newest_event_id), or None on a miss."""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired_locked(now)
+            entry = self._entries.get((actor_id, session_id))
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry.last_used = now
+            self._entries.move_to_end((actor_id, session_id))
+            self.hits += 1
+            messages = list(entry.messages)
+            event_ids = list(entry.event_ids)
+            newest_event_id = entry.newest_event_id
+
+        return [clone_session_message(sm) for sm in messages], event_ids, newest_event_id
+
+    def store(
+        self,
+        actor_id: str,
+        session_id: str,
+        messages: List[SessionMessage],
+        event_ids: List[str],
+        newest_event_id: Optional[str],
+    ) -> None:
+        """Replace the entry with a freshly loaded history."""
+        if not self.enabled:
+            return
+        if newest_event_id is None:
+            # Nothing to anchor an incremental load on (empty session)
+            self.invalidate(actor_id, session_id)
+            return
+
+        entry = CachedHistory(
+            messages=[clone_session_message(sm) for sm in messages],
+            event_ids=list(event_ids),
+            newest_event_id=newest_event_id,
+            last_used=time.monotonic(),
+        )
+        with self._lock:
+            self._entries[(actor_id, session_id)] = entry
+            self._entries.move_to_end((actor_id, session_id))
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def append(
+        self,
+        actor_id: str,
+        session_id: str,
+        session_message: Optional[SessionMessage],
+        event_id: Optional[str],
+        previous_event_id: Optional[str],
+    ) -> None:
+        """
+        Write-through of a persisted event.
+
+        session_message is None for events that carry no message (agent state).
+        previous_event_id is the newest event the writer had seen (its last
+        load or write). Without an event id (batched write), or when the entry
+        is not at previous_event_id, it can't be kept consistent and is dropped.
+        """
+        self.append_event(
+            actor_id,
+            session_id,
+            [session_message] if session_message is not None else [],
+            event_id,
+            previous_event_id,
+        )
+
+    def append_event(
+        self,
+        actor_id: str,
+        session_id: str,
+        session_messages: List[SessionMessage],
+        event_id: Optional[str],
+        previous_event_id: Optional[str],
+    ) -> None:
+        """Write-through of a persisted event holding several messages (write-behind batch), see append()."""
+        if not self.enabled:
+            return
+        if not event_id:
+            self.invalidate(actor_id, session_id)
+            return
+
+        copied = [clone_session_message(sm) for sm in session_messages]
+        with self._lock:
+            entry = self._entries.get((actor_id, session_id))
+            if entry is None:
+                return
+            if entry.newest_event_id != previous_event_id:
+                del self._entries[(actor_id, session_id)]
+                self.invalidated += 1
+                return
+            entry.messages.extend(copied)
+            entry.event_ids.extend([event_id] * len(copied))
+            self.appended += len(copied)
+            entry.newest_event_id = event_id
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end((actor_id, session_id))
+
+    def extend(
+        self,
+        actor_id: str,
+        session_id: str,
+        messages: List[SessionMessage],
+        event_ids: List[str],
+        newest_event_id: str,
+        since_event_id: str,
+    ) -> None:
+        """Add messages loaded after since_event_id (dropped if the entry moved on meanwhile)."""
+        if not self.enabled:
+            return
+
+        copied = [clone_session_message(sm) for sm in messages]
+        with self._lock:
+            entry = self._entries.get((actor_id, session_id))
+            if entry is None:
+                return
+            if entry.newest_event_id != since_event_id:
+                del self._entries[(actor_id, session_id)]
+                self.invalidated += 1
+                return
+            entry.messages.extend(copied)
+            entry.event_ids.extend(event_ids)
+            entry.newest_event_id = newest_event_id
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end((actor_id, session_id))
+
+    def invalidate(self, actor_id: str, session_id: str) -> None:
+        """Drop a session's entry (next load fetches everything)."""
+        with self._lock:
+            if self._entries.pop((actor_id, session_id), None) is not None:
+                self.invalidated += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sessions": len(self._entries),
+                "messages": sum(len(entry.messages) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "appended": self.appended,
+                "invalidated": self.invalidated,
+                "evicted": self.evicted,
+            }
+
+    def _evict_expired_locked(self, now: float) -> None:
+        """Drop entries unused for longer than the TTL. Caller holds the lock."""
+        cutoff = now - self.ttl_seconds
+        # Entries are kept in last-used order: stop at the first fresh one
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_used > cutoff:
+                break
+            del self._entries[key]
+            self.evicted += 1
+
+
+@process_singleton
+def get_session_history_cache() -> SessionHistoryCache:
+    """Get the process-wide SessionHistoryCache singleton."""
+    return SessionHistoryCache.from_env()
@@ -0,0 +1,261 @@
+"""
+Image History Policy - Bounded tool result images in the model context
+
+Browser tools (browser_navigate, browser_act, browser_extract,
+browser_manage_tabs) return a JPEG screenshot with almost every step, and
+every one of them stayed in the agent's messages. A 30-step browsing task
+sent dozens of screenshots with every later model call; Stage 1 truncation
+(truncation.py) only removes images once compaction triggers, and never from
+the protected recent turns the browsing task is part of.
+
+ImageHistoryPolicy keeps only the newest keep_last images of the configured
+tools' results in the messages:
+- Older images are replaced with a short text placeholder naming the tool,
+  format and size
+- Eviction runs once more than keep_last + evict_batch images have piled up,
+  so earlier messages (the prompt cache prefix) only change every evict_batch
+  images instead of on every step
+- Kept images other than the newest can be downscaled (downscale_px on the
+  longest edge, re-encoded as JPEG) in the same pass
+- User uploads are not touched (see attachments.py)
+
+Messages are rewritten copy-on-write: a changed message is replaced in the
+list by a new dict, blocks that do not change are shared. Persisted history
+is not modified; a reloaded session is bounded again before its first model
+call. ImageHistoryHook (agent/hooks) applies the policy before every model
+call and reports per-turn metrics.
+
+Usage:
+    from agent.session.image_history import get_image_history_policy
+
+    eviction = get_image_history_policy().apply(agent.messages)   # in place
+    eviction.images_removed, eviction.bytes_removed
+"""
+
+import io
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from agent.config.constants import (
+    DEFAULT_IMAGE_HISTORY_DOWNSCALE_PX,
+    DEFAULT_IMAGE_HISTORY_EVICT_BATCH,
+    DEFAULT_IMAGE_HISTORY_KEEP_LAST,
+    DEFAULT_IMAGE_HISTORY_TOOLS,
+    EnvVars,
+)
+from agent.config.env import env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Tool name that matches every tool
+ALL_TOOLS = "*"
+
+# (message index, content index, tool result content index, tool name)
+ImageLocation = Tuple[int, int, int, str]
+
+
+@dataclass
+class ImageEviction:
+    """What one or more policy passes removed from the messages."""
+    images_removed: int = 0
+    bytes_removed: int = 0
+    images_downscaled: int = 0
+    bytes_downscaled: int = 0  # Bytes saved by downscaling
+
+    def add(self, other: "ImageEviction") -> None:
+        self.images_removed += other.images_removed
+        self.bytes_removed += other.bytes_removed
+        self.images_downscaled += other.images_downscaled
+        self.bytes_downscaled += other.bytes_downscaled
+
+    def __bool__(self) -> bool:
+        return bool(self.images_removed or self.images_downscaled)
+
+
+def image_placeholder(tool_name: str, image_format: str, size: int) -> Dict[str, str]:
+    """Text block replacing an evicted tool result image."""
+    return {"text": f"[{tool_name} image removed from history: format={image_format}, original_size={size} bytes]"}
+
+
+def downscale_image(data: bytes, max_px: int) -> Optional[bytes]:
+    """JPEG of the image with its longest edge at max_px; None if it is not larger or not smaller in bytes."""
+    try:
+        from PIL import Image
+    except ImportError:  # pragma: no cover - Pillow is in requirements.txt
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= max_px:
+                return None
+            image.draft("RGB", (max_px, max_px))  # JPEG: decode at reduced scale
+            resized = image.convert("RGB")
+            resized.thumbnail((max_px, max_px), reducing_gap=2.0)
+            buffer = io.BytesIO()
+            resized.save(buffer, format="JPEG", quality=80)
+    except Exception as e:
+        logger.debug(f"[ImageHistory] Could not downscale image: {e}")
+        return None
+
+    downscaled = buffer.getvalue()
+    return downscaled if len(downscaled) < len(data) else None
+
+
+def _image_bytes(block: Any) -> Optional[bytes]:
+    if not isinstance(block, dict) or not isinstance(block.get("image"), dict):
+        return None
+    data = (block["image"].get("source") or {}).get("bytes")
+    return data if isinstance(data, (bytes, bytearray)) else None
+
+
+class ImageHistoryPolicy:
+    """Keeps the newest tool result images in the messages, evicting (and optionally downscaling) older ones."""
+
+    def __init__(
+        self,
+        keep_last: int = DEFAULT_IMAGE_HISTORY_KEEP_LAST,
+        evict_batch: int = DEFAULT_IMAGE_HISTORY_EVICT_BATCH,
+        downscale_px: int = DEFAULT_IMAGE_HISTORY_DOWNSCALE_PX,
+        tools: Collection[str] = tuple(DEFAULT_IMAGE_HISTORY_TOOLS.split(",")),
+    ):
+        """
+        Args:
+            keep_last: Images kept after a pass (0 disables the policy)
+            evict_batch: Extra images tolerated before a pass runs
+            downscale_px: Longest edge of kept images other than the newest (0 = full size)
+            tools: Tool names whose result images are managed ("*" = all tools)
+        """
+        self.keep_last = keep_last
+        self.evict_batch = evict_batch
+        self.downscale_px = downscale_px
+        self.tools = frozenset(tools)
+        self._lock = threading.Lock()
+
+        self.passes = 0
+        self.totals = ImageEviction()
+
+    @classmethod
+    def from_env(cls) -> "ImageHistoryPolicy":
+        """Create policy from environment variables."""
+        tools = os.environ.get(EnvVars.IMAGE_HISTORY_TOOLS, DEFAULT_IMAGE_HISTORY_TOOLS)
+        return cls(
+            keep_last=env_int(EnvVars.IMAGE_HISTORY_KEEP_LAST, DEFAULT_IMAGE_HISTORY_KEEP_LAST),
+            evict_batch=env_int(EnvVars.IMAGE_HISTORY_EVICT_BATCH, DEFAULT_IMAGE_HISTORY_EVICT_BATCH),
+            downscale_px=env_int(EnvVars.IMAGE_HISTORY_DOWNSCALE_PX, DEFAULT_IMAGE_HISTORY_DOWNSCALE_PX),
+            tools=[name.strip() for name in tools.split(",") if name.strip()],
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep_last > 0
+
+    def apply(self, messages: List[Dict[str, Any]]) -> ImageEviction:
+        """Bound the tool result images of messages (list modified in place)."""
+        eviction = ImageEviction()
+        if not self.enabled:
+            return eviction
+
+        locations = self._image_locations(messages)
+        if len(locations) <= self.keep_last + self.evict_batch:
+            return eviction
+
+        evicted = locations[:-self.keep_last]
+        downscaled = locations[-self.keep_last:-1] if self.downscale_px > 0 else []
+
+        rewrites: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        for message_index, block_index, result_index, tool_name in evicted:
+            image = messages[message_index]["content"][block_index]["toolResult"]["content"][result_index]
+            size = len(_image_bytes(image))
+            rewrites[(message_index, block_index, result_index)] = image_placeholder(
+                tool_name, image["image"].get("format", "unknown"), size
+            )
+            eviction.images_removed += 1
+            eviction.bytes_removed += size
+
+        for message_index, block_index, result_index, _ in downscaled:
+            image = messages[message_index]["content"][block_index]["toolResult"]["content"][result_index]
+            data = _image_bytes(image)
+            smaller = downscale_image(bytes(data), self.downscale_px)
+            if smaller is None:
+                continue
+            rewrites[(message_index, block_index, result_index)] = {
+                "image": {**image["image"], "format": "jpeg", "source": {"bytes": smaller}}
+            }
+            eviction.images_downscaled += 1
+            eviction.bytes_downscaled += len(data) - len(smaller)
+
+        self._rewrite(messages, rewrites)
+
+        with self._lock:
+            self.passes += 1
+            self.totals.add(eviction)
+        return eviction
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Policy counters for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "keep_last": self.keep_last,
+                "passes": self.passes,
+                "images_removed": self.totals.images_removed,
+                "bytes_removed": self.totals.bytes_removed,
+                "images_downscaled": self.totals.images_downscaled,
+                "bytes_downscaled": self.totals.bytes_downscaled,
+            }
+
+    def _image_locations(self, messages: List[Dict[str, Any]]) -> List[ImageLocation]:
+        """Images in the managed tools' results, oldest first."""
+        tool_names: Dict[str, str] = {}
+        locations: List[ImageLocation] = []
+        all_tools = ALL_TOOLS in self.tools
+
+        for message_index, message in enumerate(messages):
+            content = message.get("content") if isinstance(message, dict) else None
+            if not isinstance(content, list):
+                continue
+            for block_index, block in enumerate(content):
+                if not isinstance(block, dict):
+                    continue
+                if "toolUse" in block:
+                    tool_names[block["toolUse"].get("toolUseId")] = block["toolUse"].get("name", "")
+                    continue
+                result = block.get("toolResult")
+                if not isinstance(result, dict):
+                    continue
+                tool_name = tool_names.get(result.get("toolUseId"), "")
+                if not all_tools and tool_name not in self.tools:
+                    continue
+                for result_index, result_block in enumerate(result.get("content") or []):
+                    if _image_bytes(result_block) is not None:
+                        locations.append((message_index, block_index, result_index, tool_name or "tool"))
+        return locations
+
+    @staticmethod
+    def _rewrite(messages: List[Dict[str, Any]], rewrites: Dict[Tuple[int, int, int], Dict[str, Any]]) -> None:
+        """Replace result blocks copy-on-write: new message, content list, toolResult and result content."""
+        by_block: Dict[Tuple[int, int], Dict[int, Dict[str, Any]]] = {}
+        for (message_index, block_index, result_index), replacement in rewrites.items():
+            by_block.setdefault((message_index, block_index), {})[result_index] = replacement
+
+        new_content: Dict[int, List[Any]] = {}
+        for (message_index, block_index), replacements in by_block.items():
+            content = new_content.setdefault(message_index, list(messages[message_index]["content"]))
+            result = content[block_index]["toolResult"]
+            result_content = list(result["content"])
+            for result_index, replacement in replacements.items():
+                result_content[result_index] = replacement
+            content[block_index] = {**content[block_index], "toolResult": {**result, "content": result_content}}
+
+        for message_index, content in new_content.items():
+            messages[message_index] = {**messages[message_index], "content": content}
+
+
+@process_singleton
+def get_image_history_policy() -> ImageHistoryPolicy:
+    """Get the process-wide ImageHistoryPolicy singleton."""
+    return ImageHistoryPolicy.from_env()
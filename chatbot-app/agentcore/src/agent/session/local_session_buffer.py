@@ -1,11 +1,22 @@
 """
 Local Session Buffer Manager
 Wraps FileSessionManager with buffering support for local development.
+
+Flushed messages are appended to the agent's JSONL message segments
+(see message_segments.py) and indexed in the session manifest, which
+UnifiedFileSessionManager reads back. Uploaded files are buffered as
+attachment stubs (see attachments.py).
 """
 
 import logging
 import base64
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Collection
+
+from strands.types.session import SessionMessage
+
+from agent.session.attachments import AttachmentScope, get_attachment_store
+from agent.session.message_manifest import get_session_manifest
+from agent.session.message_segments import session_blobs_dir, session_dir
 
 logger = logging.getLogger(__name__)
 
@@ -75,10 +86,11 @@ class LocalSessionBuffer:
 
         # Convert Message to dict format for buffering
         content = actual_message.get('content', []) if isinstance(actual_message, dict) else getattr(actual_message, 'content', [])
-        message_dict = {
-            "role": role,
-            "content": content
-        }
+        # Uploaded files are buffered as attachment stubs, their bytes go to the session's blobs/
+        message_dict = get_attachment_store().detach(
+            {"role": role, "content": content},
+            AttachmentScope(self.session_id, blobs_dir=session_blobs_dir(self.base_manager.storage_dir, self.session_id)),
+        )
 
         # Add to buffer
         self.pending_messages.append(message_dict)
@@ -90,63 +102,53 @@ class LocalSessionBuffer:
             self.flush()
 
     def flush(self):
-        """Force flush pending messages to FileSessionManager"""
+        """Force flush pending messages to the session's message segments"""
         if not self.pending_messages:
             return
 
         logger.info(f"💾 Flushing {len(self.pending_messages)} messages to FileSessionManager")
 
-        # Write each pending message directly to file storage
+        # Append all pending messages to the agent's segment log in one write
         # We bypass the base_manager.append_message() to avoid double-wrapping issues
-        import os
-        import json
-        from datetime import datetime, timezone
-
-        for message_dict in self.pending_messages:
-            try:
-                # Get the next message index
-                session_dir = os.path.join(
-                    self.base_manager.storage_dir,
-                    f"session_{self.session_id}"
-                )
-                messages_dir = os.path.join(session_dir, "agents", "agent_default", "messages")
-                os.makedirs(messages_dir, exist_ok=True)
-
-                # Find next message index
-                existing_files = [f for f in os.listdir(messages_dir) if f.startswith("message_") and f.endswith(".json")]
-                next_index = len(existing_files)
-
-                # Create SessionMessage-compatible structure (single wrap)
-                now = datetime.now(timezone.utc).isoformat()
-                session_message_dict = {
-                    "message": {
-                        "role": message_dict["role"],
-                        "content": message_dict["content"]
-                    },
-                    "message_id": next_index,
-                    "redact_message": None,
-                    "created_at": now,
-                    "updated_at": now
-                }
-
-                # Encode bytes to base64 for JSON serialization
-                # (compatible with Strands SDK's encode_bytes_values format)
-                encoded_message = encode_bytes_for_json(session_message_dict)
-
-                # Write to file
-                message_path = os.path.join(messages_dir, f"message_{next_index}.json")
-                with open(message_path, 'w', encoding='utf-8') as f:
-                    json.dump(encoded_message, f, indent=2, ensure_ascii=False)
-
-                logger.debug(f" Written message_{next_index}.json (role={message_dict['role']})")
-
-            except Exception as e:
-                logger.error(f"Failed to write message to file: {e}")
+        try:
+            store = get_session_manifest(session_dir(self.base_manager.storage_dir, self.session_id)).store("default")
+            message_ids = store.append_messages(
+                {"role": message_dict["role"], "content": message_dict["content"]}
+                for message_dict in self.pending_messages
+            )
+            logger.debug(f" Written messages {message_ids[0]}..{message_ids[-1]}")
+
+        except Exception as e:
+            logger.error(f"Failed to write messages to file: {e}")
 
         # Clear buffer
         self.pending_messages = []
         logger.debug(f" Buffer flushed")
 
+    def list_recent_messages(
+        self,
+        session_id: str,
+        n: int,
+        roles: Optional[Collection[str]] = None,
+        agent_id: Optional[str] = None,
+    ) -> List[SessionMessage]:
+        """Newest n messages of the session, including messages still in the buffer"""
+        buffered_agent = agent_id in (None, "default")  # The buffer writes as "default"
+        if n <= 0 or session_id != self.session_id or not self.pending_messages or not buffered_agent:
+            return self.base_manager.list_recent_messages(session_id, n, roles, agent_id)
+
+        # Buffered messages get the ids the next flush will assign
+        store = get_session_manifest(session_dir(self.base_manager.storage_dir, session_id)).store("default")
+        first_id = store.next_message_id()
+        buffered = [
+            SessionMessage.from_message(message, first_id + i)
+            for i, message in enumerate(self.pending_messages)
+            if roles is None or message["role"] in roles
+        ][-n:]
+
+        stored = self.base_manager.list_recent_messages(session_id, n - len(buffered), roles, agent_id)
+        return stored + buffered
+
     # Delegate all other methods to base manager
     def __getattr__(self, name):
         """Delegate unknown methods to base FileSessionManager"""
@@ -0,0 +1,369 @@
+"""
+Message Manifest - Per-session index of local messages
+
+UnifiedFileSessionManager.list_messages read and decoded every message of
+every agent of the session and sorted them by created_at before applying
+limit/offset, on every call. "How many messages" or "the last 20" cost as
+much as loading the whole history.
+
+Each session now has a manifest with one entry per (agent, message id):
+created_at and the segment, byte offset and size of the message's latest
+record (see message_segments.py):
+- Segment stores report every append with the record positions, so the
+  manifest is updated on write without reading anything back
+- Entries are kept ordered by created_at in memory: count() is a len(), a
+  range is a slice, and only the selected records are read (one seek each)
+- The manifest is persisted as session_<id>/manifest.jsonl, one compact
+  JSON array per entry appended like the segments, so a restart does not
+  rescan the history
+- Before answering it compares each agent's current segment size with what
+  it has indexed (two stats per agent). Records written by someone else are
+  indexed from the last indexed offset, reading only the id prefix and the
+  timestamps at the end of each record; legacy message_<N>.json files are
+  indexed when first seen
+- A record that is not where its entry says (files replaced by hand)
+  triggers a rebuild of the session's manifest
+
+Usage:
+    from agent.session.message_manifest import get_session_manifest
+
+    manifest = get_session_manifest(session_dir)
+    manifest.store("default").append_messages([...])   # indexed on write
+    total = manifest.count()
+    last_20 = manifest.read(manifest.entries(offset=max(0, total - 20)))
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from strands.types.session import SessionMessage
+
+from agent.session.message_segments import (
+    LEGACY_SEGMENT,
+    MessageSegmentStore,
+    RecordPosition,
+    get_message_segment_store,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.jsonl"
+AGENT_PREFIX = "agent_"
+# Manifests kept in the process-wide registry (one per session directory)
+MAX_OPEN_MANIFESTS = 256
+# On load, the file is rewritten once it has this many lines per entry (updates append lines)
+MANIFEST_REWRITE_RATIO = 2
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """Where the latest record of one message is."""
+
+    agent_id: str
+    message_id: int
+    created_at: str
+    segment: int  # LEGACY_SEGMENT for a legacy message_<N>.json file
+    offset: int
+    size: int
+
+    @property
+    def sort_key(self) -> Tuple[str, int, str]:
+        return (self.created_at, self.message_id, self.agent_id)
+
+
+class SessionManifest:
+    """Ordered index of all messages of one local session (thread-safe)."""
+
+    def __init__(self, session_dir: str):
+        self.session_dir = session_dir
+        self.agents_dir = os.path.join(session_dir, "agents")
+        self.path = os.path.join(session_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self._reset_locked()
+
+    def _reset_locked(self, loaded: bool = False) -> None:
+        self._loaded = loaded
+        self._entries: Dict[Tuple[str, int], ManifestEntry] = {}
+        self._order: List[Tuple[str, int]] = []
+        self._order_dirty = False
+        # Per agent: segment position up to which records are indexed, and ids of legacy entries
+        self._covered: Dict[str, Tuple[int, int]] = {}
+        self._legacy: Dict[str, Set[int]] = {}
+        self._rewrite = False
+        self._torn_tail = False
+
+    # ------------------------------------------------------------------
+    # Stores and writes
+    # ------------------------------------------------------------------
+
+    def store(self, agent_id: str) -> MessageSegmentStore:
+        """Segment store of an agent, reporting its appends to this manifest."""
+        store = get_message_segment_store(
+            os.path.join(self.agents_dir, f"{AGENT_PREFIX}{agent_id}", "messages"),
+            os.path.join(self.session_dir, "blobs"),
+        )
+        store.on_write = lambda start, end, written: self._on_write(agent_id, start, end, written)
+        return store
+
+    def _on_write(
+        self, agent_id: str, start: Tuple[int, int], end: Tuple[int, int], written: List[RecordPosition]
+    ) -> None:
+        entries = [ManifestEntry(agent_id, *position) for position in written]
+        with self._lock:
+            self._load_locked()
+            for entry in entries:
+                self._put_locked(entry)
+            # Only if nothing was appended by someone else in between; otherwise sync() catches up
+            if self._covered.get(agent_id, (0, 0)) == start:
+                self._covered[agent_id] = end
+            self._persist_locked(entries)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        """Number of messages of all agents."""
+        self.sync()
+        with self._lock:
+            return len(self._entries)
+
+    def entries(self, offset: int = 0, limit: Optional[int] = None) -> List[ManifestEntry]:
+        """Entries ordered by created_at, from offset (at most limit of them)."""
+        self.sync()
+        with self._lock:
+            if self._order_dirty:
+                self._order.sort(key=lambda key: self._entries[key].sort_key)
+                self._order_dirty = False
+            keys = self._order[offset:] if limit is None else self._order[offset:offset + limit]
+            return [self._entries[key] for key in keys]
+
+    def read(self, entries: Iterable[ManifestEntry]) -> List[SessionMessage]:
+        """Messages of entries, in the same order."""
+        entries = list(entries)
+        messages = self._read_entries(entries)
+        if any(message is None for message in messages):
+            logger.warning(f"[MessageManifest] Stale entries in {self.path}, rebuilding")
+            self.rebuild()
+            with self._lock:
+                entries = [self._entries.get((e.agent_id, e.message_id)) for e in entries]
+            messages = self._read_entries([e for e in entries if e is not None])
+        return [message for message in messages if message is not None]
+
+    def _read_entries(self, entries: List[ManifestEntry]) -> List[Optional[SessionMessage]]:
+        by_agent: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            by_agent.setdefault(entry.agent_id, []).append(i)
+
+        messages: List[Optional[SessionMessage]] = [None] * len(entries)
+        for agent_id, indices in by_agent.items():
+            positions = [
+                (entries[i].message_id, entries[i].segment, entries[i].offset, entries[i].size) for i in indices
+            ]
+            for i, message in zip(indices, self.store(agent_id).read_at(positions)):
+                messages[i] = message
+        return messages
+
+    # ------------------------------------------------------------------
+    # Catching up with the files
+    # ------------------------------------------------------------------
+
+    def sync(self) -> None:
+        """Index records not written through this manifest (cheap when there are none)."""
+        agent_ids = self._agent_ids()
+        positions = {agent_id: self.store(agent_id).position() for agent_id in agent_ids}
+
+        with self._lock:
+            self._load_locked()
+            if any(self._covered.get(agent_id, (0, 0)) > position[:2] for agent_id, position in positions.items()):
+                logger.info(f"[MessageManifest] Segments in {self.session_dir} were rewritten, rebuilding")
+                self._reset_locked(loaded=True)
+                self._rewrite = True
+
+            for agent_id in (set(self._covered) | set(self._legacy)) - set(agent_ids):
+                self._drop_agent_locked(agent_id)
+
+            found: List[ManifestEntry] = []
+            for agent_id, (segment, size, legacy_ids) in positions.items():
+                found += self._catch_up_locked(agent_id, segment, size, legacy_ids)
+
+            if self._rewrite:
+                self._rewrite_locked()
+            elif found:
+                self._persist_locked(found)
+
+    def rebuild(self) -> None:
+        """Forget the index and rebuild it from the segments."""
+        with self._lock:
+            self._reset_locked(loaded=True)
+            self._rewrite = True
+        self.sync()
+
+    def _agent_ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.agents_dir)
+        except FileNotFoundError:
+            return []
+        return [
+            name[len(AGENT_PREFIX):]
+            for name in names
+            if name.startswith(AGENT_PREFIX) and os.path.isdir(os.path.join(self.agents_dir, name, "messages"))
+        ]
+
+    def _catch_up_locked(
+        self, agent_id: str, segment: int, size: int, legacy_ids: List[int]
+    ) -> List[ManifestEntry]:
+        store = self.store(agent_id)
+        found: List[ManifestEntry] = []
+
+        known_legacy = self._legacy.get(agent_id, set())
+        for message_id in known_legacy - set(legacy_ids):
+            self._remove_locked((agent_id, message_id))
+        for message_id in set(legacy_ids) - known_legacy:
+            if (agent_id, message_id) in self._entries:
+                continue  # Already migrated into a segment
+            created_at = store.legacy_created_at(message_id)
+            if created_at is not None:
+                found.append(ManifestEntry(agent_id, message_id, created_at, LEGACY_SEGMENT, 0, 0))
+
+        covered = self._covered.get(agent_id, (0, 0))
+        if covered < (segment, size):
+            written, end = store.scan_positions(covered[0], covered[1], segment)
+            found += [ManifestEntry(agent_id, *position) for position in written]
+            self._covered[agent_id] = end
+
+        return [entry for entry in found if self._put_locked(entry)]
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _put_locked(self, entry: ManifestEntry) -> bool:
+        """Add or replace an entry; an older record of the same message is ignored."""
+        key = (entry.agent_id, entry.message_id)
+        current = self._entries.get(key)
+        if current is not None and (current.segment, current.offset) > (entry.segment, entry.offset):
+            return False
+
+        self._entries[key] = entry
+        legacy = self._legacy.setdefault(entry.agent_id, set())
+        if entry.segment == LEGACY_SEGMENT:
+            legacy.add(entry.message_id)
+        else:
+            legacy.discard(entry.message_id)
+
+        if current is None:
+            if self._order and entry.sort_key < self._entries[self._order[-1]].sort_key:
+                self._order_dirty = True
+            self._order.append(key)
+        elif current.created_at != entry.created_at:
+            self._order_dirty = True
+        return True
+
+    def _remove_locked(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._legacy.get(entry.agent_id, set()).discard(entry.message_id)
+        self._order.remove(key)
+
+    def _drop_agent_locked(self, agent_id: str) -> None:
+        self._order = [key for key in self._order if key[0] != agent_id]
+        self._entries = {key: entry for key, entry in self._entries.items() if key[0] != agent_id}
+        self._covered.pop(agent_id, None)
+        self._legacy.pop(agent_id, None)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode_entry(entry: ManifestEntry) -> bytes:
+        row = [entry.agent_id, entry.message_id, entry.created_at, entry.segment, entry.offset, entry.size]
+        return (json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _load_locked(self) -> None:
+        """Read the persisted manifest once."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        lines = 0
+        try:
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        self._torn_tail = True
+                        break
+                    lines += 1
+                    try:
+                        self._put_locked(ManifestEntry(*json.loads(raw)))
+                    except (ValueError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+
+        # Records up to the end of the last entry of each agent are indexed
+        for entry in self._entries.values():
+            end = (entry.segment, entry.offset + entry.size)
+            if entry.segment != LEGACY_SEGMENT and end > self._covered.get(entry.agent_id, (0, 0)):
+                self._covered[entry.agent_id] = end
+
+        if lines > MANIFEST_REWRITE_RATIO * len(self._entries) + 64:
+            self._rewrite_locked()
+
+    def _persist_locked(self, entries: List[ManifestEntry]) -> None:
+        if not entries or not os.path.isdir(self.session_dir):
+            return
+        data = b"".join(self._encode_entry(entry) for entry in entries)
+        if self._torn_tail:
+            data = b"\n" + data
+            self._torn_tail = False
+        try:
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"[MessageManifest] Failed to write {self.path}: {e}")
+
+    def _rewrite_locked(self) -> None:
+        """Replace the persisted manifest with the current entries."""
+        self._rewrite = False
+        if not os.path.isdir(self.session_dir):
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.session_dir, prefix=".manifest_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b"".join(self._encode_entry(self._entries[key]) for key in self._order))
+            os.replace(tmp_path, self.path)
+            self._torn_tail = False
+        except OSError as e:
+            logger.warning(f"[MessageManifest] Failed to rewrite {self.path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+# Process-wide registry: one manifest per session directory
+_manifests: "OrderedDict[str, SessionManifest]" = OrderedDict()
+_manifests_lock = threading.Lock()
+
+
+def get_session_manifest(session_dir: str) -> SessionManifest:
+    """Get the shared SessionManifest of a session directory."""
+    key = os.path.abspath(session_dir)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _manifests[key] = SessionManifest(session_dir)
+            while len(_manifests) > MAX_OPEN_MANIFESTS:
+                _manifests.popitem(last=False)
+        else:
+            _manifests.move_to_end(key)
+        return manifest
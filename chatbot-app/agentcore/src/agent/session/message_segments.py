@@ -0,0 +1,572 @@
+"""
+Message Segments - Append-only JSONL storage for local session messages
+
+Local sessions used to store one pretty-printed message_<N>.json per message,
+with image/document bytes base64-encoded inline. LocalSessionBuffer.flush
+listed the messages directory for every buffered message to find the next
+index (O(n^2) per session), and every history load opened and parsed one
+file per message.
+
+Messages are now appended to JSONL segments, one compact record per line:
+- The next message id is an in-memory counter per directory, scanned once
+  (ids are read from the line prefix, bodies are not parsed)
+- A flush is one append to the current segment; a segment is closed once it
+  reaches SEGMENT_MAX_BYTES
+- Bytes of BLOB_MIN_BYTES or more go to content-addressed sidecar files
+  shared by the session's agents; smaller bytes stay inline in the SDK's
+  {"__bytes_encoded__": true, "data": "<base64>"} form
+- An update (redaction) appends a new record; the last record of an id wins
+- Legacy message_<N>.json files are still read, and migrated into the
+  current segment on the first append to their directory
+- Every append is reported to on_write with the position of each record,
+  which the session's manifest (message_manifest.py) indexes
+- The frontend's local history reader (lib/local-session-store.ts) reads
+  this layout directly; keep the two in sync
+
+Layout:
+    session_<id>/
+    ├── blobs/<sha256>                      # sidecar bytes
+    └── agents/agent_<id>/messages/
+        ├── segment_000000.jsonl
+        ├── segment_000001.jsonl
+        └── message_<N>.json                # legacy, until migrated
+
+Usage:
+    from agent.session.message_segments import get_message_segment_store
+
+    store = get_message_segment_store(messages_dir, blobs_dir)
+    ids = store.append_messages([{"role": "user", "content": [...]}])
+    store.append([session_message])          # caller-assigned id (SDK create_message)
+    history = store.read_messages()          # List[SessionMessage], by message_id
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from strands.types.exceptions import SessionException
+from strands.types.session import SessionMessage
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".jsonl"
+LEGACY_PREFIX = "message_"
+LEGACY_SUFFIX = ".json"
+
+# A segment is closed once it reaches this size
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+# Bytes values of this size or larger are stored as sidecar blobs
+BLOB_MIN_BYTES = 4096
+# Stores kept in the process-wide registry (one per messages directory)
+MAX_OPEN_STORES = 256
+
+BLOB_KEY = "__blob__"
+# Segment index of a record position that is a legacy message_<N>.json file
+LEGACY_SEGMENT = -1
+
+# Records start with the message id so it can be read without parsing the body
+_RECORD_ID = re.compile(r'^\{"message_id":(-?\d+)')
+# ...and end with the timestamps, so created_at can be read from the tail
+_RECORD_TIMESTAMPS = ',"created_at":'
+
+# (message_id, created_at, segment, offset, size) of one written record
+RecordPosition = Tuple[int, str, int, int, int]
+
+
+def session_dir(storage_dir: str, session_id: str) -> str:
+    """Directory of a local session."""
+    return os.path.join(storage_dir, f"session_{session_id}")
+
+
+def session_blobs_dir(storage_dir: str, session_id: str) -> str:
+    """Content-addressed blobs directory shared by a session's agents."""
+    return os.path.join(session_dir(storage_dir, session_id), "blobs")
+
+
+def message_dirs(storage_dir: str, session_id: str, agent_id: str) -> Tuple[str, str]:
+    """(messages directory of the agent, blobs directory of the session)."""
+    return (
+        os.path.join(session_dir(storage_dir, session_id), "agents", f"agent_{agent_id}", "messages"),
+        session_blobs_dir(storage_dir, session_id),
+    )
+
+
+def _refuse_symlink(path: str) -> None:
+    if os.path.islink(path):
+        raise SessionException(f"Refusing to access symlink at {path}. This may indicate session tampering.")
+
+
+def write_blob(blobs_dir: str, data: bytes) -> str:
+    """Store bytes under their SHA-256 hex digest (no-op if present); returns the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(blobs_dir, digest)
+    if os.path.exists(path):
+        return digest
+
+    os.makedirs(blobs_dir, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=blobs_dir, prefix=".blob_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest
+
+
+def read_blob(blobs_dir: str, digest: str) -> bytes:
+    """Read bytes stored by write_blob (FileNotFoundError if absent)."""
+    if not re.fullmatch(r"[0-9a-f]{64}", digest or ""):
+        raise SessionException(f"Invalid blob reference: {digest!r}")
+    path = os.path.join(blobs_dir, digest)
+    _refuse_symlink(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class MessageSegmentStore:
+    """Append-only message log of one agent directory (thread-safe)."""
+
+    def __init__(
+        self,
+        messages_dir: str,
+        blobs_dir: str,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        blob_min_bytes: int = BLOB_MIN_BYTES,
+    ):
+        self.messages_dir = messages_dir
+        self.blobs_dir = blobs_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.blob_min_bytes = blob_min_bytes
+        self._lock = threading.Lock()
+        # Directory state, scanned on first use and again if someone else changed the directory
+        self._scanned_mtime_ns: Optional[int] = None
+        self._next_id = 0
+        self._segment_index = 0
+        self._segment_size = 0
+        self._torn_tail = False
+        self._legacy_ids: List[int] = []
+        # Called with (start position, end position, written records) after each append
+        self.on_write: Optional[Callable[[Tuple[int, int], Tuple[int, int], List[RecordPosition]], None]] = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def next_message_id(self) -> int:
+        """Id the next appended message gets."""
+        with self._lock:
+            self._ensure_scanned_locked()
+            return self._next_id
+
+    def append_messages(self, messages: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Append messages with the next sequential ids.
+
+        Returns:
+            Assigned message ids
+        """
+        with self._lock:
+            self._ensure_scanned_locked()
+            now = datetime.now(timezone.utc).isoformat()
+            session_messages = []
+            for message in messages:
+                session_messages.append(SessionMessage(
+                    message=message, message_id=self._next_id, created_at=now, updated_at=now
+                ))
+                self._next_id += 1
+            self._append_locked(session_messages)
+            return [sm.message_id for sm in session_messages]
+
+    def append(self, session_messages: Iterable[SessionMessage]) -> None:
+        """Append messages with caller-assigned ids (a repeated id replaces the earlier record)."""
+        with self._lock:
+            self._ensure_scanned_locked()
+            session_messages = list(session_messages)
+            for sm in session_messages:
+                self._next_id = max(self._next_id, sm.message_id + 1)
+            self._append_locked(session_messages)
+
+    def _append_locked(self, session_messages: List[SessionMessage]) -> None:
+        if not session_messages:
+            return
+        os.makedirs(self.messages_dir, mode=0o700, exist_ok=True)
+        start = (self._segment_index, self._segment_size)
+        written = self._migrate_legacy_locked() if self._legacy_ids else []
+        written += self._write_records_locked(session_messages)
+
+        if self.on_write is not None:
+            try:
+                self.on_write(start, (self._segment_index, self._segment_size), written)
+            except Exception as e:
+                logger.warning(f"[MessageSegments] Failed to index appended records: {e}")
+
+    def _write_records_locked(self, session_messages: List[SessionMessage]) -> List[RecordPosition]:
+        """Append records to the current segment, continuing in new segments once it is full."""
+        encoded = [(self._encode_record(sm) + "\n").encode("utf-8") for sm in session_messages]
+        written: List[RecordPosition] = []
+        start = 0
+        while start < len(encoded):
+            if self._segment_size >= self.segment_max_bytes:
+                self._segment_index += 1
+                self._segment_size = 0
+                self._torn_tail = False
+
+            end, size = start, 0
+            while end < len(encoded) and (end == start or self._segment_size + size + len(encoded[end]) <= self.segment_max_bytes):
+                size += len(encoded[end])
+                end += 1
+            chunk = b"".join(encoded[start:end])
+            offset = self._segment_size
+            if self._torn_tail:
+                # Terminate a record cut short by a crash so the new ones stay readable
+                chunk = b"\n" + chunk
+                offset += 1
+                self._torn_tail = False
+            for sm, line in zip(session_messages[start:end], encoded[start:end]):
+                written.append((sm.message_id, sm.created_at, self._segment_index, offset, len(line)))
+                offset += len(line)
+
+            path = self._segment_path(self._segment_index)
+            _refuse_symlink(path)
+            created = not os.path.exists(path)
+            with open(path, "ab") as f:
+                f.write(chunk)
+            self._segment_size += len(chunk)
+            if created:
+                self._scanned_mtime_ns = self._dir_mtime_ns()
+            start = end
+        return written
+
+    def _encode_record(self, sm: SessionMessage) -> str:
+        record = {
+            "message_id": sm.message_id,
+            "message": self._encode_value(sm.message),
+            "redact_message": self._encode_value(sm.redact_message),
+            "created_at": sm.created_at,
+            "updated_at": sm.updated_at,
+        }
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+    def _encode_value(self, value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            if len(value) >= self.blob_min_bytes:
+                return {BLOB_KEY: self._write_blob(bytes(value)), "size": len(value)}
+            return {"__bytes_encoded__": True, "data": base64.b64encode(value).decode()}
+        if isinstance(value, dict):
+            return {k: self._encode_value(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._encode_value(item) for item in value]
+        return value
+
+    def _write_blob(self, data: bytes) -> str:
+        return write_blob(self.blobs_dir, data)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read_messages(self) -> List[SessionMessage]:
+        """All messages (legacy files and segments), ordered by message_id."""
+        records = self._read_records()
+        return [self._decode_record(records[message_id]) for message_id in sorted(records)]
+
+    def read_message(self, message_id: int) -> Optional[SessionMessage]:
+        """One message by id (None if it does not exist)."""
+        record = self._read_records().get(message_id)
+        return self._decode_record(record) if record is not None else None
+
+    def count(self) -> int:
+        """Number of messages (without parsing message bodies)."""
+        with self._lock:
+            self._ensure_scanned_locked()
+            ids = set(self._legacy_ids)
+            for index in range(self._segment_index + 1):
+                ids.update(message_id for message_id, _ in self._iter_segment_lines(index))
+            return len(ids)
+
+    def _read_records(self) -> Dict[int, Dict[str, Any]]:
+        """Latest raw record per message id."""
+        records: Dict[int, Dict[str, Any]] = {}
+        if not os.path.isdir(self.messages_dir):
+            return records
+
+        with self._lock:
+            self._ensure_scanned_locked()
+            legacy_ids = list(self._legacy_ids)
+            segment_count = self._segment_index + 1
+
+        for message_id in legacy_ids:
+            record = self._read_legacy_record(message_id)
+            if record is not None:  # None: migrated meanwhile, the record is in a segment
+                records[message_id] = record
+
+        for index in range(segment_count):
+            for message_id, line in self._iter_segment_lines(index):
+                try:
+                    records[message_id] = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"[MessageSegments] Skipping unreadable record {message_id} in segment {index}")
+        return records
+
+    def _read_legacy_record(self, message_id: int) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.messages_dir, f"{LEGACY_PREFIX}{message_id}{LEGACY_SUFFIX}")
+        try:
+            _refuse_symlink(path)
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise SessionException(f"Invalid JSON in file {path}: {e}") from e
+
+    def _iter_segment_lines(self, index: int):
+        """(message_id, line) of every complete record of a segment."""
+        path = self._segment_path(index)
+        if not os.path.exists(path):
+            return
+        _refuse_symlink(path)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Torn write at the end of the segment
+                match = _RECORD_ID.match(line)
+                if match:
+                    yield int(match.group(1)), line
+
+    def _decode_record(self, record: Dict[str, Any]) -> SessionMessage:
+        return SessionMessage(
+            message=self._decode_value(record["message"]),
+            message_id=record["message_id"],
+            redact_message=self._decode_value(record.get("redact_message")),
+            created_at=record.get("created_at", ""),
+            updated_at=record.get("updated_at", ""),
+        )
+
+    def _decode_value(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if BLOB_KEY in value:
+                return self._read_blob(value[BLOB_KEY])
+            if value.get("__bytes_encoded__") is True and "data" in value:
+                return base64.b64decode(value["data"])
+            return {k: self._decode_value(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._decode_value(item) for item in value]
+        return value
+
+    def _read_blob(self, digest: str) -> bytes:
+        return read_blob(self.blobs_dir, digest)
+
+    # ------------------------------------------------------------------
+    # Record positions (for the session manifest)
+    # ------------------------------------------------------------------
+
+    def position(self) -> Tuple[int, int, List[int]]:
+        """(current segment index, its size on disk, legacy message ids) - two stats if nothing changed."""
+        with self._lock:
+            self._ensure_scanned_locked()
+            try:
+                size = os.path.getsize(self._segment_path(self._segment_index))
+            except FileNotFoundError:
+                size = 0
+            return self._segment_index, size, list(self._legacy_ids)
+
+    def scan_positions(
+        self, segment: int, offset: int, last_segment: int
+    ) -> Tuple[List[RecordPosition], Tuple[int, int]]:
+        """
+        Positions of the records from (segment, offset) to the end of last_segment.
+
+        Only the id prefix and the timestamps at the end of each record are
+        decoded, not the message body.
+
+        Returns:
+            (record positions, position after the last complete record)
+        """
+        found: List[RecordPosition] = []
+        end = (segment, offset)
+        for index in range(segment, last_segment + 1):
+            path = self._segment_path(index)
+            position = offset if index == segment else 0
+            if os.path.exists(path):
+                _refuse_symlink(path)
+                with open(path, "rb") as f:
+                    f.seek(position)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # Torn write at the end of the segment
+                        parsed = self._parse_position(raw)
+                        if parsed is not None:
+                            found.append((parsed[0], parsed[1], index, position, len(raw)))
+                        position += len(raw)
+            # A closed segment is complete; the last one is indexed up to its last full record
+            end = (index, position) if index == last_segment else (index + 1, 0)
+        return found, end
+
+    @staticmethod
+    def _parse_position(raw: bytes) -> Optional[Tuple[int, str]]:
+        """(message_id, created_at) of a record line, or None if it is not a complete record."""
+        line = raw.decode("utf-8", errors="replace")
+        match = _RECORD_ID.match(line)
+        tail = line.rfind(_RECORD_TIMESTAMPS)
+        if not match or tail < 0:
+            return None
+        try:
+            # The record's own timestamps come after the body, so the last match is theirs
+            timestamps = json.loads("{" + line[tail + 1:])
+        except json.JSONDecodeError:
+            return None
+        return int(match.group(1)), timestamps.get("created_at") or ""
+
+    def legacy_created_at(self, message_id: int) -> Optional[str]:
+        """created_at of a legacy message file (None if it is gone)."""
+        record = self._read_legacy_record(message_id)
+        return record.get("created_at", "") if record is not None else None
+
+    def read_at(self, positions: Iterable[Tuple[int, int, int, int]]) -> List[Optional[SessionMessage]]:
+        """
+        Messages at known positions: (message_id, segment, offset, size).
+
+        Each segment is opened once. None where the record is not at its
+        position any more (legacy file gone, segment rewritten).
+        """
+        handles: Dict[int, Any] = {}
+        messages: List[Optional[SessionMessage]] = []
+        try:
+            for message_id, segment, offset, size in positions:
+                if segment == LEGACY_SEGMENT:
+                    record = self._read_legacy_record(message_id)
+                else:
+                    record = self._read_record_at(handles, message_id, segment, offset, size)
+                messages.append(self._decode_record(record) if record is not None else None)
+        finally:
+            for f in handles.values():
+                f.close()
+        return messages
+
+    def _read_record_at(self, handles: Dict[int, Any], message_id: int, segment: int, offset: int, size: int):
+        f = handles.get(segment)
+        if f is None:
+            path = self._segment_path(segment)
+            if not os.path.exists(path):
+                return None
+            _refuse_symlink(path)
+            f = handles[segment] = open(path, "rb")
+        f.seek(offset)
+        line = f.read(size).decode("utf-8", errors="replace")
+        match = _RECORD_ID.match(line)
+        if not match or int(match.group(1)) != message_id or not line.endswith("\n"):
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Directory state and migration
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.messages_dir, f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}")
+
+    def _dir_mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(self.messages_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _ensure_scanned_locked(self) -> None:
+        """Scan the directory once; again only if another writer added files."""
+        mtime_ns = self._dir_mtime_ns()
+        if self._scanned_mtime_ns is not None and mtime_ns == self._scanned_mtime_ns:
+            return
+
+        legacy_ids, segment_indices = [], []
+        if mtime_ns is not None:
+            for filename in os.listdir(self.messages_dir):
+                if filename.startswith(LEGACY_PREFIX) and filename.endswith(LEGACY_SUFFIX):
+                    try:
+                        legacy_ids.append(int(filename[len(LEGACY_PREFIX):-len(LEGACY_SUFFIX)]))
+                    except ValueError:
+                        continue
+                elif filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+                    try:
+                        segment_indices.append(int(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                    except ValueError:
+                        continue
+
+        self._legacy_ids = sorted(legacy_ids)
+        self._segment_index = max(segment_indices, default=0)
+        self._segment_size = (
+            os.path.getsize(self._segment_path(self._segment_index)) if segment_indices else 0
+        )
+        self._torn_tail = False
+        if self._segment_size:
+            with open(self._segment_path(self._segment_index), "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                self._torn_tail = f.read(1) != b"\n"
+        next_id = self._legacy_ids[-1] + 1 if self._legacy_ids else 0
+        for index in sorted(segment_indices):
+            for message_id, _ in self._iter_segment_lines(index):
+                next_id = max(next_id, message_id + 1)
+        self._next_id = next_id
+        self._scanned_mtime_ns = mtime_ns
+
+    def _migrate_legacy_locked(self) -> List[RecordPosition]:
+        """Move message_<N>.json files into the current segment, then delete them."""
+        session_messages = []
+        for message_id in self._legacy_ids:
+            path = os.path.join(self.messages_dir, f"{LEGACY_PREFIX}{message_id}{LEGACY_SUFFIX}")
+            try:
+                _refuse_symlink(path)
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                sm = SessionMessage.from_dict(data)
+            except (OSError, json.JSONDecodeError, TypeError, KeyError) as e:
+                logger.warning(f"[MessageSegments] Not migrating {path}: {e}")
+                continue
+            session_messages.append(sm)
+
+        # Records first: a crash before the deletes only leaves duplicates of the same id
+        written = self._write_records_locked(session_messages)
+        for message_id in self._legacy_ids:
+            try:
+                os.unlink(os.path.join(self.messages_dir, f"{LEGACY_PREFIX}{message_id}{LEGACY_SUFFIX}"))
+            except FileNotFoundError:
+                pass
+        logger.info(f"[MessageSegments] Migrated {len(written)} legacy message files in {self.messages_dir}")
+        self._legacy_ids = []
+        self._scanned_mtime_ns = self._dir_mtime_ns()
+        return written
+
+
+# Process-wide registry: one store (and counter) per messages directory
+_stores: "OrderedDict[str, MessageSegmentStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_message_segment_store(messages_dir: str, blobs_dir: str) -> MessageSegmentStore:
+    """Get the shared MessageSegmentStore of a messages directory."""
+    key = os.path.abspath(messages_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = MessageSegmentStore(messages_dir, blobs_dir)
+            while len(_stores) > MAX_OPEN_STORES:
+                _stores.popitem(last=False)
+        else:
+            _stores.move_to_end(key)
+        return store
@@ -92,18 +92,20 @@ class SwarmMessageStore:
             except ImportError:
                 logger.warning("AgentCore Memory not available, falling back to local storage")
 
-        # Local mode: Use FileSessionManager
-        from strands.session.file_session_manager import FileSessionManager
+        # Local mode: Use UnifiedFileSessionManager (manifest-backed ids and tail reads).
+        # The session dir is shared with ChatAgent (agent_default, the same agent_id as
+        # SWARM_AGENT_ID) and VoiceAgent (agent_voice): ids and history are per agent.
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
 
         sessions_dir = Path(__file__).parent.parent.parent / "sessions"
         sessions_dir.mkdir(exist_ok=True)
 
-        manager = FileSessionManager(
+        manager = UnifiedFileSessionManager(
             session_id=self.session_id,
             storage_dir=str(sessions_dir)
         )
 
-        logger.debug(f"Using FileSessionManager for swarm storage: {sessions_dir}")
+        logger.debug(f"Using UnifiedFileSessionManager for swarm storage: {sessions_dir}")
         return manager
 
     @property
@@ -113,7 +115,11 @@ class SwarmMessageStore:
 
     def _get_next_message_index(self) -> int:
         """Get the next message index by checking existing messages."""
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
         try:
+            if isinstance(self._repo, UnifiedFileSessionManager):
+                return self._repo.next_message_id(self.session_id, SWARM_AGENT_ID)
             existing = self._repo.list_messages(
                 session_id=self.session_id,
                 agent_id=SWARM_AGENT_ID
@@ -189,6 +195,10 @@ class SwarmMessageStore:
                 )
                 self._message_index += 1
 
+            # Persist queued writes before the turn is reported as saved
+            if hasattr(self.session_manager, 'flush'):
+                self.session_manager.flush()
+
             mode = "cloud" if self.memory_id else "local"
             logger.info(f"[Swarm] Saved {len(messages_to_save)} messages to {mode}: session={self.session_id}")
 
@@ -292,8 +302,10 @@ class SwarmMessageStore:
             List of message dicts for injection into coordinator.executor.messages
         """
         try:
-            session_messages = self._repo.list_messages(
+            # Limit to max_turns (each turn can have multiple messages)
+            session_messages = self._repo.list_recent_messages(
                 session_id=self.session_id,
+                n=max_turns * 2,
                 agent_id=SWARM_AGENT_ID
             )
 
@@ -303,11 +315,6 @@ class SwarmMessageStore:
 
             messages = [sm.to_message() for sm in session_messages]
 
-            # Limit to max_turns (each turn can have multiple messages)
-            max_messages = max_turns * 2
-            if len(messages) > max_messages:
-                messages = messages[-max_messages:]
-
             logger.info(f"[Swarm] Loaded {len(messages)} history messages for session={self.session_id}")
             return messages
 
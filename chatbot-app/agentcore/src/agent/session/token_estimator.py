@@ -0,0 +1,267 @@
+"""
+Token Estimator - Fast local input-token estimate, calibrated on actual usage
+
+Compaction used to be decided after a turn from the inputTokens of its last
+LLM call, so the turn that crossed token_threshold was still sent with the
+full, oversized context. CompactingSessionManager.initialize now estimates
+the context before the first model call and moves the checkpoint right away
+when the estimate crosses the threshold.
+
+The raw estimate is a cheap walk over the message list (string lengths,
+JSON sizes via json_length, a flat cost per image/document). It is
+calibrated with the inputTokens reported in the metadata chunk of every LLM
+call, per model:
+- factor: actual tokens per estimated token, learned from the change in
+  inputTokens between consecutive calls (system prompt and tool specs cancel
+  out)
+- overhead: what the messages don't account for (system prompt, tool specs)
+
+With an anchor (the previous call's estimate and actual inputTokens, kept in
+CompactionState) the prediction is anchor_actual + factor * (raw - anchor_raw);
+without one it is factor * raw + overhead.
+
+Within one stream the messages only grow (or have single messages replaced
+copy-on-write), so IncrementalEstimate re-estimates only the messages that
+are not the same objects as on its previous call.
+
+Estimated vs. actual error of every pre-turn prediction is recorded and
+exported through get_stats() (/health) so the calibration can be checked.
+
+Usage:
+    from agent.session.token_estimator import get_token_estimator
+
+    estimator = get_token_estimator()
+    raw = estimator.estimate_messages(agent.messages)
+    predicted = estimator.predict(model_key, raw, anchor=(anchor_raw, anchor_actual))
+    estimator.observe(model_key, [(raw_1, input_tokens_1), (raw_2, input_tokens_2)])
+    estimator.record_error(model_key, predicted, actual)
+
+    incremental = IncrementalEstimate()                          # one per stream
+    raw = incremental.estimate(agent.messages)                   # per LLM call
+"""
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from agent.config.singleton import process_singleton
+from agent.session.truncation import json_length
+
+logger = logging.getLogger(__name__)
+
+# Rough costs before calibration
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+BLOCK_OVERHEAD_TOKENS = 3
+IMAGE_TOKENS = 1600          # Bedrock resizes images to ~1.15 MP (~1,600 tokens)
+DOCUMENT_BYTES_PER_TOKEN = 6
+
+# Calibration
+CALIBRATION_ALPHA = 0.2      # EWMA weight of a new observation
+MIN_CALIBRATION_DELTA = 200  # Ignore call pairs whose estimates differ by less
+FACTOR_BOUNDS = (0.25, 4.0)
+ERROR_WINDOW = 100           # Recent predictions kept for error stats
+
+# (raw estimate of the messages, actual inputTokens) of one LLM call
+Observation = Tuple[int, int]
+
+
+def estimate_text(text: str) -> int:
+    """Tokens of a text: ~4 chars per token for ASCII, ~1 per char otherwise."""
+    if text.isascii():
+        return len(text) // CHARS_PER_TOKEN
+    # Count non-ASCII chars without a Python-level loop
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return (len(text) - non_ascii) // CHARS_PER_TOKEN + non_ascii
+
+
+def _estimate_value(value: Any) -> int:
+    if isinstance(value, str):
+        return estimate_text(value)
+    try:
+        return json_length(value) // CHARS_PER_TOKEN
+    except TypeError:
+        return 0
+
+
+def _estimate_block(block: Any) -> int:
+    if not isinstance(block, dict):
+        return 0
+    if 'text' in block:
+        return BLOCK_OVERHEAD_TOKENS + _estimate_value(block['text'])
+    if 'toolUse' in block:
+        tool_use = block['toolUse']
+        return BLOCK_OVERHEAD_TOKENS + _estimate_value(tool_use.get('name', '')) + _estimate_value(tool_use.get('input', {}))
+    if 'toolResult' in block:
+        content = block['toolResult'].get('content', [])
+        if not isinstance(content, list):
+            return BLOCK_OVERHEAD_TOKENS
+        tokens = BLOCK_OVERHEAD_TOKENS
+        for item in content:
+            if isinstance(item, dict) and 'json' in item:
+                tokens += _estimate_value(item['json'])
+            else:
+                tokens += _estimate_block(item)
+        return tokens
+    if 'image' in block:
+        return IMAGE_TOKENS
+    if 'document' in block:
+        source = block['document'].get('source', {})
+        data = source.get('bytes', b'') if isinstance(source, dict) else b''
+        return BLOCK_OVERHEAD_TOKENS + (len(data) if isinstance(data, (bytes, str)) else 0) // DOCUMENT_BYTES_PER_TOKEN
+    if 'reasoningContent' in block:
+        reasoning = block['reasoningContent'].get('reasoningText', {})
+        if not isinstance(reasoning, dict):
+            return BLOCK_OVERHEAD_TOKENS
+        return BLOCK_OVERHEAD_TOKENS + _estimate_value(reasoning.get('text', ''))
+    return 0
+
+
+def estimate_message(message: Dict[str, Any]) -> int:
+    content = message.get('content', [])
+    if isinstance(content, str):
+        return MESSAGE_OVERHEAD_TOKENS + estimate_text(content)
+    if not isinstance(content, list):
+        return MESSAGE_OVERHEAD_TOKENS
+    return MESSAGE_OVERHEAD_TOKENS + sum(_estimate_block(block) for block in content)
+
+
+class IncrementalEstimate:
+    """Raw estimate of a growing message list, reusing the estimates of unchanged messages."""
+
+    def __init__(self):
+        # (message, its estimate) per position; holding the message keeps identity checks valid
+        self._estimates: List[Tuple[Any, int]] = []
+        self.walked = 0  # Messages estimated so far
+
+    def estimate(self, messages: List[Dict[str, Any]]) -> int:
+        """Raw estimate of messages; only messages that are new or were replaced are walked."""
+        previous = self._estimates
+        estimates: List[Tuple[Any, int]] = []
+        for index, message in enumerate(messages):
+            if index < len(previous) and previous[index][0] is message:
+                estimates.append(previous[index])
+                continue
+            estimates.append((message, estimate_message(message)))
+            self.walked += 1
+        self._estimates = estimates
+        return sum(estimate for _, estimate in estimates)
+
+
+@dataclass
+class ModelCalibration:
+    """Calibration and prediction error of one model."""
+    factor: float = 1.0
+    overhead: float = 0.0
+    observations: int = 0
+    factor_samples: int = 0
+    # Signed relative errors ((predicted - actual) / actual) of recent predictions
+    errors: Deque[float] = field(default_factory=lambda: deque(maxlen=ERROR_WINDOW))
+    last_predicted: int = 0
+    last_actual: int = 0
+
+
+class TokenEstimator:
+    """Raw message estimates plus per-model calibration (thread-safe)."""
+
+    def __init__(self):
+        self._models: Dict[str, ModelCalibration] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_messages(messages: Iterable[Dict[str, Any]]) -> int:
+        """Raw (uncalibrated) token estimate of a message list."""
+        return sum(estimate_message(message) for message in messages)
+
+    def predict(self, model_key: str, raw: int, anchor: Optional[Observation] = None) -> int:
+        """
+        Calibrated input-token prediction for messages with raw estimate `raw`.
+
+        Args:
+            model_key: Model the messages are sent to
+            raw: estimate_messages() of the messages
+            anchor: (raw, actual inputTokens) of an earlier call of the same agent
+        """
+        with self._lock:
+            calibration = self._models.get(model_key) or ModelCalibration()
+            factor, overhead = calibration.factor, calibration.overhead
+
+        if anchor and anchor[1] > 0:
+            anchor_raw, anchor_actual = anchor
+            return max(0, int(anchor_actual + factor * (raw - anchor_raw)))
+        return int(factor * raw + overhead)
+
+    def observe(self, model_key: str, observations: List[Observation]) -> None:
+        """Update the calibration with consecutive LLM calls (oldest first)."""
+        observations = [(raw, actual) for raw, actual in observations if actual > 0]
+        if not observations:
+            return
+
+        with self._lock:
+            calibration = self._models.setdefault(model_key, ModelCalibration())
+
+            for (prev_raw, prev_actual), (raw, actual) in zip(observations, observations[1:]):
+                delta_raw = raw - prev_raw
+                if abs(delta_raw) < MIN_CALIBRATION_DELTA:
+                    continue
+                ratio = min(max((actual - prev_actual) / delta_raw, FACTOR_BOUNDS[0]), FACTOR_BOUNDS[1])
+                if calibration.factor_samples == 0:
+                    calibration.factor = ratio
+                else:
+                    calibration.factor += CALIBRATION_ALPHA * (ratio - calibration.factor)
+                calibration.factor_samples += 1
+
+            for raw, actual in observations:
+                overhead = max(0.0, actual - calibration.factor * raw)
+                if calibration.observations == 0:
+                    calibration.overhead = overhead
+                else:
+                    calibration.overhead += CALIBRATION_ALPHA * (overhead - calibration.overhead)
+                calibration.observations += 1
+
+    def record_error(self, model_key: str, predicted: int, actual: int) -> None:
+        """Record how far a prediction was from the actual inputTokens."""
+        if actual <= 0:
+            return
+        error = (predicted - actual) / actual
+        with self._lock:
+            calibration = self._models.setdefault(model_key, ModelCalibration())
+            calibration.errors.append(error)
+            calibration.last_predicted = predicted
+            calibration.last_actual = actual
+        logger.debug(f"[TokenEstimator] model={model_key} predicted={predicted:,} actual={actual:,} error={error:+.1%}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calibration and estimate-vs-actual error per model, for health/metrics endpoints."""
+        with self._lock:
+            models = {}
+            for model_key, calibration in self._models.items():
+                errors = list(calibration.errors)
+                models[model_key] = {
+                    "factor": round(calibration.factor, 4),
+                    "overhead_tokens": int(calibration.overhead),
+                    "observations": calibration.observations,
+                    "predictions": len(errors),
+                    "mean_abs_error_pct": round(100 * sum(abs(e) for e in errors) / len(errors), 2) if errors else None,
+                    "mean_error_pct": round(100 * sum(errors) / len(errors), 2) if errors else None,
+                    "last_predicted": calibration.last_predicted,
+                    "last_actual": calibration.last_actual,
+                }
+            return {"models": models}
+
+
+def model_key_for(agent: Any) -> str:
+    """Calibration key of the agent's model (its model id)."""
+    model = getattr(agent, 'model', None)
+    config = getattr(model, 'config', None)
+    if isinstance(config, dict) and config.get('model_id'):
+        return str(config['model_id'])
+    return "default"
+
+
+@process_singleton
+def get_token_estimator() -> TokenEstimator:
+    """Get the process-wide TokenEstimator singleton."""
+    return TokenEstimator()
@@ -0,0 +1,434 @@
+"""
+Tool Content Truncation - Copy-on-write Stage 1 compaction with per-message cache
+
+CompactingSessionManager._truncate_tool_contents deep-copied the whole history
+and json.dumps'ed every toolUse input and JSON toolResult just to measure it,
+from scratch on every initialize, although old messages never change. In long
+tool-heavy sessions that was the dominant per-turn compaction cost.
+
+ToolContentTruncator instead:
+- Copies only what it rewrites: a message gets a new dict and content list,
+  rewritten blocks are new, every other block is shared with the input
+- Measures JSON sizes by walking the value (json_length) and stops as soon
+  as the limit is exceeded; json.dumps only runs for content that is cut
+- Caches each message's rewrites (only the small replacement blocks) keyed
+  by its position in the append-only session history and the settings, so
+  a turn only truncates messages it has not seen before
+
+A cached rewrite is only applied if the message still has the same shape
+(role, block kinds, text lengths, tool ids); otherwise it is recomputed.
+Session history is append-only, so a position never changes its message;
+the shape check catches the one message that does differ between loads
+(the first message after a checkpoint, which gets the summary prepended).
+
+Usage:
+    from agent.session.truncation import ToolContentTruncator, get_truncation_cache
+
+    truncator = ToolContentTruncator(max_length=500, cache=get_truncation_cache())
+    messages, count, chars_saved = truncator.truncate(
+        messages, protected_indices, cache_key=(actor_id, session_id), base_index=offset
+    )
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from json.encoder import encode_basestring
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.config.constants import (
+    DEFAULT_TRUNCATION_CACHE_MAX_SESSIONS,
+    DEFAULT_TRUNCATION_CACHE_TTL_SECONDS,
+    EnvVars,
+)
+from agent.config.env import env_float, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# (actor_id, session_id)
+SessionKey = Tuple[str, str]
+
+
+def truncate_text(text: str, max_length: int) -> str:
+    """Truncate text to max_length with indicator."""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length] + f"\n... [truncated, {len(text) - max_length} chars removed]"
+
+
+class _LimitExceeded(Exception):
+    pass
+
+
+def _float_repr(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def json_length(value: Any, limit: Optional[int] = None) -> int:
+    """
+    len(json.dumps(value, ensure_ascii=False)) without building the string.
+
+    With a limit, counting stops as soon as the length exceeds it and the
+    partial count (> limit) is returned.
+
+    Raises:
+        TypeError: value is not JSON serializable (like json.dumps)
+    """
+    total = 0
+
+    def add(n: int) -> None:
+        nonlocal total
+        total += n
+        if limit is not None and total > limit:
+            raise _LimitExceeded
+
+    def add_key(key: Any) -> None:
+        if isinstance(key, str):
+            add(len(encode_basestring(key)))
+        elif key is True or key is False or key is None:
+            add(len(json.dumps(key)) + 2)
+        elif isinstance(key, int):
+            add(len(int.__repr__(key)) + 2)
+        elif isinstance(key, float):
+            add(len(_float_repr(key)) + 2)
+        else:
+            json.dumps({key: None})  # Raises TypeError like the full dump would
+
+    def walk(item: Any) -> None:
+        if isinstance(item, str):
+            add(len(encode_basestring(item)))
+        elif item is None or item is True:
+            add(4)
+        elif item is False:
+            add(5)
+        elif isinstance(item, int):
+            add(len(int.__repr__(item)))
+        elif isinstance(item, float):
+            add(len(_float_repr(item)))
+        elif isinstance(item, (list, tuple)):
+            # "[" + items joined by ", " + "]"
+            add(2 * len(item) if item else 2)
+            for element in item:
+                walk(element)
+        elif isinstance(item, dict):
+            # "{" + "key: value" joined by ", " + "}"
+            add(4 * len(item) if item else 2)
+            for key, element in item.items():
+                add_key(key)
+                walk(element)
+        else:
+            add(len(json.dumps(item, ensure_ascii=False)))
+
+    try:
+        walk(value)
+    except _LimitExceeded:
+        pass
+    return total
+
+
+def _copy_block(value: Any) -> Any:
+    """Copy the dict/list structure of a replacement block (much faster than copy.deepcopy)."""
+    if isinstance(value, dict):
+        return {key: _copy_block(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_block(item) for item in value]
+    return value
+
+
+def _image_placeholder(image_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Text block replacing an image, and the image's size in bytes."""
+    image_format = image_data.get('format', 'unknown')
+    original_bytes = image_data.get('source', {}).get('bytes', b'')
+    original_size = len(original_bytes) if isinstance(original_bytes, bytes) else 0
+    placeholder = {'text': f'[Image placeholder: format={image_format}, original_size={original_size} bytes]'}
+    return placeholder, original_size
+
+
+def message_signature(message: Dict[str, Any]) -> tuple:
+    """Cheap shape of a message: a cached rewrite only applies to the same shape."""
+    content = message.get('content')
+    if not isinstance(content, list):
+        return (message.get('role'), None)
+
+    blocks = []
+    for block in content:
+        if not isinstance(block, dict):
+            blocks.append(('raw',))
+        elif 'text' in block:
+            blocks.append(('text', len(block['text']) if isinstance(block['text'], str) else -1))
+        elif 'toolUse' in block:
+            blocks.append(('toolUse', block['toolUse'].get('toolUseId')))
+        elif 'toolResult' in block:
+            result_content = block['toolResult'].get('content')
+            if isinstance(result_content, list):
+                result_shape = tuple(
+                    len(item['text']) if isinstance(item, dict) and isinstance(item.get('text'), str)
+                    else tuple(item) if isinstance(item, dict) else None
+                    for item in result_content
+                )
+            else:
+                result_shape = None
+            blocks.append(('toolResult', block['toolResult'].get('toolUseId'), result_shape))
+        else:
+            blocks.append(tuple(block))
+    return (message.get('role'), tuple(blocks))
+
+
+@dataclass
+class MessageRewrite:
+    """Truncation result of one message: replacement blocks by position."""
+    signature: tuple
+    # content index -> replacement block (images, toolUse)
+    blocks: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    # content index -> {toolResult content index -> replacement block}
+    result_blocks: Dict[int, Dict[int, Dict[str, Any]]] = field(default_factory=dict)
+    truncation_count: int = 0
+    chars_saved: int = 0
+
+
+class TruncationCache:
+    """LRU + TTL bounded map of (actor_id, session_id, max_length) -> {position: MessageRewrite}."""
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_TRUNCATION_CACHE_MAX_SESSIONS,
+        ttl_seconds: float = DEFAULT_TRUNCATION_CACHE_TTL_SECONDS,
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept before LRU eviction (0 disables the cache)
+            ttl_seconds: Entries unused for this long are dropped
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[tuple, Tuple[Dict[int, MessageRewrite], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counted per message, not per session
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_sessions > 0
+
+    @classmethod
+    def from_env(cls) -> "TruncationCache":
+        """Create cache from environment variables."""
+        return cls(
+            max_sessions=env_int(EnvVars.TRUNCATION_CACHE_MAX_SESSIONS, DEFAULT_TRUNCATION_CACHE_MAX_SESSIONS),
+            ttl_seconds=env_float(EnvVars.TRUNCATION_CACHE_TTL_SECONDS, DEFAULT_TRUNCATION_CACHE_TTL_SECONDS),
+        )
+
+    def session(self, session_key: SessionKey, max_length: int) -> Optional[Dict[int, MessageRewrite]]:
+        """Rewrites of a session under these settings (created empty), or None when disabled."""
+        if not self.enabled:
+            return None
+
+        key = (*session_key, max_length)
+        now = time.monotonic()
+        with self._lock:
+            cutoff = now - self.ttl_seconds
+            while self._entries:
+                oldest_key, (_, last_used) = next(iter(self._entries.items()))
+                if last_used > cutoff:
+                    break
+                del self._entries[oldest_key]
+                self.evicted += 1
+
+            rewrites = self._entries[key][0] if key in self._entries else {}
+            self._entries[key] = (rewrites, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+        return rewrites
+
+    def record(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sessions": len(self._entries),
+                "messages": sum(len(rewrites) for rewrites, _ in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+            }
+
+
+class ToolContentTruncator:
+    """Stage 1 compaction: truncate long tool inputs/results, replace images with placeholders."""
+
+    def __init__(self, max_length: int, cache: Optional[TruncationCache] = None):
+        """
+        Args:
+            max_length: Max chars for tool content before truncation
+            cache: Per-message rewrite cache (None: always compute)
+        """
+        self.max_length = max_length
+        self.cache = cache
+
+    def truncate(
+        self,
+        messages: List[Dict[str, Any]],
+        protected_indices: Optional[set] = None,
+        cache_key: Optional[SessionKey] = None,
+        base_index: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Truncate unprotected messages. The input messages are not modified.
+
+        Args:
+            messages: List of message dicts
+            protected_indices: Indices (into messages) to leave as they are
+            cache_key: (actor_id, session_id) to cache rewrites under
+            base_index: Position of messages[0] in the session history
+
+        Returns:
+            Tuple of (messages, truncation_count, chars_saved)
+        """
+        protected_indices = protected_indices or set()
+        rewrites = self.cache.session(cache_key, self.max_length) if self.cache and cache_key else None
+
+        result = []
+        truncation_count = 0
+        chars_saved = 0
+        hits = misses = 0
+
+        for msg_idx, msg in enumerate(messages):
+            content = msg.get('content')
+            if not isinstance(content, list):
+                result.append(msg)
+                continue
+            if msg_idx in protected_indices:
+                result.append({**msg, 'content': list(content)})
+                continue
+
+            signature = message_signature(msg)
+            position = base_index + msg_idx
+            rewrite = rewrites.get(position) if rewrites is not None else None
+            if rewrite is not None and rewrite.signature == signature:
+                hits += 1
+            else:
+                misses += 1
+                rewrite = self._rewrite(content, signature)
+                if rewrites is not None:
+                    rewrites[position] = rewrite
+
+            result.append(self._apply(msg, content, rewrite))
+            truncation_count += rewrite.truncation_count
+            chars_saved += rewrite.chars_saved
+
+        if rewrites is not None:
+            self.cache.record(hits, misses)
+
+        return result, truncation_count, chars_saved
+
+    def _rewrite(self, content: List[Any], signature: tuple) -> MessageRewrite:
+        """Replacement blocks for one message's content (content is not modified)."""
+        rewrite = MessageRewrite(signature=signature)
+        max_length = self.max_length
+
+        for block_idx, block in enumerate(content):
+            if not isinstance(block, dict):
+                continue
+
+            if 'image' in block:
+                placeholder, original_size = _image_placeholder(block['image'])
+                rewrite.blocks[block_idx] = placeholder
+                rewrite.truncation_count += 1
+                # Estimate token savings (base64 images are ~1.33x original, then tokenized)
+                rewrite.chars_saved += original_size
+
+            elif 'toolUse' in block:
+                tool_use = block['toolUse']
+                tool_input = tool_use.get('input', {})
+                if isinstance(tool_input, dict) and json_length(tool_input, max_length) > max_length:
+                    input_str = json.dumps(tool_input, ensure_ascii=False)
+                    rewrite.blocks[block_idx] = {
+                        **block,
+                        'toolUse': {**tool_use, 'input': {"_truncated": truncate_text(input_str, max_length)}},
+                    }
+                    rewrite.truncation_count += 1
+                    rewrite.chars_saved += len(input_str) - max_length
+
+            elif 'toolResult' in block:
+                result_content = block['toolResult'].get('content', [])
+                if not isinstance(result_content, list):
+                    continue
+
+                replacements = {}
+                for result_idx, result_block in enumerate(result_content):
+                    if not isinstance(result_block, dict):
+                        continue
+
+                    if 'image' in result_block:
+                        placeholder, original_size = _image_placeholder(result_block['image'])
+                        replacements[result_idx] = placeholder
+                        rewrite.truncation_count += 1
+                        rewrite.chars_saved += original_size
+
+                    elif 'text' in result_block:
+                        text = result_block['text']
+                        if len(text) > max_length:
+                            replacements[result_idx] = {**result_block, 'text': truncate_text(text, max_length)}
+                            rewrite.truncation_count += 1
+                            rewrite.chars_saved += len(text) - max_length
+
+                    elif 'json' in result_block:
+                        json_content = result_block['json']
+                        if json_length(json_content, max_length) > max_length:
+                            json_str = json.dumps(json_content, ensure_ascii=False)
+                            # Simply convert to truncated text instead of recursive dict processing
+                            replaced = {key: value for key, value in result_block.items() if key != 'json'}
+                            replaced['text'] = truncate_text(json_str, max_length)
+                            replacements[result_idx] = replaced
+                            rewrite.truncation_count += 1
+                            rewrite.chars_saved += len(json_str) - max_length
+
+                if replacements:
+                    rewrite.result_blocks[block_idx] = replacements
+
+        return rewrite
+
+    @staticmethod
+    def _apply(msg: Dict[str, Any], content: List[Any], rewrite: MessageRewrite) -> Dict[str, Any]:
+        """New message with the rewrite applied; untouched blocks are shared with msg."""
+        new_content = list(content)
+        # Replacement blocks are small; copies keep cached ones out of agent.messages
+        for block_idx, replacement in rewrite.blocks.items():
+            new_content[block_idx] = _copy_block(replacement)
+        for block_idx, replacements in rewrite.result_blocks.items():
+            block = content[block_idx]
+            tool_result = block['toolResult']
+            result_content = list(tool_result['content'])
+            for result_idx, replacement in replacements.items():
+                result_content[result_idx] = _copy_block(replacement)
+            new_content[block_idx] = {**block, 'toolResult': {**tool_result, 'content': result_content}}
+        return {**msg, 'content': new_content}
+
+
+@process_singleton
+def get_truncation_cache() -> TruncationCache:
+    """Get the process-wide TruncationCache singleton."""
+    return TruncationCache.from_env()
@@ -5,33 +5,40 @@ Wraps FileSessionManager to share messages across all agents while
 keeping agent states separate - matching the behavior of AgentCore Memory
 in cloud mode.
 
-Storage structure (unchanged):
+Storage structure:
   session_<id>/
+  ├── blobs/           (sidecar bytes of images/documents, by SHA-256)
   └── agents/
       ├── agent_default/   (text messages + state)
       └── agent_voice/     (voice messages + state)
 
+Messages are stored as append-only JSONL segments (see message_segments.py);
+legacy message_<N>.json files are still read and migrated on the next write.
+A per-session manifest (see message_manifest.py) indexes every message by
+created_at, so counts and ranges only read the records they return.
+
 Behavior changes:
   - list_messages: Returns ALL messages from ALL agents (sorted by timestamp)
-  - create_message: Saves to the calling agent's folder (unchanged)
+  - count_messages: Number of messages of ALL agents (from the manifest)
+  - list_recent_messages: Newest messages of ALL agents (or of one), reading only those
+  - next_message_id: Id the next message of an agent gets (per-agent, like create_message)
+  - create_message: Saves to the calling agent's folder, uploaded files as
+    attachment stubs with their bytes in blobs/ (see attachments.py)
   - Agent state: Stays separate per agent_id (unchanged)
 """
 
-import json
 import logging
-import os
-from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Collection, List, Optional
 
 from strands.session.file_session_manager import FileSessionManager
+from strands.types.exceptions import SessionException
 from strands.types.session import SessionMessage
 
-logger = logging.getLogger(__name__)
+from agent.session.attachments import AttachmentScope, get_attachment_store
+from agent.session.message_manifest import SessionManifest, get_session_manifest
+from agent.session.message_segments import MessageSegmentStore
 
-# File prefixes (matching FileSessionManager)
-SESSION_PREFIX = "session_"
-AGENT_PREFIX = "agent_"
-MESSAGE_PREFIX = "message_"
+logger = logging.getLogger(__name__)
 
 
 class UnifiedFileSessionManager(FileSessionManager):
@@ -42,6 +49,46 @@ class UnifiedFileSessionManager(FileSessionManager):
     enabling voice-text conversation continuity in local development mode.
     """
 
+    def _manifest(self, session_id: str) -> SessionManifest:
+        """Message manifest of a session."""
+        return get_session_manifest(self._get_session_path(session_id))
+
+    def _message_store(self, session_id: str, agent_id: str) -> MessageSegmentStore:
+        """Segment store of an agent's messages directory."""
+        self._get_agent_path(session_id, agent_id)  # Validates agent_id
+        return self._manifest(session_id).store(agent_id)
+
+    def count_messages(self, session_id: str) -> int:
+        """Number of messages of all agents in the session, without reading them."""
+        return self._manifest(session_id).count()
+
+    def next_message_id(self, session_id: str, agent_id: str) -> int:
+        """Id the next message of the agent gets (message ids are per agent)."""
+        return self._message_store(session_id, agent_id).next_message_id()
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Append a message to the agent's segment log (uploaded files as attachment stubs)."""
+        store = self._message_store(session_id, agent_id)
+        session_message.message = get_attachment_store().detach(
+            session_message.message, AttachmentScope(session_id, blobs_dir=store.blobs_dir)
+        )
+        store.append([session_message])
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> Optional[SessionMessage]:
+        """Read one message of the agent (segments or legacy file)."""
+        return self._message_store(session_id, agent_id).read_message(message_id)
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Update a message by appending a newer record of it."""
+        store = self._message_store(session_id, agent_id)
+        previous_message = store.read_message(session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+
+        # Preserve the original created_at timestamp
+        session_message.created_at = previous_message.created_at
+        store.append([session_message])
+
     def list_messages(
         self,
         session_id: str,
@@ -55,7 +102,8 @@ class UnifiedFileSessionManager(FileSessionManager):
 
         Unlike the base FileSessionManager which only reads from the specific
         agent's folder, this returns messages from all agents to enable
-        cross-agent conversation continuity.
+        cross-agent conversation continuity. The range is taken from the
+        session manifest, so only the returned messages are read.
 
         Args:
             session_id: Session identifier
@@ -66,57 +114,40 @@ class UnifiedFileSessionManager(FileSessionManager):
         Returns:
             List of SessionMessage from all agents, sorted by created_at
         """
-        session_path = self._get_session_path(session_id)
-        agents_path = os.path.join(session_path, "agents")
-
-        if not os.path.exists(agents_path):
-            logger.debug(f"[UnifiedFSM] No agents directory found: {agents_path}")
-            return []
-
-        all_messages: List[tuple[str, SessionMessage]] = []  # (timestamp, message)
-
-        # Iterate through all agent directories
-        for agent_dir_name in os.listdir(agents_path):
-            if not agent_dir_name.startswith(AGENT_PREFIX):
-                continue
-
-            current_agent_id = agent_dir_name[len(AGENT_PREFIX):]
-            messages_dir = os.path.join(agents_path, agent_dir_name, "messages")
-
-            if not os.path.exists(messages_dir):
-                continue
-
-            # Load messages from this agent
-            for filename in os.listdir(messages_dir):
-                if not filename.startswith(MESSAGE_PREFIX) or not filename.endswith(".json"):
-                    continue
-
-                file_path = os.path.join(messages_dir, filename)
-                try:
-                    message_data = self._read_file(file_path)
-                    session_message = SessionMessage.from_dict(message_data)
-
-                    # Use created_at for sorting
-                    timestamp = message_data.get("created_at", "")
-                    all_messages.append((timestamp, session_message))
-
-                except Exception as e:
-                    logger.warning(f"[UnifiedFSM] Failed to read {file_path}: {e}")
-                    continue
-
-        # Sort by timestamp
-        all_messages.sort(key=lambda x: x[0])
-
-        # Extract just the messages
-        sorted_messages = [msg for _, msg in all_messages]
-
-        # Apply pagination
-        if limit is not None:
-            sorted_messages = sorted_messages[offset:offset + limit]
-        else:
-            sorted_messages = sorted_messages[offset:]
+        manifest = self._manifest(session_id)
+        sorted_messages = manifest.read(manifest.entries(offset, limit))
 
         logger.debug(f"[UnifiedFSM] Loaded {len(sorted_messages)} messages from all agents "
                     f"(requested by agent '{agent_id}')")
 
         return sorted_messages
+
+    def list_recent_messages(
+        self,
+        session_id: str,
+        n: int,
+        roles: Optional[Collection[str]] = None,
+        agent_id: Optional[str] = None,
+    ) -> List[SessionMessage]:
+        """
+        The newest n messages from ALL agents (or one agent), oldest first.
+
+        Records are read backwards from the end of the manifest, a window at
+        a time, until n messages (of the given roles) are found.
+
+        Args:
+            session_id: Session identifier
+            n: Number of messages
+            roles: Only count and return messages with these roles (default: all)
+            agent_id: Only messages of this agent (default: all agents)
+        """
+        manifest = self._manifest(session_id)
+        recent: List[SessionMessage] = []
+        end = manifest.count()
+        while end > 0 and len(recent) < n:
+            start = max(0, end - (n - len(recent)))
+            entries = manifest.entries(start, end - start)
+            window = manifest.read([e for e in entries if agent_id is None or e.agent_id == agent_id])
+            recent = [sm for sm in window if roles is None or sm.message.get("role") in roles] + recent
+            end = start
+        return recent[-n:] if n > 0 else []
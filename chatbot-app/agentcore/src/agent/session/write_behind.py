@@ -0,0 +1,204 @@
+"""
+Write-Behind Queue - Ordered, batched AgentCore Memory writes off the agent loop
+
+CompactingSessionManager persisted every MessageAddedEvent inline: one
+create_event for the message and one for the agent state sync, both blocking
+the agent loop between a tool result and the next model call. A tool-heavy
+turn paid dozens of sequential Memory round-trips.
+
+Writes are now queued per session and written by a shared worker pool:
+- Items are written strictly in the order they were queued (one drain at a
+  time per queue)
+- A drain writes everything that is pending as one create_event, split only
+  by the item/byte limits of a single event
+- While a create_event is in flight new items accumulate and go out together
+  in the next one (group commit)
+- flush() blocks until everything queued so far is written; it runs at turn
+  end, on stop and on shutdown
+- A failed write keeps its items at the head of the queue; the next drain or
+  flush retries them, and flush() raises if they still can't be written
+
+Usage:
+    from agent.session.write_behind import MemoryWriteQueue, PendingWrite
+
+    queue = MemoryWriteQueue(write_batch=self._write_event)
+    queue.put(PendingWrite(payload={"blob": "..."}, size=123))
+    queue.flush()     # turn end / stop / shutdown
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from strands.types.session import SessionMessage
+
+from agent.config.constants import (
+    DEFAULT_MEMORY_WRITE_MAX_BATCH_BYTES,
+    DEFAULT_MEMORY_WRITE_MAX_BATCH_ITEMS,
+    DEFAULT_MEMORY_WRITE_WORKERS,
+    EnvVars,
+)
+from agent.config.env import env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingWrite:
+    """One create_event payload item waiting to be written."""
+    payload: Dict[str, Any]
+    size: int
+    metadata: Optional[Dict[str, Any]] = None
+    # Parsed message for the history cache (None for agent state)
+    message: Optional[SessionMessage] = None
+    # Items of one batch with the same key supersede each other (agent state syncs)
+    coalesce_key: Optional[str] = None
+    # Set by the writer once the item is persisted
+    event_id: Optional[str] = None
+
+
+class MemoryWriteQueue:
+    """Ordered write-behind queue of one session."""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[PendingWrite]], Optional[str]],
+        max_batch_items: Optional[int] = None,
+        max_batch_bytes: Optional[int] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        Args:
+            write_batch: Writes items as one event, returns its event id (raises on failure)
+            max_batch_items: Payload items per event (default from env)
+            max_batch_bytes: Payload bytes per event; a single larger item is sent alone
+            executor: Worker pool for background drains (default: shared pool)
+        """
+        self._write_batch = write_batch
+        self.max_batch_items = max_batch_items or env_int(EnvVars.MEMORY_WRITE_MAX_BATCH_ITEMS, DEFAULT_MEMORY_WRITE_MAX_BATCH_ITEMS)
+        self.max_batch_bytes = max_batch_bytes or env_int(EnvVars.MEMORY_WRITE_MAX_BATCH_BYTES, DEFAULT_MEMORY_WRITE_MAX_BATCH_BYTES)
+        self._executor = executor
+
+        self._pending: Deque[PendingWrite] = deque()
+        self._cond = threading.Condition()
+        self._draining = False
+
+        # Counters for metrics and debugging
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.flush_wait_ms = 0.0
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def put(self, item: PendingWrite) -> None:
+        """Queue an item and make sure a background drain is running."""
+        with self._cond:
+            self._pending.append(item)
+            self.queued += 1
+            if self._draining:
+                return  # The running drain picks it up
+            self._draining = True
+
+        try:
+            (self._executor or get_memory_write_executor()).submit(self._drain_in_background)
+        except RuntimeError:
+            # Executor shut down (process exit): write inline
+            self._drain_in_background()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until every item queued so far is written.
+
+        Raises:
+            TimeoutError: A background drain did not finish within timeout
+            Exception: Whatever write_batch raised for items that still can't be written
+        """
+        start = time.monotonic()
+        try:
+            with self._cond:
+                while self._draining:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"Memory writes still in flight after {timeout}s")
+                    self._cond.wait(remaining)
+                if not self._pending:
+                    return
+                # Left over from a failed background drain: retry in the caller
+                self._draining = True
+            self._drain()
+        finally:
+            self.flush_wait_ms += (time.monotonic() - start) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "queued": self.queued,
+                "written": self.written,
+                "batches": self.batches,
+                "failures": self.failures,
+                "flush_wait_ms": self.flush_wait_ms,
+            }
+
+    def _drain_in_background(self) -> None:
+        try:
+            self._drain()
+        except Exception as e:
+            logger.warning(f"[WriteBehind] Write failed, {self.pending} items kept for retry: {e}")
+
+    def _drain(self) -> None:
+        """Write pending items in order until the queue is empty. Caller set _draining."""
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._draining = False
+                    self._cond.notify_all()
+                    return
+                batch = self._take_batch_locked()
+
+            try:
+                self._write_batch(batch)
+            except Exception:
+                with self._cond:
+                    self._pending.extendleft(reversed(batch))
+                    self.failures += 1
+                    self._draining = False
+                    self._cond.notify_all()
+                raise
+
+            with self._cond:
+                self.written += len(batch)
+                self.batches += 1
+
+    def _take_batch_locked(self) -> List[PendingWrite]:
+        """Oldest items that fit into one event. Caller holds the lock."""
+        batch = [self._pending.popleft()]
+        size = batch[0].size
+        while (
+            self._pending
+            and len(batch) < self.max_batch_items
+            and size + self._pending[0].size <= self.max_batch_bytes
+        ):
+            item = self._pending.popleft()
+            batch.append(item)
+            size += item.size
+        return batch
+
+
+@process_singleton
+def get_memory_write_executor() -> ThreadPoolExecutor:
+    """Get the process-wide worker pool shared by all write queues."""
+    return ThreadPoolExecutor(
+        max_workers=env_int(EnvVars.MEMORY_WRITE_WORKERS, DEFAULT_MEMORY_WRITE_WORKERS),
+        thread_name_prefix="memory-write",
+    )
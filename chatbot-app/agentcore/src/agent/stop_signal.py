@@ -5,6 +5,10 @@ Provides unified stop signal mechanism for both local and cloud deployments.
 - Local: In-memory dictionary (singleton)
 - Cloud: DynamoDB session metadata
 
+Running streams can subscribe() to be woken the moment a stop is requested,
+instead of noticing it only when the next stream event arrives (which never
+happens during a long tool call or model generation).
+
 Usage:
     from agent.stop_signal import get_stop_signal_provider
 
@@ -15,14 +19,20 @@ Usage:
         # Handle graceful shutdown
         provider.clear_stop_signal(user_id, session_id)
 
+    # Or wait for it (asyncio.Event, None if the provider can only be polled)
+    stop_event = provider.subscribe(user_id, session_id)
+    ...
+    provider.unsubscribe(user_id, session_id, stop_event)
+
     # Request stop (called by BFF or API)
     provider.request_stop(user_id, session_id)
 """
 
+import asyncio
 import os
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import threading
 
 logger = logging.getLogger(__name__)
@@ -46,6 +56,14 @@ class StopSignalProvider(ABC):
         """Clear stop signal after processing"""
         pass
 
+    def subscribe(self, user_id: str, session_id: str) -> Optional[asyncio.Event]:
+        """Event set when stop is requested for this session (None: poll is_stop_requested)"""
+        return None
+
+    def unsubscribe(self, user_id: str, session_id: str, event: Optional[asyncio.Event]) -> None:
+        """Release an event returned by subscribe()"""
+        pass
+
 
 class LocalStopSignalProvider(StopSignalProvider):
     """
@@ -61,6 +79,7 @@ class LocalStopSignalProvider(StopSignalProvider):
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._signals: Dict[str, bool] = {}
+                    cls._instance._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
                     cls._instance._signals_lock = threading.Lock()
         return cls._instance
 
@@ -79,7 +98,14 @@ class LocalStopSignalProvider(StopSignalProvider):
         key = self._get_key(user_id, session_id)
         with self._signals_lock:
             self._signals[key] = True
-        logger.debug(f"Stop signal set for {key}")
+            waiters = list(self._waiters.get(key, ()))
+        # Wake subscribed streams (may be called from another thread)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+        logger.debug(f"Stop signal set for {key} ({len(waiters)} waiting stream(s))")
 
     def clear_stop_signal(self, user_id: str, session_id: str) -> None:
         key = self._get_key(user_id, session_id)
@@ -87,6 +113,28 @@ class LocalStopSignalProvider(StopSignalProvider):
             self._signals.pop(key, None)
         logger.debug(f"Stop signal cleared for {key}")
 
+    def subscribe(self, user_id: str, session_id: str) -> Optional[asyncio.Event]:
+        """Event for the running loop, already set if a stop is pending."""
+        key = self._get_key(user_id, session_id)
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        with self._signals_lock:
+            self._waiters.setdefault(key, []).append((loop, event))
+            if self._signals.get(key, False):
+                event.set()
+        return event
+
+    def unsubscribe(self, user_id: str, session_id: str, event: Optional[asyncio.Event]) -> None:
+        if event is None:
+            return
+        key = self._get_key(user_id, session_id)
+        with self._signals_lock:
+            waiters = [w for w in self._waiters.get(key, ()) if w[1] is not event]
+            if waiters:
+                self._waiters[key] = waiters
+            else:
+                self._waiters.pop(key, None)
+
 
 # Singleton instance cache
 _provider_instance: StopSignalProvider = None
@@ -2,7 +2,7 @@
 Unified Tool Filter Module
 
 Consolidates tool filtering logic for all tool sources:
-- Local tools (TOOL_REGISTRY)
+- Local tools (lazy TOOL_REGISTRY, see agent/tool_registry.py)
 - Gateway MCP tools (gateway_* prefix)
 - A2A Agent tools (agentcore_* prefix)
 
@@ -77,7 +77,7 @@ class ToolFilterRegistry:
         Initialize the tool filter registry.
 
         Args:
-            local_registry: Dict mapping tool_id -> tool object (default: imports TOOL_REGISTRY)
+            local_registry: Mapping tool_id -> tool object (default: lazy tool registry)
             gateway_client_factory: Function to create Gateway MCP client
             a2a_tool_factory: Function to create A2A tools
         """
@@ -86,10 +86,10 @@ class ToolFilterRegistry:
         self._a2a_tool_factory = a2a_tool_factory
 
     def _get_local_registry(self) -> Dict[str, Any]:
-        """Lazy load local registry to avoid circular imports."""
+        """Lazy load local registry (tool modules themselves are imported on first lookup)."""
         if self._local_registry is None:
-            from agent.agent import TOOL_REGISTRY
-            self._local_registry = TOOL_REGISTRY
+            from agent.tool_registry import get_tool_registry
+            self._local_registry = get_tool_registry()
         return self._local_registry
 
     def _get_gateway_client_factory(self) -> Optional[Callable]:
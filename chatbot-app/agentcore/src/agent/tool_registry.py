@@ -0,0 +1,157 @@
+"""
+Lazy Tool Registry - Tool ID -> import path, resolved on first use
+
+Building TOOL_REGISTRY used to import every module listed in
+local_tools.__all__ and builtin_tools.__all__ at import time (python-pptx
+helpers, pdf2image, the Nova Act browser stack, Code Interpreter clients...),
+even when a request enables only `calculator`.
+
+LazyToolRegistry maps tool IDs to (module, attribute) pairs and imports a
+module only the first time one of its tools is looked up. It behaves like a
+read-only dict: `in`, iteration, keys() and len() never import anything;
+`registry[tool_id]` / `registry.get(tool_id)` import on demand.
+
+Each module import is timed; get_import_report() returns per-module
+milliseconds so cold-start regressions are visible.
+
+Usage:
+    from agent.tool_registry import get_tool_registry
+
+    registry = get_tool_registry()
+    if "calculator" in registry:          # no import
+        tool = registry.get("calculator")  # imports strands_tools.calculator
+    registry.get_import_report()           # {"strands_tools.calculator": 412.3}
+"""
+
+import importlib
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# (module path, attribute name)
+ToolImportPath = Tuple[str, str]
+
+# Strands built-in tools (externally managed)
+STRANDS_TOOLS: Dict[str, ToolImportPath] = {
+    "calculator": ("strands_tools.calculator", "calculator"),
+}
+
+# Packages whose __init__ declares `_TOOL_MODULES` (tool name -> relative submodule)
+TOOL_PACKAGES = ("local_tools", "builtin_tools")
+
+
+class LazyToolRegistry(Mapping):
+    """Read-only mapping of tool ID -> tool object with on-demand module imports."""
+
+    def __init__(self, import_paths: Optional[Dict[str, ToolImportPath]] = None):
+        """
+        Args:
+            import_paths: Tool ID -> (module, attribute). Defaults to Strands
+                built-in tools plus every tool declared by TOOL_PACKAGES.
+        """
+        self._import_paths: Dict[str, ToolImportPath] = (
+            dict(import_paths) if import_paths is not None else _discover_import_paths()
+        )
+        self._tools: Dict[str, Any] = {}
+        self._failed: Dict[str, str] = {}
+        self._import_ms: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, tool_id: str) -> Any:
+        tool = self._tools.get(tool_id)
+        if tool is not None:
+            return tool
+        if tool_id not in self._import_paths:
+            raise KeyError(tool_id)
+
+        with self._lock:
+            if tool_id in self._tools:
+                return self._tools[tool_id]
+
+            module_path, attr = self._import_paths[tool_id]
+            if module_path in self._failed:
+                raise KeyError(tool_id)
+
+            try:
+                module = self._import_module(module_path)
+                tool = getattr(module, attr)
+            except Exception as e:
+                # Import errors surface as "not found" so a broken optional
+                # dependency only disables its own tools
+                self._failed[module_path] = str(e)
+                logger.error(f"[ToolRegistry] Failed to load tool '{tool_id}' from {module_path}: {e}")
+                raise KeyError(tool_id) from e
+
+            self._tools[tool_id] = tool
+            return tool
+
+    def __contains__(self, tool_id: object) -> bool:
+        return tool_id in self._import_paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._import_paths)
+
+    def __len__(self) -> int:
+        return len(self._import_paths)
+
+    def register(self, tool_id: str, tool: Any) -> None:
+        """Register an already-imported tool object under tool_id."""
+        with self._lock:
+            self._import_paths[tool_id] = (getattr(tool, "__module__", "") or "", tool_id)
+            self._tools[tool_id] = tool
+
+    def get_import_path(self, tool_id: str) -> Optional[ToolImportPath]:
+        """(module, attribute) a tool is loaded from, without importing it."""
+        return self._import_paths.get(tool_id)
+
+    def is_loaded(self, tool_id: str) -> bool:
+        """Whether the tool's module has already been imported."""
+        return tool_id in self._tools
+
+    def preload(self) -> None:
+        """Import every tool module (e.g. for registry sync or warm-up)."""
+        for tool_id in list(self._import_paths):
+            self.get(tool_id)
+
+    def get_import_report(self) -> Dict[str, float]:
+        """Per-module import time in milliseconds, slowest first."""
+        with self._lock:
+            return dict(sorted(self._import_ms.items(), key=lambda item: item[1], reverse=True))
+
+    def get_failed_imports(self) -> Dict[str, str]:
+        """Modules that failed to import -> error message."""
+        with self._lock:
+            return dict(self._failed)
+
+    def _import_module(self, module_path: str) -> Any:
+        """Import module_path, recording its import time on first load."""
+        already_loaded = module_path in self._import_ms
+        start = time.perf_counter()
+        module = importlib.import_module(module_path)
+        if not already_loaded:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._import_ms[module_path] = elapsed_ms
+            logger.info(f"[ToolRegistry] Imported {module_path} in {elapsed_ms:.1f}ms")
+        return module
+
+
+def _discover_import_paths() -> Dict[str, ToolImportPath]:
+    """Collect tool import paths from STRANDS_TOOLS and TOOL_PACKAGES (package __init__ only)."""
+    import_paths = dict(STRANDS_TOOLS)
+    for package_name in TOOL_PACKAGES:
+        package = importlib.import_module(package_name)
+        for tool_name, relative_module in package._TOOL_MODULES.items():
+            import_paths[tool_name] = (f"{package_name}{relative_module}", tool_name)
+    return import_paths
+
+
+@process_singleton
+def get_tool_registry() -> LazyToolRegistry:
+    """Get the process-wide LazyToolRegistry singleton."""
+    return LazyToolRegistry()
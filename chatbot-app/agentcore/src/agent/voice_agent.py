@@ -222,29 +222,23 @@ class VoiceAgent(BaseAgent):
         MAX_MESSAGES = int(os.environ.get('NOVA_SONIC_MAX_MESSAGES', '20'))
 
         try:
-            if hasattr(self.session_manager, 'list_messages'):
-                session_messages = self.session_manager.list_messages(
+            if hasattr(self.session_manager, 'list_recent_messages'):
+                # Only the most recent messages are read, not the whole history
+                session_messages = self.session_manager.list_recent_messages(
                     session_id=self.session_id,
-                    agent_id=self.VOICE_AGENT_ID,
+                    n=MAX_MESSAGES,
                 )
 
                 if session_messages:
                     messages = [msg.to_message() for msg in session_messages]
-                    original_count = len(messages)
-
-                    # Trim to most recent messages only
-                    if original_count > MAX_MESSAGES:
-                        messages = messages[-MAX_MESSAGES:]
-                        logger.info(f"[VoiceAgent] Trimmed messages from {original_count} to {len(messages)} "
-                                   f"(Nova Sonic limit protection)")
-
-                    logger.info(f"[VoiceAgent] Loaded {len(messages)} messages from unified storage")
+                    logger.info(f"[VoiceAgent] Loaded {len(messages)} recent messages from unified storage "
+                               f"(limit {MAX_MESSAGES}, Nova Sonic limit protection)")
                     return messages
                 else:
                     logger.debug("[VoiceAgent] No previous messages found")
                     return []
             else:
-                logger.debug("[VoiceAgent] Session manager does not support list_messages")
+                logger.debug("[VoiceAgent] Session manager does not support list_recent_messages")
                 return []
 
         except Exception as e:
@@ -129,7 +129,7 @@ class BaseAgent(ABC):
         self,
         message: str,
         **kwargs
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Stream agent response
 
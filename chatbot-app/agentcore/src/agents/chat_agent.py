@@ -8,14 +8,18 @@ ChatAgent - Text-based conversational agent
 import logging
 import os
 import base64
+import hashlib
 from typing import AsyncGenerator, Dict, Any, List, Optional
 from pathlib import Path
 from strands import Agent
-from strands.models import BedrockModel, CacheConfig
+from strands.models import CacheConfig
 from strands.tools.executors import SequentialToolExecutor
 from agents.base import BaseAgent
 from streaming.event_processor import StreamEventProcessor
-from agent.hooks import ResearchApprovalHook
+from streaming.sse import encode_event
+from agent.hooks import AttachmentHistoryHook, ImageHistoryHook, ResearchApprovalHook
+from agent.model_registry import get_model_registry
+from agent.session.message_segments import session_blobs_dir
 from agent.config.prompt_builder import (
     build_text_system_prompt,
     system_prompt_to_string,
@@ -28,48 +32,55 @@ try:
 except ImportError:
     AGENTCORE_MEMORY_AVAILABLE = False
 
-# Import Strands built-in tools
-from strands_tools.calculator import calculator
-
-# Import local tools module (general-purpose, agent-core integrated)
-import local_tools
-
-# Import built-in tools module (AWS Bedrock-powered tools)
-import builtin_tools
+# Lazy tool registry (Strands built-in, local and builtin tools imported on first use)
+from agent.tool_registry import get_tool_registry
+from agent.request_context import set_request_context, get_stream_processor
 
 logger = logging.getLogger(__name__)
 
-# Global stream processor instance
-_global_stream_processor = None
-
 # Global cache for Memory Strategy IDs (loaded once per container lifecycle)
 _cached_strategy_ids: Optional[Dict[str, str]] = None
 
 
 def get_global_stream_processor():
-    """Get the global stream processor instance"""
-    return _global_stream_processor
+    """Get the stream processor of the current stream (per-request, see agent.request_context)"""
+    return get_stream_processor()
 
 
-# Tool ID to tool object mapping
-# Start with Strands built-in tools (externally managed)
-TOOL_REGISTRY = {
-    "calculator": calculator,
-}
+# Tool ID to tool object mapping (read-only, lazy)
+# Tool IDs come from local_tools/builtin_tools _TOOL_MODULES; a tool module is
+# only imported the first time a request enables one of its tools
+TOOL_REGISTRY = get_tool_registry()
 
-# Dynamically load all local tools from local_tools.__all__
-# This ensures we only need to maintain the list in one place (__init__.py)
-for tool_name in local_tools.__all__:
-    tool_obj = getattr(local_tools, tool_name)
-    TOOL_REGISTRY[tool_name] = tool_obj
-    logger.debug(f"Registered local tool: {tool_name}")
 
-# Dynamically load all builtin tools from builtin_tools.__all__
-# This ensures we only need to maintain the list in one place (__init__.py)
-for tool_name in builtin_tools.__all__:
-    tool_obj = getattr(builtin_tools, tool_name)
-    TOOL_REGISTRY[tool_name] = tool_obj
-    logger.debug(f"Registered builtin tool: {tool_name}")
+def get_memory_strategy_ids(memory_id: str, aws_region: str) -> Dict[str, str]:
+    """Get Memory Strategy IDs from AgentCore Memory with global caching."""
+    global _cached_strategy_ids
+
+    if _cached_strategy_ids is not None:
+        return _cached_strategy_ids
+
+    import boto3
+
+    try:
+        gmcp = boto3.client('bedrock-agentcore-control', region_name=aws_region)
+        response = gmcp.get_memory(memoryId=memory_id)
+        memory = response['memory']
+        strategies = memory.get('strategies', memory.get('memoryStrategies', []))
+
+        strategy_map = {
+            s.get('type', s.get('memoryStrategyType', '')): s.get('strategyId', s.get('memoryStrategyId', ''))
+            for s in strategies
+            if s.get('type', s.get('memoryStrategyType', '')) and s.get('strategyId', s.get('memoryStrategyId', ''))
+        }
+
+        _cached_strategy_ids = strategy_map
+        logger.info(f"[StrategyCache] Loaded {len(strategy_map)} strategy IDs: {list(strategy_map.keys())}")
+
+        return strategy_map
+    except Exception as e:
+        logger.warning(f"Failed to get memory strategy IDs: {e}")
+        return {}
 
 
 class ChatAgent(BaseAgent):
@@ -105,9 +116,7 @@ class ChatAgent(BaseAgent):
             api_keys: User-specific API keys for external services
         """
         # Initialize stream processor first (before BaseAgent.__init__)
-        global _global_stream_processor
         self.stream_processor = StreamEventProcessor()
-        _global_stream_processor = self.stream_processor
 
         # Initialize Strands agent placeholder
         self.agent = None
@@ -137,32 +146,7 @@ class ChatAgent(BaseAgent):
 
     def _get_memory_strategy_ids(self, memory_id: str, aws_region: str) -> Dict[str, str]:
         """Get Memory Strategy IDs from AgentCore Memory with global caching."""
-        global _cached_strategy_ids
-
-        if _cached_strategy_ids is not None:
-            return _cached_strategy_ids
-
-        import boto3
-
-        try:
-            gmcp = boto3.client('bedrock-agentcore-control', region_name=aws_region)
-            response = gmcp.get_memory(memoryId=memory_id)
-            memory = response['memory']
-            strategies = memory.get('strategies', memory.get('memoryStrategies', []))
-
-            strategy_map = {
-                s.get('type', s.get('memoryStrategyType', '')): s.get('strategyId', s.get('memoryStrategyId', ''))
-                for s in strategies
-                if s.get('type', s.get('memoryStrategyType', '')) and s.get('strategyId', s.get('memoryStrategyId', ''))
-            }
-
-            _cached_strategy_ids = strategy_map
-            logger.info(f"[StrategyCache] Loaded {len(strategy_map)} strategy IDs: {list(strategy_map.keys())}")
-
-            return strategy_map
-        except Exception as e:
-            logger.warning(f"Failed to get memory strategy IDs: {e}")
-            return {}
+        return get_memory_strategy_ids(memory_id, aws_region)
 
     def get_model_config(self) -> Dict[str, Any]:
         """Return model configuration"""
@@ -177,34 +161,25 @@ class ChatAgent(BaseAgent):
     def create_agent(self):
         """Create Strands agent with filtered tools and session management"""
         try:
-            from botocore.config import Config
-
             config = self.get_model_config()
 
-            # Configure retry for transient Bedrock errors (serviceUnavailableException)
-            retry_config = Config(
-                retries={
-                    'max_attempts': 10,
-                    'mode': 'adaptive'  # Adaptive retry with exponential backoff
-                },
-                connect_timeout=30,
-                read_timeout=300  # Increased to 5 minutes for complex Code Interpreter operations
-            )
-
-            # Create model configuration
-            model_config = {
-                "model_id": config["model_id"],
-                "temperature": config.get("temperature", 0.7),
-                "boto_client_config": retry_config
-            }
-
             # Add CacheConfig if caching is enabled (strands-agents 1.24.0+)
+            cache_config = None
             if self.caching_enabled:
-                model_config["cache_config"] = CacheConfig(strategy="auto")
+                cache_config = CacheConfig(strategy="auto")
                 logger.info("Prompt caching enabled via CacheConfig(strategy='auto')")
 
-            logger.debug("Bedrock retry config: max_attempts=10, mode=adaptive")
-            model = BedrockModel(**model_config)
+            # Shared model/client: retry for transient Bedrock errors (serviceUnavailableException),
+            # 5 minute read timeout for complex Code Interpreter operations
+            model = get_model_registry().get_model(
+                model_id=config["model_id"],
+                temperature=config.get("temperature", 0.7),
+                max_attempts=10,
+                retry_mode="adaptive",
+                connect_timeout=30,
+                read_timeout=300,
+                cache_config=cache_config,
+            )
 
             # Create hooks
             hooks = []
@@ -214,11 +189,23 @@ class ChatAgent(BaseAgent):
             hooks.append(research_approval_hook)
             logger.debug("Research approval hook enabled (BeforeToolCallEvent)")
 
+            # Keep uploaded files of earlier turns out of model requests (ATTACHMENT_POLICY)
+            storage_dir = getattr(self.session_manager, "storage_dir", None)
+            attachment_hook = AttachmentHistoryHook(
+                session_id=self.session_id,
+                user_id=self.user_id,
+                blobs_dir=session_blobs_dir(storage_dir, self.session_id) if isinstance(storage_dir, str) else None,
+            )
+            hooks.append(attachment_hook)
+
+            # Keep only the newest tool result images (browser screenshots) in model requests
+            hooks.append(ImageHistoryHook())
+
             # Create agent with session manager, hooks, and system prompt as list of content blocks
             agent_kwargs = {
                 "model": model,
                 "system_prompt": self.system_prompt,  # List[SystemContentBlock]
-                "tools": self.tools,
+                "tools": self.tools + attachment_hook.tools(),
                 "session_manager": self.session_manager,
                 "hooks": hooks if hooks else None,
                 "agent_id": "default"  # Fixed agent_id for state persistence across requests
@@ -261,6 +248,10 @@ class ChatAgent(BaseAgent):
 
             self.agent = Agent(**agent_kwargs)
 
+            # Remember which compaction checkpoint the loaded history reflects (see is_reusable)
+            compaction_state = getattr(self.session_manager, 'compaction_state', None)
+            self._loaded_checkpoint = compaction_state.checkpoint if compaction_state else 0
+
             # Calculate total characters for logging
             total_chars = sum(len(block.get("text", "")) for block in self.system_prompt)
             logger.debug(f"Agent created with {len(self.tools)} tools")
@@ -279,7 +270,7 @@ class ChatAgent(BaseAgent):
             logger.error(f"Error creating agent: {e}")
             raise
 
-    async def stream_async(self, message: str, session_id: str = None, files: Optional[List] = None, selected_artifact_id: Optional[str] = None, api_keys: Optional[Dict[str, str]] = None) -> AsyncGenerator[str, None]:
+    async def stream_async(self, message: str, session_id: str = None, files: Optional[List] = None, selected_artifact_id: Optional[str] = None, api_keys: Optional[Dict[str, str]] = None) -> AsyncGenerator[bytes, None]:
         """
         Stream responses using StreamEventProcessor
 
@@ -293,9 +284,9 @@ class ChatAgent(BaseAgent):
         if not self.agent:
             self.create_agent()
 
-        # Set SESSION_ID for browser session isolation (each conversation has isolated browser)
-        os.environ['SESSION_ID'] = self.session_id
-        os.environ['USER_ID'] = self.user_id or self.session_id
+        # Bind session to this stream's context (browser session isolation, tool lookups).
+        # Context vars are per task, so concurrent streams in one container stay isolated.
+        set_request_context(self.session_id, self.user_id, self.stream_processor)
 
         try:
             # Reset context token tracking for new turn
@@ -363,12 +354,39 @@ class ChatAgent(BaseAgent):
             logger.error(f"Traceback: {traceback.format_exc()}")
 
             # Send error event
-            import json
-            error_event = {
+            yield encode_event({
                 "type": "error",
                 "message": str(e)
-            }
-            yield f"data: {json.dumps(error_event)}\n\n"
+            })
+
+    def is_reusable(self) -> bool:
+        """
+        Whether this warm agent can serve the next turn of the session (used by AgentPool).
+
+        Not reusable when:
+        - The compaction checkpoint moved, or is being prepared in the background:
+          history must be reloaded from the new checkpoint
+        - The turn was cut short (stop/disconnect/error): the last message is not an
+          assistant message, and the persisted history may differ from agent.messages
+
+        Stage 1 truncation and the pre-turn estimate are re-applied before every
+        warm turn by CompactingSessionManager (BeforeInvocationEvent).
+        """
+        if not self.agent:
+            return False
+
+        compaction_state = getattr(self.session_manager, 'compaction_state', None)
+        if compaction_state and compaction_state.checkpoint != getattr(self, '_loaded_checkpoint', 0):
+            return False
+        compaction_pending = getattr(self.session_manager, 'compaction_pending', None)
+        if callable(compaction_pending) and compaction_pending():
+            return False
+
+        messages = self.agent.messages
+        if messages and messages[-1].get('role') != 'assistant':
+            return False
+
+        return True
 
     def _update_compaction_state(self):
         """Update compaction state after turn completion (if using CompactingSessionManager)."""
@@ -381,7 +399,11 @@ class ChatAgent(BaseAgent):
             logger.debug(f"_update_compaction_state: context_tokens={context_tokens:,} (from last LLM call)")
 
             if context_tokens > 0:
-                self.session_manager.update_after_turn(context_tokens, self.agent.agent_id)
+                self.session_manager.update_after_turn(
+                    context_tokens,
+                    self.agent.agent_id,
+                    llm_calls=self.stream_processor.llm_call_tokens,
+                )
                 logger.debug(f"Compaction updated: context={context_tokens:,} tokens")
             else:
                 logger.debug(f"Skipping compaction: context_tokens=0 (no token data from stream processor)")
@@ -425,16 +447,14 @@ class ChatAgent(BaseAgent):
 
         # Try Parameter Store
         try:
-            import boto3
+            from agent.config.parameters import get_ssm_parameter
             project_name = os.getenv('PROJECT_NAME', 'strands-agent-chatbot')
             environment = os.getenv('ENVIRONMENT', 'dev')
             region = os.getenv('AWS_REGION', 'us-west-2')
             param_name = f"/{project_name}/{environment}/agentcore/code-interpreter-id"
 
             logger.debug(f"Checking Parameter Store for Code Interpreter ID: {param_name}")
-            ssm = boto3.client('ssm', region_name=region)
-            response = ssm.get_parameter(Name=param_name)
-            code_interpreter_id = response['Parameter']['Value']
+            code_interpreter_id = get_ssm_parameter(param_name, region)  # Cached per process
             logger.debug(f"Found CODE_INTERPRETER_ID in Parameter Store: {code_interpreter_id}")
             return code_interpreter_id
         except Exception as e:
@@ -564,7 +584,7 @@ class ChatAgent(BaseAgent):
         Returns:
             tuple: (prompt, uploaded_files)
                 - prompt: str or list[ContentBlock] for Strands Agent
-                - uploaded_files: list of dicts with filename, bytes, content_type
+                - uploaded_files: list of dicts with filename, bytes, content_type, sha256
         """
         # If no files, return simple text message
         if not files or len(files) == 0:
@@ -604,8 +624,9 @@ class ChatAgent(BaseAgent):
             # Store for tool invocation_state with sanitized filename
             uploaded_files.append({
                 'filename': sanitized_full_name,
-                'bytes': file_bytes,
-                'content_type': file.content_type
+                'bytes': file_bytes,  # Same object as the ContentBlock's bytes, not a copy
+                'content_type': file.content_type,
+                'sha256': hashlib.sha256(file_bytes).hexdigest()  # Attachment id in persisted history
             })
 
             # Track sanitized filename for agent's reference
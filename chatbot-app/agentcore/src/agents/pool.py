@@ -0,0 +1,324 @@
+"""
+Agent Pool - Warm per-session ChatAgent reuse
+
+AgentCore Runtime routes every turn of a session to the same container, so the
+ChatAgent built for turn N can serve turn N+1 as-is: tools are already filtered,
+the system prompt is built, the BedrockModel client is connected and the
+message history is already loaded into the Strands Agent.
+
+Entries are keyed by everything that shapes a ChatAgent at construction time
+(session, user, model, enabled tools, caching/compaction flags, ...), so a
+change in any of them simply misses the pool and builds a fresh agent.
+
+Eviction:
+- Idle TTL: entries unused for longer than idle_ttl_seconds are dropped
+- LRU: the least recently used idle entry is dropped beyond max_size
+- Invalidation: other agent types writing to the session (swarm, compose,
+  voice) or a compaction checkpoint change drop the warm agent
+
+Evicted agents flush their session buffers and stop their Gateway MCP client.
+
+Usage:
+    from agents.pool import get_agent_pool, build_pool_key
+
+    pool = get_agent_pool()
+    key = build_pool_key(session_id, user_id, model_id, enabled_tools, ...)
+    agent = pool.acquire(key, lambda: create_agent(...))
+    stream = pool.track_stream(key, agent, agent.stream_async(message))
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from agent.config.constants import (
+    DEFAULT_AGENT_POOL_IDLE_TTL_SECONDS,
+    DEFAULT_AGENT_POOL_MAX_SIZE,
+    EnvVars,
+)
+from agent.config.env import env_bool, env_float, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[Any, ...]
+
+
+def _fingerprint(value: Any) -> str:
+    """Short stable hash for values that should not be stored verbatim in keys."""
+    if not value:
+        return ""
+    raw = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def build_pool_key(
+    session_id: str,
+    user_id: Optional[str],
+    model_id: Optional[str],
+    enabled_tools: Optional[List[str]],
+    temperature: Optional[float] = None,
+    system_prompt: Optional[str] = None,
+    caching_enabled: Optional[bool] = None,
+    compaction_enabled: Optional[bool] = None,
+    api_keys: Optional[Dict[str, str]] = None,
+) -> PoolKey:
+    """
+    Build the pool key for a normal (ChatAgent) invocation.
+
+    Enabled tools are order-insensitive; the extra system prompt and API keys
+    are hashed so the key never carries their content.
+    """
+    tools = sorted(set(enabled_tools)) if enabled_tools else []
+    return (
+        session_id,
+        user_id or session_id,
+        model_id or "",
+        _fingerprint(tools),
+        temperature,
+        _fingerprint(system_prompt),
+        caching_enabled,
+        compaction_enabled,
+        _fingerprint(api_keys),
+    )
+
+
+@dataclass
+class PoolEntry:
+    """A warm agent and its bookkeeping."""
+    agent: Any
+    created_at: float
+    last_used: float
+    in_use: bool = False
+    hits: int = 0
+    stale: bool = False  # Invalidated while leased: dropped on release
+
+
+class AgentPool:
+    """
+    Thread-safe LRU pool of warm ChatAgents with idle-TTL eviction.
+
+    An entry is leased to one stream at a time. A concurrent request for a key
+    that is already streaming gets a fresh, unpooled agent instead of waiting.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_AGENT_POOL_MAX_SIZE,
+        idle_ttl_seconds: float = DEFAULT_AGENT_POOL_IDLE_TTL_SECONDS,
+        enabled: bool = True,
+    ):
+        self.max_size = max_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.enabled = enabled and max_size > 0
+        self._entries: "OrderedDict[PoolKey, PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "AgentPool":
+        """Create pool from environment variables."""
+        return cls(
+            max_size=env_int(EnvVars.AGENT_POOL_MAX_SIZE, DEFAULT_AGENT_POOL_MAX_SIZE),
+            idle_ttl_seconds=env_float(EnvVars.AGENT_POOL_IDLE_TTL_SECONDS, DEFAULT_AGENT_POOL_IDLE_TTL_SECONDS),
+            enabled=env_bool(EnvVars.AGENT_POOL_ENABLED, True),
+        )
+
+    def acquire(self, key: PoolKey, factory: Callable[[], Any]) -> Any:
+        """
+        Lease a warm agent for key, or build one with factory on a miss.
+
+        The returned agent must be handed back via release() (or track_stream(),
+        which releases when the stream ends).
+        """
+        if not self.enabled:
+            return factory()
+
+        with self._lock:
+            expired = self._pop_expired_locked(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is not None and not entry.in_use:
+                entry.in_use = True
+                entry.hits += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                agent = entry.agent
+            else:
+                agent = None
+                if entry is not None:
+                    self.bypasses += 1
+                else:
+                    self.misses += 1
+        self._close_all(expired)
+
+        if agent is not None:
+            logger.debug(f"[AgentPool] Hit: session={key[0]} (hits={entry.hits})")
+            return agent
+
+        # Build outside the lock - agent construction is slow
+        agent = factory()
+        if entry is not None or not self._is_poolable(agent):
+            return agent
+
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                # Another request pooled the same key meanwhile - keep theirs
+                return agent
+            self._entries[key] = PoolEntry(agent=agent, created_at=now, last_used=now, in_use=True)
+            overflow = self._pop_overflow_locked()
+        self._close_all(overflow)
+
+        logger.debug(f"[AgentPool] Miss: session={key[0]}, pooled={len(self._entries)}")
+        return agent
+
+    def release(self, key: PoolKey, agent: Any) -> None:
+        """Return a leased agent; drops it if it cannot serve another turn."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.agent is not agent:
+                return
+            entry.in_use = False
+            entry.last_used = time.monotonic()
+
+            is_reusable = getattr(agent, "is_reusable", None)
+            drop = entry.stale or (callable(is_reusable) and not is_reusable())
+            if drop:
+                del self._entries[key]
+                self.evictions += 1
+
+        if drop:
+            logger.debug(f"[AgentPool] Dropping non-reusable agent: session={key[0]}")
+            self._close_agent(agent)
+
+    async def track_stream(
+        self,
+        key: PoolKey,
+        agent: Any,
+        stream: AsyncGenerator,
+    ) -> AsyncGenerator:
+        """Pass stream through and release the agent once it finishes or is closed."""
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            try:
+                await stream.aclose()
+            except Exception as e:
+                logger.debug(f"[AgentPool] Error closing stream: {e}")
+            self.release(key, agent)
+
+    def invalidate_session(self, session_id: str) -> int:
+        """
+        Drop the warm agents of a session; leased ones are dropped on release.
+
+        Called when another agent type writes to the session history, which the
+        warm agent's in-memory messages would not reflect.
+        """
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if k[0] == session_id]
+            for k in keys:
+                self._entries[k].stale = True
+            dropped = [self._entries.pop(k) for k in keys if not self._entries[k].in_use]
+            self.evictions += len(dropped)
+        self._close_all(dropped)
+        if dropped:
+            logger.debug(f"[AgentPool] Invalidated {len(dropped)} agent(s) for session={session_id}")
+        return len(dropped)
+
+    def clear(self) -> None:
+        """Drop all entries (container shutdown)."""
+        with self._lock:
+            dropped = list(self._entries.values())
+            self._entries.clear()
+            self.evictions += len(dropped)
+        self._close_all(dropped)
+        logger.info(f"[AgentPool] Cleared {len(dropped)} pooled agent(s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters for health/metrics endpoints."""
+        with self._lock:
+            in_use = sum(1 for e in self._entries.values() if e.in_use)
+            size = len(self._entries)
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "in_use": in_use,
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop_expired_locked(self, now: float) -> List[PoolEntry]:
+        """Remove idle entries past their TTL. Caller holds the lock."""
+        if self.idle_ttl_seconds <= 0:
+            return []
+        expired_keys = [
+            k for k, e in self._entries.items()
+            if not e.in_use and now - e.last_used > self.idle_ttl_seconds
+        ]
+        expired = [self._entries.pop(k) for k in expired_keys]
+        self.evictions += len(expired)
+        return expired
+
+    def _pop_overflow_locked(self) -> List[PoolEntry]:
+        """Remove least recently used idle entries beyond max_size. Caller holds the lock."""
+        overflow = []
+        if len(self._entries) <= self.max_size:
+            return overflow
+        for k in list(self._entries.keys()):
+            if len(self._entries) <= self.max_size:
+                break
+            if not self._entries[k].in_use:
+                overflow.append(self._entries.pop(k))
+        self.evictions += len(overflow)
+        return overflow
+
+    @staticmethod
+    def _is_poolable(agent: Any) -> bool:
+        """Only ChatAgents are pooled (other agent types are cheap or stateful per run)."""
+        from agents.chat_agent import ChatAgent
+        return isinstance(agent, ChatAgent)
+
+    def _close_all(self, entries: List[PoolEntry]) -> None:
+        for entry in entries:
+            self._close_agent(entry.agent)
+
+    @staticmethod
+    def _close_agent(agent: Any) -> None:
+        """Flush buffered session writes and stop the Gateway MCP client."""
+        session_manager = getattr(agent, "session_manager", None)
+        if session_manager is not None and hasattr(session_manager, "flush"):
+            try:
+                session_manager.flush()
+            except Exception as e:
+                logger.warning(f"[AgentPool] Failed to flush session manager: {e}")
+
+        gateway_client = getattr(agent, "gateway_client", None)
+        if gateway_client is not None:
+            try:
+                gateway_client.stop(None, None, None)
+            except Exception as e:
+                logger.warning(f"[AgentPool] Failed to stop gateway client: {e}")
+            agent.gateway_client = None
+
+
+@process_singleton
+def get_agent_pool() -> AgentPool:
+    """Get the process-wide AgentPool singleton."""
+    return AgentPool.from_env()
@@ -13,26 +13,25 @@ Unlike ChatAgent, SwarmAgent:
 """
 
 import logging
-import os
 import asyncio
-import json
 import copy
 from typing import Dict, List, Optional, AsyncGenerator, Any
 from pathlib import Path
 
 from strands import Agent
-from strands.models import BedrockModel
 from strands.multiagent import Swarm
-from botocore.config import Config
 from fastapi import Request
 
 from agents.base import BaseAgent
+from agent.hooks import ImageHistoryHook
+from agent.model_registry import get_model_registry
 from agent.config.swarm_config import (
     AGENT_TOOL_MAPPING,
     AGENT_DESCRIPTIONS,
     build_agent_system_prompt,
 )
 from agent.tool_filter import filter_tools
+from streaming.sse import encode_event, encode_model
 from models.swarm_schemas import (
     SwarmNodeStartEvent,
     SwarmNodeStopEvent,
@@ -165,34 +164,29 @@ class SwarmAgent(BaseAgent):
         Returns:
             Dictionary mapping agent name to Agent instance
         """
-        region = os.environ.get("AWS_REGION", "us-west-2")
-
-        # Retry configuration
-        retry_config = Config(
-            retries={"max_attempts": 5, "mode": "adaptive"},
-            connect_timeout=30,
-            read_timeout=180,
-        )
+        # Shared models/clients (retry profile: 5 attempts, 3 minute read timeout)
+        registry = get_model_registry()
+        retry_profile = dict(max_attempts=5, retry_mode="adaptive", connect_timeout=30, read_timeout=180)
 
         # Create models
-        main_model = BedrockModel(
+        main_model = registry.get_model(
             model_id=self.model_id,
             temperature=0.7,
-            boto_client_config=retry_config,
+            **retry_profile,
         )
 
-        coordinator_model = BedrockModel(
+        coordinator_model = registry.get_model(
             model_id=self.coordinator_model_id,
             temperature=0.3,  # Lower temperature for routing decisions
-            boto_client_config=retry_config,
+            **retry_profile,
         )
 
         # Responder needs higher max_tokens to handle large context + tool results
-        responder_model = BedrockModel(
+        responder_model = registry.get_model(
             model_id=self.model_id,
             temperature=0.7,
             max_tokens=4096,
-            boto_client_config=retry_config,
+            **retry_profile,
         )
 
         agents: Dict[str, Agent] = {}
@@ -236,6 +230,7 @@ class SwarmAgent(BaseAgent):
                 model=model,
                 system_prompt=system_prompt,
                 tools=tools,
+                hooks=[ImageHistoryHook()],  # Browser screenshots: keep only the newest
             )
 
             tool_count = len(tools) if tools else 0
@@ -296,7 +291,7 @@ class SwarmAgent(BaseAgent):
         message: str,
         http_request: Optional[Request] = None,
         **kwargs
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Stream swarm execution with multi-agent orchestration.
 
@@ -315,10 +310,14 @@ class SwarmAgent(BaseAgent):
             SSE-formatted strings with swarm events
         """
         from agent.stop_signal import get_stop_signal_provider
+        from agent.request_context import set_request_context
 
         user_query = message
         stop_signal_provider = get_stop_signal_provider()
 
+        # Bind session to this stream's context (browser tools of the specialist agents)
+        set_request_context(self.session_id, self.user_id)
+
         logger.info(f"[SwarmAgent] Starting for session {self.session_id}: {user_query[:50]}...")
 
         # Inject conversation history into coordinator
@@ -345,7 +344,7 @@ class SwarmAgent(BaseAgent):
         logger.info(f"[SwarmAgent] Prepared invocation_state: user_id={self.user_id}, session_id={self.session_id}")
 
         # Yield start event
-        yield f"data: {json.dumps({'type': 'start'})}\n\n"
+        yield encode_event({'type': 'start'})
 
         # Token usage accumulator
         total_usage = {
@@ -387,7 +386,7 @@ class SwarmAgent(BaseAgent):
                     logger.info(f"[SwarmAgent] Stop signal received for {self.session_id}")
                     stop_signal_provider.clear_stop_signal(self.user_id, self.session_id)
                     # Send stop complete event (don't save incomplete turn)
-                    yield f"data: {json.dumps({'type': 'complete', 'message': 'Stream stopped by user'})}\n\n"
+                    yield encode_event({'type': 'complete', 'message': 'Stream stopped by user'})
                     break
 
                 event_type = event.get("type")
@@ -406,7 +405,7 @@ class SwarmAgent(BaseAgent):
                         node_id=node_id,
                         node_description=AGENT_DESCRIPTIONS.get(node_id, "")
                     )
-                    yield f"data: {json.dumps(start_event.model_dump())}\n\n"
+                    yield encode_model(start_event)
                     logger.debug(f"[SwarmAgent] Node started: {node_id}")
 
                 # Node stream (agent output)
@@ -418,7 +417,7 @@ class SwarmAgent(BaseAgent):
                     if "reasoningText" in inner_event:
                         reasoning_text = inner_event["reasoningText"]
                         if reasoning_text:
-                            yield f"data: {json.dumps({'type': 'reasoning', 'text': reasoning_text, 'node_id': node_id})}\n\n"
+                            yield encode_event({'type': 'reasoning', 'text': reasoning_text, 'node_id': node_id})
 
                     # Text output - SDK emits {"data": str}
                     elif "data" in inner_event:
@@ -431,10 +430,10 @@ class SwarmAgent(BaseAgent):
                         if node_id == "responder":
                             # Final response - displayed as chat message
                             responder_current_text += text_data
-                            yield f"data: {json.dumps({'type': 'response', 'text': text_data, 'node_id': node_id})}\n\n"
+                            yield encode_event({'type': 'response', 'text': text_data, 'node_id': node_id})
                         else:
                             # Intermediate agent text - for SwarmProgress display only
-                            yield f"data: {json.dumps({'type': 'text', 'content': text_data, 'node_id': node_id})}\n\n"
+                            yield encode_event({'type': 'text', 'content': text_data, 'node_id': node_id})
 
                     # Tool events - only responder's tools are sent to frontend for real-time rendering
                     elif inner_event.get("type") == "tool_use_stream" and node_id == "responder":
@@ -450,7 +449,7 @@ class SwarmAgent(BaseAgent):
                                 "input": {}
                             }
                             logger.debug(f"[SwarmAgent] Responder tool use: {tool_event.get('name')}")
-                            yield f"data: {json.dumps(tool_event)}\n\n"
+                            yield encode_event(tool_event)
 
                             # Save current text segment before tool (if any)
                             if responder_current_text.strip():
@@ -492,7 +491,7 @@ class SwarmAgent(BaseAgent):
                                                 if isinstance(result_content, dict) and "text" in result_content:
                                                     result_event["result"] = result_content["text"]
                                         logger.info(f"[SwarmAgent] Responder tool result: {tool_use_id}")
-                                        yield f"data: {json.dumps(result_event)}\n\n"
+                                        yield encode_event(result_event)
 
                                         # Store toolUse + toolResult blocks in content order
                                         if tool_use_id in responder_pending_tools:
@@ -529,7 +528,7 @@ class SwarmAgent(BaseAgent):
                         node_id=node_id,
                         status=status
                     )
-                    yield f"data: {json.dumps(stop_event.model_dump())}\n\n"
+                    yield encode_model(stop_event)
                     logger.debug(f"[SwarmAgent] Node stopped: {node_id}")
 
                 # Handoff
@@ -554,7 +553,7 @@ class SwarmAgent(BaseAgent):
                         message=handoff_message,
                         context=agent_context
                     )
-                    yield f"data: {json.dumps(handoff_event.model_dump())}\n\n"
+                    yield encode_model(handoff_event)
                     logger.info(f"[SwarmAgent] Handoff: {from_node or '?'} → {to_nodes[0] if to_nodes else '?'}")
 
                 # Final result
@@ -608,11 +607,11 @@ class SwarmAgent(BaseAgent):
                         final_node_id=final_node_id,
                         shared_context=swarm_shared_context
                     )
-                    yield f"data: {json.dumps(complete_event.model_dump())}\n\n"
+                    yield encode_model(complete_event)
 
                     # Final complete event with usage
                     final_usage = {k: v for k, v in total_usage.items() if v > 0}
-                    yield f"data: {json.dumps({'type': 'complete', 'usage': final_usage if final_usage else None})}\n\n"
+                    yield encode_event({'type': 'complete', 'usage': final_usage if final_usage else None})
 
                     logger.info(f"[SwarmAgent] Complete: {len(node_history)} nodes, tokens={total_usage['inputTokens']+total_usage['outputTokens']}")
 
@@ -621,10 +620,10 @@ class SwarmAgent(BaseAgent):
             import traceback
             traceback.print_exc()
             # Error occurred - don't save incomplete turn
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield encode_event({'type': 'error', 'content': str(e)})
 
         finally:
-            yield f"data: {json.dumps({'type': 'end'})}\n\n"
+            yield encode_event({'type': 'end'})
 
 
 def get_tools_for_agent(agent_name: str) -> List:
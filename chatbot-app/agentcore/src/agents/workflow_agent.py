@@ -13,6 +13,7 @@ from typing import AsyncGenerator, Optional
 
 from agents.base import BaseAgent
 from agent.factory import create_session_manager
+from streaming.sse import encode_event
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,7 @@ class WorkflowAgent(BaseAgent):
         message: str,
         confirmation_response=None,
         **kwargs
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Stream workflow execution events.
 
@@ -237,12 +238,10 @@ class WorkflowAgent(BaseAgent):
                 logger.info(f"[Workflow] Saved document to ChatAgent.state: {artifact_id}")
 
                 # Yield artifact_created event for frontend to update artifacts list
-                import json
-                artifact_event = {
+                yield encode_event({
                     "type": "artifact_created",
                     "artifact": artifacts[artifact_id]
-                }
-                yield f"data: {json.dumps(artifact_event, ensure_ascii=False)}\n\n"
+                })
 
                 # Save assistant message (user message was saved at workflow start)
                 from strands.types.content import Message
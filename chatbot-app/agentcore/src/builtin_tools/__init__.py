@@ -9,7 +9,7 @@ This package contains tools that leverage AWS Bedrock capabilities:
 
 IMPORTANT: When adding a NEW TOOL, you MUST complete ALL 3 steps:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-1. Add tool import and export in THIS file (__init__.py)
+1. Add tool name -> module mapping in THIS file (_TOOL_MODULES in __init__.py)
 2. Add tool definition in: chatbot-app/frontend/src/config/tools-config.json
 3. Sync to DynamoDB: POST http://localhost:3000/api/tools/sync-registry
    (Or in production: POST https://your-domain.com/api/tools/sync-registry)
@@ -20,108 +20,69 @@ must be manually synced whenever tools-config.json changes. Without step 3,
 your new tool will NOT appear in the agent's tool list!
 
 You can verify the sync with: GET http://localhost:3000/api/tools
+
+Tool modules are imported lazily (PEP 562 module __getattr__): importing this
+package is cheap, and e.g. the Nova Act browser stack is only loaded the first
+time a browser tool is accessed. See agent/tool_registry.py.
 """
 
-from .diagram_tool import generate_diagram_and_validate
-from .artifact_editor_tool import update_artifact
+import importlib
+from typing import Any, Dict, List
+
+# Tool name -> submodule that defines it
+_TOOL_MODULES: Dict[str, str] = {
+    'generate_diagram_and_validate': '.diagram_tool',
+    'update_artifact': '.artifact_editor_tool',
+    # Nova Act browser tools
+    'browser_navigate': '.nova_act_browser_tools',
+    'browser_act': '.nova_act_browser_tools',
+    'browser_extract': '.nova_act_browser_tools',
+    'browser_get_page_info': '.nova_act_browser_tools',
+    'browser_manage_tabs': '.nova_act_browser_tools',
+    'browser_save_screenshot': '.nova_act_browser_tools',
+    # Word tools
+    'create_word_document': '.word_document_tool',
+    'modify_word_document': '.word_document_tool',
+    'list_my_word_documents': '.word_document_tool',
+    'read_word_document': '.word_document_tool',
+    'preview_word_page': '.word_document_tool',
+    # Excel tools
+    'create_excel_spreadsheet': '.excel_spreadsheet_tool',
+    'modify_excel_spreadsheet': '.excel_spreadsheet_tool',
+    'list_my_excel_spreadsheets': '.excel_spreadsheet_tool',
+    'read_excel_spreadsheet': '.excel_spreadsheet_tool',
+    'preview_excel_sheets': '.excel_spreadsheet_tool',
+    # PowerPoint tools
+    'list_my_powerpoint_presentations': '.powerpoint_presentation_tool',
+    'get_presentation_layouts': '.powerpoint_presentation_tool',
+    'analyze_presentation': '.powerpoint_presentation_tool',
+    'create_presentation': '.powerpoint_presentation_tool',
+    'update_slide_content': '.powerpoint_presentation_tool',
+    'add_slide': '.powerpoint_presentation_tool',
+    'delete_slides': '.powerpoint_presentation_tool',
+    'move_slide': '.powerpoint_presentation_tool',
+    'duplicate_slide': '.powerpoint_presentation_tool',
+    'update_slide_notes': '.powerpoint_presentation_tool',
+    'preview_presentation_slides': '.powerpoint_presentation_tool',
+}
 
-# Nova Act browser tools
-from .nova_act_browser_tools import browser_navigate, browser_act, browser_extract, browser_get_page_info, browser_manage_tabs, browser_save_screenshot
+__all__ = list(_TOOL_MODULES)
 
-from .word_document_tool import (
-    create_word_document,
-    modify_word_document,
-    list_my_word_documents,
-    read_word_document,
-    preview_word_page
-)
-from .excel_spreadsheet_tool import (
-    create_excel_spreadsheet,
-    modify_excel_spreadsheet,
-    list_my_excel_spreadsheets,
-    read_excel_spreadsheet,
-    preview_excel_sheets
-)
-from .powerpoint_presentation_tool import (
-    list_my_powerpoint_presentations,
-    get_presentation_layouts,
-    analyze_presentation,
-    create_presentation,
-    update_slide_content,
-    add_slide,
-    delete_slides,
-    move_slide,
-    duplicate_slide,
-    update_slide_notes,
-    preview_presentation_slides
-)
 
-__all__ = [
-    'generate_diagram_and_validate',
-    'update_artifact',
-    'browser_navigate',
-    'browser_act',
-    'browser_extract',
-    'browser_get_page_info',
-    'browser_manage_tabs',
-    'browser_save_screenshot',
-    'create_word_document',
-    'modify_word_document',
-    'list_my_word_documents',
-    'read_word_document',
-    'preview_word_page',
-    'create_excel_spreadsheet',
-    'modify_excel_spreadsheet',
-    'list_my_excel_spreadsheets',
-    'read_excel_spreadsheet',
-    'preview_excel_sheets',
-    # PowerPoint tools
-    'list_my_powerpoint_presentations',
-    'get_presentation_layouts',
-    'analyze_presentation',
-    'create_presentation',
-    'update_slide_content',
-    'add_slide',
-    'delete_slides',
-    'move_slide',
-    'duplicate_slide',
-    'update_slide_notes',
-    'preview_presentation_slides'
-]
+def __getattr__(name: str) -> Any:
+    """Import the defining submodule on first access of a tool (or BUILTIN_TOOLS)."""
+    if name in _TOOL_MODULES:
+        module = importlib.import_module(_TOOL_MODULES[name], __name__)
+        tool = getattr(module, name)
+        globals()[name] = tool
+        return tool
+    if name == 'BUILTIN_TOOLS':
+        # Collection of all builtin tools for registry sync (imports every tool module)
+        tools: List[Any] = [__getattr__(tool_name) for tool_name in __all__]
+        globals()[name] = tools
+        return tools
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Collection of all builtin tools for registry sync
-BUILTIN_TOOLS = [
-    generate_diagram_and_validate,
-    update_artifact,
-    create_word_document,
-    modify_word_document,
-    list_my_word_documents,
-    read_word_document,
-    preview_word_page,
-    create_excel_spreadsheet,
-    modify_excel_spreadsheet,
-    list_my_excel_spreadsheets,
-    read_excel_spreadsheet,
-    preview_excel_sheets,
-    list_my_powerpoint_presentations,
-    get_presentation_layouts,
-    analyze_presentation,
-    create_presentation,
-    update_slide_content,
-    add_slide,
-    delete_slides,
-    move_slide,
-    duplicate_slide,
-    update_slide_notes,
-    preview_presentation_slides
-]
 
-# Nova Act browser tools
-BUILTIN_TOOLS.extend([
-    browser_navigate,
-    browser_act,
-    browser_extract,
-    browser_get_page_info,
-    browser_manage_tabs,
-    browser_save_screenshot,
-])
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | {'BUILTIN_TOOLS'})
@@ -10,6 +10,8 @@ import base64
 from typing import Dict, Any, Optional
 from bedrock_agentcore.tools.browser_client import BrowserClient
 
+from agent.request_context import get_session_id, get_user_id
+
 # Import Nova Act error types for better error handling
 from nova_act import (
     ActInvalidModelGenerationError,
@@ -118,15 +120,13 @@ class BrowserController:
 
         # 2. Try Parameter Store (for local development or alternative configuration)
         try:
-            import boto3
+            from agent.config.parameters import get_ssm_parameter
             project_name = os.getenv('PROJECT_NAME', 'strands-agent-chatbot')
             environment = os.getenv('ENVIRONMENT', 'dev')
             param_name = f"/{project_name}/{environment}/agentcore/browser-id"
 
             logger.info(f"Checking Parameter Store for Browser ID: {param_name}")
-            ssm = boto3.client('ssm', region_name=self.region)
-            response = ssm.get_parameter(Name=param_name)
-            browser_id = response['Parameter']['Value']
+            browser_id = get_ssm_parameter(param_name, self.region)  # Cached per process
             logger.info(f"Found BROWSER_ID in Parameter Store: {browser_id}")
             return browser_id
         except Exception as e:
@@ -966,10 +966,10 @@ class BrowserController:
 
 def get_or_create_controller(session_id: Optional[str] = None) -> BrowserController:
     """Get existing controller or create new one (auto-detects session_id from agent context)"""
-    # Auto-detect session_id from environment (set by ChatbotAgent)
-    # Uses SESSION_ID (per-conversation) for isolated browser sessions
+    # Auto-detect session_id from request context (set by ChatAgent per stream)
+    # Uses the per-conversation session ID for isolated browser sessions
     if not session_id:
-        session_id = os.getenv('SESSION_ID') or os.getenv('USER_ID') or "default"
+        session_id = get_session_id() or get_user_id() or "default"
         logger.info(f"Auto-detected browser session_id: {session_id}")
 
     if session_id not in _browser_sessions:
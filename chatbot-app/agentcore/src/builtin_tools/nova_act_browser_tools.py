@@ -3,10 +3,10 @@ Browser automation tools using AgentCore Browser + Nova Act.
 Each tool returns a screenshot to show current browser state.
 """
 
-import os
 import logging
 from typing import Dict, Any, Optional, List, Union
 from strands import tool, ToolContext
+from agent.request_context import get_user_id
 from .lib.browser_controller import get_or_create_controller
 
 logger = logging.getLogger(__name__)
@@ -77,8 +77,8 @@ def _save_extracted_data_artifact(
         # Create title from description (truncate if too long)
         title = description[:50] + "..." if len(description) > 50 else description
 
-        # Get user_id from environment
-        user_id = os.environ.get('USER_ID', 'default_user')
+        # Get user_id from request context
+        user_id = get_user_id('default_user')
 
         # Save JSON file to workspace (S3)
         try:
@@ -870,8 +870,8 @@ def browser_save_screenshot(filename: str, tool_context: ToolContext) -> Dict[st
         else:
             raise ValueError("session_id not found in ToolContext")
 
-        # Get user_id (from environment or agent config)
-        user_id = os.environ.get('USER_ID', 'default_user')
+        # Get user_id from request context
+        user_id = get_user_id('default_user')
 
         # Get current browser controller
         controller = get_or_create_controller(session_id)
@@ -136,16 +136,14 @@ def _get_code_interpreter_id() -> Optional[str]:
 
     # 2. Try Parameter Store (for local development or alternative configuration)
     try:
-        import boto3
+        from agent.config.parameters import get_ssm_parameter
         project_name = os.getenv('PROJECT_NAME', 'strands-agent-chatbot')
         environment = os.getenv('ENVIRONMENT', 'dev')
         region = os.getenv('AWS_REGION', 'us-west-2')
         param_name = f"/{project_name}/{environment}/agentcore/code-interpreter-id"
 
         logger.info(f"Checking Parameter Store for Code Interpreter ID: {param_name}")
-        ssm = boto3.client('ssm', region_name=region)
-        response = ssm.get_parameter(Name=param_name)
-        code_interpreter_id = response['Parameter']['Value']
+        code_interpreter_id = get_ssm_parameter(param_name, region)  # Cached per process
         logger.info(f"Found CODE_INTERPRETER_ID in Parameter Store: {code_interpreter_id}")
         return code_interpreter_id
     except Exception as e:
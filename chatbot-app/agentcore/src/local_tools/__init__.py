@@ -4,14 +4,32 @@ This package contains tools that don't require specific AWS services:
 - Web search
 - URL fetching and content extraction
 - Data visualization
+
+Tool modules are imported lazily on first access (see agent/tool_registry.py).
 """
 
-from .web_search import ddg_web_search
-from .url_fetcher import fetch_url_content
-from .visualization import create_visualization
+import importlib
+from typing import Any, Dict, List
+
+# Tool name -> submodule that defines it
+_TOOL_MODULES: Dict[str, str] = {
+    'ddg_web_search': '.web_search',
+    'fetch_url_content': '.url_fetcher',
+    'create_visualization': '.visualization',
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    """Import the defining submodule on first access of a tool."""
+    if name in _TOOL_MODULES:
+        module = importlib.import_module(_TOOL_MODULES[name], __name__)
+        tool = getattr(module, name)
+        globals()[name] = tool
+        return tool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = [
-    'ddg_web_search',
-    'fetch_url_content',
-    'create_visualization',
-]
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -65,11 +65,27 @@ async def lifespan(app: FastAPI):
     os.makedirs(sessions_dir, exist_ok=True)
     logger.info("Sessions directory ready")
 
+    # Fill SSM / tool config / memory strategy / Gateway caches in the background
+    # so /ping answers immediately; readiness is reported on /health
+    from agent.prewarm import get_prewarmer
+    prewarmer = get_prewarmer()
+    if prewarmer.on_startup:
+        prewarmer.start()
+
     yield  # Application is running
 
     # Shutdown
     logger.info("=== Agent Core Service Shutting Down ===")
-    # TODO: Cleanup agent pool, MCP clients, etc.
+
+    await prewarmer.stop()
+
+    # Release warm agents (flushes session buffers, stops Gateway MCP clients)
+    from agents.pool import get_agent_pool
+    get_agent_pool().clear()
+
+    # Close shared Bedrock clients
+    from agent.model_registry import get_model_registry
+    get_model_registry().clear()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -96,7 +112,7 @@ if os.getenv('ENVIRONMENT', 'development') == 'development':
     )
 
 # Import routers
-from routers import health, chat, gateway_tools, tools, browser_live_view, stop, voice
+from routers import health, chat, gateway_tools, tools, browser_live_view, stop, voice, blobs
 
 # Include routers
 app.include_router(health.router)
@@ -106,6 +122,7 @@ app.include_router(tools.router)
 app.include_router(browser_live_view.router)
 app.include_router(stop.router)
 app.include_router(voice.router)  # Voice chat WebSocket
+app.include_router(blobs.router)  # Out-of-band tool result images
 
 if __name__ == "__main__":
     import uvicorn
@@ -37,7 +37,7 @@ class InvocationInput(BaseModel):
     user_id: str
     session_id: str
     message: str = ""  # Optional for action-only requests (e.g., stop)
-    action: Optional[str] = None  # Action type: None (default chat), "stop"
+    action: Optional[str] = None  # Action type: None (default chat), "stop", "resume"
     model_id: Optional[str] = None
     temperature: Optional[float] = None
     system_prompt: Optional[str] = None
@@ -49,6 +49,7 @@ class InvocationInput(BaseModel):
     request_type: Optional[str] = None  # Request type: "normal" (default), "swarm", "compose"
     selected_artifact_id: Optional[str] = None  # Currently selected artifact for tool context
     api_keys: Optional[Dict[str, str]] = None  # User-specific API keys for external services
+    last_event_id: Optional[str] = None  # Resume: last SSE id received, "<run>-<n>" (AgentCore only forwards the body)
 
 
 class InvocationRequest(BaseModel):
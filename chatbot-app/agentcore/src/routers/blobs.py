@@ -0,0 +1,52 @@
+"""
+Blob Router
+
+Serves tool result images stored out-of-band by streaming.blob_store
+(SSE_IMAGE_TRANSPORT=blob). Blobs are content-addressed, so responses are
+immutable and cacheable by the client. A blob is only served for the session
+it was stored in and to that session's user (both set by the BFF); with the
+blob transport off the endpoint serves nothing.
+"""
+
+import logging
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from streaming.blob_store import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["blobs"])
+
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+@router.get("/blobs/{blob_hash}")
+async def get_blob(
+    blob_hash: str,
+    session_id: str = Query(..., description="Session the blob was stored in"),
+    user_id: str = Query(..., description="User ID (from BFF)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Return the bytes of a stored image by SHA-256 hash."""
+    if not _HASH_PATTERN.match(blob_hash):
+        raise HTTPException(status_code=400, detail="Invalid blob hash")
+
+    store = get_blob_store()
+    if not store.enabled:
+        raise HTTPException(status_code=404, detail="Blob not found or expired")
+
+    etag = f'"{blob_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+
+    blob = store.get(blob_hash, session_id, user_id)
+    if blob is None:
+        logger.debug(f"[BlobRouter] Blob not found: {blob_hash[:12]} (session={session_id})")
+        raise HTTPException(status_code=404, detail="Blob not found or expired")
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=blob.data, media_type=blob.content_type, headers=headers)
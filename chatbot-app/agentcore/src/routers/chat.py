@@ -9,58 +9,74 @@ Simplified using agent factory pattern - all agent-specific logic moved to agent
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from typing import AsyncGenerator, Optional
+import asyncio
 import logging
 import json
-import os
 from opentelemetry import trace
 
 from models.schemas import InvocationRequest
 from agents.factory import create_agent
+from agents.pool import get_agent_pool, build_pool_key
+from agent.session.compaction_worker import compaction_key, get_compaction_worker
+from streaming.coalescer import STOP_REQUESTED, iterate_with_deadlines
+from streaming.replay import get_stream_replay_registry, parse_event_id
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["chat"])
 
 
+async def _wait_for_disconnect(http_request: Request, disconnected: asyncio.Event) -> None:
+    """Set disconnected when the ASGI server reports http.disconnect for this request."""
+    while True:
+        message = await http_request.receive()
+        if message.get("type") == "http.disconnect":
+            disconnected.set()
+            return
+
+
 async def disconnect_aware_stream(
     stream: AsyncGenerator,
     http_request: Request,
     session_id: str
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
-    Wrapper generator that checks for client disconnection.
-
-    When BFF aborts the connection, FastAPI's Request.is_disconnected()
-    returns True. This wrapper detects that and closes the underlying stream,
-    which triggers the finally block in event_processor (partial response save).
+    Wrapper generator that stops the stream when the client disconnects.
+
+    A single watcher task waits for http.disconnect while the stream runs in a
+    producer task (see streaming.coalescer.iterate_with_deadlines). When BFF
+    aborts the connection, the producer is cancelled right away - also during
+    a long tool call when no chunk is being produced. For a direct agent stream
+    this runs the event_processor finally block (partial response save); for a
+    resumable stream it detaches the reader, and the run is cancelled once no
+    reader reconnects within the grace period (see streaming.replay).
     """
-    disconnected = False
+    disconnected = asyncio.Event()
+    watcher = asyncio.create_task(_wait_for_disconnect(http_request, disconnected))
+    chunks = iterate_with_deadlines(stream, lambda: None, stop_event=disconnected)
     try:
-        async for chunk in stream:
-            # Check if client disconnected before yielding
-            if await http_request.is_disconnected():
-                logger.info(f"🔌 Client disconnected for session {session_id} - stopping stream")
-                disconnected = True
+        async for chunk in chunks:
+            if chunk is STOP_REQUESTED:
+                logger.info(f"🔌 Client disconnected for session {session_id} - stream cancelled")
                 break
 
             yield chunk
 
     except GeneratorExit:
         logger.info(f"🔌 GeneratorExit in disconnect_aware_stream for session {session_id}")
-        disconnected = True
         raise
     except Exception as e:
         logger.error(f"Error in disconnect_aware_stream for session {session_id}: {e}")
         raise
     finally:
-        # Close the underlying stream to trigger its finally block
-        # This ensures event_processor saves partial response
-        if disconnected:
-            logger.info(f"🔌 Closing underlying stream for session {session_id} due to disconnect")
-            try:
-                await stream.aclose()
-            except Exception as e:
-                logger.debug(f"Error closing stream: {e}")
+        watcher.cancel()
+        # Cancels the producer if still running, then close the underlying stream
+        # to trigger its finally block (event_processor saves partial response)
+        await chunks.aclose()
+        try:
+            await stream.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing stream: {e}")
         logger.debug(f"disconnect_aware_stream finished for session {session_id}")
 
 
@@ -78,31 +94,11 @@ async def invocations(request: InvocationRequest, http_request: Request):
     if input_data.warmup:
         logger.info(f"[Warmup] Container warmed - session={input_data.session_id}, user={input_data.user_id}")
 
-        # Pre-cache memory strategy IDs to speed up first real request
-        memory_id = os.environ.get('MEMORY_ID')
-        if memory_id:
-            try:
-                from agent.agent import _cached_strategy_ids
-                if _cached_strategy_ids is None:
-                    import boto3
-                    import agent.agent as agent_module
-                    aws_region = os.environ.get('AWS_REGION', 'us-west-2')
-                    gmcp = boto3.client('bedrock-agentcore-control', region_name=aws_region)
-                    response = gmcp.get_memory(memoryId=memory_id)
-                    memory = response['memory']
-                    strategies = memory.get('strategies', memory.get('memoryStrategies', []))
-
-                    strategy_map = {
-                        s.get('type', s.get('memoryStrategyType', '')): s.get('strategyId', s.get('memoryStrategyId', ''))
-                        for s in strategies
-                        if s.get('type', s.get('memoryStrategyType', '')) and s.get('strategyId', s.get('memoryStrategyId', ''))
-                    }
-                    agent_module._cached_strategy_ids = strategy_map
-                    logger.info(f"[Warmup] Pre-cached {len(strategy_map)} strategy IDs")
-            except Exception as e:
-                logger.warning(f"[Warmup] Failed to pre-cache strategy IDs: {e}")
-
-        return {"status": "warm"}
+        # Run (or join) the prewarm stage so the first real request hits warm caches
+        from agent.prewarm import get_prewarmer
+        prewarm_status = await get_prewarmer().run()
+
+        return {"status": "warm", "prewarm": prewarm_status}
 
     # Handle stop action - set in-memory flag for immediate stop
     if input_data.action == "stop":
@@ -112,6 +108,31 @@ async def invocations(request: InvocationRequest, http_request: Request):
         logger.info(f"[Stop] Stop signal set via /invocations for session={input_data.session_id}")
         return {"status": "stop_requested", "session_id": input_data.session_id}
 
+    # Handle resume - reattach to a running (or just finished) stream after a dropped connection
+    last_event_id = _parse_last_event_id(input_data.last_event_id, http_request)
+    if input_data.action == "resume" or last_event_id is not None:
+        resumable = get_stream_replay_registry().get(input_data.session_id, input_data.user_id)
+        if resumable is None:
+            raise HTTPException(status_code=404, detail="No resumable stream for this session")
+
+        # An id of an earlier run of the session would silently skip the
+        # current run's frames up to its counter value, and one whose next
+        # frames have left the replay buffer would render a truncated answer
+        try:
+            after = resumable.sequence_of(last_event_id)
+        except LookupError as e:
+            raise HTTPException(status_code=409, detail=f"Last-Event-ID cannot be resumed: {e}")
+
+        logger.info(
+            f"[Replay] Resuming session={input_data.session_id} after event {last_event_id} "
+            f"(last={resumable.event_id(resumable.last_event_id)}, done={resumable.done})"
+        )
+        return _streaming_response(
+            disconnect_aware_stream(resumable.subscribe(after), http_request, input_data.session_id),
+            input_data.session_id,
+            input_data.request_type or "normal",
+        )
+
     # Add tracing attributes
     span = trace.get_current_span()
     span.set_attribute("user.id", input_data.user_id or "anonymous")
@@ -125,19 +146,54 @@ async def invocations(request: InvocationRequest, http_request: Request):
         message_content, special_params = _parse_message(input_data.message, request_type)
 
         # Create agent using factory
-        agent = create_agent(
-            request_type=request_type,
-            session_id=input_data.session_id,
-            user_id=input_data.user_id,
-            enabled_tools=input_data.enabled_tools,
-            model_id=input_data.model_id,
-            temperature=input_data.temperature,
-            system_prompt=input_data.system_prompt,
-            caching_enabled=input_data.caching_enabled,
-            compaction_enabled=input_data.compaction_enabled,
-            api_keys=input_data.api_keys
+        def _create_agent():
+            return create_agent(
+                request_type=request_type,
+                session_id=input_data.session_id,
+                user_id=input_data.user_id,
+                enabled_tools=input_data.enabled_tools,
+                model_id=input_data.model_id,
+                temperature=input_data.temperature,
+                system_prompt=input_data.system_prompt,
+                caching_enabled=input_data.caching_enabled,
+                compaction_enabled=input_data.compaction_enabled,
+                api_keys=input_data.api_keys
+            )
+
+        # A previous run of the session (e.g. one waiting out its resume grace
+        # period) is stopped and has saved its partial response before this
+        # turn acquires the agent and loads history
+        replay_registry = get_stream_replay_registry()
+        await replay_registry.supersede(input_data.session_id, input_data.user_id)
+
+        # A checkpoint of this session still being prepared in the background is
+        # stored before the agent loads its history; wait for it off the event loop
+        await get_compaction_worker().settle_async(
+            compaction_key(input_data.user_id or input_data.session_id, input_data.session_id)
         )
 
+        # Normal chat reuses the warm ChatAgent of this session (AgentCore Runtime
+        # gives session affinity). Other modes write to the same history, so any
+        # warm agent of the session is dropped before they run.
+        agent_pool = get_agent_pool()
+        pool_key = None
+        if request_type == "normal":
+            pool_key = build_pool_key(
+                session_id=input_data.session_id,
+                user_id=input_data.user_id,
+                model_id=input_data.model_id,
+                enabled_tools=input_data.enabled_tools,
+                temperature=input_data.temperature,
+                system_prompt=input_data.system_prompt,
+                caching_enabled=input_data.caching_enabled,
+                compaction_enabled=input_data.compaction_enabled,
+                api_keys=input_data.api_keys,
+            )
+            agent = agent_pool.acquire(pool_key, _create_agent)
+        else:
+            agent_pool.invalidate_session(input_data.session_id)
+            agent = _create_agent()
+
         # Stream response from agent
         stream = agent.stream_async(
             message_content,
@@ -147,6 +203,15 @@ async def invocations(request: InvocationRequest, http_request: Request):
             **special_params
         )
 
+        # Release the pooled agent once the stream ends
+        if pool_key is not None:
+            stream = agent_pool.track_stream(pool_key, agent, stream)
+
+        # Run the stream in its own task with event ids and a replay buffer,
+        # so a dropped connection can resume instead of re-invoking
+        if replay_registry.enabled:
+            stream = replay_registry.start(input_data.session_id, input_data.user_id, stream).subscribe()
+
         # Wrap stream with disconnect detection
         wrapped_stream = disconnect_aware_stream(
             stream,
@@ -154,18 +219,7 @@ async def invocations(request: InvocationRequest, http_request: Request):
             input_data.session_id
         )
 
-        # Return streaming response with appropriate headers
-        return StreamingResponse(
-            wrapped_stream,
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "X-Accel-Buffering": "no",
-                "Connection": "keep-alive",
-                "X-Session-ID": input_data.session_id,
-                "X-Request-Type": request_type
-            }
-        )
+        return _streaming_response(wrapped_stream, input_data.session_id, request_type)
 
     except Exception as e:
         logger.error(f"Error in invocations: {e}", exc_info=True)
@@ -181,6 +235,36 @@ async def ping():
     return {"status": "healthy"}
 
 
+def _streaming_response(stream: AsyncGenerator, session_id: str, request_type: str) -> StreamingResponse:
+    """SSE response with the headers shared by new and resumed streams."""
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Connection": "keep-alive",
+            "X-Session-ID": session_id,
+            "X-Request-Type": request_type
+        }
+    )
+
+
+def _parse_last_event_id(body_value: Optional[str], http_request: Request) -> Optional[str]:
+    """
+    Last SSE id the client received: the input field (AgentCore Runtime only
+    forwards the body) or the standard Last-Event-ID header.
+    """
+    last_event_id = body_value or http_request.headers.get("last-event-id")
+    if not last_event_id:
+        return None
+    try:
+        parse_event_id(last_event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    return last_event_id
+
+
 def _parse_message(message: str, request_type: str) -> tuple[str, dict]:
     """
     Parse message for special cases (HITL interrupt response, compose confirmation).
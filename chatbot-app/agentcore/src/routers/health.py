@@ -6,7 +6,37 @@ router = APIRouter(tags=["health"])
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "agent-core", "version": "2.0.0"}
+    from agent.model_registry import get_model_registry
+    from agent.session.attachments import get_attachment_store
+    from agent.session.compaction_worker import get_compaction_worker
+    from agent.session.history_cache import get_session_history_cache
+    from agent.session.image_history import get_image_history_policy
+    from agent.session.token_estimator import get_token_estimator
+    from agent.session.truncation import get_truncation_cache
+    from agent.prewarm import get_prewarmer
+    from agent.tool_registry import get_tool_registry
+    from agents.pool import get_agent_pool
+    from streaming.blob_store import get_blob_store
+    from streaming.replay import get_stream_replay_registry
+    prewarm_status = get_prewarmer().get_status()
+    return {
+        "status": "healthy",
+        "service": "agent-core",
+        "version": "2.0.0",
+        "ready": prewarm_status["ready"],
+        "prewarm": prewarm_status,
+        "agent_pool": get_agent_pool().get_stats(),
+        "model_registry": get_model_registry().get_stats(),
+        "tool_imports_ms": get_tool_registry().get_import_report(),
+        "blob_store": get_blob_store().get_stats(),
+        "attachment_store": get_attachment_store().get_stats(),
+        "image_history": get_image_history_policy().get_stats(),
+        "stream_replay": get_stream_replay_registry().get_stats(),
+        "history_cache": get_session_history_cache().get_stats(),
+        "truncation_cache": get_truncation_cache().get_stats(),
+        "token_estimator": get_token_estimator().get_stats(),
+        "compaction_worker": get_compaction_worker().get_stats(),
+    }
 
 @router.get("/ping")
 async def ping():
@@ -169,6 +169,10 @@ async def voice_stream(
             except Exception as e:
                 logger.error(f"[Voice] Error stopping agent: {e}")
 
+        # Voice turns were appended to the shared history - drop any warm text agent
+        from agents.pool import get_agent_pool
+        get_agent_pool().invalidate_session(session_id)
+
         try:
             await websocket.close()
         except Exception as close_err:
@@ -0,0 +1,322 @@
+"""
+Blob Store - Out-of-band delivery of tool result images
+
+Browser screenshots, generated diagrams and MCP image blocks used to travel
+inline as base64 in the SSE tool_result / complete events: megabytes per
+browser step, re-sent on every render and never cacheable by the client.
+
+With SSE_IMAGE_TRANSPORT=blob the image bytes are kept in this in-memory,
+content-addressed store and the SSE event only carries a reference:
+
+    {"format": "png", "hash": "<sha256>", "url": "/blobs/<sha256>?session_id=...&user_id=...",
+     "size": 482113, "width": 1280, "height": 720, "thumbnail": "<tiny base64 jpeg>"}
+
+Clients fetch the bytes lazily from that URL (immutable, so HTTP caching
+applies); a blob is only served to the user the session's blobs were stored
+for. The frontend requests /api + url from its BFF, which forwards it to
+the container in local mode (app/api/blobs/[hash]/route.ts). The default
+transport stays "inline" because AgentCore Runtime only routes /invocations
+to the container.
+
+Bounds:
+- Per session: least recently used blobs beyond max_session_bytes are dropped
+- Total: least recently active sessions are dropped beyond max_total_bytes
+- TTL: blobs not stored or fetched for ttl_seconds are dropped
+
+Usage:
+    from streaming.blob_store import get_blob_store
+
+    images = get_blob_store().offload_images(images, session_id, user_id)   # SSE-ready
+    blob = get_blob_store().get(blob_hash, session_id, user_id)             # /blobs endpoint
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from agent.config.constants import (
+    DEFAULT_BLOB_STORE_MAX_SESSION_BYTES,
+    DEFAULT_BLOB_STORE_MAX_TOTAL_BYTES,
+    DEFAULT_BLOB_STORE_TTL_SECONDS,
+    DEFAULT_BLOB_THUMBNAIL_PX,
+    DEFAULT_SSE_IMAGE_TRANSPORT,
+    EnvVars,
+)
+from agent.config.env import env_float, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+BLOB_URL_PREFIX = "/blobs/"
+
+_CONTENT_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+
+
+@dataclass
+class Blob:
+    """Stored image bytes."""
+    data: bytes
+    format: str
+    last_used: float
+
+    @property
+    def content_type(self) -> str:
+        return _CONTENT_TYPES.get(self.format.lower(), "application/octet-stream")
+
+
+class _SessionBlobs:
+    """LRU map of one session's blobs."""
+
+    __slots__ = ("blobs", "size", "user_id")
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.blobs: "OrderedDict[str, Blob]" = OrderedDict()
+        self.size = 0
+        self.user_id = user_id
+
+
+def image_preview(data: bytes, thumbnail_px: int) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """(width, height, base64 JPEG thumbnail) of an image; None parts when Pillow can't tell."""
+    try:
+        from PIL import Image
+    except ImportError:  # pragma: no cover - Pillow is in requirements.txt
+        return None, None, None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            if thumbnail_px <= 0:
+                return width, height, None
+
+            image.draft("RGB", (thumbnail_px, thumbnail_px))  # JPEG: decode at reduced scale
+            thumb = image.convert("RGB")
+            thumb.thumbnail((thumbnail_px, thumbnail_px), reducing_gap=2.0)
+            buffer = io.BytesIO()
+            thumb.save(buffer, format="JPEG", quality=60)
+            return width, height, base64.b64encode(buffer.getvalue()).decode("ascii")
+    except Exception as e:
+        logger.debug(f"[BlobStore] No preview for image: {e}")
+        return None, None, None
+
+
+class BlobStore:
+    """Per-session, content-addressed, bounded in-memory image store."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_session_bytes: int = DEFAULT_BLOB_STORE_MAX_SESSION_BYTES,
+        max_total_bytes: int = DEFAULT_BLOB_STORE_MAX_TOTAL_BYTES,
+        ttl_seconds: float = DEFAULT_BLOB_STORE_TTL_SECONDS,
+        thumbnail_px: int = DEFAULT_BLOB_THUMBNAIL_PX,
+    ):
+        """
+        Args:
+            enabled: Replace inline base64 images in SSE events with blob references
+            max_session_bytes: Bytes kept per session before LRU eviction
+            max_total_bytes: Bytes kept in total before whole sessions are evicted
+            ttl_seconds: Blobs unused (not stored or fetched) for this long are dropped
+            thumbnail_px: Longest edge of the inline thumbnail (0 = no thumbnail)
+        """
+        self.enabled = enabled
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.ttl_seconds = ttl_seconds
+        self.thumbnail_px = thumbnail_px
+
+        self._sessions: "OrderedDict[str, _SessionBlobs]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stored = 0
+        self.deduplicated = 0
+        self.evicted = 0
+        self.inline_bytes_saved = 0
+
+    @classmethod
+    def from_env(cls) -> "BlobStore":
+        """Create store from environment variables."""
+        transport = os.environ.get(EnvVars.SSE_IMAGE_TRANSPORT, DEFAULT_SSE_IMAGE_TRANSPORT)
+        return cls(
+            enabled=transport.lower() == "blob",
+            max_session_bytes=env_int(EnvVars.BLOB_STORE_MAX_SESSION_BYTES, DEFAULT_BLOB_STORE_MAX_SESSION_BYTES),
+            max_total_bytes=env_int(EnvVars.BLOB_STORE_MAX_TOTAL_BYTES, DEFAULT_BLOB_STORE_MAX_TOTAL_BYTES),
+            ttl_seconds=env_float(EnvVars.BLOB_STORE_TTL_SECONDS, DEFAULT_BLOB_STORE_TTL_SECONDS),
+            thumbnail_px=env_int(EnvVars.BLOB_THUMBNAIL_PX, DEFAULT_BLOB_THUMBNAIL_PX),
+        )
+
+    def put(self, session_id: str, data: bytes, format: str = "png", user_id: Optional[str] = None) -> str:
+        """Store bytes for a session (owned by user_id); returns their SHA-256 hex digest."""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired_locked(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _SessionBlobs(user_id)
+            self._sessions.move_to_end(session_id)
+
+            blob = session.blobs.get(blob_hash)
+            if blob is not None:
+                blob.last_used = now
+                session.blobs.move_to_end(blob_hash)
+                self.deduplicated += 1
+                return blob_hash
+
+            session.blobs[blob_hash] = Blob(data=data, format=format, last_used=now)
+            session.size += len(data)
+            self._total_bytes += len(data)
+            self.stored += 1
+
+            self._evict_over_budget_locked(session_id, session)
+
+        return blob_hash
+
+    def get(self, blob_hash: str, session_id: str, user_id: Optional[str] = None) -> Optional[Blob]:
+        """
+        Look up a blob of a session.
+
+        With a user_id, only blobs of a session stored for that user are
+        returned (the /blobs endpoint always passes one).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired_locked(now)
+
+            session = self._sessions.get(session_id)
+            if session is None or (user_id is not None and session.user_id != user_id):
+                return None
+            blob = session.blobs.get(blob_hash)
+            if blob is not None:
+                blob.last_used = now
+                session.blobs.move_to_end(blob_hash)
+            return blob
+
+    def drop_session(self, session_id: str) -> None:
+        """Forget all blobs of a session."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_bytes -= session.size
+                self.evicted += len(session.blobs)
+
+    def offload_images(
+        self,
+        images: Optional[List[Dict[str, Any]]],
+        session_id: Optional[str],
+        user_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Replace inline base64 images ({"format", "data"}) with blob references.
+
+        Returns the input unchanged when the store is disabled or there is no
+        session; URL images and undecodable data are passed through.
+        """
+        if not images or not self.enabled or not session_id:
+            return images
+
+        offloaded = []
+        for image in images:
+            data_b64 = image.get("data") if isinstance(image, dict) else None
+            if not isinstance(data_b64, str) or not data_b64:
+                offloaded.append(image)
+                continue
+
+            try:
+                data = base64.b64decode(data_b64, validate=True)
+            except (binascii.Error, ValueError):
+                offloaded.append(image)
+                continue
+
+            image_format = image.get("format", "png")
+            blob_hash = self.put(session_id, data, image_format, user_id)
+            width, height, thumbnail = image_preview(data, self.thumbnail_px)
+
+            query = {"session_id": session_id}
+            if user_id:
+                query["user_id"] = user_id
+            reference = {
+                "format": image_format,
+                "hash": blob_hash,
+                "url": f"{BLOB_URL_PREFIX}{blob_hash}?{urlencode(query, quote_via=quote)}",
+                "size": len(data),
+            }
+            if width and height:
+                reference["width"] = width
+                reference["height"] = height
+            if thumbnail:
+                reference["thumbnail"] = thumbnail
+            offloaded.append(reference)
+
+            with self._lock:
+                self.inline_bytes_saved += len(data_b64) - len(thumbnail or "")
+
+        return offloaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store counters for health/metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sessions": len(self._sessions),
+                "blobs": sum(len(session.blobs) for session in self._sessions.values()),
+                "bytes": self._total_bytes,
+                "stored": self.stored,
+                "deduplicated": self.deduplicated,
+                "evicted": self.evicted,
+                "inline_bytes_saved": self.inline_bytes_saved,
+            }
+
+    def _remove_locked(self, session_id: str, session: _SessionBlobs, blob_hash: str) -> None:
+        blob = session.blobs.pop(blob_hash)
+        session.size -= len(blob.data)
+        self._total_bytes -= len(blob.data)
+        self.evicted += 1
+        if not session.blobs:
+            self._sessions.pop(session_id, None)
+
+    def _evict_expired_locked(self, now: float) -> None:
+        """Drop blobs unused for longer than the TTL. Caller holds the lock."""
+        cutoff = now - self.ttl_seconds
+        for session_id, session in list(self._sessions.items()):
+            # Blobs are kept in last-used order: stop at the first fresh one
+            while session.blobs:
+                blob_hash, blob = next(iter(session.blobs.items()))
+                if blob.last_used > cutoff:
+                    break
+                self._remove_locked(session_id, session, blob_hash)
+
+    def _evict_over_budget_locked(self, session_id: str, session: _SessionBlobs) -> None:
+        """Enforce per-session and total byte budgets. Caller holds the lock."""
+        # Keep at least the newest blob, even if it alone exceeds the budget
+        while session.size > self.max_session_bytes and len(session.blobs) > 1:
+            self._remove_locked(session_id, session, next(iter(session.blobs)))
+
+        while self._total_bytes > self.max_total_bytes and len(self._sessions) > 1:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if oldest_id == session_id:
+                break
+            self._remove_locked(oldest_id, oldest, next(iter(oldest.blobs)))
+
+
+@process_singleton
+def get_blob_store() -> BlobStore:
+    """Get the process-wide BlobStore singleton."""
+    return BlobStore.from_env()
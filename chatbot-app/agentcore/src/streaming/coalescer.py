@@ -0,0 +1,204 @@
+"""
+SSE Coalescer - Batch text deltas into fewer response frames
+
+The model streams text a few characters at a time. Sending every delta as its
+own SSE frame (with a fixed sleep after each one) made long answers both slow
+and chatty. TextCoalescer buffers text deltas and emits one response frame
+when either budget is reached:
+
+- Time: the oldest buffered delta is max_delay_ms old (default 16ms)
+- Size: the buffer holds max_bytes of UTF-8 text (default 1KB)
+
+Any other event (tool_use, tool_result, complete, ...) flushes the buffer first
+so ordering is preserved, then goes out immediately.
+
+The time budget also has to fire while the model is idle, so the agent stream
+is consumed by a producer task (iterate_with_deadlines); the consumer waits on
+its queue with the coalescer's remaining budget and receives FLUSH_DUE when it
+runs out.
+
+A stop event passed to iterate_with_deadlines cancels the producer task (the
+agent stream and whatever model call or tool it is awaiting) as soon as it is
+set, and the consumer receives STOP_REQUESTED.
+
+Usage:
+    from streaming.coalescer import TextCoalescer, iterate_with_deadlines, FLUSH_DUE
+
+    coalescer = TextCoalescer.from_env(formatter.create_response_event)
+    async for event in iterate_with_deadlines(agent_stream, coalescer.time_until_flush):
+        if event is FLUSH_DUE:
+            frame = coalescer.flush()
+        ...
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from agent.config.constants import (
+    DEFAULT_SSE_COALESCE_MAX_BYTES,
+    DEFAULT_SSE_COALESCE_MAX_DELAY_MS,
+    EnvVars,
+)
+from agent.config.env import env_float, env_int
+
+# Yielded by iterate_with_deadlines() when the flush budget runs out
+FLUSH_DUE = object()
+
+# Yielded by iterate_with_deadlines() (last item) when its stop event is set
+STOP_REQUESTED = object()
+
+# Producer queue bound (back-pressure on the agent stream)
+_QUEUE_SIZE = 64
+_END = object()
+
+
+class TextDelta(str):
+    """Text chunk that may be coalesced with its neighbours (vs. a ready SSE frame)."""
+    __slots__ = ()
+
+
+class TextCoalescer:
+    """Buffers text deltas and renders them as a single response frame."""
+
+    def __init__(
+        self,
+        create_frame: Callable[[str], bytes],
+        max_delay_ms: float = DEFAULT_SSE_COALESCE_MAX_DELAY_MS,
+        max_bytes: int = DEFAULT_SSE_COALESCE_MAX_BYTES,
+    ):
+        """
+        Args:
+            create_frame: Renders buffered text as an SSE frame
+            max_delay_ms: Age of the oldest buffered delta that triggers a flush (0 = no buffering)
+            max_bytes: Buffered UTF-8 size that triggers a flush
+        """
+        self.create_frame = create_frame
+        self.max_delay = max_delay_ms / 1000
+        self.max_bytes = max_bytes
+
+        self._parts: List[str] = []
+        self._size = 0
+        self._first_at: Optional[float] = None
+
+        self.deltas = 0
+        self.frames = 0
+
+    @classmethod
+    def from_env(cls, create_frame: Callable[[str], bytes]) -> "TextCoalescer":
+        """Create coalescer from environment variables."""
+        return cls(
+            create_frame,
+            max_delay_ms=env_float(EnvVars.SSE_COALESCE_MAX_DELAY_MS, DEFAULT_SSE_COALESCE_MAX_DELAY_MS),
+            max_bytes=env_int(EnvVars.SSE_COALESCE_MAX_BYTES, DEFAULT_SSE_COALESCE_MAX_BYTES),
+        )
+
+    def add(self, text: str) -> Optional[bytes]:
+        """Buffer a delta; returns a frame when a budget is reached."""
+        if not text:
+            return None
+
+        self.deltas += 1
+        self._parts.append(text)
+        self._size += len(text.encode("utf-8"))
+        if self._first_at is None:
+            self._first_at = time.monotonic()
+
+        if self._size >= self.max_bytes or time.monotonic() - self._first_at >= self.max_delay:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[bytes]:
+        """Render and clear the buffer (None when empty)."""
+        if not self._parts:
+            return None
+
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        self._first_at = None
+        self.frames += 1
+        return self.create_frame(text)
+
+    def time_until_flush(self) -> Optional[float]:
+        """Seconds until the time budget runs out (None when the buffer is empty)."""
+        if self._first_at is None:
+            return None
+        return max(0.0, self.max_delay - (time.monotonic() - self._first_at))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Text deltas received vs. response frames emitted."""
+        return {"deltas": self.deltas, "frames": self.frames}
+
+
+async def iterate_with_deadlines(
+    source: AsyncIterator[Any],
+    time_until_flush: Callable[[], Optional[float]],
+    stop_event: Optional[asyncio.Event] = None,
+) -> AsyncIterator[Any]:
+    """
+    Iterate source, yielding FLUSH_DUE whenever time_until_flush() elapses first.
+
+    source runs in its own task (with a copy of the current context) so waiting
+    with a timeout never cancels it mid-step. Exceptions from source are
+    re-raised here; closing this generator cancels the producer task.
+
+    When stop_event is set, the producer is cancelled immediately and
+    STOP_REQUESTED is yielded as the last item.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+
+    async def produce():
+        try:
+            async for event in source:
+                await queue.put((event, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put((_END, e))
+            return
+        await queue.put((_END, None))
+
+    producer = asyncio.create_task(produce())
+
+    async def watch_stop():
+        await stop_event.wait()
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        await queue.put((STOP_REQUESTED, None))  # Wake the consumer
+
+    watcher = asyncio.create_task(watch_stop()) if stop_event is not None else None
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                # Don't drain events queued before the stop
+                yield STOP_REQUESTED
+                return
+
+            timeout = time_until_flush()
+            if timeout is None:
+                event, error = await queue.get()
+            elif timeout <= 0:
+                yield FLUSH_DUE
+                continue
+            else:
+                try:
+                    event, error = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield FLUSH_DUE
+                    continue
+
+            if event is STOP_REQUESTED:
+                yield STOP_REQUESTED
+                return
+            if event is _END:
+                if error is not None:
+                    raise error
+                return
+            yield event
+    finally:
+        tasks = [task for task in (producer, watcher) if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
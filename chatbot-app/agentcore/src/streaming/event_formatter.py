@@ -1,19 +1,66 @@
 import json
 import base64
+import logging
 import os
-from typing import Dict, Any, List, Tuple
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from .blob_store import get_blob_store
+from .sse import INIT_FRAME, encode_event, reasoning_frame, response_frame, thinking_frame
+
+logger = logging.getLogger(__name__)
+
+# Top-level fields that may carry base64 image data in JSON tool results
+IMAGE_FIELDS = ('screenshot', 'image', 'diagram', 'chart', 'visualization', 'figure')
+
+_JSON_OBJECT_START = re.compile(r'\s*\{')
+
+# Marker for payloads that are not valid JSON (json "null" parses to None)
+NOT_JSON = object()
+
+
+class ToolResultPayloads:
+    """
+    Per-result memo of parsed text payloads.
+
+    The formatting steps (Lambda unwrap, content extraction, screenshot
+    extraction, metadata extraction) often look at the same text; each
+    distinct payload is json.loads'ed at most once per tool result.
+    Parsed values are shared between steps and must not be mutated.
+    """
+
+    __slots__ = ("_parsed",)
+
+    def __init__(self):
+        self._parsed: Dict[str, Any] = {}
+
+    def loads(self, text: str) -> Any:
+        """Parsed value of text, or NOT_JSON."""
+        value = self._parsed.get(text, None)
+        if value is None and text not in self._parsed:
+            try:
+                value = json.loads(text)
+            except (json.JSONDecodeError, TypeError):
+                value = NOT_JSON
+            self._parsed[text] = value
+        return value
+
+    def remember(self, text: str, value: Any) -> None:
+        """Record a payload whose parsed value is already known (e.g. text we serialized)."""
+        self._parsed[text] = value
+
+    def forget(self, text: str) -> None:
+        """Drop a payload no later step will look at (frees its parsed value early)."""
+        self._parsed.pop(text, None)
+
 
 class StreamEventFormatter:
     """Handles formatting of streaming events for SSE"""
 
     @staticmethod
-    def format_sse_event(event_data: dict) -> str:
-        """Format event data as Server-Sent Event with proper JSON serialization"""
-        try:
-            return f"data: {json.dumps(event_data)}\n\n"
-        except (TypeError, ValueError) as e:
-            # Fallback for non-serializable objects
-            return f"data: {json.dumps({'type': 'error', 'message': f'Serialization error: {str(e)}'})}\n\n"
+    def format_sse_event(event_data: dict) -> bytes:
+        """Format event data as a Server-Sent Event frame (bytes, see streaming.sse)"""
+        return encode_event(event_data)
     
     @staticmethod
     def extract_final_result_data(final_result) -> Tuple[List[Dict[str, str]], str]:
@@ -47,33 +94,22 @@ class StreamEventFormatter:
         return images, result_text
     
     @staticmethod
-    def create_init_event() -> str:
+    def create_init_event() -> bytes:
         """Create initialization event"""
-        return StreamEventFormatter.format_sse_event({
-            "type": "init",
-            "message": "Initializing..."
-        })
+        return INIT_FRAME
     
     @staticmethod
-    def create_reasoning_event(reasoning_text: str) -> str:
+    def create_reasoning_event(reasoning_text: str) -> bytes:
         """Create reasoning event"""
-        return StreamEventFormatter.format_sse_event({
-            "type": "reasoning",
-            "text": reasoning_text,
-            "step": "thinking"
-        })
+        return reasoning_frame(reasoning_text)
     
     @staticmethod
-    def create_response_event(text: str) -> str:
+    def create_response_event(text: str) -> bytes:
         """Create response event"""
-        return StreamEventFormatter.format_sse_event({
-            "type": "response",
-            "text": text,
-            "step": "answering"
-        })
+        return response_frame(text)
     
     @staticmethod
-    def create_tool_use_event(tool_use: Dict[str, Any]) -> str:
+    def create_tool_use_event(tool_use: Dict[str, Any]) -> bytes:
         """Create tool use event"""
         return StreamEventFormatter.format_sse_event({
             "type": "tool_use",
@@ -83,18 +119,9 @@ class StreamEventFormatter:
         })
     
     @staticmethod
-    def create_tool_result_event(tool_result: Dict[str, Any]) -> str:
-        """Create tool result event - refactored for clarity"""
-        import json
-        import logging
-
-        logger = logging.getLogger(__name__)
-
-        # Debug: Log tool_result structure to see if metadata is present
-        logger.info(f"[DocumentDownload] tool_result keys: {tool_result.keys() if isinstance(tool_result, dict) else 'not a dict'}")
-        if isinstance(tool_result, dict) and "metadata" in tool_result:
-            logger.info(f"[DocumentDownload] metadata found: {tool_result['metadata']}")
-
+    def create_tool_result_event(tool_result: Dict[str, Any], session_id: Optional[str] = None, user_id: Optional[str] = None) -> bytes:
+        """Create tool result event - every text payload is parsed at most once.
+        With a session_id, inline images may be replaced by blob references (see streaming.blob_store)."""
         # Handle case where entire tool_result might be a JSON string (shouldn't happen but defensive)
         if isinstance(tool_result, str):
             try:
@@ -106,207 +133,206 @@ class StreamEventFormatter:
                     "content": [{"text": str(tool_result)}]
                 }
 
+        payloads = ToolResultPayloads()
+
         # Unwrap Lambda response if present (Gateway tools)
-        # Lambda format: content[0].text = "{\"statusCode\":200,\"body\":\"...\"}"
-        if "content" in tool_result and isinstance(tool_result["content"], list):
-            if len(tool_result["content"]) > 0:
-                first_item = tool_result["content"][0]
-                if isinstance(first_item, dict) and "text" in first_item:
-                    text_content = first_item["text"]
-                    # Skip empty or whitespace-only text
-                    if text_content and text_content.strip():
-                        try:
-                            logger.info(f"[Lambda Unwrap] Checking text content (first 200 chars): {text_content[:200]}")
-                            parsed = json.loads(text_content)
-                            if isinstance(parsed, dict) and "statusCode" in parsed and "body" in parsed:
-                                logger.info(f"[Lambda Unwrap] Detected Lambda response, unwrapping...")
-                                body = json.loads(parsed["body"]) if isinstance(parsed["body"], str) else parsed["body"]
-                                logger.info(f"[Lambda Unwrap] Body keys: {body.keys() if isinstance(body, dict) else 'not a dict'}")
-                                if "content" in body:
-                                    # Replace with unwrapped content
-                                    tool_result["content"] = body["content"]
-                                    logger.info(f"[Lambda Unwrap] Successfully unwrapped Lambda response")
-                        except (json.JSONDecodeError, KeyError) as e:
-                            logger.debug(f"[Lambda Unwrap] Not a Lambda response, skipping: {e}")
-                            pass
+        StreamEventFormatter._unwrap_lambda_response(tool_result, payloads)
 
         # 1. Extract all content (text and images) and process Base64
-        result_text, result_images = StreamEventFormatter._extract_all_content(tool_result)
+        result_text, result_images = StreamEventFormatter._extract_all_content(tool_result, payloads)
 
         # 2. Handle storage based on tool type
         StreamEventFormatter._handle_tool_storage(tool_result, result_text)
 
         # 3. Extract metadata from JSON result text (for A2A browser-use-agent)
-        result_text = StreamEventFormatter._extract_metadata_from_json_result(tool_result, result_text)
+        result_text = StreamEventFormatter._extract_metadata_from_json_result(tool_result, result_text, payloads)
 
         # 4. Build and return the event
+        result_images = get_blob_store().offload_images(result_images, session_id, user_id)
         event = StreamEventFormatter._build_tool_result_event(tool_result, result_text, result_images)
 
         return event
-    
+
+    @staticmethod
+    def _unwrap_lambda_response(tool_result: Dict[str, Any], payloads: ToolResultPayloads) -> None:
+        """
+        Replace a Gateway Lambda response with the content it wraps (in place).
+        Lambda format: content[0].text = "{\"statusCode\":200,\"body\":\"...\"}"
+        """
+        content = tool_result.get("content")
+        if not isinstance(content, list) or not content:
+            return
+        first_item = content[0]
+        if not isinstance(first_item, dict) or "text" not in first_item:
+            return
+
+        text_content = first_item["text"]
+        # Only JSON objects can be Lambda responses
+        if not isinstance(text_content, str) or not _JSON_OBJECT_START.match(text_content):
+            return
+
+        parsed = payloads.loads(text_content)
+        if not (isinstance(parsed, dict) and "statusCode" in parsed and "body" in parsed):
+            return
+
+        try:
+            body = json.loads(parsed["body"]) if isinstance(parsed["body"], str) else parsed["body"]
+        except json.JSONDecodeError:
+            return
+        if isinstance(body, dict) and "content" in body:
+            # Replace with unwrapped content; the wrapper is not looked at again
+            tool_result["content"] = body["content"]
+            payloads.forget(text_content)
+            logger.debug("[Lambda Unwrap] Unwrapped Lambda response")
+
     @staticmethod
-    def _extract_all_content(tool_result: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    def _extract_all_content(tool_result: Dict[str, Any], payloads: Optional[ToolResultPayloads] = None) -> Tuple[str, List[Dict[str, str]]]:
         """Extract text content and images from tool result and process Base64"""
+        if payloads is None:
+            payloads = ToolResultPayloads()
+
         # Extract basic content from MCP format
-        result_text, result_images = StreamEventFormatter._extract_basic_content(tool_result)
+        result_text, result_images = StreamEventFormatter._extract_basic_content(tool_result, payloads)
 
         # Process JSON content for screenshots and additional images
-        json_images, cleaned_text = StreamEventFormatter._process_json_content(result_text)
+        json_images, cleaned_text = StreamEventFormatter._process_json_content(result_text, payloads)
         result_images.extend(json_images)
 
         return cleaned_text, result_images
-    
+
     @staticmethod
-    def _extract_basic_content(tool_result: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    def _image_block_to_event_image(image: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """Convert an MCP/Bedrock image block to {"format", "data"} (base64), or None"""
+        if "source" not in image:
+            return None
+        image_source = image["source"]
+        image_data = ""
+
+        if "data" in image_source:
+            image_data = image_source["data"]
+        elif "bytes" in image_source:
+            if isinstance(image_source["bytes"], bytes):
+                image_data = base64.b64encode(image_source["bytes"]).decode('utf-8')
+            else:
+                image_data = str(image_source["bytes"])
+
+        if not image_data:
+            return None
+        return {
+            "format": image.get("format", "png"),
+            "data": image_data
+        }
+
+    @staticmethod
+    def _extract_basic_content(tool_result: Dict[str, Any], payloads: Optional[ToolResultPayloads] = None) -> Tuple[str, List[Dict[str, str]]]:
         """Extract basic text and image content from MCP format"""
-        import base64
-        import json
+        if payloads is None:
+            payloads = ToolResultPayloads()
 
-        result_text = ""
+        text_parts = []
         result_images = []
 
         # Handle case where content might be a JSON string (MCP tools sometimes return stringified JSON)
         if "content" in tool_result and isinstance(tool_result["content"], str):
-            try:
-                parsed_content = json.loads(tool_result["content"])
+            parsed_content = payloads.loads(tool_result["content"])
+            if parsed_content is not NOT_JSON:
                 tool_result = tool_result.copy()
                 tool_result["content"] = parsed_content
-            except json.JSONDecodeError:
-                pass
 
         if "content" in tool_result:
             content = tool_result["content"]
 
-            for idx, item in enumerate(content):
-                if isinstance(item, dict):
-
-                    if "text" in item:
-                        text_content = item["text"]
-
-                        # Check if this text is actually a JSON-stringified response
-                        if text_content.strip().startswith('{'):
-                            try:
-                                parsed_json = json.loads(text_content)
-
-                                if isinstance(parsed_json, dict):
-                                    # Handle Google search results with images (URL-based)
-                                    if "images" in parsed_json and isinstance(parsed_json["images"], list):
-                                        for img in parsed_json["images"]:
-                                            if isinstance(img, dict) and "link" in img:
-                                                result_images.append({
-                                                    "type": "url",
-                                                    "url": img.get("link"),
-                                                    "thumbnail": img.get("thumbnail"),
-                                                    "title": img.get("title", ""),
-                                                    "width": img.get("width", 0),
-                                                    "height": img.get("height", 0)
-                                                })
-
-                                    # Handle A2A tool response format: {"status": "...", "text": "...", "metadata": {...}}
-                                    if "text" in parsed_json:
-                                        result_text += parsed_json["text"]
-                                        # Extract metadata for browserSessionId
-                                        if "metadata" in parsed_json and isinstance(parsed_json["metadata"], dict):
-                                            if "metadata" not in tool_result:
-                                                tool_result["metadata"] = {}
-                                            tool_result["metadata"].update(parsed_json["metadata"])
-                                        continue
-
-                                    # Handle MCP response format: {"status": "...", "content": [...]}
-                                    if "content" in parsed_json and isinstance(parsed_json["content"], list):
-                                        # Recursively process the unwrapped content
-                                        for unwrapped_item in parsed_json["content"]:
-                                            if isinstance(unwrapped_item, dict):
-                                                if "text" in unwrapped_item:
-                                                    result_text += unwrapped_item["text"]
-                                                elif "image" in unwrapped_item and "source" in unwrapped_item["image"]:
-                                                    image_source = unwrapped_item["image"]["source"]
-                                                    image_data = ""
-
-                                                    if "data" in image_source:
-                                                        image_data = image_source["data"]
-                                                    elif "bytes" in image_source:
-                                                        if isinstance(image_source["bytes"], bytes):
-                                                            image_data = base64.b64encode(image_source["bytes"]).decode('utf-8')
-                                                        else:
-                                                            image_data = str(image_source["bytes"])
-
-                                                    if image_data:
-                                                        result_images.append({
-                                                            "format": unwrapped_item["image"].get("format", "png"),
-                                                            "data": image_data
-                                                        })
-                                                elif "document" in unwrapped_item:
-                                                    # Skip document bytes in MCP format too
-                                                    # Document metadata is handled via tool_result["metadata"]
-                                                    pass
-                                        continue
-
-                            except json.JSONDecodeError:
-                                # Fall through to normal text processing
-                                pass
-
-                        # Normal text processing (if not unwrapped)
-                        result_text += text_content
-
-                    elif "image" in item:
-                        if "source" in item["image"]:
-                            image_source = item["image"]["source"]
-                            image_data = ""
-
-                            if "data" in image_source:
-                                image_data = image_source["data"]
-                            elif "bytes" in image_source:
-                                if isinstance(image_source["bytes"], bytes):
-                                    image_data = base64.b64encode(image_source["bytes"]).decode('utf-8')
-                                else:
-                                    image_data = str(image_source["bytes"])
-
-                            if image_data:
-                                result_images.append({
-                                    "format": item["image"].get("format", "png"),
-                                    "data": image_data
-                                })
-
-                    elif "document" in item:
-                        # Handle document content block (Word, Excel, PDF, etc.)
-                        # These are for agent consumption (Bedrock/Claude can read documents)
-                        # Skip bytes from frontend display - metadata is already in tool_result["metadata"]
-                        # Frontend will use metadata to show download button
-                        import logging
-                        doc_logger = logging.getLogger(__name__)
-                        doc_info = item["document"]
-                        doc_name = doc_info.get("name", "unknown")
-                        doc_format = doc_info.get("format", "unknown")
-                        doc_logger.info(f"[Document] Skipping document bytes from frontend display: {doc_name}.{doc_format}")
-                        # Don't add bytes to result_text - they're binary and would show as garbage
-                        # The document metadata (filename, format) is passed via tool_result["metadata"]
-
-        return result_text, result_images
-    
+            for item in content:
+                if not isinstance(item, dict):
+                    continue
+
+                if "text" in item:
+                    text_content = item["text"]
+
+                    # Check if this text is actually a JSON-stringified response
+                    if _JSON_OBJECT_START.match(text_content):
+                        parsed_json = payloads.loads(text_content)
+
+                        if isinstance(parsed_json, dict):
+                            # Handle Google search results with images (URL-based)
+                            if "images" in parsed_json and isinstance(parsed_json["images"], list):
+                                for img in parsed_json["images"]:
+                                    if isinstance(img, dict) and "link" in img:
+                                        result_images.append({
+                                            "type": "url",
+                                            "url": img.get("link"),
+                                            "thumbnail": img.get("thumbnail"),
+                                            "title": img.get("title", ""),
+                                            "width": img.get("width", 0),
+                                            "height": img.get("height", 0)
+                                        })
+
+                            # Handle A2A tool response format: {"status": "...", "text": "...", "metadata": {...}}
+                            if "text" in parsed_json:
+                                text_parts.append(parsed_json["text"])
+                                # Extract metadata for browserSessionId
+                                if "metadata" in parsed_json and isinstance(parsed_json["metadata"], dict):
+                                    if "metadata" not in tool_result:
+                                        tool_result["metadata"] = {}
+                                    tool_result["metadata"].update(parsed_json["metadata"])
+                                continue
+
+                            # Handle MCP response format: {"status": "...", "content": [...]}
+                            if "content" in parsed_json and isinstance(parsed_json["content"], list):
+                                # Process the unwrapped content
+                                for unwrapped_item in parsed_json["content"]:
+                                    if isinstance(unwrapped_item, dict):
+                                        if "text" in unwrapped_item:
+                                            text_parts.append(unwrapped_item["text"])
+                                        elif "image" in unwrapped_item:
+                                            image = StreamEventFormatter._image_block_to_event_image(unwrapped_item["image"])
+                                            if image:
+                                                result_images.append(image)
+                                        # "document" blocks: bytes are skipped, metadata comes via tool_result["metadata"]
+                                continue
+
+                    # Normal text processing (if not unwrapped)
+                    text_parts.append(text_content)
+
+                elif "image" in item:
+                    image = StreamEventFormatter._image_block_to_event_image(item["image"])
+                    if image:
+                        result_images.append(image)
+
+                elif "document" in item:
+                    # Handle document content block (Word, Excel, PDF, etc.)
+                    # These are for agent consumption (Bedrock/Claude can read documents)
+                    # Skip bytes from frontend display - metadata is already in tool_result["metadata"]
+                    # Frontend will use metadata to show download button
+                    doc_info = item["document"]
+                    logger.debug(f"[Document] Skipping document bytes from frontend display: {doc_info.get('name', 'unknown')}.{doc_info.get('format', 'unknown')}")
+
+        # A single text block is returned as-is, so later steps hit the same parsed payload
+        if len(text_parts) == 1:
+            return text_parts[0], result_images
+        return "".join(text_parts), result_images
+
     @staticmethod
-    def _process_json_content(result_text: str) -> Tuple[List[Dict[str, str]], str]:
+    def _process_json_content(result_text: str, payloads: Optional[ToolResultPayloads] = None) -> Tuple[List[Dict[str, str]], str]:
         """Process JSON content to extract screenshots and clean text"""
-        try:
-            import json
-            parsed_result = json.loads(result_text)
-            extracted_images = StreamEventFormatter._extract_images_from_json_response(parsed_result)
-            
-            if extracted_images:
-                cleaned_text = StreamEventFormatter._clean_result_text_for_display(result_text, parsed_result)
-                return extracted_images, cleaned_text
-            else:
-                return [], result_text
-                
-        except (json.JSONDecodeError, TypeError):
+        if payloads is None:
+            payloads = ToolResultPayloads()
+
+        parsed_result = payloads.loads(result_text)
+        if parsed_result is NOT_JSON:
             return [], result_text
-    
+
+        extracted_images = StreamEventFormatter._extract_images_from_json_response(parsed_result)
+        if not extracted_images:
+            return [], result_text
+
+        cleaned_text, cleaned_result = StreamEventFormatter._strip_image_data(result_text, parsed_result)
+        payloads.remember(cleaned_text, cleaned_result)
+        return extracted_images, cleaned_text
+
     @staticmethod
-    def _build_tool_result_event(tool_result: Dict[str, Any], result_text: str, result_images: List[Dict[str, str]]) -> str:
+    def _build_tool_result_event(tool_result: Dict[str, Any], result_text: str, result_images: List[Dict[str, str]]) -> bytes:
         """Build the final tool result event"""
-        import logging
-        logger = logging.getLogger(__name__)
-
         tool_result_data = {
             "type": "tool_result",
             "toolUseId": tool_result.get("toolUseId"),
@@ -321,16 +347,10 @@ class StreamEventFormatter:
             tool_result_data["status"] = tool_result["status"]
 
         # Include metadata if present (e.g., browserSessionId for Live View)
+        # Documents are collected at turn level (event_processor.py) and sent in complete event
         if "metadata" in tool_result:
             tool_result_data["metadata"] = tool_result["metadata"]
 
-            # Documents are collected at turn level (event_processor.py) and sent in complete event
-            # Don't add documents to tool_result event to avoid duplication
-            if "filename" in tool_result["metadata"] and "tool_type" in tool_result["metadata"]:
-                logger.info(f"[DocumentDownload] Document metadata found (will be sent in complete event): {tool_result['metadata']['filename']}")
-
-        logger.info(f"[DocumentDownload] Final tool_result_data keys: {tool_result_data.keys()}")
-
         return StreamEventFormatter.format_sse_event(tool_result_data)
     
 
@@ -340,7 +360,7 @@ class StreamEventFormatter:
         pass
 
     @staticmethod
-    def create_interrupt_event(interrupts: List[Any]) -> str:
+    def create_interrupt_event(interrupts: List[Any]) -> bytes:
         """Create interrupt event for human-in-the-loop workflows
 
         Args:
@@ -365,7 +385,7 @@ class StreamEventFormatter:
         })
 
     @staticmethod
-    def create_complete_event(message: str, images: List[Dict[str, str]] = None, usage: Dict[str, Any] = None) -> str:
+    def create_complete_event(message: str, images: List[Dict[str, str]] = None, usage: Dict[str, Any] = None, session_id: Optional[str] = None, user_id: Optional[str] = None) -> bytes:
         """Create completion event with optional token usage metrics.
         Documents are now fetched by frontend via S3 workspace API."""
         completion_data = {
@@ -373,14 +393,14 @@ class StreamEventFormatter:
             "message": message
         }
         if images:
-            completion_data["images"] = images
+            completion_data["images"] = get_blob_store().offload_images(images, session_id, user_id)
         if usage:
             completion_data["usage"] = usage
 
         return StreamEventFormatter.format_sse_event(completion_data)
     
     @staticmethod
-    def create_error_event(error_message: str) -> str:
+    def create_error_event(error_message: str) -> bytes:
         """Create error event"""
         return StreamEventFormatter.format_sse_event({
             "type": "error",
@@ -388,15 +408,12 @@ class StreamEventFormatter:
         })
     
     @staticmethod
-    def create_thinking_event(message: str = "Processing your request...") -> str:
+    def create_thinking_event(message: str = "Processing your request...") -> bytes:
         """Create thinking event"""
-        return StreamEventFormatter.format_sse_event({
-            "type": "thinking",
-            "message": message
-        })
+        return thinking_frame(message)
 
     @staticmethod
-    def create_metadata_event(metadata: Dict[str, Any]) -> str:
+    def create_metadata_event(metadata: Dict[str, Any]) -> bytes:
         """Create metadata update event (e.g., for browser session during tool execution)"""
         return StreamEventFormatter.format_sse_event({
             "type": "metadata",
@@ -404,7 +421,7 @@ class StreamEventFormatter:
         })
 
     @staticmethod
-    def create_browser_progress_event(content: str, step_number: int) -> str:
+    def create_browser_progress_event(content: str, step_number: int) -> bytes:
         """Create browser progress event for real-time step updates in Browser Modal"""
         return StreamEventFormatter.format_sse_event({
             "type": "browser_progress",
@@ -413,7 +430,7 @@ class StreamEventFormatter:
         })
 
     @staticmethod
-    def create_research_progress_event(content: str, step_number: int) -> str:
+    def create_research_progress_event(content: str, step_number: int) -> bytes:
         """Create research progress event for real-time step updates in Research Agent card"""
         return StreamEventFormatter.format_sse_event({
             "type": "research_progress",
@@ -421,6 +438,17 @@ class StreamEventFormatter:
             "stepNumber": step_number
         })
 
+    @staticmethod
+    def create_tool_progress_event(tool_use_id: str, tool_name: str, input_size: int) -> bytes:
+        """Create tool progress event while a large tool input is still streaming"""
+        return StreamEventFormatter.format_sse_event({
+            "type": "tool_progress",
+            "toolUseId": tool_use_id,
+            "name": tool_name,
+            "inputSize": input_size,
+            "message": f"Preparing {tool_name} ({input_size:,} bytes)"
+        })
+
     @staticmethod
     def _extract_images_from_json_response(response_data):
         """Extract images from any JSON tool response automatically"""
@@ -428,9 +456,7 @@ class StreamEventFormatter:
         
         if isinstance(response_data, dict):
             # Support common image field patterns
-            image_fields = ['screenshot', 'image', 'diagram', 'chart', 'visualization', 'figure']
-            
-            for field in image_fields:
+            for field in IMAGE_FIELDS:
                 if field in response_data and isinstance(response_data[field], dict):
                     img_data = response_data[field]
                     
@@ -438,7 +464,7 @@ class StreamEventFormatter:
                     if img_data.get("available") and "description" in img_data:
                         # This is the new optimized format - no actual image data
                         # Just skip extraction since there's no base64 data to process
-                        print(f"📷 Found optimized screenshot reference: {img_data.get('description')}")
+                        logger.debug(f"[Screenshot] Optimized screenshot reference: {img_data.get('description')}")
                         continue
                     
                     # Handle legacy format with actual base64 data
@@ -457,17 +483,19 @@ class StreamEventFormatter:
     @staticmethod
     def _clean_result_text_for_display(original_text: str, parsed_result: dict) -> str:
         """Clean result text by removing large image data but keeping other information"""
+        return StreamEventFormatter._strip_image_data(original_text, parsed_result)[0]
+
+    @staticmethod
+    def _strip_image_data(original_text: str, parsed_result: dict) -> Tuple[str, Any]:
+        """
+        Replace base64 image fields with a size note; returns (text, cleaned value).
+        Only top-level fields change, so a shallow copy leaves parsed_result untouched.
+        """
         try:
-            import json
-            import copy
-            
-            # Create a copy to avoid modifying the original
-            cleaned_result = copy.deepcopy(parsed_result)
-            
+            cleaned_result = dict(parsed_result)
+
             # Remove large image data fields but keep metadata
-            image_fields = ['screenshot', 'image', 'diagram', 'chart', 'visualization', 'figure']
-            
-            for field in image_fields:
+            for field in IMAGE_FIELDS:
                 if field in cleaned_result and isinstance(cleaned_result[field], dict):
                     if "data" in cleaned_result[field]:
                         # Keep format and size info, remove the large base64 data
@@ -477,58 +505,52 @@ class StreamEventFormatter:
                             "size": f"{data_size} characters",
                             "note": "Image data extracted and displayed separately"
                         }
-            
+
             # Return the cleaned JSON string
-            return json.dumps(cleaned_result, indent=2)
+            return json.dumps(cleaned_result, indent=2), cleaned_result
 
         except Exception as e:
             # If cleaning fails, return the original
-            print(f"Warning: Failed to clean result text: {e}")
-            return original_text
+            logger.warning(f"Failed to clean result text: {e}")
+            return original_text, parsed_result
 
     @staticmethod
-    def _extract_metadata_from_json_result(tool_result: Dict[str, Any], result_text: str) -> str:
+    def _extract_metadata_from_json_result(tool_result: Dict[str, Any], result_text: str, payloads: Optional[ToolResultPayloads] = None) -> str:
         """
         Extract metadata (like browserSessionId) from JSON result text.
         A2A browser-use-agent returns JSON with metadata containing browserSessionId.
         This method parses the result and extracts metadata into tool_result.
         Returns the cleaned result text (without metadata wrapper if extracted).
         """
-        import json
+        if payloads is None:
+            payloads = ToolResultPayloads()
 
-        try:
-            # Try to parse result_text as JSON
-            parsed = json.loads(result_text)
-
-            if isinstance(parsed, dict):
-                # Check for metadata field with browserSessionId
-                if "metadata" in parsed and isinstance(parsed["metadata"], dict):
-                    browser_session_id = parsed["metadata"].get("browserSessionId")
-                    if browser_session_id:
-                        # Add to tool_result metadata
-                        if "metadata" not in tool_result:
-                            tool_result["metadata"] = {}
-                        tool_result["metadata"]["browserSessionId"] = browser_session_id
-                        print(f"[Live View] Extracted browserSessionId from tool result: {browser_session_id}")
-
-                        # Return the actual text content, not the wrapper JSON
-                        if "text" in parsed:
-                            return parsed["text"]
-
-                # Check for browser_session_arn field directly
-                browser_session_arn = parsed.get("browser_session_arn")
-                if browser_session_arn:
+        parsed = payloads.loads(result_text)
+
+        if isinstance(parsed, dict):
+            # Check for metadata field with browserSessionId
+            if "metadata" in parsed and isinstance(parsed["metadata"], dict):
+                browser_session_id = parsed["metadata"].get("browserSessionId")
+                if browser_session_id:
+                    # Add to tool_result metadata
                     if "metadata" not in tool_result:
                         tool_result["metadata"] = {}
-                    tool_result["metadata"]["browserSessionId"] = browser_session_arn
-                    print(f"[Live View] Extracted browser_session_arn from tool result: {browser_session_arn}")
+                    tool_result["metadata"]["browserSessionId"] = browser_session_id
+                    logger.debug(f"[Live View] Extracted browserSessionId from tool result: {browser_session_id}")
 
+                    # Return the actual text content, not the wrapper JSON
                     if "text" in parsed:
                         return parsed["text"]
 
-        except (json.JSONDecodeError, TypeError):
-            # Not JSON, return original
-            pass
+            # Check for browser_session_arn field directly
+            browser_session_arn = parsed.get("browser_session_arn")
+            if browser_session_arn:
+                if "metadata" not in tool_result:
+                    tool_result["metadata"] = {}
+                tool_result["metadata"]["browserSessionId"] = browser_session_arn
+                logger.debug(f"[Live View] Extracted browser_session_arn from tool result: {browser_session_arn}")
 
-        return result_text
+                if "text" in parsed:
+                    return parsed["text"]
 
+        return result_text
@@ -1,9 +1,15 @@
 import asyncio
 import os
-import time
 import logging
 from typing import AsyncGenerator, Dict, Any
+from .coalescer import FLUSH_DUE, STOP_REQUESTED, TextCoalescer, TextDelta, iterate_with_deadlines
+from .blob_store import get_blob_store
 from .event_formatter import StreamEventFormatter
+from .partial_json import JsonCompletenessTracker
+from .xml_tool_parser import XmlToolCallParser
+from agent.config.constants import DEFAULT_TOOL_INPUT_PROGRESS_BYTES, EnvVars
+from agent.config.env import env_int
+from agent.session.token_estimator import IncrementalEstimate
 from agent.stop_signal import get_stop_signal_provider
 
 # OpenTelemetry imports
@@ -29,6 +35,9 @@ class StreamEventProcessor:
         self.tool_use_registry = {}
         self.partial_response_text = ""  # Track partial response for graceful abort
         self.tool_use_started = False  # Track if tool_use has been emitted (to prevent duplicate assistant messages)
+        self._xml_parser = XmlToolCallParser()  # Raw <use_tools> blocks in streamed text
+        self._tool_input_trackers: Dict[str, JsonCompletenessTracker] = {}  # Streaming tool inputs by toolUseId
+        self.tool_input_progress_bytes = env_int(EnvVars.TOOL_INPUT_PROGRESS_BYTES, DEFAULT_TOOL_INPUT_PROGRESS_BYTES)
 
         # Token usage from last completed stream (for metrics)
         self.last_usage = None
@@ -37,10 +46,13 @@ class StreamEventProcessor:
         # This captures inputTokens from the final metadata chunk of each LLM call
         self.last_llm_input_tokens = 0
 
+        # (local estimate of the messages, actual inputTokens) of each LLM call in the stream
+        # Calibrates the pre-turn token estimate of CompactingSessionManager
+        self.llm_call_tokens = []
+        self._call_estimate = IncrementalEstimate()
+
         # Stop signal provider (Strategy pattern - Local or DynamoDB)
         self.stop_signal_provider = get_stop_signal_provider()
-        self.last_stop_check_time = 0
-        self.stop_check_interval = 1.0  # Check every 1 second (configurable)
         self._stop_detected = False  # Cached stop state - once True, stops immediately
 
         # Initialize OpenTelemetry
@@ -78,14 +90,6 @@ class StreamEventProcessor:
         from datetime import datetime
         return datetime.now().isoformat()
 
-    def _should_check_stop_signal(self) -> bool:
-        """Check if enough time has passed to check stop signal (throttling)"""
-        current_time = time.time()
-        if current_time - self.last_stop_check_time >= self.stop_check_interval:
-            self.last_stop_check_time = current_time
-            return True
-        return False
-
     def _check_stop_signal(self) -> bool:
         """Check if stop has been requested for current session."""
         if self._stop_detected:
@@ -108,6 +112,24 @@ class StreamEventProcessor:
             logger.warning(f"[StopSignal] Error: {e}")
             return False
 
+    def _subscribe_stop_signal(self):
+        """Stop event for the current session (None if no session or provider can't notify)"""
+        if not self.current_user_id or not self.current_session_id:
+            return None
+        try:
+            return self.stop_signal_provider.subscribe(self.current_user_id, self.current_session_id)
+        except Exception as e:
+            logger.warning(f"[StopSignal] Error subscribing: {e}")
+            return None
+
+    def _unsubscribe_stop_signal(self, stop_event) -> None:
+        if stop_event is None:
+            return
+        try:
+            self.stop_signal_provider.unsubscribe(self.current_user_id, self.current_session_id, stop_event)
+        except Exception as e:
+            logger.warning(f"[StopSignal] Error unsubscribing: {e}")
+
     def _clear_stop_signal(self) -> None:
         """Clear stop signal after processing"""
         if not self.current_user_id or not self.current_session_id:
@@ -181,69 +203,82 @@ class StreamEventProcessor:
         return None
 
     def _parse_xml_tool_calls(self, text: str) -> list:
-        """Parse raw XML tool calls from Claude response"""
-        import re
-        import json
-        
-        tool_calls = []
-        
-        # Pattern to match <use_tools><invoke name="tool_name"><parameter name="param">value</parameter></invoke></use_tools>
-        use_tools_pattern = r'<use_tools>(.*?)</use_tools>'
-        invoke_pattern = r'<invoke name="([^"]+)">(.*?)</invoke>'
-        parameter_pattern = r'<parameter name="([^"]+)">([^<]*)</parameter>'
-        
-        # Find all use_tools blocks
-        use_tools_matches = re.findall(use_tools_pattern, text, re.DOTALL)
-        
-        for use_tools_content in use_tools_matches:
-            # Find all invoke blocks within this use_tools block
-            invoke_matches = re.findall(invoke_pattern, use_tools_content, re.DOTALL)
-            
-            for tool_name, parameters_content in invoke_matches:
-                # Parse parameters
-                parameter_matches = re.findall(parameter_pattern, parameters_content, re.DOTALL)
-                
-                # Build input dictionary
-                tool_input = {}
-                for param_name, param_value in parameter_matches:
-                    # Try to parse as JSON if it looks like structured data
-                    param_value = param_value.strip()
-                    if param_value.startswith('{') or param_value.startswith('['):
-                        try:
-                            tool_input[param_name] = json.loads(param_value)
-                        except json.JSONDecodeError:
-                            tool_input[param_name] = param_value
-                    else:
-                        tool_input[param_name] = param_value
-                
-                # Create tool call object
-                tool_call = {
-                    "name": tool_name,
-                    "input": tool_input
-                }
-                
-                tool_calls.append(tool_call)
-        
-        return tool_calls
-    
+        """Parse raw XML tool calls from a complete Claude response"""
+        parser = XmlToolCallParser()
+        segments = parser.feed(text) + parser.flush()
+        return [segment for segment in segments if isinstance(segment, dict)]
+
     def _remove_xml_tool_calls(self, text: str) -> str:
-        """Remove XML tool call blocks from text, leaving any other content"""
+        """Remove XML tool call blocks from a complete text, leaving any other content"""
         import re
-        
-        # Pattern to match entire <use_tools>...</use_tools> blocks
-        use_tools_pattern = r'<use_tools>.*?</use_tools>'
-        
-        # Remove all use_tools blocks
-        cleaned_text = re.sub(use_tools_pattern, '', text, flags=re.DOTALL)
-        
+
+        parser = XmlToolCallParser()
+        segments = parser.feed(text) + parser.flush()
+        cleaned_text = "".join(segment for segment in segments if isinstance(segment, str))
+
         # Clean up extra whitespace
         cleaned_text = re.sub(r'\n\s*\n', '\n\n', cleaned_text)  # Collapse multiple newlines
-        cleaned_text = cleaned_text.strip()
-        
-        return cleaned_text
+        return cleaned_text.strip()
+
+    def _register_xml_tool_call(self, tool_call: Dict[str, Any]):
+        """Register a tool call parsed from response text; returns its tool_use frame (None if duplicate)"""
+        # Generate proper tool_use_id if not present
+        if not tool_call.get("toolUseId"):
+            tool_call["toolUseId"] = f"tool_{tool_call['name']}_{self._get_current_timestamp().replace(':', '').replace('-', '').replace('.', '')}"
+
+        # Check for duplicates
+        tool_use_id = tool_call["toolUseId"]
+        if not tool_use_id or tool_use_id in self.seen_tool_uses:
+            return None
+        self.seen_tool_uses.add(tool_use_id)
+
+        # Register tool info with session_id
+        self.tool_use_registry[tool_use_id] = {
+            'tool_name': tool_call["name"],
+            'tool_use_id': tool_use_id,
+            'session_id': self.current_session_id,
+            'input': tool_call.get("input", {})
+        }
+
+        self.tool_use_started = True  # Mark that tool_use was emitted
+        return self.formatter.create_tool_use_event(tool_call)
 
-    async def process_stream(self, agent, message: str, file_paths: list = None, session_id: str = None, invocation_state: dict = None) -> AsyncGenerator[str, None]:
-        """Process streaming events from agent with proper error handling and event separation"""
+    async def process_stream(self, agent, message: str, file_paths: list = None, session_id: str = None, invocation_state: dict = None) -> AsyncGenerator[bytes, None]:
+        """Process streaming events from agent, coalescing text deltas into fewer SSE frames"""
+        coalescer = TextCoalescer.from_env(self.formatter.create_response_event)
+        self._text_coalescer = coalescer
+
+        events = self._process_events(agent, message, file_paths, session_id, invocation_state)
+        try:
+            async for item in events:
+                if isinstance(item, TextDelta):
+                    frame = coalescer.add(item)
+                elif item is FLUSH_DUE:
+                    frame = coalescer.flush()
+                else:
+                    # Non-text events go out immediately, after any buffered text
+                    pending = coalescer.flush()
+                    if pending:
+                        yield pending
+                    frame = item
+
+                if frame:
+                    yield frame
+
+            pending = coalescer.flush()
+            if pending:
+                yield pending
+        finally:
+            # Client disconnect: let the inner generator save the partial response
+            await events.aclose()
+            logger.debug(f"[SSE] Coalesced text: {coalescer.get_stats()}")
+
+    async def _process_events(self, agent, message: str, file_paths: list = None, session_id: str = None, invocation_state: dict = None) -> AsyncGenerator[Any, None]:
+        """Process streaming events from agent with proper error handling and event separation.
+
+        Yields ready SSE frames, TextDelta chunks (coalesced by process_stream)
+        and FLUSH_DUE when the coalescer's time budget runs out.
+        """
 
         # Store current session ID and invocation_state for tools to use
         self.current_session_id = session_id
@@ -254,11 +289,11 @@ class StreamEventProcessor:
 
 
         # Reset stop signal state for this stream
-        self.last_stop_check_time = 0
         self._stop_detected = False
 
-        # Reset seen tool uses for each new stream
+        # Reset seen tool uses for each new stream (a pooled agent keeps its processor)
         self.seen_tool_uses.clear()
+        self.tool_use_registry.clear()
 
         # Reset partial response tracking for this stream
         self.partial_response_text = ""
@@ -266,8 +301,14 @@ class StreamEventProcessor:
         # Reset tool_use tracking flag
         self.tool_use_started = False
 
+        # Reset incremental XML tool call parser and tool input trackers
+        self._xml_parser.reset()
+        self._tool_input_trackers.clear()
+
         # Reset last LLM input tokens for this stream
         self.last_llm_input_tokens = 0
+        self.llm_call_tokens = []
+        self._call_estimate = IncrementalEstimate()
 
         # Add stream-level deduplication
         # Handle both string and list (multimodal) messages
@@ -291,6 +332,8 @@ class StreamEventProcessor:
             return
 
         stream_iterator = None
+        events = None
+        stop_event = None
         stream_completed_normally = False  # Track if stream completed without interruption
         try:
             multimodal_message = self._create_multimodal_message(message, file_paths)
@@ -307,9 +350,31 @@ class StreamEventProcessor:
             # Documents are now fetched by frontend via S3 workspace API
             # No longer need to track documents in backend
 
-            async for event in stream_iterator:
-                # Check stop signal periodically (throttled to reduce DB calls)
-                if self._check_stop_signal():
+            # Wake up as soon as a stop is requested (None: provider can only be polled)
+            stop_event = self._subscribe_stop_signal()
+
+            # Agent stream runs in a producer task so buffered text can be flushed on time;
+            # a stop cancels that task (model call / in-flight tool) immediately
+            coalescer = getattr(self, '_text_coalescer', None)
+            events = iterate_with_deadlines(
+                stream_iterator,
+                coalescer.time_until_flush if coalescer else lambda: None,
+                stop_event=stop_event
+            )
+
+            async for event in events:
+                if event is FLUSH_DUE:
+                    yield FLUSH_DUE
+                    continue
+
+                if event is STOP_REQUESTED:
+                    logger.debug(f"[StopSignal] Stream cancelled for session {session_id}")
+                    self._stop_detected = True
+                    self._clear_stop_signal()
+                    raise StopRequestedException("Stop requested by user")
+
+                # Poll only when the provider can't notify us
+                if stop_event is None and self._check_stop_signal():
                     logger.debug(f"[StopSignal] Stopping stream for session {session_id}")
                     self._clear_stop_signal()
                     raise StopRequestedException("Stop requested by user")
@@ -331,6 +396,11 @@ class StreamEventProcessor:
 
                 # Handle final result
                 if "result" in event:
+                    # Release text held back as a possible <use_tools> prefix
+                    for segment in self._xml_parser.flush():
+                        if isinstance(segment, str):
+                            yield TextDelta(segment)
+
                     logger.info("[Final Result] Received final result event from agent")
                     final_result = event["result"]
                     logger.info(f"[Final Result] stop_reason={getattr(final_result, 'stop_reason', 'NO_ATTR')}, has_interrupts={hasattr(final_result, 'interrupts')}")
@@ -342,7 +412,7 @@ class StreamEventProcessor:
 
                             # Send interrupt event to frontend
                             interrupt_event = self.formatter.create_interrupt_event(final_result.interrupts)
-                            logger.info(f"[Interrupt] Created interrupt event: {interrupt_event[:200]}")
+                            logger.info(f"[Interrupt] Created interrupt event for ids: {[interrupt.id for interrupt in final_result.interrupts]}")
                             yield interrupt_event
                             # FIX: Don't return here! Let the stream continue so agent's finally block runs
                             # This ensures AfterInvocationEvent fires and interrupt state gets saved
@@ -392,7 +462,10 @@ class StreamEventProcessor:
 
                     # Documents are fetched by frontend via S3 workspace API - no longer sent from backend
                     logger.debug(f"[Final Result] Emitting complete event and closing stream")
-                    yield self.formatter.create_complete_event(result_text, images, usage)
+                    yield await self._format_off_loop(
+                        self.formatter.create_complete_event, result_text, images, usage,
+                        session_id=self.current_session_id, user_id=self.current_user_id
+                    )
                     logger.debug(f"[Final Result] Complete event emitted, stream ended")
                     stream_completed_normally = True
                     return
@@ -410,49 +483,22 @@ class StreamEventProcessor:
                     self.partial_response_text += text_data
 
                     # Check stop signal before yielding response (fast path using cached flag)
-                    if self._check_stop_signal():
+                    if stop_event is None and self._check_stop_signal():
                         logger.debug(f"Stopping stream for session {session_id}")
                         self._clear_stop_signal()
                         raise StopRequestedException("Stop requested by user")
 
-                    # Check if this is a raw XML tool call that needs parsing
-                    tool_calls = self._parse_xml_tool_calls(text_data)
-                    if tool_calls:
-                        # Process each tool call as proper tool events
-                        for tool_call in tool_calls:
-                            # Generate proper tool_use_id if not present
-                            if not tool_call.get("toolUseId"):
-                                tool_call["toolUseId"] = f"tool_{tool_call['name']}_{self._get_current_timestamp().replace(':', '').replace('-', '').replace('.', '')}"
-
-                            # Check for duplicates
-                            tool_use_id = tool_call["toolUseId"]
-                            if tool_use_id and tool_use_id not in self.seen_tool_uses:
-                                self.seen_tool_uses.add(tool_use_id)
-
-                                # Register tool info with session_id
-                                self.tool_use_registry[tool_use_id] = {
-                                    'tool_name': tool_call["name"],
-                                    'tool_use_id': tool_use_id,
-                                    'session_id': self.current_session_id,
-                                    'input': tool_call.get("input", {})
-                                }
-
-                                # Emit tool_use event
-                                yield self.formatter.create_tool_use_event(tool_call)
-                                self.tool_use_started = True  # Mark that tool_use was emitted
-
-                                await asyncio.sleep(0.1)
+                    # Raw XML tool calls may be split across deltas; the incremental
+                    # parser passes plain text through and emits completed calls in order
+                    for segment in self._xml_parser.feed(text_data):
+                        if isinstance(segment, str):
+                            # Regular text response (coalesced into fewer frames by process_stream)
+                            yield TextDelta(segment)
+                        else:
+                            frame = self._register_xml_tool_call(segment)
+                            if frame:
+                                yield frame
 
-                        # Remove the XML from the text and send the remaining as regular response
-                        cleaned_text = self._remove_xml_tool_calls(text_data)
-                        if cleaned_text.strip():
-                            yield self.formatter.create_response_event(cleaned_text)
-                    else:
-                        # Regular text response
-                        yield self.formatter.create_response_event(text_data)
-                        # Small delay to allow progress events to be processed
-                        await asyncio.sleep(0.02)
-                
                 # Handle callback events - ignore current_tool_use from delta events
                 elif event.get("callback"):
                     callback_data = event["callback"]
@@ -478,28 +524,29 @@ class StreamEventProcessor:
                         logger.debug(f"[Tool Use Event] Empty input for {tool_name} - emitting for frontend to show preparing state")
                         should_process = True
                         processed_input = {}
+                    elif isinstance(tool_input, dict):
+                        # Already parsed
+                        should_process = True
+                        processed_input = tool_input
+                        logger.debug(f"[Tool Use Event] Dict input received for {tool_name} - keys: {list(tool_input.keys())}")
+                    elif isinstance(tool_input, str):
+                        # Accumulated JSON string: scan only the new suffix, parse once it closes
+                        tracker = self._tool_input_trackers.get(tool_use_id)
+                        if tracker is None:
+                            tracker = self._tool_input_trackers[tool_use_id] = JsonCompletenessTracker()
+
+                        if tracker.update(tool_input):
+                            should_process = True
+                            processed_input = tracker.value
+                            logger.debug(f"[Tool Use Event] Parsed input for {tool_name} - keys: {list(processed_input.keys()) if isinstance(processed_input, dict) else 'not a dict'}")
+                        elif self.tool_input_progress_bytes > 0 and tool_use_id:
+                            # Input is still incomplete (streaming in progress) - report size for large inputs
+                            step = len(tool_input) // self.tool_input_progress_bytes
+                            if step > tracker.progress_mark:
+                                tracker.progress_mark = step
+                                yield self.formatter.create_tool_progress_event(tool_use_id, tool_name, len(tool_input))
                     else:
-                        # Check if input is valid JSON (complete)
-                        try:
-                            import json
-                            # Handle case where input might already be parsed
-                            if isinstance(tool_input, str):
-                                parsed_input = json.loads(tool_input)
-                                should_process = True
-                                processed_input = parsed_input  # Use parsed input
-                                logger.debug(f"[Tool Use Event] Parsed input for {tool_name} - keys: {list(parsed_input.keys()) if isinstance(parsed_input, dict) else 'not a dict'}")
-                            elif isinstance(tool_input, dict):
-                                # Already parsed
-                                should_process = True
-                                processed_input = tool_input
-                                logger.debug(f"[Tool Use Event] Dict input received for {tool_name} - keys: {list(tool_input.keys())}")
-                            else:
-                                should_process = False
-                                logger.debug(f"[Tool Use Event] Unexpected input type: {type(tool_input).__name__}")
-                        except json.JSONDecodeError as e:
-                            # Input is still incomplete (streaming in progress) - this is normal, skip silently
-                            should_process = False
-                            logger.debug(f"[Tool Use Event] Incomplete input for {tool_name} (streaming): {str(e)[:100]}")
+                        logger.debug(f"[Tool Use Event] Unexpected input type: {type(tool_input).__name__}")
 
                     if should_process and tool_use_id:
                         # Check if this is a new tool or parameter update
@@ -543,8 +590,6 @@ class StreamEventProcessor:
                             yield self.formatter.create_tool_use_event(tool_use_copy)
                             self.tool_use_started = True  # Mark that tool_use was emitted
 
-                            await asyncio.sleep(0.1)
-                
                 # Handle tool streaming events (from async generator tools)
                 elif event.get("tool_stream_event"):
                     tool_stream = event["tool_stream_event"]
@@ -616,7 +661,11 @@ class StreamEventProcessor:
                             # Update last LLM input tokens (overwrite, not accumulate)
                             # Each LLM call sends metadata at the end, so this captures the most recent call
                             self.last_llm_input_tokens = input_tokens
-                            logger.debug(f"[Metadata] Captured LLM inputTokens: {input_tokens:,}")
+                            # agent.messages is still this call's input (the response is appended after it);
+                            # only messages added or replaced since the previous call are estimated
+                            estimated = self._call_estimate.estimate(getattr(agent, 'messages', None) or [])
+                            self.llm_call_tokens.append((estimated, input_tokens))
+                            logger.debug(f"[Metadata] Captured LLM inputTokens: {input_tokens:,} (estimated {estimated:,})")
 
                 # Handle tool results from message events
                 elif event.get("message"):
@@ -624,6 +673,11 @@ class StreamEventProcessor:
                     async for result in self._process_message_event(event):
                         yield result
 
+            # Stream ended without a result event: release held-back text
+            for segment in self._xml_parser.flush():
+                if isinstance(segment, str):
+                    yield TextDelta(segment)
+
         except StopRequestedException:
             self._save_partial_response(agent, session_id)
             yield self.formatter.create_complete_event("Stream stopped by user")
@@ -650,7 +704,7 @@ class StreamEventProcessor:
                     "status": "error",
                     "content": [{"text": f"Tool execution failed: {str(e)}"}]
                 }
-                yield self.formatter.create_tool_result_event(error_tool_result)
+                yield self.formatter.create_tool_result_event(error_tool_result, self.current_session_id, self.current_user_id)
             else:
                 # No pending tool, emit as error event (chat message)
                 yield self.formatter.create_error_event(f"Sorry, I encountered an error: {str(e)}")
@@ -659,6 +713,12 @@ class StreamEventProcessor:
             if not stream_completed_normally:
                 self._save_partial_response(agent, session_id)
 
+            # Stop the producer task before closing the agent stream
+            if events is not None:
+                await events.aclose()
+
+            self._unsubscribe_stop_signal(stop_event)
+
             if stream_iterator and hasattr(stream_iterator, 'aclose'):
                 try:
                     await stream_iterator.aclose()
@@ -668,7 +728,7 @@ class StreamEventProcessor:
             if hasattr(self, '_active_streams'):
                 self._active_streams.discard(stream_id)
     
-    async def _process_message_event(self, event: Dict[str, Any]) -> AsyncGenerator[str, None]:
+    async def _process_message_event(self, event: Dict[str, Any]) -> AsyncGenerator[bytes, None]:
         """Process message events that may contain tool results"""
         message_obj = event["message"]
 
@@ -702,9 +762,9 @@ class StreamEventProcessor:
                             "status": "error",
                             "content": [{"text": f"Error processing tool result: {str(e)}"}]
                         }
-                        yield self.formatter.create_tool_result_event(error_tool_result)
+                        yield self.formatter.create_tool_result_event(error_tool_result, self.current_session_id, self.current_user_id)
 
-    async def _process_single_tool_result(self, tool_result: Dict[str, Any], tool_use_id: str) -> AsyncGenerator[str, None]:
+    async def _process_single_tool_result(self, tool_result: Dict[str, Any], tool_use_id: str) -> AsyncGenerator[bytes, None]:
         """Process a single tool result with proper error handling"""
         # Note: browserSessionId is now handled via tool stream events (immediate)
         # No need to extract from tool result (too late)
@@ -713,10 +773,10 @@ class StreamEventProcessor:
         if tool_use_id:
             try:
                 from utils.tool_execution_context import tool_context_manager
-                context = tool_context_manager.get_context(tool_use_id)
-                if context:
+                tool_context = tool_context_manager.get_context(tool_use_id)
+                if tool_context:
                     # Set as current context during result processing
-                    tool_context_manager.set_current_context(context)
+                    tool_context_manager.set_current_context(tool_context)
 
                     # Add browser session metadata from invocation_state (for Live View)
                     self._add_browser_metadata(tool_result)
@@ -726,7 +786,7 @@ class StreamEventProcessor:
 
                     # Process the tool result
                     logger.debug(f"[Tool Result] Emitting tool_result event for {tool_use_id}")
-                    yield self.formatter.create_tool_result_event(tool_result)
+                    yield await self._format_off_loop(self.formatter.create_tool_result_event, tool_result, self.current_session_id, self.current_user_id)
 
                     # Clean up context after processing
                     tool_context_manager.clear_current_context()
@@ -739,7 +799,7 @@ class StreamEventProcessor:
                     self._collect_document_info(tool_result)
 
                     logger.debug(f"[Tool Result] Emitting tool_result event for {tool_use_id} (no context)")
-                    yield self.formatter.create_tool_result_event(tool_result)
+                    yield await self._format_off_loop(self.formatter.create_tool_result_event, tool_result, self.current_session_id, self.current_user_id)
             except ImportError:
                 # Add browser session metadata even if import fails
                 self._add_browser_metadata(tool_result)
@@ -748,13 +808,24 @@ class StreamEventProcessor:
                 self._collect_document_info(tool_result)
 
                 logger.debug(f"[Tool Result] Emitting tool_result event for {tool_use_id} (without tool_context_manager)")
-                yield self.formatter.create_tool_result_event(tool_result)
+                yield await self._format_off_loop(self.formatter.create_tool_result_event, tool_result, self.current_session_id, self.current_user_id)
         else:
             # Collect documents from tool result (for complete event)
             self._collect_document_info(tool_result)
 
             logger.debug(f"[Tool Result] Emitting tool_result event (no tool_use_id)")
-            yield self.formatter.create_tool_result_event(tool_result)
+            yield await self._format_off_loop(self.formatter.create_tool_result_event, tool_result, self.current_session_id, self.current_user_id)
+
+    @staticmethod
+    async def _format_off_loop(format_event, *args, **kwargs) -> bytes:
+        """
+        Format an event that may carry images. With the blob transport each image
+        gets a Pillow preview (decode + thumbnail), which runs in a worker thread
+        so large screenshots don't stall the other streams on the event loop.
+        """
+        if not get_blob_store().enabled:
+            return format_event(*args, **kwargs)
+        return await asyncio.to_thread(format_event, *args, **kwargs)
 
     def _add_browser_metadata(self, tool_result: Dict[str, Any]) -> None:
         """Add browser session metadata to tool result if available"""
@@ -0,0 +1,136 @@
+"""
+Partial JSON Tracker - Detect when a streamed tool input is complete
+
+Strands re-emits `current_tool_use` for every input delta with the whole
+accumulated JSON string. Calling json.loads on it each time just to find out
+whether it is complete yet costs O(n^2) parse work (and one exception per
+delta) for large inputs such as generated document code.
+
+JsonCompletenessTracker scans only the characters added since the previous
+update, keeping bracket depth and string/escape state, and parses once the
+top-level object or array closes:
+- Plain characters are skipped by a compiled regex (no per-char Python loop)
+- The parse result is cached for the input length it was computed for
+- A shorter input than last time means the input restarted (state is reset)
+
+Usage:
+    from streaming.partial_json import JsonCompletenessTracker
+
+    tracker = JsonCompletenessTracker()
+    for accumulated in deltas:
+        if tracker.update(accumulated):
+            tool_input = tracker.value
+"""
+
+import json
+import re
+from typing import Any
+
+# Characters that change scanner state outside / inside a string
+_STRUCTURE_PATTERN = re.compile(r'[{}\[\]"]')
+_STRING_PATTERN = re.compile(r'["\\]')
+_NON_SPACE_PATTERN = re.compile(r'\S')
+
+_UNSET = object()
+
+
+class JsonCompletenessTracker:
+    """Incremental bracket/string-state scanner for one accumulating JSON text."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all scanner state (new input)."""
+        self._pos = 0               # Next index to scan
+        self._seen = 0              # Length of the last update
+        self._depth = 0
+        self._in_string = False
+        self._started = False       # First '{' or '[' seen
+        self._scalar = False        # Top-level value is not a container
+        self._closed_at = -1        # Index after the closing top-level bracket
+        self._parsed_len = -1       # Input length the cached value belongs to
+        self._value: Any = _UNSET
+        self.progress_mark = 0      # Last progress step reported for this input (owner-managed)
+
+    @property
+    def value(self) -> Any:
+        """Parsed input of the last complete update (None if it never completed)."""
+        return None if self._value is _UNSET else self._value
+
+    def update(self, text: str) -> bool:
+        """Scan the new suffix of the accumulated text; True once it parses as complete JSON."""
+        if len(text) < self._seen:
+            self.reset()
+        self._seen = len(text)
+
+        if self._parsed_len == len(text):
+            return self._value is not _UNSET
+
+        if self._closed_at == -1 and not self._scalar:
+            self._scan(text)
+
+        if self._scalar:
+            # Top-level string/number/literal: rare, fall back to a full parse
+            return self._parse(text)
+
+        if self._closed_at == -1:
+            return False
+
+        return self._parse(text)
+
+    def _parse(self, text: str) -> bool:
+        self._parsed_len = len(text)
+        try:
+            self._value = json.loads(text)
+            return True
+        except json.JSONDecodeError:
+            self._value = _UNSET
+            return False
+
+    def _scan(self, text: str) -> None:
+        pos = self._pos
+        end = len(text)
+
+        if not self._started:
+            first = _NON_SPACE_PATTERN.search(text, pos)
+            if first is None:
+                self._pos = end
+                return
+            if text[first.start()] not in "{[":
+                self._scalar = True
+                return
+            self._started = True
+            pos = first.start()
+
+        while pos < end:
+            if self._in_string:
+                match = _STRING_PATTERN.search(text, pos)
+                if match is None:
+                    pos = end
+                    break
+                if match.group() == "\\":
+                    # Skip the escaped character (may not have arrived yet)
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURE_PATTERN.search(text, pos)
+            if match is None:
+                pos = end
+                break
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._closed_at = pos
+                    break
+
+        self._pos = pos
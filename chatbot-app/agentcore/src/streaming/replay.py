@@ -0,0 +1,391 @@
+"""
+Stream Replay - Resumable SSE streams with Last-Event-ID
+
+A BFF or CloudFront blip during a long turn (research agent, swarm, compose)
+used to cancel the run with the connection; the client had to re-invoke, which
+re-ran the model and tool calls.
+
+The agent stream now runs in its own producer task, decoupled from the HTTP
+response that reads it:
+- Every frame gets an `id: <run>-<n>` line: a token of the run plus a
+  monotonically increasing counter (for chat, swarm and compose alike), so an
+  id from an earlier run of the session is never mistaken for one of the
+  current run
+- The newest frames are kept in a ring buffer bounded by count and bytes
+- A reconnect with the last id it received attaches to the still-running
+  producer: missed frames are replayed, then new ones follow live
+- When no client is attached for grace_seconds the producer is cancelled,
+  which runs the usual partial-response save (stop / disconnect path). The
+  BFF resumes with the last id it forwarded when its AgentCore connection drops
+- A finished stream stays resumable for retain_seconds
+
+Usage:
+    from streaming.replay import get_stream_replay_registry
+
+    registry = get_stream_replay_registry()
+    stream = registry.start(session_id, user_id, agent_stream)
+    return StreamingResponse(stream.subscribe())
+
+    # Reconnect (action="resume" / Last-Event-ID header)
+    stream = registry.get(session_id, user_id)
+    return StreamingResponse(stream.subscribe(stream.sequence_of(last_event_id)))
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Tuple
+
+from agent.config.constants import (
+    DEFAULT_SSE_REPLAY_MAX_BYTES,
+    DEFAULT_SSE_REPLAY_MAX_EVENTS,
+    DEFAULT_SSE_REPLAY_RETAIN_SECONDS,
+    DEFAULT_SSE_RESUME_GRACE_SECONDS,
+    EnvVars,
+)
+from agent.config.env import env_float, env_int
+from agent.config.singleton import process_singleton
+
+logger = logging.getLogger(__name__)
+
+
+def with_event_id(event_id: str, frame: Any) -> bytes:
+    """Prefix an SSE frame with its `id:` line."""
+    if isinstance(frame, str):
+        frame = frame.encode("utf-8")
+    return b"id: " + event_id.encode("ascii") + b"\n" + frame
+
+
+def parse_event_id(event_id: str) -> Tuple[str, int]:
+    """Split an `id:` value into (run token, counter); ValueError when malformed."""
+    run_id, _, sequence = event_id.strip().rpartition("-")
+    if not run_id:
+        raise ValueError(f"Invalid event id: {event_id!r}")
+    return run_id, int(sequence)
+
+
+class ResumableStream:
+    """One agent run: producer task, id counter, ring buffer and attached readers."""
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: Optional[str],
+        source: AsyncGenerator,
+        max_events: int = DEFAULT_SSE_REPLAY_MAX_EVENTS,
+        max_bytes: int = DEFAULT_SSE_REPLAY_MAX_BYTES,
+        grace_seconds: float = DEFAULT_SSE_RESUME_GRACE_SECONDS,
+    ):
+        """
+        Args:
+            session_id: Session the run belongs to
+            user_id: Owner; resumes by other users are refused
+            source: Agent stream of SSE frames (bytes or str)
+            max_events: Frames kept for replay
+            max_bytes: Bytes kept for replay (the newest frame is always kept)
+            grace_seconds: Time without readers before the run is cancelled
+        """
+        self.session_id = session_id
+        self.user_id = user_id
+        self.run_id = uuid.uuid4().hex[:12]
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+
+        self._source = source
+        self._frames: Deque[Tuple[int, bytes]] = deque()
+        self._buffered_bytes = 0
+        self.last_event_id = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+
+        self._wakeup = asyncio.Event()
+        self._readers = 0
+        self._cancel_handle: Optional[asyncio.TimerHandle] = None
+
+        self.resumes = 0
+        self.replayed = 0
+        self.dropped = 0
+
+        self._task = asyncio.create_task(self._produce())
+
+    @property
+    def readers(self) -> int:
+        return self._readers
+
+    def event_id(self, sequence: int) -> str:
+        """SSE id of the frame with the given counter value."""
+        return f"{self.run_id}-{sequence}"
+
+    def sequence_of(self, event_id: Optional[str]) -> Optional[int]:
+        """
+        Counter value of a Last-Event-ID for subscribe(); 0 when None (replay
+        from the run's first frame). ValueError for a malformed id, LookupError
+        for an id of another run, one this run has not issued, or one whose
+        following frames have already left the buffer.
+        """
+        sequence = 0
+        if event_id is not None:
+            run_id, sequence = parse_event_id(event_id)
+            if run_id != self.run_id or not 0 <= sequence <= self.last_event_id:
+                raise LookupError(f"Event id {event_id} is not part of run {self.run_id}")
+        if sequence + 1 < self.first_event_id:
+            raise LookupError(
+                f"Events {sequence + 1}-{self.first_event_id - 1} of run {self.run_id} are no longer buffered"
+            )
+        return sequence
+
+    @property
+    def first_event_id(self) -> int:
+        """Oldest id still buffered (last_event_id + 1 when the buffer is empty)."""
+        return self._frames[0][0] if self._frames else self.last_event_id + 1
+
+    async def _produce(self) -> None:
+        try:
+            async for frame in self._source:
+                self._publish(frame)
+        except asyncio.CancelledError:
+            logger.info(f"[Replay] Run cancelled for session {self.session_id} (no reader reconnected)")
+        except Exception as e:
+            logger.error(f"[Replay] Stream failed for session {self.session_id}: {e}", exc_info=True)
+        finally:
+            try:
+                # Runs the agent stream's finally blocks (partial response save, pool release)
+                await self._source.aclose()
+            except Exception as e:
+                logger.debug(f"[Replay] Error closing stream: {e}")
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _publish(self, frame: Any) -> None:
+        self.last_event_id += 1
+        framed = with_event_id(self.event_id(self.last_event_id), frame)
+        self._frames.append((self.last_event_id, framed))
+        self._buffered_bytes += len(framed)
+
+        while len(self._frames) > 1 and (
+            len(self._frames) > self.max_events or self._buffered_bytes > self.max_bytes
+        ):
+            _, old = self._frames.popleft()
+            self._buffered_bytes -= len(old)
+            self.dropped += 1
+
+        self._notify()
+
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def _frames_after(self, event_id: int) -> List[Tuple[int, bytes]]:
+        """Buffered frames with an id greater than event_id, oldest first."""
+        pending = []
+        for item in reversed(self._frames):
+            if item[0] <= event_id:
+                break
+            pending.append(item)
+        pending.reverse()
+        return pending
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Yield frames after the counter value last_event_id (all buffered frames
+        when None), then follow the producer until the run ends. Resumes map
+        the client's id through sequence_of() first.
+        """
+        self._attach()
+        if last_event_id is not None:
+            self.resumes += 1
+
+        cursor = last_event_id or 0
+        try:
+            while True:
+                wakeup = self._wakeup
+
+                if cursor + 1 < self.first_event_id and cursor < self.last_event_id:
+                    logger.warning(
+                        f"[Replay] Session {self.session_id}: events {cursor + 1}-{self.first_event_id - 1} "
+                        f"are no longer buffered"
+                    )
+
+                pending = self._frames_after(cursor)
+                if pending:
+                    if last_event_id is not None:
+                        self.replayed += len(pending)
+                        last_event_id = None  # Only the first batch is a replay
+                    for event_id, frame in pending:
+                        cursor = event_id
+                        yield frame
+                    continue
+
+                if self.done:
+                    return
+
+                await wakeup.wait()
+        finally:
+            self._detach()
+
+    def _attach(self) -> None:
+        self._readers += 1
+        if self._cancel_handle is not None:
+            self._cancel_handle.cancel()
+            self._cancel_handle = None
+
+    def _detach(self) -> None:
+        self._readers -= 1
+        if self._readers > 0 or self.done:
+            return
+
+        if self.grace_seconds <= 0:
+            self.cancel()
+            return
+
+        logger.info(
+            f"[Replay] No reader for session {self.session_id} - "
+            f"keeping the run {self.grace_seconds}s for a reconnect"
+        )
+        loop = asyncio.get_running_loop()
+        self._cancel_handle = loop.call_later(self.grace_seconds, self._cancel_if_unattended)
+
+    def _cancel_if_unattended(self) -> None:
+        self._cancel_handle = None
+        if self._readers == 0:
+            self.cancel()
+
+    def cancel(self) -> None:
+        """Cancel the producer (no-op once the run has finished)."""
+        if not self._task.done():
+            self._task.cancel()
+
+    async def wait_closed(self) -> None:
+        """Wait until the producer has finished (including its cleanup)."""
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "last_event_id": self.last_event_id,
+            "buffered": len(self._frames),
+            "buffered_bytes": self._buffered_bytes,
+            "readers": self._readers,
+            "done": self.done,
+        }
+
+
+class StreamReplayRegistry:
+    """Latest resumable stream per session."""
+
+    def __init__(
+        self,
+        max_events: int = DEFAULT_SSE_REPLAY_MAX_EVENTS,
+        max_bytes: int = DEFAULT_SSE_REPLAY_MAX_BYTES,
+        grace_seconds: float = DEFAULT_SSE_RESUME_GRACE_SECONDS,
+        retain_seconds: float = DEFAULT_SSE_REPLAY_RETAIN_SECONDS,
+    ):
+        """
+        Args:
+            max_events: Frames kept per stream (0 disables resumable streams)
+            max_bytes: Bytes kept per stream
+            grace_seconds: Time a run without readers waits for a reconnect
+            retain_seconds: Time a finished stream stays resumable
+        """
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.retain_seconds = retain_seconds
+
+        self._streams: Dict[str, ResumableStream] = {}
+        self._lock = threading.Lock()
+
+        self.started = 0
+        self.resumed = 0
+        self.missed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_events > 0
+
+    @classmethod
+    def from_env(cls) -> "StreamReplayRegistry":
+        """Create registry from environment variables."""
+        return cls(
+            max_events=env_int(EnvVars.SSE_REPLAY_MAX_EVENTS, DEFAULT_SSE_REPLAY_MAX_EVENTS),
+            max_bytes=env_int(EnvVars.SSE_REPLAY_MAX_BYTES, DEFAULT_SSE_REPLAY_MAX_BYTES),
+            grace_seconds=env_float(EnvVars.SSE_RESUME_GRACE_SECONDS, DEFAULT_SSE_RESUME_GRACE_SECONDS),
+            retain_seconds=env_float(EnvVars.SSE_REPLAY_RETAIN_SECONDS, DEFAULT_SSE_REPLAY_RETAIN_SECONDS),
+        )
+
+    def start(self, session_id: str, user_id: Optional[str], source: AsyncGenerator) -> ResumableStream:
+        """Run source in a producer task; it becomes the session's resumable stream."""
+        stream = ResumableStream(
+            session_id,
+            user_id,
+            source,
+            max_events=self.max_events,
+            max_bytes=self.max_bytes,
+            grace_seconds=self.grace_seconds,
+        )
+        with self._lock:
+            self._evict_finished_locked()
+            self._streams[session_id] = stream
+            self.started += 1
+        return stream
+
+    async def supersede(self, session_id: str, user_id: Optional[str]) -> None:
+        """
+        Cancel the session's running stream and wait until its cleanup is done
+        (partial response save, write-behind flush, pool release), so a new
+        turn loads history only after the previous run stopped writing to it.
+        """
+        with self._lock:
+            stream = self._streams.get(session_id)
+        if stream is None or stream.done or stream.user_id != user_id:
+            return
+
+        logger.info(
+            f"[Replay] New turn for session {session_id} - stopping the previous run "
+            f"({stream.readers} reader(s) attached)"
+        )
+        stream.cancel()
+        await stream.wait_closed()
+
+    def get(self, session_id: str, user_id: Optional[str]) -> Optional[ResumableStream]:
+        """Resumable stream of a session, or None (unknown, expired, other user)."""
+        with self._lock:
+            self._evict_finished_locked()
+            stream = self._streams.get(session_id)
+            if stream is None or stream.user_id != user_id:
+                self.missed += 1
+                return None
+            self.resumed += 1
+            return stream
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry counters for health/metrics endpoints."""
+        with self._lock:
+            streams = list(self._streams.values())
+            return {
+                "enabled": self.enabled,
+                "streams": len(streams),
+                "running": sum(1 for stream in streams if not stream.done),
+                "started": self.started,
+                "resumed": self.resumed,
+                "missed": self.missed,
+                "replayed_events": sum(stream.replayed for stream in streams),
+            }
+
+    def _evict_finished_locked(self) -> None:
+        """Drop streams finished more than retain_seconds ago. Caller holds the lock."""
+        cutoff = time.monotonic() - self.retain_seconds
+        for session_id, stream in list(self._streams.items()):
+            if stream.done and stream.finished_at is not None and stream.finished_at <= cutoff:
+                del self._streams[session_id]
+
+
+@process_singleton
+def get_stream_replay_registry() -> StreamReplayRegistry:
+    """Get the process-wide StreamReplayRegistry singleton."""
+    return StreamReplayRegistry.from_env()
@@ -0,0 +1,113 @@
+"""
+SSE Serializer - Encode stream events straight to bytes
+
+Every token-level event used to go through json.dumps into an f-string, and
+Starlette then encoded that str again for the socket. Swarm and Composer events
+were dumped to a dict (model_dump) before json.dumps walked it a second time.
+
+This module is the single encoder for SSE frames:
+- Frames are `bytes` ("data: {...}\\n\\n"), passed to StreamingResponse as-is
+- orjson when installed, stdlib json fallback (same compact output)
+- Pre-built byte templates for the frequent small events (response, reasoning,
+  thinking, init): only the variable text is JSON-encoded
+- Pydantic models serialize directly via pydantic-core, without model_dump()
+
+Non-serializable payloads become an error frame instead of raising, like the
+previous formatter.
+
+Usage:
+    from streaming.sse import encode_event, encode_model, response_frame
+
+    yield response_frame("Hello")                        # b'data: {"type":"response",...}\\n\\n'
+    yield encode_event({"type": "tool_use", ...})
+    yield encode_model(SwarmNodeStartEvent(node_id="coder", ...))
+"""
+
+import json
+from typing import Any, Dict
+
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError, to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+_PREFIX = b"data: "
+_SUFFIX = b"\n\n"
+
+_stdlib_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON encoding as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return _stdlib_encoder.encode(obj).encode("utf-8")
+
+
+def _error_frame(error: Exception) -> bytes:
+    return _PREFIX + dumps({"type": "error", "message": f"Serialization error: {error}"}) + _SUFFIX
+
+
+def encode_event(event_data: Dict[str, Any]) -> bytes:
+    """Encode an event dict as an SSE frame."""
+    try:
+        return _PREFIX + dumps(event_data) + _SUFFIX
+    except (TypeError, ValueError) as e:
+        return _error_frame(e)
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """Encode a Pydantic event model as an SSE frame (no dict round-trip)."""
+    try:
+        return _PREFIX + to_json(model) + _SUFFIX
+    except PydanticSerializationError as e:
+        return _error_frame(e)
+
+
+# =============================================================================
+# Templates for frequent events
+# =============================================================================
+
+_RESPONSE_HEAD = b'data: {"type":"response","text":'
+_RESPONSE_TAIL = b',"step":"answering"}\n\n'
+_REASONING_HEAD = b'data: {"type":"reasoning","text":'
+_REASONING_TAIL = b',"step":"thinking"}\n\n'
+_THINKING_HEAD = b'data: {"type":"thinking","message":'
+_OBJECT_TAIL = b"}\n\n"
+
+INIT_FRAME = encode_event({"type": "init", "message": "Initializing..."})
+DEFAULT_THINKING_MESSAGE = "Processing your request..."
+DEFAULT_THINKING_FRAME = _THINKING_HEAD + dumps(DEFAULT_THINKING_MESSAGE) + _OBJECT_TAIL
+
+
+def response_frame(text: str) -> bytes:
+    """{"type": "response", "text": text, "step": "answering"}"""
+    return _RESPONSE_HEAD + dumps(text) + _RESPONSE_TAIL
+
+
+def reasoning_frame(text: str) -> bytes:
+    """{"type": "reasoning", "text": text, "step": "thinking"}"""
+    return _REASONING_HEAD + dumps(text) + _REASONING_TAIL
+
+
+def thinking_frame(message: str = DEFAULT_THINKING_MESSAGE) -> bytes:
+    """{"type": "thinking", "message": message}"""
+    if message == DEFAULT_THINKING_MESSAGE:
+        return DEFAULT_THINKING_FRAME
+    return _THINKING_HEAD + dumps(message) + _OBJECT_TAIL
+
+
+def parse_frame(frame: bytes) -> Dict[str, Any]:
+    """Decode one SSE frame back into its event dict (tests, replay, logging)."""
+    if isinstance(frame, str):
+        frame = frame.encode("utf-8")
+    if frame.startswith(b"id: "):
+        frame = frame[frame.index(b"\n") + 1:]
+    if frame.startswith(_PREFIX):
+        frame = frame[len(_PREFIX):]
+    return json.loads(frame)
@@ -0,0 +1,138 @@
+"""
+XML Tool Call Parser - Incremental <use_tools> detection in streamed text
+
+Some model responses contain raw XML tool calls in the text stream:
+
+    <use_tools><invoke name="web_search"><parameter name="query">...</parameter></invoke></use_tools>
+
+They used to be found by running three DOTALL regexes over every text delta,
+which costs every plain token a regex scan and misses blocks split across
+deltas (the common case when streaming).
+
+XmlToolCallParser is fed deltas and returns, in order, clean text and
+completed tool calls as soon as they are known:
+- Plain text passes straight through (a single '<' lookup per delta)
+- Only a possible "<use_tools>" prefix at the end of a delta is held back
+- A block is buffered until "</use_tools>" and parsed once
+
+Usage:
+    from streaming.xml_tool_parser import XmlToolCallParser
+
+    parser = XmlToolCallParser()
+    for segment in parser.feed(delta):
+        if isinstance(segment, str):
+            ...  # text
+        else:
+            ...  # {"name": "web_search", "input": {"query": "..."}}
+    for segment in parser.flush():  # end of stream
+        ...
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Union
+
+OPEN_TAG = "<use_tools>"
+CLOSE_TAG = "</use_tools>"
+
+_INVOKE_PATTERN = re.compile(r'<invoke name="([^"]+)">(.*?)</invoke>', re.DOTALL)
+_PARAMETER_PATTERN = re.compile(r'<parameter name="([^"]+)">([^<]*)</parameter>', re.DOTALL)
+
+ToolCall = Dict[str, Any]
+Segment = Union[str, ToolCall]
+
+
+def parse_tool_block(block: str) -> List[ToolCall]:
+    """Parse the content of one <use_tools> block into tool calls."""
+    tool_calls = []
+    for tool_name, parameters_content in _INVOKE_PATTERN.findall(block):
+        tool_input = {}
+        for param_name, param_value in _PARAMETER_PATTERN.findall(parameters_content):
+            # Try to parse as JSON if it looks like structured data
+            param_value = param_value.strip()
+            if param_value.startswith('{') or param_value.startswith('['):
+                try:
+                    tool_input[param_name] = json.loads(param_value)
+                    continue
+                except json.JSONDecodeError:
+                    pass
+            tool_input[param_name] = param_value
+        tool_calls.append({"name": tool_name, "input": tool_input})
+    return tool_calls
+
+
+def _held_prefix_length(text: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of OPEN_TAG."""
+    start = text.rfind("<", max(0, len(text) - len(OPEN_TAG) + 1))
+    if start != -1 and OPEN_TAG.startswith(text[start:]):
+        return len(text) - start
+    return 0
+
+
+class XmlToolCallParser:
+    """Incremental state machine: text <-> inside a <use_tools> block."""
+
+    def __init__(self):
+        self._pending = ""      # Held-back text (possible open tag prefix)
+        self._block = None      # Buffered block content while inside <use_tools>
+
+    @property
+    def in_block(self) -> bool:
+        return self._block is not None
+
+    def feed(self, delta: str) -> List[Segment]:
+        """Consume a text delta; return text and completed tool calls in order."""
+        # Fast path: plain text with nothing held back
+        if self._block is None and not self._pending and "<" not in delta:
+            return [delta] if delta else []
+
+        segments: List[Segment] = []
+        text = self._pending + delta
+        self._pending = ""
+
+        while text:
+            if self._block is None:
+                start = text.find(OPEN_TAG)
+                if start == -1:
+                    held = _held_prefix_length(text)
+                    if held:
+                        self._pending = text[-held:]
+                        text = text[:-held]
+                    if text:
+                        segments.append(text)
+                    break
+
+                if start:
+                    segments.append(text[:start])
+                self._block = ""
+                text = text[start + len(OPEN_TAG):]
+            else:
+                # Only rescan the tail that could complete the close tag
+                search_from = max(0, len(self._block) - len(CLOSE_TAG) + 1)
+                buffered = self._block + text
+                end = buffered.find(CLOSE_TAG, search_from)
+                if end == -1:
+                    self._block = buffered
+                    break
+
+                segments.extend(parse_tool_block(buffered[:end]))
+                self._block = None
+                text = buffered[end + len(CLOSE_TAG):]
+
+        return segments
+
+    def flush(self) -> List[Segment]:
+        """End of stream: release held-back text (an unterminated block is returned as text)."""
+        segments: List[Segment] = []
+        if self._block is not None:
+            segments.append(OPEN_TAG + self._block)
+            self._block = None
+        if self._pending:
+            segments.append(self._pending)
+            self._pending = ""
+        return segments
+
+    def reset(self) -> None:
+        """Drop any buffered state (new stream)."""
+        self._pending = ""
+        self._block = None
@@ -22,10 +22,14 @@ import logging
 import os
 import re
 from datetime import datetime, timezone
-from typing import AsyncGenerator, Optional, Dict, Any, List
+from typing import AsyncGenerator, Optional, Dict, Any, List, Union
+
+from pydantic import BaseModel
 
 from strands import Agent
-from strands.models import BedrockModel
+
+from agent.model_registry import get_model_registry
+from streaming.sse import encode_event, encode_model
 
 from models.composer_schemas import (
     WritingTaskStatus,
@@ -358,7 +362,7 @@ class ComposerWorkflow:
         self,
         user_request: Optional[str] = None,
         confirmation_response: Optional[OutlineConfirmation] = None
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Run the writing workflow.
 
@@ -431,7 +435,7 @@ class ComposerWorkflow:
     async def _handle_outline_confirmation(
         self,
         confirmation: OutlineConfirmation
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Handle outline confirmation and continue workflow.
 
@@ -531,7 +535,7 @@ class ComposerWorkflow:
     async def _task_intake(
         self,
         user_request: str
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Task 1: Extract requirements from user request"""
         self.state.current_task = 1
         self.save_workflow_state()
@@ -543,7 +547,7 @@ class ComposerWorkflow:
             status=WritingTaskStatus.IN_PROGRESS,
             details="Analyzing your writing request..."
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
         # Load conversation history from session
         conversation_context = ""
@@ -574,18 +578,16 @@ class ComposerWorkflow:
                 logger.info(f"[Compose] Created new session_manager: {type(session_manager).__name__}")
 
             # Get recent messages (last 10 for context)
-            logger.info(f"[Compose] Loading messages for session_id={self.session_id}, agent_id=default")
-            messages = session_manager.list_messages(
+            logger.info(f"[Compose] Loading recent messages for session_id={self.session_id}")
+            messages = session_manager.list_recent_messages(
                 session_id=self.session_id,
-                agent_id="default",
-                limit=20  # Get more to filter
+                n=10
             )
             logger.info(f"[Compose] Loaded {len(messages) if messages else 0} messages from session")
 
             if messages:
                 context_lines = ["Previous conversation context:"]
-                # Take last 10 messages for context
-                for i, msg in enumerate(messages[-10:]):
+                for i, msg in enumerate(messages):
                     if hasattr(msg, 'message'):
                         role = msg.message.get('role', '')
                         content = msg.message.get('content', [])
@@ -658,7 +660,7 @@ class ComposerWorkflow:
                 status=WritingTaskStatus.COMPLETED,
                 details=f"Identified: {requirements.document_type} about '{requirements.topic}'"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
         except Exception as e:
             logger.error(f"Failed to parse requirements: {e}")
@@ -672,12 +674,12 @@ class ComposerWorkflow:
                 status=WritingTaskStatus.FAILED,
                 details=str(e)
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
     async def _task_outline(
         self,
         feedback: Optional[str] = None
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Task 2: Generate document outline"""
         self.state.current_task = 2
         self.save_workflow_state()
@@ -689,7 +691,7 @@ class ComposerWorkflow:
             status=WritingTaskStatus.IN_PROGRESS,
             details="Creating document structure..."
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
         req = self.state.requirements
         if not req:
@@ -766,7 +768,7 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.COMPLETED,
                 details=f"Created outline with {len(outline.sections)} sections"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
         except Exception as e:
             logger.error(f"Failed to parse outline: {e}")
@@ -780,9 +782,9 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.FAILED,
                 details=str(e)
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
-    async def _task_confirm(self) -> AsyncGenerator[str, None]:
+    async def _task_confirm(self) -> AsyncGenerator[bytes, None]:
         """Task 3: Request user confirmation on outline"""
         self.state.current_task = 3
         self.state.status = WritingWorkflowStatus.AWAITING_OUTLINE_CONFIRMATION
@@ -795,14 +797,14 @@ Please address this feedback in the revised outline.
             status=WritingTaskStatus.AWAITING_CONFIRMATION,
             details="Waiting for your approval..."
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
         # Yield outline event
         outline_event = WritingOutlineEvent(
             outline=self.state.outline,
             attempt=self.state.outline_attempts
         )
-        yield self._format_sse(outline_event.model_dump())
+        yield self._format_sse(outline_event)
 
         # Yield interrupt event (pauses workflow)
         interrupt_data = {
@@ -820,7 +822,7 @@ Please address this feedback in the revised outline.
         }
         yield self._format_sse(interrupt_data)
 
-    async def _task_body_write(self) -> AsyncGenerator[str, None]:
+    async def _task_body_write(self) -> AsyncGenerator[bytes, None]:
         """Task 4: Write each section content"""
         self.state.current_task = 4
         self.state.status = WritingWorkflowStatus.IN_PROGRESS
@@ -857,7 +859,7 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.IN_PROGRESS,
                 details=f"Writing section {idx + 1}/{len(outline.sections)}: {section.title}"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
             # Build previous context (summaries of previous sections)
             previous_context = "None (this is the first section)"
@@ -921,9 +923,9 @@ Please address this feedback in the revised outline.
             status=WritingTaskStatus.COMPLETED,
             details=f"Completed all {len(outline.sections)} sections"
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
-    async def _task_intro_outro(self) -> AsyncGenerator[str, None]:
+    async def _task_intro_outro(self) -> AsyncGenerator[bytes, None]:
         """Task 5: Write introduction and conclusion"""
         self.state.current_task = 5
         self.save_workflow_state()
@@ -935,7 +937,7 @@ Please address this feedback in the revised outline.
             status=WritingTaskStatus.IN_PROGRESS,
             details="Writing introduction and conclusion..."
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
         req = self.state.requirements
         outline = self.state.outline
@@ -980,7 +982,7 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.COMPLETED,
                 details="Introduction and conclusion ready"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
         except Exception as e:
             logger.error(f"Failed to parse intro/outro: {e}")
@@ -994,9 +996,9 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.FAILED,
                 details=str(e)
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
-    async def _task_review(self) -> AsyncGenerator[str, None]:
+    async def _task_review(self) -> AsyncGenerator[bytes, None]:
         """Task 6: Final review and polish"""
         self.state.current_task = 6
         self.save_workflow_state()
@@ -1008,7 +1010,7 @@ Please address this feedback in the revised outline.
             status=WritingTaskStatus.IN_PROGRESS,
             details="Reviewing and polishing document..."
         )
-        yield self._format_sse(progress.model_dump())
+        yield self._format_sse(progress)
 
         req = self.state.requirements
         outline = self.state.outline
@@ -1055,7 +1057,7 @@ Please address this feedback in the revised outline.
                 word_count=final_word_count,
                 sections_count=len(outline.sections)
             )
-            yield self._format_sse(complete_event.model_dump())
+            yield self._format_sse(complete_event)
 
             # Yield final progress
             progress = WritingProgressEvent(
@@ -1064,7 +1066,7 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.COMPLETED,
                 details=f"Document complete: {final_word_count} words ({review.edit_count} edits applied)"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
             # Yield document content as text event (for message history)
             yield self._format_sse({
@@ -1130,7 +1132,7 @@ Please address this feedback in the revised outline.
                 word_count=word_count,
                 sections_count=len(outline.sections) if outline else 0
             )
-            yield self._format_sse(complete_event.model_dump())
+            yield self._format_sse(complete_event)
 
             # Yield completion progress
             progress = WritingProgressEvent(
@@ -1139,7 +1141,7 @@ Please address this feedback in the revised outline.
                 status=WritingTaskStatus.COMPLETED,
                 details=f"Document complete: {word_count} words (review parsing skipped)"
             )
-            yield self._format_sse(progress.model_dump())
+            yield self._format_sse(progress)
 
             # Yield document content as text event
             yield self._format_sse({
@@ -1155,7 +1157,6 @@ Please address this feedback in the revised outline.
         """Invoke LLM with prompt and return response text"""
         import sys
         import io
-        from botocore.config import Config
 
         # Log the full prompt for debugging
         logger.info("=" * 80)
@@ -1164,20 +1165,15 @@ Please address this feedback in the revised outline.
         logger.info(prompt)
         logger.info("=" * 80)
 
-        retry_config = Config(
-            retries={
-                'max_attempts': 5,
-                'mode': 'adaptive'
-            },
-            connect_timeout=30,
-            read_timeout=120
-        )
-
-        model = BedrockModel(
+        # Shared model/client - avoids a new client and TLS handshake per LLM call
+        model = get_model_registry().get_model(
             model_id=self.model_id,
             temperature=self.temperature,
             max_tokens=8096,
-            boto_client_config=retry_config
+            max_attempts=5,
+            retry_mode="adaptive",
+            connect_timeout=30,
+            read_timeout=120,
         )
 
         # Create a simple agent for LLM invocation (stateless)
@@ -1361,9 +1357,11 @@ Please address this feedback in the revised outline.
 
         raise ValueError(f"Could not extract JSON from response: {text[:200]}...")
 
-    def _format_sse(self, data: dict) -> str:
-        """Format data as SSE event"""
-        return f"data: {json.dumps(data)}\n\n"
+    def _format_sse(self, data: Union[Dict[str, Any], BaseModel]) -> bytes:
+        """Format data as SSE event (Pydantic events serialize without model_dump)"""
+        if isinstance(data, BaseModel):
+            return encode_model(data)
+        return encode_event(data)
 
     def _get_word_target(self, length_guidance: str) -> int:
         """Convert length guidance to word target"""
@@ -7,7 +7,8 @@ Currently supports S3 with plans for additional storage options.
 
 import os
 import logging
-import boto3
+
+from agent.config.parameters import get_ssm_parameter
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +39,7 @@ def get_workspace_bucket() -> str:
         param_name = f"/{project_name}/{environment}/agentcore/document-bucket"
 
         logger.info(f"Checking Parameter Store for Document Bucket: {param_name}")
-        ssm = boto3.client('ssm', region_name=region)
-        response = ssm.get_parameter(Name=param_name)
-        bucket_name = response['Parameter']['Value']
+        bucket_name = get_ssm_parameter(param_name, region)  # Cached per process
         logger.info(f"Found DOCUMENT_BUCKET in Parameter Store: {bucket_name}")
         return bucket_name
     except Exception as e:
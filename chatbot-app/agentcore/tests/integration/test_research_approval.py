@@ -67,10 +67,10 @@ def make_stream_async_mock(items):
     return stream_async
 
 
-def parse_sse_event(event_str: str) -> Dict[str, Any]:
-    """Parse SSE event string to dictionary."""
-    if event_str.startswith("data: "):
-        return json.loads(event_str[6:].strip())
+def parse_sse_event(event_frame: bytes) -> Dict[str, Any]:
+    """Parse SSE event frame to dictionary."""
+    if event_frame.startswith(b"data: "):
+        return json.loads(event_frame[6:].strip())
     return {}
 
 
@@ -113,7 +113,7 @@ class TestResearchInterruptEvent:
             events.append(event)
 
         # Find interrupt event
-        interrupt_events = [e for e in events if '"type": "interrupt"' in e]
+        interrupt_events = [e for e in events if parse_sse_event(e).get("type") == "interrupt"]
         assert len(interrupt_events) == 1
 
         interrupt_event = parse_sse_event(interrupt_events[0])
@@ -140,7 +140,7 @@ class TestResearchInterruptEvent:
         async for event in processor.process_stream(mock_agent, "Browse Amazon", session_id="test_browser"):
             events.append(event)
 
-        interrupt_events = [e for e in events if '"type": "interrupt"' in e]
+        interrupt_events = [e for e in events if parse_sse_event(e).get("type") == "interrupt"]
         assert len(interrupt_events) == 1
 
         interrupt_event = parse_sse_event(interrupt_events[0])
@@ -164,7 +164,7 @@ class TestResearchInterruptEvent:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test"):
             events.append(event)
 
-        interrupt_events = [e for e in events if '"type": "interrupt"' in e]
+        interrupt_events = [e for e in events if parse_sse_event(e).get("type") == "interrupt"]
         interrupt_event = parse_sse_event(interrupt_events[0])
 
         # Reason should contain the plan
@@ -19,6 +19,14 @@ class MockFileContent:
         self.bytes = base64.b64encode(bytes_data).decode()
 
 
+@pytest.fixture(autouse=True)
+def sessions_dir(tmp_path):
+    """Local-mode agents write their session files under tmp_path, not the repo's sessions/."""
+    with patch('agent.agent.Path') as mock_path:
+        mock_path.return_value.parent.parent.parent = tmp_path
+        yield tmp_path
+
+
 class TestBuildPromptLocalMode:
     """Tests for _build_prompt in local mode (no MEMORY_ID)."""
 
@@ -37,17 +45,15 @@ class TestBuildPromptLocalMode:
                             yield ChatbotAgent
 
     @pytest.fixture
-    def local_agent(self, mock_agent_class, tmp_path):
+    def local_agent(self, mock_agent_class):
         """Create agent in local mode."""
         with patch.dict(os.environ, {'NEXT_PUBLIC_AGENTCORE_LOCAL': 'true'}, clear=True):
-            with patch('agent.agent.Path') as mock_path:
-                mock_path.return_value.parent.parent.parent = tmp_path
-                agent = mock_agent_class(
-                    session_id="test_session",
-                    user_id="test_user",
-                    enabled_tools=[]
-                )
-                return agent
+            agent = mock_agent_class(
+                session_id="test_session",
+                user_id="test_user",
+                enabled_tools=[]
+            )
+            return agent
 
     def test_text_only_message(self, local_agent):
         """Test _build_prompt with text only (no files)."""
@@ -0,0 +1,197 @@
+"""
+Unit tests for AgentPool (warm per-session ChatAgent reuse).
+
+Focuses on meaningful logic:
+- Key building (order-insensitive tools, hashed prompt/API keys)
+- Hit / miss / bypass accounting
+- Idle TTL and LRU eviction
+- Release with non-reusable agents
+- Session invalidation and cleanup of evicted agents
+"""
+import os
+import sys
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from agents.pool import AgentPool, build_pool_key
+
+
+def _make_agent(reusable: bool = True):
+    """Create a mock agent exposing the attributes the pool touches."""
+    agent = MagicMock()
+    agent.is_reusable.return_value = reusable
+    return agent
+
+
+@pytest.fixture
+def pool():
+    """Create a pool that treats every agent as poolable."""
+    with patch.object(AgentPool, '_is_poolable', staticmethod(lambda agent: True)):
+        yield AgentPool(max_size=2, idle_ttl_seconds=60)
+
+
+# ============================================================
+# Key Building Tests
+# ============================================================
+
+class TestBuildPoolKey:
+    """Tests for build_pool_key."""
+
+    def test_tool_order_does_not_matter(self):
+        """Same tools in different order produce the same key."""
+        a = build_pool_key("s1", "u1", "m", ["b", "a"])
+        b = build_pool_key("s1", "u1", "m", ["a", "b"])
+        assert a == b
+
+    def test_session_is_first_element(self):
+        """Session ID leads the key (used by invalidate_session)."""
+        key = build_pool_key("s1", "u1", "m", [])
+        assert key[0] == "s1"
+
+    def test_secrets_are_not_stored_verbatim(self):
+        """API keys and system prompt are fingerprinted."""
+        key = build_pool_key("s1", "u1", "m", [], system_prompt="secret prompt",
+                             api_keys={"tavily": "sk-123"})
+        assert "secret prompt" not in key
+        assert all("sk-123" not in str(part) for part in key)
+
+    def test_different_model_different_key(self):
+        """Changing the model misses the pool."""
+        assert build_pool_key("s1", "u1", "m1", []) != build_pool_key("s1", "u1", "m2", [])
+
+
+# ============================================================
+# Acquire / Release Tests
+# ============================================================
+
+class TestAcquireRelease:
+    """Tests for AgentPool.acquire and release."""
+
+    def test_miss_then_hit(self, pool):
+        """Second acquire after release reuses the same agent."""
+        agent = _make_agent()
+        factory = MagicMock(return_value=agent)
+
+        first = pool.acquire(("s1",), factory)
+        pool.release(("s1",), first)
+        second = pool.acquire(("s1",), factory)
+
+        assert first is second
+        factory.assert_called_once()
+        assert pool.hits == 1
+        assert pool.misses == 1
+
+    def test_in_use_entry_bypasses_pool(self, pool):
+        """Concurrent request on a leased key gets a fresh unpooled agent."""
+        pooled = _make_agent()
+        fresh = _make_agent()
+        factory = MagicMock(side_effect=[pooled, fresh])
+
+        first = pool.acquire(("s1",), factory)
+        second = pool.acquire(("s1",), factory)
+
+        assert first is pooled
+        assert second is fresh
+        assert pool.bypasses == 1
+        assert len(pool) == 1
+
+    def test_non_reusable_agent_dropped_on_release(self, pool):
+        """Agents reporting is_reusable() == False are evicted and closed."""
+        agent = _make_agent(reusable=False)
+        pool.acquire(("s1",), lambda: agent)
+        pool.release(("s1",), agent)
+
+        assert len(pool) == 0
+        assert agent.gateway_client is None
+        agent.session_manager.flush.assert_called_once()
+
+    def test_disabled_pool_always_builds(self):
+        """Disabled pool calls the factory every time and stores nothing."""
+        pool = AgentPool(enabled=False)
+        factory = MagicMock(side_effect=lambda: _make_agent())
+
+        pool.acquire(("s1",), factory)
+        pool.acquire(("s1",), factory)
+
+        assert factory.call_count == 2
+        assert len(pool) == 0
+
+    def test_non_chat_agents_not_pooled(self):
+        """Only ChatAgent instances are stored."""
+        pool = AgentPool(max_size=2)
+        pool.acquire(("s1",), lambda: _make_agent())
+        assert len(pool) == 0
+
+
+# ============================================================
+# Eviction Tests
+# ============================================================
+
+class TestEviction:
+    """Tests for TTL, LRU and invalidation eviction."""
+
+    def test_lru_overflow_evicts_oldest_idle(self, pool):
+        """Beyond max_size the least recently used idle entry is dropped."""
+        gateways = {}
+        for sid in ("s1", "s2", "s3"):
+            agent = pool.acquire((sid,), _make_agent)
+            gateways[sid] = agent.gateway_client
+            pool.release((sid,), agent)
+
+        assert len(pool) == 2
+        assert pool.evictions == 1
+        gateways["s1"].stop.assert_called_once_with(None, None, None)
+        gateways["s3"].stop.assert_not_called()
+
+    def test_idle_ttl_expires_entries(self, pool):
+        """Entries idle longer than the TTL are purged on the next acquire."""
+        agent = pool.acquire(("s1",), _make_agent)
+        pool.release(("s1",), agent)
+
+        with patch('agents.pool.time.monotonic', return_value=10**9):
+            pool.acquire(("s2",), _make_agent)
+
+        assert ("s1",) not in pool._entries
+        assert pool.evictions == 1
+
+    def test_invalidate_session_drops_in_use_on_release(self, pool):
+        """Invalidation drops idle entries now and streaming ones once released."""
+        idle = pool.acquire(("s1", "a"), _make_agent)
+        pool.release(("s1", "a"), idle)
+        streaming = pool.acquire(("s1", "b"), _make_agent)
+
+        dropped = pool.invalidate_session("s1")
+
+        assert dropped == 1
+        assert ("s1", "b") in pool._entries
+
+        pool.release(("s1", "b"), streaming)
+        assert ("s1", "b") not in pool._entries
+        assert pool.acquire(("s1", "b"), _make_agent) is not streaming
+
+
+# ============================================================
+# Stream Tracking Tests
+# ============================================================
+
+class TestTrackStream:
+    """Tests for AgentPool.track_stream."""
+
+    def test_releases_after_stream(self, pool):
+        """Agent is released once the wrapped stream is exhausted."""
+        agent = pool.acquire(("s1",), _make_agent)
+
+        async def source():
+            yield "a"
+            yield "b"
+
+        async def consume():
+            return [c async for c in pool.track_stream(("s1",), agent, source())]
+
+        chunks = asyncio.run(consume())
+
+        assert chunks == ["a", "b"]
+        assert pool._entries[("s1",)].in_use is False
@@ -0,0 +1,266 @@
+"""
+Tests for uploaded-file attachments in session history.
+
+Focuses on meaningful logic:
+- detach() replaces a user prompt's file blocks with stubs (copy-on-write) once the bytes are durable
+- Stubs resolve back to identical file blocks, from the cache, S3 or the session's blobs directory
+- Without a durable tier (or when the S3 write fails) messages keep their bytes
+- Tool results, assistant messages and the "off" policy keep their bytes
+- Local session writes persist stubs; the bytes are in blobs/ exactly once
+- reattach_file results are persisted as the plain stub; other tool result files keep their bytes
+- AttachmentHistoryHook: first_turn stubs earlier prompts and provides reattach_file up front; inline resolves
+"""
+import hashlib
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.tools.registry import ToolRegistry
+from strands.types.session import SessionMessage
+
+from agent.hooks import AttachmentHistoryHook
+from agent.session.attachments import (
+    REATTACH_TOOL_NAME,
+    AttachmentScope,
+    AttachmentStore,
+    attachment_stub,
+    parse_attachment_stub,
+    reattached_content,
+)
+from agent.session.message_segments import session_blobs_dir
+
+IMAGE = b"\x89PNG" + os.urandom(6000)
+PDF = b"%PDF-1.4 " + os.urandom(200)
+
+
+def upload(text="What is this?"):
+    return {"role": "user", "content": [
+        {"text": text},
+        {"image": {"format": "png", "source": {"bytes": IMAGE}}},
+        {"document": {"format": "pdf", "name": "report", "source": {"bytes": PDF}}},
+    ]}
+
+
+SCOPE = AttachmentScope("s1", user_id="u1")
+
+
+def stubs(message):
+    return [parse_attachment_stub(block) for block in message["content"] if parse_attachment_stub(block)]
+
+
+class FakeS3:
+    """put_object/get_object over a dict."""
+
+    def __init__(self, fail=False):
+        self.objects = {}
+        self.puts = 0
+        self.fail = fail
+
+    def put_object(self, Bucket, Key, Body):
+        if self.fail:
+            raise RuntimeError("AccessDenied")
+        self.puts += 1
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        return {"Body": SimpleNamespace(read=lambda: self.objects[(Bucket, Key)])}
+
+
+@pytest.fixture
+def s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def store(s3):
+    return AttachmentStore(policy="first_turn", bucket="docs", s3_client=s3)
+
+
+class TestDetach:
+    """Persisted form of uploaded files."""
+
+    def test_file_blocks_become_stubs(self, store, s3):
+        message = upload()
+        detached = store.detach(message, SCOPE)
+
+        assert message["content"][1]["image"]["source"]["bytes"] == IMAGE  # Input untouched
+        assert detached["content"][0] == {"text": "What is this?"}
+        image, document = stubs(detached)
+        assert image == {"sha256": hashlib.sha256(IMAGE).hexdigest(), "kind": "image", "format": "png", "size": str(len(IMAGE))}
+        assert document["name"] == "report" and document["kind"] == "document"
+        assert store.get_stats()["detached_bytes"] == len(IMAGE) + len(PDF)
+        assert s3.objects[("docs", f"documents/u1/s1/attachments/{image['sha256']}")] == IMAGE
+
+        store.detach(upload(), SCOPE)
+        assert s3.puts == 2  # Already uploaded
+
+    def test_stub_resolves_to_same_block(self, store):
+        original = upload()
+        detached = store.detach(original, SCOPE)
+
+        resolved = [store.resolve_block(block, SCOPE) for block in detached["content"][1:]]
+        assert resolved == original["content"][1:]
+        assert store.resolve_block(detached["content"][1], AttachmentScope("other-session", user_id="u1")) is None
+
+    def test_bytes_reloaded_from_s3(self, store, s3):
+        detached = store.detach(upload(), SCOPE)
+
+        restarted = AttachmentStore(bucket="docs", s3_client=s3)  # Empty cache
+        assert restarted.resolve_block(detached["content"][1], SCOPE)["image"]["source"]["bytes"] == IMAGE
+        assert restarted.resolve_block(detached["content"][1], AttachmentScope("s1", user_id="u2")) is None
+
+    def test_no_durable_tier_keeps_bytes(self):
+        message = upload()
+        assert AttachmentStore(policy="first_turn").detach(message, SCOPE) is message
+
+        failing = AttachmentStore(policy="first_turn", bucket="docs", s3_client=FakeS3(fail=True))
+        assert failing.detach(message, SCOPE) is message
+        assert failing.get_stats()["not_durable"] == 2
+
+    def test_untouched_messages(self, store):
+        tool_result = {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "content": [
+            {"image": {"format": "png", "source": {"bytes": IMAGE}}}
+        ]}}]}
+        assistant = {"role": "assistant", "content": [{"image": {"format": "png", "source": {"bytes": IMAGE}}}]}
+        plain = {"role": "user", "content": [{"text": "hi"}]}
+
+        for message in (tool_result, assistant, plain):
+            assert store.detach(message, SCOPE) is message
+        off = AttachmentStore(policy="off", bucket="docs", s3_client=FakeS3())
+        message = upload()
+        assert off.detach(message, SCOPE) is message
+
+    def test_reattached_file_persisted_as_stub(self, store):
+        store.detach(upload(), SCOPE)
+        sha256 = hashlib.sha256(IMAGE).hexdigest()
+        attributes = {"sha256": sha256, "kind": "image", "format": "png", "size": str(len(IMAGE))}
+        screenshot = {"image": {"format": "png", "source": {"bytes": b"screenshot"}}}
+        message = {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "status": "success", "content": (
+            reattached_content(attributes, IMAGE) + [screenshot]
+        )}}]}
+
+        detached = store.detach(message, SCOPE)
+        result = detached["content"][0]["toolResult"]
+        assert message["content"][0]["toolResult"]["content"][1]["image"]["source"]["bytes"] == IMAGE  # Input untouched
+        assert result["content"] == [{"text": attachment_stub("image", sha256, "png", len(IMAGE))}, screenshot]
+        assert result["toolUseId"] == "t" and result["status"] == "success"
+
+        forged = {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "content": [
+            {"text": attachment_stub("image", sha256, "png", 10)},
+            {"image": {"format": "png", "source": {"bytes": b"other"}}},
+        ]}}]}
+        assert store.detach(forged, SCOPE) is forged  # Bytes do not match the stub
+
+    def test_only_exact_stub_blocks_are_parsed(self):
+        stub = attachment_stub("document", "a" * 64, "pdf", 10, name='q"uote')
+        assert parse_attachment_stub({"text": stub})["name"] == 'q"uote'
+        assert parse_attachment_stub({"text": "see " + stub}) is None
+        assert parse_attachment_stub({"text": stub.replace("a" * 64, "xyz")}) is None
+
+    def test_bytes_reloaded_from_blobs_dir(self, tmp_path):
+        scope = AttachmentScope("s1", blobs_dir=str(tmp_path / "blobs"))
+        detached = AttachmentStore().detach(upload(), scope)
+
+        restarted = AttachmentStore()  # Empty cache
+        assert restarted.resolve_block(detached["content"][1], AttachmentScope("s1")) is None
+        assert restarted.resolve_block(detached["content"][1], scope)["image"]["source"]["bytes"] == IMAGE
+
+
+class TestLocalPersistence:
+    """Local session managers write stubs and keep the bytes in blobs/."""
+
+    @pytest.fixture(autouse=True)
+    def process_store(self, monkeypatch, store):
+        from agent.session import local_session_buffer, unified_file_session_manager
+
+        for module in (local_session_buffer, unified_file_session_manager):
+            monkeypatch.setattr(module, "get_attachment_store", lambda: store)
+
+    def test_unified_manager(self, tmp_path):
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        manager.create_message("s1", "default", SessionMessage.from_message(upload(), 0))
+        manager.create_message("s1", "default", SessionMessage.from_message(upload("Again?"), 1))
+
+        loaded = manager.list_messages("s1", "default")
+        assert [len(stubs(sm.message)) for sm in loaded] == [2, 2]
+        assert sorted(os.listdir(session_blobs_dir(str(tmp_path), "s1"))) == sorted(
+            hashlib.sha256(data).hexdigest() for data in (IMAGE, PDF)
+        )
+
+    def test_buffer_keeps_live_message(self, tmp_path):
+        from agent.session.local_session_buffer import LocalSessionBuffer
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        buffer = LocalSessionBuffer(base_manager=manager, session_id="s1")
+        live = upload()
+        buffer.append_message(live, object())
+        buffer.flush()
+
+        assert live["content"][1]["image"]["source"]["bytes"] == IMAGE
+        assert len(stubs(manager.list_messages("s1", "default")[0].message)) == 2
+
+
+class TestAttachmentHistoryHook:
+    """Policy applied to the agent's messages before each model call."""
+
+    def run(self, hook, messages):
+        agent = SimpleNamespace(messages=messages, tool_registry=ToolRegistry())
+        hook.apply_policy(SimpleNamespace(agent=agent))
+        return agent
+
+    def test_first_turn_stubs_earlier_prompts(self, store):
+        hook = AttachmentHistoryHook("s1", user_id="u1", store=store)
+        messages = [upload(), {"role": "assistant", "content": [{"text": "A chart."}]}, {"role": "user", "content": [{"text": "Thanks"}]}]
+
+        agent = self.run(hook, messages)
+        assert len(stubs(messages[0])) == 2
+        assert REATTACH_TOOL_NAME not in agent.tool_registry.registry  # Provided up front, not mid-session
+
+    def test_reattach_tool_provided_up_front(self, store):
+        assert [t.tool_name for t in AttachmentHistoryHook("s1", user_id="u1", store=store).tools()] == [REATTACH_TOOL_NAME]
+        assert AttachmentHistoryHook("s1", store=store).tools() == []  # No durable tier
+        inline = AttachmentStore(policy="inline", bucket="docs", s3_client=FakeS3())
+        assert AttachmentHistoryHook("s1", user_id="u1", store=inline).tools() == []
+
+    def test_current_prompt_resolved_and_reattach(self, store):
+        hook = AttachmentHistoryHook("s1", user_id="u1", store=store)
+        reattach = hook.tools()[0]
+        messages = [store.detach(upload(), SCOPE)]
+
+        self.run(hook, messages)
+        assert messages[0]["content"][1]["image"]["source"]["bytes"] == IMAGE
+
+        messages.append({"role": "user", "content": [{"text": "And now?"}]})
+        self.run(hook, messages)
+        result = reattach._tool_func(sha256=hashlib.sha256(PDF).hexdigest())
+        assert result["status"] == "success"
+        assert result["content"][1]["document"] == {"format": "pdf", "name": "report", "source": {"bytes": PDF}}
+        assert reattach._tool_func(sha256="0" * 64)["status"] == "error"
+
+        # The re-attached file stays for the rest of this turn, then becomes its stub again
+        messages += [
+            {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t", "name": REATTACH_TOOL_NAME, "input": {}}}]},
+            {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "content": result["content"]}}]},
+        ]
+        self.run(hook, messages)
+        assert messages[-1]["content"][0]["toolResult"]["content"][1]["document"]["source"]["bytes"] == PDF
+
+        messages += [{"role": "assistant", "content": [{"text": "Done."}]}, {"role": "user", "content": [{"text": "Thanks"}]}]
+        self.run(hook, messages)
+        (stub,) = messages[3]["content"][0]["toolResult"]["content"]
+        assert parse_attachment_stub(stub)["name"] == "report"
+
+    def test_inline_resolves_everything(self, s3):
+        store = AttachmentStore(policy="inline", bucket="docs", s3_client=s3)
+        messages = [store.detach(upload(), SCOPE), {"role": "user", "content": [{"text": "And now?"}]}]
+
+        agent = self.run(AttachmentHistoryHook("s1", user_id="u1", store=store), messages)
+        assert messages[0] == upload()
+        assert REATTACH_TOOL_NAME not in agent.tool_registry.registry
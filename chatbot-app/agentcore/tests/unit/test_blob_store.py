@@ -0,0 +1,196 @@
+"""
+Unit tests for the out-of-band image blob store.
+
+Focuses on meaningful logic:
+- Content addressing: same bytes in a session are stored once
+- Per-session, total and TTL bounds evict least recently used blobs
+- offload_images replaces base64 data with a reference + thumbnail
+- With the blob transport, events are formatted (Pillow previews) off the event loop
+- Inline transport (default) leaves SSE images untouched
+- Blobs are only returned for their session and that session's user
+- GET /blobs/{hash} serves bytes with cache headers; 404 without session/user match or with the store off
+"""
+import base64
+import hashlib
+import io
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming.blob_store import BlobStore
+from streaming.event_formatter import StreamEventFormatter
+from streaming.sse import parse_frame
+
+
+def png_bytes(width=320, height=200):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestBlobStore:
+    """Storage and eviction."""
+
+    def test_content_addressed(self):
+        store = BlobStore(enabled=True)
+        first = store.put("s1", b"abc")
+        assert store.put("s1", b"abc") == first == hashlib.sha256(b"abc").hexdigest()
+        assert store.get_stats()["blobs"] == 1
+        assert store.get(first, "s1").data == b"abc"
+        assert store.get(first, "other") is None
+
+    def test_owner_check(self):
+        store = BlobStore(enabled=True)
+        blob_hash = store.put("s1", b"abc", user_id="alice")
+        assert store.get(blob_hash, "s1", "alice").data == b"abc"
+        assert store.get(blob_hash, "s1", "mallory") is None
+
+    def test_session_budget_evicts_lru(self):
+        store = BlobStore(enabled=True, max_session_bytes=10)
+        a = store.put("s1", b"aaaa")
+        b = store.put("s1", b"bbbb")
+        store.get(a, "s1")  # a is now most recently used
+        store.put("s1", b"cccc")
+
+        assert store.get(b, "s1") is None
+        assert store.get(a, "s1") is not None
+
+    def test_total_budget_evicts_oldest_session(self):
+        store = BlobStore(enabled=True, max_total_bytes=10)
+        old = store.put("s1", b"aaaaaa")
+        new = store.put("s2", b"bbbbbb")
+
+        assert store.get(old, "s1") is None
+        assert store.get(new, "s2") is not None
+
+    def test_ttl(self):
+        store = BlobStore(enabled=True, ttl_seconds=60)
+        blob_hash = store.put("s1", b"abc")
+        with patch("streaming.blob_store.time.monotonic", return_value=time.monotonic() + 120):
+            assert store.get(blob_hash, "s1") is None
+        assert store.get_stats()["bytes"] == 0
+
+
+class TestOffloadImages:
+    """SSE image references."""
+
+    def test_reference_with_dimensions_and_thumbnail(self):
+        data = png_bytes()
+        store = BlobStore(enabled=True, thumbnail_px=32)
+        images = [
+            {"format": "png", "data": base64.b64encode(data).decode()},
+            {"type": "url", "url": "https://example.com/a.jpg"},
+        ]
+
+        ref, url_image = store.offload_images(images, "s 1", "u/1")
+
+        assert url_image == images[1]
+        assert ref["hash"] == hashlib.sha256(data).hexdigest()
+        assert ref["url"] == f"/blobs/{ref['hash']}?session_id=s%201&user_id=u%2F1"
+        assert store.get(ref["hash"], "s 1", "u/1") is not None
+        assert (ref["width"], ref["height"], ref["size"]) == (320, 200, len(data))
+        assert "data" not in ref
+        assert len(ref["thumbnail"]) < 2000
+
+    def test_disabled_or_no_session_keeps_inline(self):
+        images = [{"format": "png", "data": base64.b64encode(b"x").decode()}]
+        assert BlobStore(enabled=False).offload_images(images, "s1") is images
+        assert BlobStore(enabled=True).offload_images(images, None) is images
+
+    def test_tool_result_event_carries_reference(self):
+        data = png_bytes()
+        store = BlobStore(enabled=True)
+        tool_result = {"toolUseId": "t1", "content": [{"text": "shot"}, {"image": {"format": "png", "source": {"bytes": data}}}]}
+
+        with patch("streaming.event_formatter.get_blob_store", return_value=store):
+            event = parse_frame(StreamEventFormatter.create_tool_result_event(tool_result, "s1", "u1"))
+
+        assert event["images"][0]["hash"] == hashlib.sha256(data).hexdigest()
+        assert store.get(event["images"][0]["hash"], "s1", "u1").data == data
+
+    @pytest.mark.asyncio
+    async def test_previews_render_off_the_event_loop(self):
+        import threading
+        from streaming.event_processor import StreamEventProcessor
+
+        loop_thread = threading.get_ident()
+        format_threads = []
+
+        def format_event(*args):
+            format_threads.append(threading.get_ident())
+            return b"data: {}\n\n"
+
+        with patch("streaming.event_processor.get_blob_store", return_value=BlobStore(enabled=True)):
+            await StreamEventProcessor._format_off_loop(format_event, "s1")
+        with patch("streaming.event_processor.get_blob_store", return_value=BlobStore(enabled=False)):
+            await StreamEventProcessor._format_off_loop(format_event, "s1")
+
+        assert format_threads[0] != loop_thread
+        assert format_threads[1] == loop_thread
+
+
+class TestBlobRouter:
+    """GET /blobs/{hash}."""
+
+    @pytest.fixture
+    def store(self):
+        store = BlobStore(enabled=True)
+        with patch("routers.blobs.get_blob_store", return_value=store):
+            yield store
+
+    @pytest.fixture
+    def client(self, store):
+        from routers.blobs import router
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_serves_bytes_with_cache_headers(self, store, client):
+        blob_hash = store.put("s1", b"\x89PNG...", "png", user_id="u1")
+
+        response = client.get(f"/blobs/{blob_hash}", params={"session_id": "s1", "user_id": "u1"})
+
+        assert response.status_code == 200
+        assert response.content == b"\x89PNG..."
+        assert response.headers["content-type"] == "image/png"
+        assert "immutable" in response.headers["cache-control"]
+
+        cached = client.get(
+            f"/blobs/{blob_hash}",
+            params={"session_id": "s1", "user_id": "u1"},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert cached.status_code == 304
+
+    def test_reference_url_is_fetchable(self, store, client):
+        data = base64.b64encode(b"\x89PNG...").decode()
+        (reference,) = store.offload_images([{"format": "png", "data": data}], "s 1", "u1")
+
+        assert client.get(reference["url"]).content == b"\x89PNG..."
+
+    def test_missing_and_invalid(self, client):
+        params = {"session_id": "s1", "user_id": "u1"}
+        assert client.get("/blobs/" + "0" * 64, params=params).status_code == 404
+        assert client.get("/blobs/not-a-hash", params=params).status_code == 400
+
+    def test_requires_owning_session(self, store, client):
+        blob_hash = store.put("s1", b"%PDF", "pdf", user_id="u1")
+
+        assert client.get(f"/blobs/{blob_hash}").status_code == 422
+        assert client.get(f"/blobs/{blob_hash}", params={"user_id": "u1"}).status_code == 422
+        assert client.get(f"/blobs/{blob_hash}", params={"session_id": "s1", "user_id": "u2"}).status_code == 404
+        assert client.get(f"/blobs/{blob_hash}", params={"session_id": "s2", "user_id": "u1"}).status_code == 404
+
+    def test_disabled_store(self, store, client):
+        blob_hash = store.put("s1", b"\x89PNG...", "png", user_id="u1")
+        store.enabled = False
+
+        assert client.get(f"/blobs/{blob_hash}", params={"session_id": "s1", "user_id": "u1"}).status_code == 404
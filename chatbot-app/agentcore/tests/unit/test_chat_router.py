@@ -8,6 +8,7 @@ Tests cover:
 - Disconnect-aware streaming
 - Error handling
 """
+import asyncio
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from fastapi import Request
@@ -125,6 +126,21 @@ class TestAgentFactory:
 # Disconnect-Aware Stream Tests
 # ============================================================
 
+def make_request(disconnect_after: float = None):
+    """Mock Request whose ASGI receive() reports http.disconnect after a delay (never if None)."""
+    mock_request = MagicMock(spec=Request)
+
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    mock_request.receive = receive
+    mock_request.is_disconnected = AsyncMock(side_effect=AssertionError("no per-chunk polling"))
+    return mock_request
+
+
 class TestDisconnectAwareStream:
     """Tests for disconnect_aware_stream wrapper."""
 
@@ -138,13 +154,10 @@ class TestDisconnectAwareStream:
             yield "chunk2"
             yield "chunk3"
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.is_disconnected = AsyncMock(return_value=False)
-
         chunks = []
         async for chunk in disconnect_aware_stream(
             mock_stream(),
-            mock_request,
+            make_request(),
             "test-session"
         ):
             chunks.append(chunk)
@@ -156,30 +169,49 @@ class TestDisconnectAwareStream:
         """Test that stream stops when client disconnects."""
         from routers.chat import disconnect_aware_stream
 
-        call_count = 0
-
         async def mock_stream():
-            nonlocal call_count
             for i in range(10):
-                call_count += 1
+                await asyncio.sleep(0.02)
                 yield f"chunk{i}"
 
-        mock_request = MagicMock(spec=Request)
-        # Disconnect after 2 chunks
-        mock_request.is_disconnected = AsyncMock(
-            side_effect=[False, False, True] + [True] * 10
-        )
-
         chunks = []
         async for chunk in disconnect_aware_stream(
             mock_stream(),
-            mock_request,
+            make_request(disconnect_after=0.05),
             "test-session"
         ):
             chunks.append(chunk)
 
         # Should only get chunks before disconnect
-        assert len(chunks) <= 3
+        assert 0 < len(chunks) < 10
+
+    @pytest.mark.asyncio
+    async def test_disconnect_during_silent_period(self):
+        """A disconnect during a long tool call is noticed without waiting for the next chunk."""
+        from routers.chat import disconnect_aware_stream
+
+        cancelled = asyncio.Event()
+
+        async def mock_stream():
+            yield "chunk1"
+            try:
+                await asyncio.sleep(180)  # Long tool call, no chunks
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            yield "never"
+
+        async def consume():
+            return [chunk async for chunk in disconnect_aware_stream(
+                mock_stream(),
+                make_request(disconnect_after=0.05),
+                "test-session"
+            )]
+
+        chunks = await asyncio.wait_for(consume(), timeout=1)
+
+        assert chunks == ["chunk1"]
+        assert cancelled.is_set()
 
     @pytest.mark.asyncio
     async def test_handles_generator_exit(self):
@@ -190,12 +222,9 @@ class TestDisconnectAwareStream:
             yield "chunk1"
             yield "chunk2"
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.is_disconnected = AsyncMock(return_value=False)
-
         gen = disconnect_aware_stream(
             mock_stream(),
-            mock_request,
+            make_request(),
             "test-session"
         )
 
@@ -217,17 +246,15 @@ class TestDisconnectAwareStream:
             nonlocal stream_closed
             try:
                 yield "chunk1"
+                await asyncio.sleep(10)
                 yield "chunk2"
             finally:
                 stream_closed = True
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.is_disconnected = AsyncMock(side_effect=[False, True])
-
         chunks = []
         async for chunk in disconnect_aware_stream(
             mock_stream(),
-            mock_request,
+            make_request(disconnect_after=0.01),
             "test-session"
         ):
             chunks.append(chunk)
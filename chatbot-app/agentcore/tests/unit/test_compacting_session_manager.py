@@ -1340,7 +1340,8 @@ class TestUpdateAfterTurnLogic:
                 region_name='us-west-2',
                 token_threshold=1000,
                 protected_turns=2,
-                user_id='test-user'
+                user_id='test-user',
+                background_compaction=False,  # Checkpoint synchronously
             )
             manager.compaction_state = CompactionState()
             manager.config = config
@@ -1478,7 +1479,8 @@ class TestEndToEndScenarios:
                 token_threshold=1000,
                 protected_turns=2,
                 max_tool_content_length=50,
-                user_id='test-user'
+                user_id='test-user',
+                background_compaction=False,  # Checkpoint synchronously
             )
             manager.compaction_state = CompactionState()
             manager.config = config
@@ -0,0 +1,257 @@
+"""
+Tests for background checkpoint preparation.
+
+Focuses on meaningful logic:
+- One job per session; a second trigger while it runs is coalesced
+- settle() cuts a job's LTM wait short and returns once its state is stored
+- settle_async() waits in a worker thread, so the event loop keeps running
+- update_after_turn() leaves the checkpoint alone until the job stores it with its summary
+- A fresh LTM summary is used as soon as it appears; otherwise stale LTM or the local fallback
+- initialize() settles a running job before loading the compaction state
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from agent.session.compaction_worker import CompactionWorker
+
+
+class TestCompactionWorker:
+    """Per-session job bookkeeping."""
+
+    def test_second_submit_is_coalesced(self):
+        worker = CompactionWorker()
+        release = threading.Event()
+        runs = []
+
+        def job(hurry):
+            runs.append(1)
+            release.wait(5)
+            return "ltm_fresh"
+
+        assert worker.submit(("u1", "s1"), job) is True
+        assert worker.submit(("u1", "s1"), job) is False
+        assert worker.pending(("u1", "s1"))
+
+        release.set()
+        assert worker.settle(("u1", "s1"), timeout=5)
+        stats = worker.get_stats()
+        assert runs == [1]
+        assert (stats["submitted"], stats["coalesced"], stats["completed"]) == (1, 1, 1)
+        assert stats["summaries"] == {"ltm_fresh": 1}
+        assert not worker.pending(("u1", "s1"))
+
+    def test_settle_hurries_the_job(self):
+        worker = CompactionWorker()
+        started = threading.Event()
+
+        def job(hurry):
+            started.set()
+            hurry.wait(30)  # Waiting for LTM
+            return "ltm_stale" if hurry.is_set() else "timeout"
+
+        worker.submit(("u1", "s1"), job)
+        started.wait(5)
+
+        assert worker.settle(("u1", "s1"), timeout=5)
+        assert worker.get_stats()["summaries"] == {"ltm_stale": 1}
+
+    def test_settle_without_job(self):
+        assert CompactionWorker().settle(("u1", "s1")) is True
+
+    def test_settle_async_keeps_the_event_loop_free(self):
+        worker = CompactionWorker()
+        started = threading.Event()
+
+        def job(hurry):
+            started.set()
+            hurry.wait(5)
+            time.sleep(0.1)  # The hurried job still has to store its state
+            return "fallback"
+
+        worker.submit(("u1", "s1"), job)
+        started.wait(5)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            settled = await worker.settle_async(("u1", "s1"), timeout=5)
+            task.cancel()
+            return settled, ticks
+
+        settled, ticks = asyncio.run(scenario())
+        assert settled and not worker.pending(("u1", "s1"))
+        assert ticks > 3
+        assert asyncio.run(worker.settle_async(("u1", "s1"))) is True
+
+    def test_failed_job_is_counted_and_released(self):
+        worker = CompactionWorker()
+
+        def job(hurry):
+            raise RuntimeError("boom")
+
+        worker.submit(("u1", "s1"), job)
+        worker.settle(("u1", "s1"), timeout=5)
+
+        assert worker.get_stats()["failed"] == 1
+        assert worker.submit(("u1", "s1"), lambda hurry: None) is True
+
+
+def record(text, age_seconds=0):
+    return {"content": {"text": text}, "createdAt": datetime.now(timezone.utc) - timedelta(seconds=age_seconds)}
+
+
+class TestBackgroundCheckpoint:
+    """CompactingSessionManager hands the checkpoint to the worker."""
+
+    @pytest.fixture
+    def worker(self, monkeypatch):
+        worker = CompactionWorker()
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_compaction_worker", lambda: worker)
+        return worker
+
+    @pytest.fixture
+    def manager(self, worker):
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager, CompactionState
+
+            manager = CompactingSessionManager(
+                agentcore_memory_config=MagicMock(),
+                region_name='us-west-2',
+                token_threshold=1000,
+                protected_turns=2,
+                user_id='u1',
+                background_compaction=True,
+                summary_wait_seconds=30,
+            )
+        manager.config = MagicMock(memory_id="mem", actor_id="u1")
+        manager.session_id = "s1"
+        manager.compaction_state = CompactionState()
+        manager._valid_cutoff_message_ids = [0, 2, 4]
+        manager._all_messages_for_summary = [
+            {"role": "user" if n % 2 == 0 else "assistant", "content": [{"text": f"msg{n}"}]} for n in range(6)
+        ]
+        manager._message_event_ids = [f"e{n}" for n in range(6)]
+        manager.save_compaction_state = MagicMock()
+        return manager
+
+    def test_checkpoint_stored_by_the_job(self, manager, worker):
+        release = threading.Event()
+
+        def list_records():
+            release.wait(5)
+            return [record("LTM summary")]
+
+        manager._list_session_summary_records = MagicMock(side_effect=list_records)
+        manager.update_after_turn(1500, "default")
+
+        # The turn only saved lastInputTokens
+        assert manager.compaction_state.checkpoint == 0
+        assert manager.compaction_pending()
+        manager.save_compaction_state.assert_called_once()
+
+        release.set()
+        worker.settle(("u1", "s1"), timeout=5)
+
+        state = manager.compaction_state
+        assert (state.checkpoint, state.summary, state.checkpointEventId) == (2, "LTM summary", "e2")
+        assert state.lastInputTokens == 1500
+        assert manager.save_compaction_state.call_count == 2
+        assert worker.get_stats()["summaries"] == {"ltm_fresh": 1}
+        assert not manager.compaction_pending()
+
+    def test_waits_for_fresh_summary_until_settled(self, manager, worker):
+        polled = threading.Event()
+
+        def list_records():
+            polled.set()
+            return [record("Summary of an older turn", age_seconds=600)]
+
+        manager._list_session_summary_records = MagicMock(side_effect=list_records)
+        manager.update_after_turn(1500, "default")
+        polled.wait(5)
+
+        assert manager.compaction_pending()  # Still waiting for LTM to catch up
+        worker.settle(("u1", "s1"), timeout=5)
+
+        assert manager.compaction_state.summary == "Summary of an older turn"
+        assert worker.get_stats()["summaries"] == {"ltm_stale": 1}
+
+    def test_fallback_summary_without_ltm(self, manager, worker):
+        manager._list_session_summary_records = MagicMock(return_value=None)
+        manager.update_after_turn(1500, "default")
+        worker.settle(("u1", "s1"), timeout=5)
+
+        assert manager.compaction_state.checkpoint == 2
+        assert manager.compaction_state.summary == "Previous conversation topics:\n- User asked about: msg0"
+        assert worker.get_stats()["summaries"] == {"fallback": 1}
+
+    def test_polls_reuse_one_client(self, manager):
+        manager.memory_client = MagicMock()
+        manager.memory_client.gmdp_client.list_memory_records.return_value = {"memoryRecordSummaries": []}
+        manager._get_summarization_strategy_id = MagicMock(return_value="summary-1")
+
+        with patch("boto3.client") as factory:
+            manager._list_session_summary_records()
+            manager._list_session_summary_records()
+
+        factory.assert_not_called()
+        assert manager.memory_client.gmdp_client.list_memory_records.call_count == 2
+
+    def test_below_threshold_schedules_nothing(self, manager, worker):
+        manager.update_after_turn(500, "default")
+        assert worker.get_stats()["submitted"] == 0
+
+    def test_initialize_settles_before_loading_state(self, manager, worker):
+        from agent.session.compacting_session_manager import CompactionState
+
+        calls = []
+        worker.settle = MagicMock(side_effect=lambda key: calls.append(("settle", key)))
+
+        def load():
+            calls.append(("load",))
+            return CompactionState()
+
+        manager._latest_agent_message = {}
+        manager.session_repository = MagicMock()
+        manager.session_repository.read_agent.return_value = MagicMock(state={}, conversation_manager_state={})
+        manager.load_compaction_state = MagicMock(side_effect=load)
+        manager._load_messages_for_init = MagicMock(return_value=([], [], 0, "full"))
+        agent = MagicMock(agent_id="default")
+        agent.conversation_manager.restore_from_session.return_value = []
+        agent.conversation_manager.removed_message_count = 0
+
+        manager.initialize(agent)
+
+        assert calls == [("settle", ("u1", "s1")), ("load",)]
+
+
+class TestRecordsFresh:
+    """LTM record timestamps against the end of the turn."""
+
+    def test_freshness(self):
+        from agent.session.compacting_session_manager import CompactingSessionManager
+
+        since = datetime.now(timezone.utc)
+        assert CompactingSessionManager._records_fresh([record("a", age_seconds=-1)], since)
+        assert not CompactingSessionManager._records_fresh([record("a", age_seconds=60)], since)
+        assert CompactingSessionManager._records_fresh([{"content": {"text": "a"}}], since)
+        assert CompactingSessionManager._records_fresh(
+            [{"content": {"text": "a"}, "updatedAt": (since + timedelta(seconds=1)).isoformat()}], since
+        )
@@ -78,6 +78,13 @@ MOCK_REVIEW_RESPONSE = json.dumps({
 # Fixtures
 # ============================================================
 
+@pytest.fixture(autouse=True)
+def sessions_dir(tmp_path, monkeypatch):
+    """Local session managers write under tmp_path, not the repo's sessions/."""
+    monkeypatch.setattr("agent.factory.session_manager_factory.get_sessions_dir", lambda: tmp_path)
+    return tmp_path
+
+
 @pytest.fixture
 def writing_agent():
     """Create a ComposerWorkflow instance for testing"""
@@ -184,9 +191,9 @@ class TestHelperMethods:
         """Test SSE formatting"""
         data = {"type": "test", "message": "hello"}
         result = writing_agent._format_sse(data)
-        assert result.startswith("data: ")
-        assert result.endswith("\n\n")
-        assert '"type": "test"' in result
+        assert result.startswith(b"data: ")
+        assert result.endswith(b"\n\n")
+        assert json.loads(result[6:]) == data
 
     def test_extract_json_direct(self, writing_agent):
         """Test JSON extraction from direct JSON"""
@@ -358,8 +365,8 @@ class TestWorkflowExecution:
 
             # Verify events were emitted
             assert len(events) >= 2  # progress start + completion
-            assert any('"task": 1' in e for e in events)
-            assert any('"completed"' in e for e in events)
+            assert any(b'"task":1' in e for e in events)
+            assert any(b'"completed"' in e for e in events)
 
             # Verify requirements were set
             assert writing_agent.state.requirements is not None
@@ -403,8 +410,8 @@ class TestWorkflowExecution:
             events.append(event)
 
         # Verify interrupt event was emitted
-        assert any('"interrupt"' in e for e in events)
-        assert any('"outline_confirmation"' in e for e in events)
+        assert any(b'"interrupt"' in e for e in events)
+        assert any(b'"outline_confirmation"' in e for e in events)
 
         # Verify status changed
         assert writing_agent.state.status == WritingWorkflowStatus.AWAITING_OUTLINE_CONFIRMATION
@@ -480,7 +487,7 @@ class TestWorkflowExecution:
             assert "Add more sections" in writing_agent.state.outline_feedback
 
             # Verify another interrupt was emitted (for new outline)
-            assert any('"interrupt"' in e for e in events)
+            assert any(b'"interrupt"' in e for e in events)
 
     @pytest.mark.asyncio
     async def test_max_outline_attempts(self, writing_agent, mock_dynamodb):
@@ -522,7 +529,7 @@ class TestWorkflowExecution:
                 events.append(event)
 
             # Verify max attempts message
-            assert any("Maximum revision attempts reached" in e for e in events)
+            assert any(b"Maximum revision attempts reached" in e for e in events)
 
             # Verify workflow continued and completed
             assert writing_agent.state.status == WritingWorkflowStatus.COMPLETED
@@ -551,11 +558,11 @@ class TestWorkflowIntegration:
                 events.append(event)
 
             # Verify start and end events
-            assert any('"start"' in e for e in events)
-            assert any('"end"' in e for e in events)
+            assert any(b'"start"' in e for e in events)
+            assert any(b'"end"' in e for e in events)
 
             # Verify interrupt for confirmation
-            assert any('"interrupt"' in e for e in events)
+            assert any(b'"interrupt"' in e for e in events)
 
             # Verify state
             assert writing_agent.state.status == WritingWorkflowStatus.AWAITING_OUTLINE_CONFIRMATION
@@ -575,8 +582,8 @@ class TestWorkflowIntegration:
                 events.append(event)
 
             # Verify error was handled
-            assert any('"error"' in e for e in events)
-            assert any('"end"' in e for e in events)
+            assert any(b'"error"' in e for e in events)
+            assert any(b'"end"' in e for e in events)
 
     @pytest.mark.asyncio
     async def test_workflow_no_request(self, writing_agent, mock_dynamodb):
@@ -585,4 +592,4 @@ class TestWorkflowIntegration:
         async for event in writing_agent.run_workflow():
             events.append(event)
 
-        assert any("No user request provided" in e for e in events)
+        assert any(b"No user request provided" in e for e in events)
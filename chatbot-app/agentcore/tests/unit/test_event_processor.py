@@ -3,15 +3,21 @@ Unit tests for StreamEventProcessor.
 
 Tests event processing, streaming, and abort handling.
 """
-import asyncio
+import json
 import os
 import sys
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 
 from streaming.event_processor import StreamEventProcessor
+from streaming.sse import parse_frame
+
+
+def sse_type(frame: bytes) -> str:
+    """Event type of an SSE frame."""
+    return parse_frame(frame).get("type")
 
 
 class TestStreamEventProcessor:
@@ -90,7 +96,6 @@ class TestStreamEventProcessorAbortHandling:
 
         # Simulate the finally block logic
         stream_completed_normally = False
-        session_id = "test_session"
 
         if not stream_completed_normally and processor.partial_response_text.strip():
             abort_message_text = processor.partial_response_text.strip() + "\n\n**[Response interrupted by user]**"
@@ -431,7 +436,7 @@ class TestProcessStreamFlow:
 
         # First event should be init
         assert len(events) >= 1
-        assert '"type": "init"' in events[0]
+        assert sse_type(events[0]) == "init"
 
     @pytest.mark.asyncio
     async def test_process_stream_complete_event(self, processor, mock_agent):
@@ -444,7 +449,7 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have init and complete events
-        assert any('"type": "complete"' in e for e in events)
+        assert any(sse_type(e) == "complete" for e in events)
 
     @pytest.mark.asyncio
     async def test_process_stream_no_agent_error(self, processor):
@@ -455,8 +460,8 @@ class TestProcessStreamFlow:
 
         # Should yield error event
         assert len(events) == 1
-        assert '"type": "error"' in events[0]
-        assert "Agent not available" in events[0]
+        assert sse_type(events[0]) == "error"
+        assert "Agent not available" in events[0].decode()
 
     # ============================================================
     # Text Response Event Tests
@@ -476,9 +481,10 @@ class TestProcessStreamFlow:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_text"):
             events.append(event)
 
-        # Should have response events
-        response_events = [e for e in events if '"type": "response"' in e]
-        assert len(response_events) >= 2
+        # Should have response events (deltas may be coalesced into fewer frames)
+        response_events = [json.loads(e[6:]) for e in events if sse_type(e) == "response"]
+        assert response_events
+        assert "".join(e["text"] for e in response_events) == "Hello World!"
 
         # Check partial_response_text accumulated
         assert "Hello " in processor.partial_response_text
@@ -520,9 +526,9 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have reasoning event
-        reasoning_events = [e for e in events if '"type": "reasoning"' in e]
+        reasoning_events = [e for e in events if sse_type(e) == "reasoning"]
         assert len(reasoning_events) == 1
-        assert "Let me think about this" in reasoning_events[0]
+        assert "Let me think about this" in reasoning_events[0].decode()
 
     # ============================================================
     # Tool Use Event Tests
@@ -548,10 +554,10 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have tool_use event
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_events) == 1
-        assert "search_tool" in tool_events[0]
-        assert "tool_123" in tool_events[0]
+        assert "search_tool" in tool_events[0].decode()
+        assert "tool_123" in tool_events[0].decode()
 
     @pytest.mark.asyncio
     async def test_process_stream_tool_use_parameter_update(self, processor, mock_agent):
@@ -585,7 +591,7 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should emit tool_use for both: initial and parameter update
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_events) == 2  # Initial + parameter update
 
     @pytest.mark.asyncio
@@ -608,7 +614,7 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should still emit tool_use event for empty input
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_events) == 1
 
     @pytest.mark.asyncio
@@ -631,9 +637,9 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should parse JSON and emit tool_use event
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_events) == 1
-        assert '"key": "value"' in tool_events[0] or '"key":"value"' in tool_events[0]
+        assert parse_frame(tool_events[0])["input"]["key"] == "value"
 
     # ============================================================
     # Tool Result Event Tests (via message event)
@@ -665,9 +671,9 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have tool_result event
-        result_events = [e for e in events if '"type": "tool_result"' in e]
+        result_events = [e for e in events if sse_type(e) == "tool_result"]
         assert len(result_events) == 1
-        assert "tool_result_123" in result_events[0]
+        assert "tool_result_123" in result_events[0].decode()
 
     @pytest.mark.asyncio
     async def test_process_stream_tool_result_error_recovery(self, processor, mock_agent):
@@ -698,10 +704,10 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have tool_result event (either success or error wrapped)
-        result_events = [e for e in events if '"type": "tool_result"' in e]
+        result_events = [e for e in events if sse_type(e) == "tool_result"]
         assert len(result_events) >= 1
         # The toolUseId should be preserved in the result
-        assert any("tool_result_error_456" in e for e in result_events)
+        assert any("tool_result_error_456" in e.decode() for e in result_events)
 
     # ============================================================
     # Interrupt (HITL) Event Tests
@@ -728,10 +734,10 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have interrupt event
-        interrupt_events = [e for e in events if '"type": "interrupt"' in e]
+        interrupt_events = [e for e in events if sse_type(e) == "interrupt"]
         assert len(interrupt_events) == 1
-        assert "interrupt_001" in interrupt_events[0]
-        assert "research_approval" in interrupt_events[0]
+        assert "interrupt_001" in interrupt_events[0].decode()
+        assert "research_approval" in interrupt_events[0].decode()
 
     # ============================================================
     # Lifecycle Event Tests
@@ -751,7 +757,7 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have thinking event
-        thinking_events = [e for e in events if '"type": "thinking"' in e]
+        thinking_events = [e for e in events if sse_type(e) == "thinking"]
         assert len(thinking_events) == 1
 
     # ============================================================
@@ -772,9 +778,9 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have error event (either as tool_result or error type)
-        error_events = [e for e in events if '"type": "error"' in e or '"status": "error"' in e]
+        error_events = [e for e in events if sse_type(e) == "error" or parse_frame(e).get("status") == "error"]
         assert len(error_events) >= 1
-        assert any("Simulated error" in e for e in error_events)
+        assert any("Simulated error" in e.decode() for e in error_events)
 
     @pytest.mark.asyncio
     async def test_process_stream_error_recovery_with_pending_tool(self, processor, mock_agent):
@@ -798,14 +804,14 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have tool_use event
-        tool_use_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_use_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_use_events) == 1
 
         # Should have tool_result error event (for agent self-recovery)
-        tool_result_events = [e for e in events if '"type": "tool_result"' in e]
+        tool_result_events = [e for e in events if sse_type(e) == "tool_result"]
         assert len(tool_result_events) == 1
-        assert "tool_error_recovery_123" in tool_result_events[0]
-        assert '"status": "error"' in tool_result_events[0]
+        assert "tool_error_recovery_123" in tool_result_events[0].decode()
+        assert parse_frame(tool_result_events[0]).get("status") == "error"
 
     @pytest.mark.asyncio
     async def test_process_stream_error_without_pending_tool(self, processor, mock_agent):
@@ -821,9 +827,29 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have error event (not tool_result)
-        error_events = [e for e in events if '"type": "error"' in e]
+        error_events = [e for e in events if sse_type(e) == "error"]
         assert len(error_events) == 1
-        assert "General error" in error_events[0]
+        assert "General error" in error_events[0].decode()
+
+    @pytest.mark.asyncio
+    async def test_error_after_earlier_turn_tool_is_plain_error(self, processor, mock_agent):
+        """A pooled agent keeps its processor: a later error must not answer an earlier turn's tool."""
+        mock_agent.stream_async = create_async_generator([
+            {"current_tool_use": {"toolUseId": "tool_turn_1", "name": "search_tool", "input": {"q": "x"}}},
+            {"result": create_mock_final_result("Done")},
+        ])
+        async for _ in processor.process_stream(mock_agent, "First turn", session_id="test_two_turns"):
+            pass
+
+        async def mock_stream_error_no_tool(*args, **kwargs):
+            yield {"data": "Hello"}
+            raise Exception("General error")
+
+        mock_agent.stream_async = mock_stream_error_no_tool
+        events = [e async for e in processor.process_stream(mock_agent, "Second turn", session_id="test_two_turns")]
+
+        assert not [e for e in events if sse_type(e) == "tool_result"]
+        assert len([e for e in events if sse_type(e) == "error"]) == 1
 
     # ============================================================
     # Token Usage Tests
@@ -849,10 +875,10 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Find complete event and check usage
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         assert len(complete_events) == 1
-        assert '"inputTokens": 200' in complete_events[0]
-        assert '"outputTokens": 100' in complete_events[0]
+        assert parse_frame(complete_events[0])["usage"]["inputTokens"] == 200
+        assert parse_frame(complete_events[0])["usage"]["outputTokens"] == 100
 
     # ============================================================
     # XML Tool Call in Text Tests
@@ -872,9 +898,9 @@ class TestProcessStreamFlow:
             events.append(event)
 
         # Should have tool_use event parsed from XML
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         assert len(tool_events) == 1
-        assert "web_search" in tool_events[0]
+        assert "web_search" in tool_events[0].decode()
 
     # ============================================================
     # Stream Deduplication Tests
@@ -951,9 +977,9 @@ class TestProcessStreamBrowserEvents:
             events.append(event)
 
         # Should have at least one metadata event with browserSessionId
-        metadata_events = [e for e in events if '"type": "metadata"' in e]
+        metadata_events = [e for e in events if sse_type(e) == "metadata"]
         assert len(metadata_events) >= 1
-        assert any("session_abc123" in e for e in metadata_events)
+        assert any("session_abc123" in e.decode() for e in metadata_events)
 
     @pytest.mark.asyncio
     async def test_process_stream_browser_step(self, processor, mock_agent):
@@ -986,10 +1012,10 @@ class TestProcessStreamBrowserEvents:
             events.append(event)
 
         # Should have browser_progress events
-        progress_events = [e for e in events if '"type": "browser_progress"' in e]
+        progress_events = [e for e in events if sse_type(e) == "browser_progress"]
         assert len(progress_events) == 2
-        assert "Clicking on login button" in progress_events[0]
-        assert "Entering username" in progress_events[1]
+        assert "Clicking on login button" in progress_events[0].decode()
+        assert "Entering username" in progress_events[1].decode()
 
 
 # ============================================================
@@ -1010,14 +1036,9 @@ class TestFrontendEventCompatibility:
         agent.agent_id = "test_agent"
         return agent
 
-    def parse_sse_event(self, sse_string: str) -> dict:
-        """Parse SSE event string to dict."""
-        import json
-        # SSE format: "data: {...}\n\n"
-        if sse_string.startswith("data: "):
-            json_str = sse_string[6:].strip()
-            return json.loads(json_str)
-        return {}
+    def parse_sse_event(self, sse_frame: bytes) -> dict:
+        """Parse SSE frame (b"data: {...}\\n\\n") to dict."""
+        return parse_frame(sse_frame)
 
     @pytest.mark.asyncio
     async def test_init_event_structure(self, processor, mock_agent):
@@ -1046,7 +1067,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_response"):
             events.append(event)
 
-        response_events = [e for e in events if '"type": "response"' in e]
+        response_events = [e for e in events if sse_type(e) == "response"]
         response_event = self.parse_sse_event(response_events[0])
 
         # Frontend expects: { type: "response", text: string, step: string }
@@ -1069,7 +1090,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_reasoning"):
             events.append(event)
 
-        reasoning_events = [e for e in events if '"type": "reasoning"' in e]
+        reasoning_events = [e for e in events if sse_type(e) == "reasoning"]
         reasoning_event = self.parse_sse_event(reasoning_events[0])
 
         # Frontend expects: { type: "reasoning", text: string, step: string }
@@ -1097,7 +1118,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_tool_use"):
             events.append(event)
 
-        tool_events = [e for e in events if '"type": "tool_use"' in e]
+        tool_events = [e for e in events if sse_type(e) == "tool_use"]
         tool_event = self.parse_sse_event(tool_events[0])
 
         # Frontend expects: { type: "tool_use", toolUseId: string, name: string, input: object }
@@ -1134,7 +1155,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_tool_result"):
             events.append(event)
 
-        result_events = [e for e in events if '"type": "tool_result"' in e]
+        result_events = [e for e in events if sse_type(e) == "tool_result"]
         result_event = self.parse_sse_event(result_events[0])
 
         # Frontend expects: { type: "tool_result", toolUseId: string, result: string, status?: string }
@@ -1158,7 +1179,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_complete"):
             events.append(event)
 
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         complete_event = self.parse_sse_event(complete_events[0])
 
         # Frontend expects: { type: "complete", message: string, usage?: object, images?: array }
@@ -1187,7 +1208,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_cache_tokens"):
             events.append(event)
 
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         complete_event = self.parse_sse_event(complete_events[0])
 
         # Verify cache token fields are included
@@ -1215,7 +1236,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_zero_cache"):
             events.append(event)
 
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         complete_event = self.parse_sse_event(complete_events[0])
 
         # Base tokens should be present
@@ -1243,7 +1264,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_cache_read"):
             events.append(event)
 
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         complete_event = self.parse_sse_event(complete_events[0])
 
         # Cache read should be present, write should be omitted
@@ -1268,7 +1289,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_cache_write"):
             events.append(event)
 
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         complete_event = self.parse_sse_event(complete_events[0])
 
         # Cache write should be present, read should be omitted
@@ -1288,7 +1309,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_error"):
             events.append(event)
 
-        error_events = [e for e in events if '"type": "error"' in e]
+        error_events = [e for e in events if sse_type(e) == "error"]
         error_event = self.parse_sse_event(error_events[0])
 
         # Frontend expects: { type: "error", message: string }
@@ -1315,7 +1336,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_interrupt"):
             events.append(event)
 
-        interrupt_events = [e for e in events if '"type": "interrupt"' in e]
+        interrupt_events = [e for e in events if sse_type(e) == "interrupt"]
         interrupt_event = self.parse_sse_event(interrupt_events[0])
 
         # Frontend expects: { type: "interrupt", interrupts: [{id, name, reason}] }
@@ -1347,7 +1368,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_metadata"):
             events.append(event)
 
-        metadata_events = [e for e in events if '"type": "metadata"' in e]
+        metadata_events = [e for e in events if sse_type(e) == "metadata"]
         metadata_event = self.parse_sse_event(metadata_events[0])
 
         # Frontend expects: { type: "metadata", metadata: { browserSessionId?: string, ... } }
@@ -1376,7 +1397,7 @@ class TestFrontendEventCompatibility:
         async for event in processor.process_stream(mock_agent, "Test", session_id="test_fe_browser_progress"):
             events.append(event)
 
-        progress_events = [e for e in events if '"type": "browser_progress"' in e]
+        progress_events = [e for e in events if sse_type(e) == "browser_progress"]
         progress_event = self.parse_sse_event(progress_events[0])
 
         # Frontend expects: { type: "browser_progress", content: string, stepNumber: number }
@@ -1409,29 +1430,6 @@ class TestStreamEventProcessorStopSignal:
     def test_stop_signal_provider_initialization(self, processor):
         """Test that stop signal provider is initialized."""
         assert processor.stop_signal_provider is not None
-        assert processor.stop_check_interval == 1.0
-        assert processor.last_stop_check_time == 0
-
-    def test_should_check_stop_signal_throttling(self, processor):
-        """Test that stop signal checking is throttled."""
-        # First check should return True
-        assert processor._should_check_stop_signal() is True
-
-        # Immediate second check should return False (throttled)
-        assert processor._should_check_stop_signal() is False
-
-    def test_should_check_stop_signal_after_interval(self, processor):
-        """Test that stop signal check is allowed after interval."""
-        import time
-
-        # First check
-        assert processor._should_check_stop_signal() is True
-
-        # Set last check time to past
-        processor.last_stop_check_time = time.time() - 2.0  # 2 seconds ago
-
-        # Should allow check now
-        assert processor._should_check_stop_signal() is True
 
     def test_check_stop_signal_no_session(self, processor):
         """Test that stop signal check skips when no session."""
@@ -1548,7 +1546,6 @@ class TestStreamEventProcessorStopSignal:
     async def test_process_stream_stop_requested_saves_partial(self, processor, mock_agent):
         """Test that stop request saves partial response and yields complete event."""
         from streaming.event_processor import StopRequestedException
-        from unittest.mock import patch
 
         # Mock slow streaming that gets interrupted
         async def mock_slow_stream(*args, **kwargs):
@@ -1569,27 +1566,9 @@ class TestStreamEventProcessorStopSignal:
             events.append(event)
 
         # Should have complete event at the end
-        complete_events = [e for e in events if '"type": "complete"' in e]
+        complete_events = [e for e in events if sse_type(e) == "complete"]
         assert len(complete_events) == 1
-        assert "Stream stopped by user" in complete_events[0]
-
-    @pytest.mark.asyncio
-    async def test_process_stream_resets_stop_check_timer(self, processor, mock_agent):
-        """Test that process_stream resets stop check timer at start."""
-        import time
-
-        # Set last check time to something non-zero
-        processor.last_stop_check_time = time.time()
-
-        events_list = [{"result": create_mock_final_result("Done")}]
-        mock_agent.stream_async = create_async_generator(events_list)
-
-        async for _ in processor.process_stream(mock_agent, "Test", session_id="test_reset"):
-            pass
-
-        # Timer should be reset to 0 at start (then updated during processing)
-        # This ensures first stop check can happen immediately
-        # Note: The actual value after processing will be updated, so we just verify it works
+        assert "Stream stopped by user" in complete_events[0].decode()
 
 
 class TestStopRequestedException:
@@ -1786,7 +1765,6 @@ class TestStrandsMessageSignatureCompliance:
 
             assert isinstance(tool_use["input"], dict)
             # Should be JSON serializable
-            import json
             json.dumps(tool_use)  # Should not raise
 
     # ============================================================
@@ -1891,8 +1869,8 @@ class TestStrandsMessageSignatureCompliance:
         event_str = StreamEventFormatter.create_tool_use_event(tool_use)
 
         # Should be valid SSE format
-        assert event_str.startswith("data: ")
-        assert event_str.endswith("\n\n")
+        assert event_str.startswith(b"data: ")
+        assert event_str.endswith(b"\n\n")
 
         # Parse and verify
         import json
@@ -1915,7 +1893,7 @@ class TestStrandsMessageSignatureCompliance:
         event_str = StreamEventFormatter.create_tool_result_event(tool_result)
 
         # Should be valid SSE format
-        assert event_str.startswith("data: ")
+        assert event_str.startswith(b"data: ")
 
         # Parse and verify
         import json
@@ -2265,6 +2243,9 @@ class TestStrandsMessageSignatureCompliance:
             ]}
         ]
 
+        # Cache points are added inside messages, never as messages of their own
+        assert [msg["role"] for msg in messages_after] == [msg["role"] for msg in messages_before]
+
         # Verify structure matches Strands expectations
         for msg in messages_after:
             assert "role" in msg
@@ -0,0 +1,406 @@
+"""
+Tests for the container-local session history cache.
+
+Focuses on meaningful logic:
+- Cached messages never alias the caller's dicts
+- Write-through, incremental extend and invalidation keep the watermark consistent
+- CompactingSessionManager fetches only events newer than the watermark
+- A missing watermark falls back to a full reload
+- With a checkpoint, initialize reads only the events from the checkpoint onwards
+- list_recent_messages stops paging once it has the newest n messages
+"""
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.types.session import SessionMessage
+
+from agent.session.history_cache import SessionHistoryCache, clone_session_message
+
+
+def session_message(text, role="user", index=0):
+    return SessionMessage.from_message({"role": role, "content": [{"text": text}]}, index)
+
+
+def texts(messages):
+    return [sm.message["content"][0]["text"] for sm in messages]
+
+
+class TestSessionHistoryCache:
+    """Cache entry bookkeeping."""
+
+    def test_snapshot_returns_independent_copies(self):
+        cache = SessionHistoryCache()
+        original = session_message("hello")
+        cache.store("u1", "s1", [original], ["e1"], "e1")
+
+        original.message["content"][0]["text"] = "mutated by caller"
+        messages, event_ids, watermark = cache.snapshot("u1", "s1")
+        messages[0].message["content"].append({"text": "mutated by agent"})
+
+        again, _, _ = cache.snapshot("u1", "s1")
+        assert watermark == "e1"
+        assert again[0].message == {"role": "user", "content": [{"text": "hello"}]}
+
+    def test_clone_shares_leaves(self):
+        image = b"\x89PNG..."
+        sm = SessionMessage.from_message({"role": "user", "content": [{"image": {"source": {"bytes": image}}}]}, 0)
+        clone = clone_session_message(sm)
+        assert clone.message == sm.message
+        assert clone.message["content"] is not sm.message["content"]
+        assert clone.message["content"][0]["image"]["source"]["bytes"] is image
+
+    def test_append_advances_watermark(self):
+        cache = SessionHistoryCache()
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+
+        cache.append("u1", "s1", session_message("b", role="assistant"), "e2", "e1")
+        cache.append("u1", "s1", None, "e3", "e2")  # Agent state event
+
+        messages, event_ids, watermark = cache.snapshot("u1", "s1")
+        assert texts(messages) == ["a", "b"]
+        assert event_ids == ["e1", "e2"]
+        assert watermark == "e3"
+
+    def test_append_without_event_id_invalidates(self):
+        cache = SessionHistoryCache()
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+
+        cache.append("u1", "s1", session_message("b"), None, "e1")  # Batched write
+
+        assert cache.snapshot("u1", "s1") is None
+
+    def test_append_without_entry_is_ignored(self):
+        cache = SessionHistoryCache()
+        cache.append("u1", "s1", session_message("a"), "e1", None)
+        assert cache.snapshot("u1", "s1") is None
+
+    def test_append_requires_seen_watermark(self):
+        cache = SessionHistoryCache()
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+        cache.append("u1", "s1", session_message("b"), "e2", "e1")
+
+        # A writer that last saw e1 missed e2: its write can't be placed
+        cache.append("u1", "s1", session_message("c"), "e3", "e1")
+        assert cache.snapshot("u1", "s1") is None
+
+    def test_extend_requires_unchanged_watermark(self):
+        cache = SessionHistoryCache()
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+
+        cache.extend("u1", "s1", [session_message("b")], ["e2"], "e2", since_event_id="e1")
+        assert texts(cache.snapshot("u1", "s1")[0]) == ["a", "b"]
+
+        cache.extend("u1", "s1", [session_message("c")], ["e9"], "e9", since_event_id="e1")  # Stale load
+        assert cache.snapshot("u1", "s1") is None
+
+    def test_keys_are_per_actor(self):
+        cache = SessionHistoryCache()
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+        assert cache.snapshot("u2", "s1") is None
+
+    def test_lru_and_ttl_bounds(self):
+        cache = SessionHistoryCache(max_sessions=2)
+        for n in range(3):
+            cache.store("u1", f"s{n}", [session_message("a")], ["e1"], "e1")
+        assert cache.snapshot("u1", "s0") is None
+        assert cache.snapshot("u1", "s2") is not None
+
+        expired = SessionHistoryCache(ttl_seconds=0)
+        expired.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+        assert expired.snapshot("u1", "s1") is None
+
+    def test_disabled(self):
+        cache = SessionHistoryCache(max_sessions=0)
+        cache.store("u1", "s1", [session_message("a")], ["e1"], "e1")
+        assert not cache.enabled
+        assert cache.snapshot("u1", "s1") is None
+
+
+class FakeMemory:
+    """AgentCore Memory events of one session; list_events pages newest first."""
+
+    def __init__(self):
+        self.events = []  # Chronological
+        self.pages_served = 0
+        self.events_served = 0
+
+    def add_message(self, text, role="user"):
+        sm = session_message(text, role)
+        payload = {"_payload_type": "message", **sm.to_dict()}
+        event_id = f"e{len(self.events) + 1:05d}"
+        self.events.append({"eventId": event_id, "payload": [{"blob": json.dumps(payload)}]})
+        return event_id
+
+    def add_agent_state(self):
+        payload = {"_payload_type": "agent_state", "_agent_id": "default", "agent_id": "default", "state": {}}
+        event_id = f"e{len(self.events) + 1:05d}"
+        self.events.append({"eventId": event_id, "payload": [{"blob": json.dumps(payload)}]})
+        return event_id
+
+    def list_events(self, memoryId, actorId, sessionId, maxResults, includePayloads, nextToken=None):
+        newest_first = list(reversed(self.events))
+        start = int(nextToken or 0)
+        page = newest_first[start:start + maxResults]
+        self.pages_served += 1
+        self.events_served += len(page)
+        response = {"events": page}
+        if start + maxResults < len(newest_first):
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+
+class TestManagerIncrementalLoad:
+    """CompactingSessionManager reads through the cache."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = SessionHistoryCache()
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_session_history_cache", lambda: cache)
+        return cache
+
+    @pytest.fixture
+    def memory(self):
+        return FakeMemory()
+
+    @pytest.fixture
+    def manager(self, cache, memory):
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager
+
+            manager = CompactingSessionManager(agentcore_memory_config=MagicMock(), region_name='us-west-2', write_behind=False)
+            manager.config = MagicMock(memory_id="mem", actor_id="u1", session_id="s1")
+            manager.memory_client = MagicMock()
+            manager.memory_client.gmdp_client.list_events.side_effect = memory.list_events
+            return manager
+
+    def test_second_load_fetches_only_new_events(self, manager, memory):
+        for n in range(250):
+            memory.add_message(f"m{n}", role="user" if n % 2 == 0 else "assistant")
+
+        first = manager._list_messages_unified("s1")
+        assert texts(first) == [f"m{n}" for n in range(250)]
+        assert memory.events_served == 250
+
+        memory.events_served = memory.pages_served = 0
+        memory.add_message("m250")
+        memory.add_agent_state()
+
+        second = manager._list_messages_unified("s1")
+        assert texts(second)[-2:] == ["m249", "m250"]
+        assert len(second) == 251
+        assert memory.pages_served == 1  # One small page reaches the watermark
+        assert memory.events_served <= 10
+
+    def test_write_through_avoids_refetch(self, manager, memory, cache):
+        memory.add_message("question")
+        manager._list_messages_unified("s1")
+
+        event_id = memory.add_message("answer", role="assistant")
+        with patch(
+            'agent.session.compacting_session_manager.AgentCoreMemorySessionManager.create_message',
+            return_value={"eventId": event_id},
+        ):
+            manager.create_message("s1", "default", session_message("answer", role="assistant"))
+
+        memory.events_served = 0
+        messages = manager._list_messages_unified("s1")
+
+        assert texts(messages) == ["question", "answer"]
+        assert memory.pages_served == 2  # Cold load + one small page to confirm the watermark
+        assert cache.get_stats()["appended"] == 1
+
+    def test_write_through_filters_empty_text(self, manager, memory, cache):
+        memory.add_message("question")
+        manager._list_messages_unified("s1")
+
+        empty = SessionMessage.from_message({"role": "assistant", "content": [{"text": "  "}]}, 0)
+        with patch(
+            'agent.session.compacting_session_manager.AgentCoreMemorySessionManager.create_message',
+            return_value={"eventId": "e99"},
+        ):
+            manager.create_message("s1", "default", empty)
+
+        messages, event_ids, watermark = cache.snapshot("u1", "s1")
+        assert texts(messages) == ["question"]
+        assert watermark == "e99"
+
+    def test_missing_watermark_reloads_everything(self, manager, memory, cache):
+        memory.add_message("a")
+        cache.store("u1", "s1", [session_message("stale")], ["gone"], "gone")
+
+        messages = manager._list_messages_unified("s1")
+
+        assert texts(messages) == ["a"]
+        assert texts(cache.snapshot("u1", "s1")[0]) == ["a"]
+
+    def test_limit_on_cold_cache_does_not_populate(self, manager, memory, cache):
+        memory.add_message("a")
+        memory.add_message("b", role="assistant")
+        manager.memory_client.list_events.return_value = list(reversed(memory.events))[:1]
+
+        messages = manager._list_messages_unified("s1", limit=1)
+
+        assert texts(messages) == ["b"]
+        assert cache.get_stats()["sessions"] == 0
+
+
+class TestRecentMessages:
+    """list_recent_messages reads only the tail of the session."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = SessionHistoryCache()
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_session_history_cache", lambda: cache)
+        return cache
+
+    @pytest.fixture
+    def memory(self):
+        memory = FakeMemory()
+        for n in range(300):
+            memory.add_message(f"m{n}", role="user" if n % 2 == 0 else "assistant")
+            if n % 10 == 9:
+                memory.add_agent_state()
+        return memory
+
+    @pytest.fixture
+    def manager(self, cache, memory):
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager
+
+            manager = CompactingSessionManager(agentcore_memory_config=MagicMock(), region_name='us-west-2', write_behind=False)
+            manager.config = MagicMock(memory_id="mem", actor_id="u1", session_id="s1")
+            manager.memory_client = MagicMock()
+            manager.memory_client.gmdp_client.list_events.side_effect = memory.list_events
+            return manager
+
+    def test_cold_cache_stops_early(self, manager, memory, cache):
+        recent = manager.list_recent_messages("s1", 20)
+
+        assert texts(recent) == [f"m{n}" for n in range(280, 300)]
+        assert memory.pages_served == 1
+        assert memory.events_served == 30
+        assert cache.get_stats()["sessions"] == 0  # A tail is not a full history
+
+    def test_roles_filter(self, manager, memory):
+        recent = manager.list_recent_messages("s1", 5, roles=("user",))
+
+        assert texts(recent) == ["m290", "m292", "m294", "m296", "m298"]
+
+    def test_cached_session_reads_only_new_events(self, manager, memory):
+        manager._list_messages_unified("s1")
+        memory.add_message("m300")
+        memory.events_served = 0
+
+        assert texts(manager.list_recent_messages("s1", 2)) == ["m299", "m300"]
+        assert memory.events_served <= 10
+
+    def test_short_session(self, manager):
+        assert len(manager.list_recent_messages("s1", 1000)) == 300
+        assert manager.list_recent_messages("s1", 0) == []
+
+
+class TestCheckpointTailLoad:
+    """initialize() loads only the post-checkpoint tail when the cache is cold."""
+
+    @pytest.fixture
+    def memory(self):
+        memory = FakeMemory()
+        for n in range(500):
+            memory.add_message(f"m{n}", role="user" if n % 2 == 0 else "assistant")
+            if n % 2:
+                memory.add_agent_state()
+        return memory
+
+    def make_manager(self, memory, state):
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager
+
+            manager = CompactingSessionManager(agentcore_memory_config=MagicMock(), region_name='us-west-2', protected_turns=2)
+        manager.config = MagicMock(memory_id="mem", actor_id="u1", session_id="s1")
+        manager.session_id = "s1"
+        manager._latest_agent_message = {}
+        manager.memory_client = MagicMock()
+        manager.memory_client.gmdp_client.list_events.side_effect = memory.list_events
+        manager.session_repository = MagicMock()
+        manager.session_repository.read_agent.return_value = MagicMock(state={}, conversation_manager_state={})
+        manager.load_compaction_state = MagicMock(return_value=state)
+        return manager
+
+    @staticmethod
+    def make_agent():
+        agent = MagicMock(agent_id="default")
+        agent.conversation_manager.restore_from_session.return_value = []
+        agent.conversation_manager.removed_message_count = 0
+        return agent
+
+    @pytest.fixture(autouse=True)
+    def no_cache(self, monkeypatch):
+        cache = SessionHistoryCache(max_sessions=0)
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_session_history_cache", lambda: cache)
+
+    def test_full_load_backfills_anchor_then_tail_load(self, memory):
+        from agent.session.compacting_session_manager import CompactionState
+
+        state = CompactionState(checkpoint=400, summary="Previous conversation topics:\n- User asked about: m0")
+        self.make_manager(memory, state).initialize(self.make_agent())
+        assert memory.events_served == 750
+        assert state.checkpointEventId is not None
+
+        memory.events_served = memory.pages_served = 0
+        manager = self.make_manager(memory, state)
+        agent = self.make_agent()
+        manager.initialize(agent)
+
+        assert manager.last_init_info["load_mode"] == "tail"
+        assert manager.last_init_info["loaded_messages"] == 100
+        assert memory.pages_served == 2  # 150 of 750 events: messages 400-499 + their agent states
+        assert texts([SessionMessage.from_message(m, 0) for m in agent.messages[-2:]]) == ["m498", "m499"]
+        assert agent.messages[0]["content"][0]["text"].startswith("<conversation_summary>")
+        assert manager._valid_cutoff_message_ids[0] == 400
+        assert manager._total_message_count_at_init == 500
+
+    def test_unknown_anchor_falls_back_to_full_load(self, memory):
+        from agent.session.compacting_session_manager import CompactionState
+
+        state = CompactionState(checkpoint=400, checkpointEventId="gone")
+        manager = self.make_manager(memory, state)
+        agent = self.make_agent()
+        manager.initialize(agent)
+
+        assert manager.last_init_info["load_mode"] == "full"
+        assert len(agent.messages) == 100
+        assert manager._valid_cutoff_message_ids[0] == 0
+
+    def test_checkpoint_advances_from_tail(self, memory):
+        from agent.session.compacting_session_manager import CompactionState
+
+        anchor = [e["eventId"] for e in memory.events if '"m400"' in e["payload"][0]["blob"]][0]
+        state = CompactionState(
+            checkpoint=400,
+            checkpointEventId=anchor,
+            summary="Previous conversation topics:\n- User asked about: m0",
+        )
+        manager = self.make_manager(memory, state)
+        manager.token_threshold = 10
+        manager.pre_turn_compaction = False  # Exercise the post-turn path
+        manager.background_compaction = False
+        manager.initialize(self.make_agent())
+        manager._retrieve_session_summaries = MagicMock(return_value=[])
+        manager.save_compaction_state = MagicMock()
+
+        manager.update_after_turn(1000, "default")
+
+        assert state.checkpoint == 496
+        assert state.checkpointEventId == [e["eventId"] for e in memory.events if '"m496"' in e["payload"][0]["blob"]][0]
+        lines = state.summary.splitlines()
+        assert "- User asked about: m0" not in lines  # Only the last 10 topics are kept
+        assert lines[-1] == "- User asked about: m494"
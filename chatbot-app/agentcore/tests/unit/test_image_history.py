@@ -0,0 +1,123 @@
+"""
+Tests for the tool result image history policy.
+
+Focuses on meaningful logic:
+- Only the newest keep_last images of the managed tools survive a pass; older ones become placeholders
+- Passes run in batches (keep_last + evict_batch), so earlier messages change rarely
+- Messages are rewritten copy-on-write; other tools' images and user uploads are untouched
+- Kept images other than the newest are downscaled when configured
+- ImageHistoryHook accumulates per-turn metrics
+"""
+import io
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from agent.hooks import ImageHistoryHook
+from agent.session.image_history import ImageHistoryPolicy
+
+
+def jpeg(width=1280, height=720):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 60).convert("RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def browser_session(steps, tool="browser_act", data=b"\xff\xd8" + b"x" * 1000):
+    messages = [{"role": "user", "content": [{"text": "Book a table"}]}]
+    for step in range(steps):
+        messages.append({"role": "assistant", "content": [{"toolUse": {"toolUseId": f"t{step}", "name": tool, "input": {}}}]})
+        messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": f"t{step}", "status": "success", "content": [
+            {"text": f"step {step}"},
+            {"image": {"format": "jpeg", "source": {"bytes": data}}},
+        ]}}]})
+    return messages
+
+
+def result_blocks(messages):
+    return [block["toolResult"]["content"][1] for message in messages for block in message["content"] if "toolResult" in block]
+
+
+class TestEviction:
+    """Which images are kept."""
+
+    def test_keeps_newest_images(self):
+        messages = browser_session(8)
+        eviction = ImageHistoryPolicy(keep_last=3, evict_batch=2).apply(messages)
+
+        blocks = result_blocks(messages)
+        assert [("image" in block) for block in blocks] == [False] * 5 + [True] * 3
+        assert blocks[0] == {"text": "[browser_act image removed from history: format=jpeg, original_size=1002 bytes]"}
+        assert (eviction.images_removed, eviction.bytes_removed) == (5, 5 * 1002)
+
+    def test_batched_passes(self):
+        policy = ImageHistoryPolicy(keep_last=3, evict_batch=2)
+        messages = browser_session(5)
+        assert not policy.apply(messages)  # 5 <= 3 + 2
+
+        messages.extend(browser_session(1)[1:])
+        assert policy.apply(messages).images_removed == 3
+        assert not policy.apply(messages)
+
+    def test_copy_on_write(self):
+        messages = browser_session(4)
+        original = list(messages)
+        ImageHistoryPolicy(keep_last=1, evict_batch=0).apply(messages)
+
+        assert messages[2] is not original[2]
+        assert "image" in original[2]["content"][0]["toolResult"]["content"][1]  # Old dict untouched
+        assert messages[-1] is original[-1] and messages[1] is original[1]
+
+    def test_other_tools_and_uploads_untouched(self):
+        messages = browser_session(4, tool="generate_chart")
+        messages[0]["content"].append({"image": {"format": "png", "source": {"bytes": b"upload"}}})
+
+        assert not ImageHistoryPolicy(keep_last=1, evict_batch=0).apply(messages)
+        assert ImageHistoryPolicy(keep_last=1, evict_batch=0, tools=["*"]).apply(messages).images_removed == 3
+        assert messages[0]["content"][1]["image"]["source"]["bytes"] == b"upload"
+
+    def test_disabled(self):
+        messages = browser_session(20)
+        assert not ImageHistoryPolicy(keep_last=0).apply(messages)
+        assert all("image" in block for block in result_blocks(messages))
+
+
+class TestDownscale:
+    """Kept images other than the newest."""
+
+    def test_kept_images_downscaled(self):
+        from PIL import Image
+
+        screenshot = jpeg()
+        messages = browser_session(4, data=screenshot)
+        eviction = ImageHistoryPolicy(keep_last=3, evict_batch=0, downscale_px=320).apply(messages)
+
+        blocks = result_blocks(messages)
+        sizes = [Image.open(io.BytesIO(block["image"]["source"]["bytes"])).size for block in blocks[1:]]
+        assert sizes == [(320, 180), (320, 180), (1280, 720)]
+        assert eviction.images_downscaled == 2
+        assert eviction.bytes_downscaled == 2 * len(screenshot) - sum(len(block["image"]["source"]["bytes"]) for block in blocks[1:3])
+
+
+class TestImageHistoryHook:
+    """Per-turn metrics."""
+
+    def test_turn_metrics(self):
+        hook = ImageHistoryHook(ImageHistoryPolicy(keep_last=2, evict_batch=0))
+        agent = SimpleNamespace(messages=browser_session(3))
+
+        hook.start_turn(SimpleNamespace(agent=agent))
+        hook.apply_policy(SimpleNamespace(agent=agent))
+        agent.messages.extend(browser_session(1)[1:])
+        hook.apply_policy(SimpleNamespace(agent=agent))
+        hook.end_turn(SimpleNamespace(agent=agent))
+
+        assert hook.last_turn.images_removed == 2
+        assert hook.policy.get_stats()["passes"] == 2
+
+        hook.start_turn(SimpleNamespace(agent=agent))
+        assert not hook.last_turn
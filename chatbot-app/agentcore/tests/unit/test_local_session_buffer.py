@@ -14,6 +14,17 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 from agent.session.local_session_buffer import LocalSessionBuffer, encode_bytes_for_json
 
 
+def saved_record(messages_dir, message_id):
+    """Raw record of a message in the directory's JSONL segments (None if missing)."""
+    record = None
+    for segment in sorted(messages_dir.glob("segment_*.jsonl")):
+        for line in segment.read_text(encoding="utf-8").splitlines():
+            data = json.loads(line)
+            if data["message_id"] == message_id:
+                record = data
+    return record
+
+
 class TestLocalSessionBuffer:
     """Tests for LocalSessionBuffer class."""
 
@@ -134,13 +145,11 @@ class TestLocalSessionBuffer:
         session_buffer.append_message(message, mock_agent)
         session_buffer.flush()
 
-        # Check file was created
-        message_file = setup_session_dir / "message_0.json"
-        assert message_file.exists()
+        # Check the record was written
+        saved = saved_record(setup_session_dir, 0)
+        assert saved is not None
 
         # Verify content
-        with open(message_file) as f:
-            saved = json.load(f)
         assert saved["message"]["role"] == "assistant"
         assert saved["message"]["content"][0]["text"] == "Test response"
 
@@ -171,9 +180,9 @@ class TestLocalSessionBuffer:
         session_buffer.append_message({"role": "assistant", "content": [{"text": "Second"}]}, mock_agent)
         session_buffer.flush()
 
-        # Check both files exist with correct indices
-        assert (setup_session_dir / "message_0.json").exists()
-        assert (setup_session_dir / "message_1.json").exists()
+        # Check both records exist with correct indices
+        assert saved_record(setup_session_dir, 0) is not None
+        assert saved_record(setup_session_dir, 1) is not None
 
     # ============================================================
     # Message Format Tests
@@ -187,8 +196,7 @@ class TestLocalSessionBuffer:
         session_buffer.append_message(message, mock_agent)
         session_buffer.flush()
 
-        with open(setup_session_dir / "message_0.json") as f:
-            saved = json.load(f)
+        saved = saved_record(setup_session_dir, 0)
 
         # Verify structure matches SessionMessage format
         assert "message" in saved
@@ -206,8 +214,7 @@ class TestLocalSessionBuffer:
         session_buffer.append_message(message, mock_agent)
         session_buffer.flush()
 
-        with open(setup_session_dir / "message_0.json") as f:
-            saved = json.load(f)
+        saved = saved_record(setup_session_dir, 0)
 
         # Should be single wrap: {message: {role, content}, message_id, ...}
         # NOT double wrap: {message: {message: {role, content}, ...}, ...}
@@ -253,8 +260,7 @@ class TestLocalSessionBufferInterruptedResponse:
         buffer.flush()
 
         # Verify saved content
-        with open(messages_dir / "message_0.json") as f:
-            saved = json.load(f)
+        saved = saved_record(messages_dir, 0)
 
         content_text = saved["message"]["content"][0]["text"]
         assert partial_text in content_text
@@ -388,8 +394,19 @@ class TestLocalSessionBufferBytesHandling:
     Local mode needs to handle bytes in ContentBlocks for:
     - Images (PNG, JPEG, etc.)
     - Documents (PDF, etc.)
+
+    Runs with ATTACHMENT_POLICY=off, which keeps uploaded bytes in the messages
+    (the default policy stores them as attachment stubs, see test_attachments.py).
     """
 
+    @pytest.fixture(autouse=True)
+    def keep_bytes_in_messages(self, monkeypatch):
+        from agent.session import local_session_buffer
+        from agent.session.attachments import AttachmentStore
+
+        store = AttachmentStore(policy="off")
+        monkeypatch.setattr(local_session_buffer, "get_attachment_store", lambda: store)
+
     @pytest.fixture
     def session_buffer_with_setup(self, tmp_path):
         """Create session buffer with directory setup."""
@@ -431,9 +448,8 @@ class TestLocalSessionBufferBytesHandling:
         buffer.append_message(message, mock_agent)
         buffer.flush()
 
-        # Verify file was created and is valid JSON
-        with open(messages_dir / "message_0.json") as f:
-            saved = json.load(f)
+        # Verify the record was written and is valid JSON
+        saved = saved_record(messages_dir, 0)
 
         # Verify structure
         assert saved["message"]["role"] == "user"
@@ -472,9 +488,8 @@ class TestLocalSessionBufferBytesHandling:
         buffer.append_message(message, mock_agent)
         buffer.flush()
 
-        # Verify file was created and is valid JSON
-        with open(messages_dir / "message_0.json") as f:
-            saved = json.load(f)
+        # Verify the record was written and is valid JSON
+        saved = saved_record(messages_dir, 0)
 
         # Verify bytes were encoded
         doc_source = saved["message"]["content"][1]["document"]["source"]["bytes"]
@@ -508,8 +523,7 @@ class TestLocalSessionBufferBytesHandling:
         buffer.append_message(message, mock_agent)
         buffer.flush()
 
-        with open(messages_dir / "message_0.json") as f:
-            saved = json.load(f)
+        saved = saved_record(messages_dir, 0)
 
         # All bytes should be encoded
         assert saved["message"]["content"][1]["image"]["source"]["bytes"]["__bytes_encoded__"] is True
@@ -528,8 +542,7 @@ class TestLocalSessionBufferBytesHandling:
         buffer.append_message(message, mock_agent)
         buffer.flush()
 
-        with open(messages_dir / "message_0.json") as f:
-            saved = json.load(f)
+        saved = saved_record(messages_dir, 0)
 
         # Should remain unchanged
         assert saved["message"]["content"][0]["text"] == "This is a simple text response."
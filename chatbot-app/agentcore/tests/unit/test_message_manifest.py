@@ -0,0 +1,216 @@
+"""
+Tests for the per-session message manifest.
+
+Focuses on meaningful logic:
+- Appends are indexed on write; counts and ranges do not scan the segments
+- Ranges are ordered by created_at across agents and read only the selected records
+- A restart loads the persisted manifest instead of rescanning
+- Records and legacy files written by someone else are caught up from the last indexed offset
+- Entries that no longer match the files trigger a rebuild
+- list_recent_messages reads only the tail, including messages still in the local buffer
+- Message ids and agent-filtered tails are per agent (swarm history shares the session with voice)
+"""
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.types.session import SessionMessage
+
+from agent.session.message_manifest import SessionManifest
+from agent.session.message_segments import MessageSegmentStore, message_dirs, session_dir
+
+
+def text(sm):
+    return sm.message["content"][0]["text"]
+
+
+def message(role, value):
+    return {"role": role, "content": [{"text": value}]}
+
+
+def session_message(role, value, message_id, created_at):
+    return SessionMessage(message=message(role, value), message_id=message_id, created_at=created_at, updated_at=created_at)
+
+
+@pytest.fixture
+def session_path(tmp_path):
+    return session_dir(str(tmp_path), "s1")
+
+
+@pytest.fixture
+def no_scan(monkeypatch):
+    """Fail if the manifest has to scan segments."""
+    def scan(*args, **kwargs):
+        raise AssertionError("segments were scanned")
+
+    monkeypatch.setattr(MessageSegmentStore, "scan_positions", scan)
+
+
+class TestIndexedOnWrite:
+    """Appends through the manifest's stores."""
+
+    def test_count_and_range_without_scanning(self, session_path, no_scan):
+        manifest = SessionManifest(session_path)
+        manifest.store("default").append_messages([message("user", f"m{n}") for n in range(10)])
+
+        assert manifest.count() == 10
+        assert [e.message_id for e in manifest.entries(offset=7)] == [7, 8, 9]
+        assert [text(sm) for sm in manifest.read(manifest.entries(offset=2, limit=2))] == ["m2", "m3"]
+
+    def test_agents_interleaved_by_created_at(self, session_path):
+        manifest = SessionManifest(session_path)
+        manifest.store("default").append([
+            session_message("user", "text q", 0, "2026-01-01T00:00:00+00:00"),
+            session_message("assistant", "text a", 1, "2026-01-01T00:00:02+00:00"),
+        ])
+        manifest.store("voice").append([session_message("user", "voice q", 0, "2026-01-01T00:00:01+00:00")])
+
+        assert [text(sm) for sm in manifest.read(manifest.entries())] == ["text q", "voice q", "text a"]
+
+    def test_update_replaces_entry(self, session_path, no_scan):
+        manifest = SessionManifest(session_path)
+        store = manifest.store("default")
+        store.append_messages([message("user", "secret"), message("assistant", "ok")])
+        created_at = store.read_message(0).created_at
+        store.append([session_message("user", "[redacted]", 0, created_at)])
+
+        assert manifest.count() == 2
+        assert [text(sm) for sm in manifest.read(manifest.entries())] == ["[redacted]", "ok"]
+
+    def test_restart_loads_persisted_manifest(self, session_path, no_scan):
+        SessionManifest(session_path).store("default").append_messages([message("user", f"m{n}") for n in range(5)])
+
+        restarted = SessionManifest(session_path)
+        assert restarted.count() == 5
+        assert text(restarted.read(restarted.entries(offset=4))[0]) == "m4"
+
+    def test_body_with_timestamp_keys(self, session_path):
+        tricky = {"role": "user", "content": [
+            {"text": 'literal ,"created_at":"1999" text'},
+            {"toolResult": {"toolUseId": "t", "content": [{"json": {"created_at": "1999", "updated_at": "1999"}}]}},
+        ]}
+        SessionManifest(session_path).store("default").append_messages([tricky])
+
+        # Index from the segments alone
+        os.remove(os.path.join(session_path, "manifest.jsonl"))
+        entries = SessionManifest(session_path).entries()
+        assert len(entries) == 1 and entries[0].created_at.startswith("20")
+
+
+class TestCatchUp:
+    """Files that were not written through the manifest."""
+
+    def test_records_appended_by_another_writer(self, session_path, tmp_path):
+        manifest = SessionManifest(session_path)
+        manifest.store("default").append_messages([message("user", "a")])
+
+        outside = MessageSegmentStore(*message_dirs(str(tmp_path), "s1", "default"))
+        outside.append_messages([message("assistant", "b"), message("user", "c")])
+
+        assert manifest.count() == 3
+        assert [text(sm) for sm in manifest.read(manifest.entries(offset=1))] == ["b", "c"]
+
+    def test_legacy_files_indexed_then_migrated(self, session_path, tmp_path):
+        messages_dir, _ = message_dirs(str(tmp_path), "s1", "default")
+        os.makedirs(messages_dir)
+        for n in range(2):
+            sm = session_message("user", f"legacy {n}", n, f"2026-01-01T00:00:0{n}+00:00")
+            with open(os.path.join(messages_dir, f"message_{n}.json"), "w") as f:
+                json.dump(sm.to_dict(), f, indent=2)
+
+        manifest = SessionManifest(session_path)
+        assert [text(sm) for sm in manifest.read(manifest.entries())] == ["legacy 0", "legacy 1"]
+
+        manifest.store("default").append_messages([message("assistant", "new")])
+        entries = manifest.entries()
+        assert [e.segment for e in entries] == [0, 0, 0]
+        assert [text(sm) for sm in manifest.read(entries)] == ["legacy 0", "legacy 1", "new"]
+
+    def test_stale_entries_trigger_rebuild(self, session_path, tmp_path):
+        SessionManifest(session_path).store("default").append_messages([message("user", f"m{n}") for n in range(3)])
+        path = os.path.join(session_path, "manifest.jsonl")
+        rows = [json.loads(line) for line in open(path)]
+        with open(path, "w") as f:
+            for row in rows:
+                row[4] += 1  # Offsets no longer point at the records
+                f.write(json.dumps(row) + "\n")
+
+        manifest = SessionManifest(session_path)
+        assert [text(sm) for sm in manifest.read(manifest.entries())] == ["m0", "m1", "m2"]
+        assert [json.loads(line)[4] for line in open(path)] == [row[4] - 1 for row in rows]
+
+    def test_deleted_session_is_empty(self, session_path):
+        manifest = SessionManifest(session_path)
+        manifest.store("default").append_messages([message("user", "a")])
+        shutil.rmtree(session_path)
+
+        assert manifest.count() == 0
+        assert not os.path.exists(session_path)
+
+
+class TestUnifiedManager:
+    """UnifiedFileSessionManager answers from the manifest."""
+
+    def test_count_and_paged_list(self, tmp_path):
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        for n in range(6):
+            manager.create_message("s1", "default", SessionMessage.from_message(message("user", f"m{n}"), n))
+
+        assert manager.count_messages("s1") == 6
+        assert [text(sm) for sm in manager.list_messages("s1", "voice", limit=2, offset=4)] == ["m4", "m5"]
+
+    def test_recent_messages_with_roles(self, tmp_path, monkeypatch):
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        for n in range(40):
+            role = "user" if n % 2 == 0 else "assistant"
+            manager.create_message("s1", "default", SessionMessage.from_message(message(role, f"m{n}"), n))
+
+        read = []
+        original = MessageSegmentStore.read_at
+
+        def read_at(self, positions):
+            positions = list(positions)
+            read.extend(positions)
+            return original(self, positions)
+
+        monkeypatch.setattr(MessageSegmentStore, "read_at", read_at)
+
+        assert [text(sm) for sm in manager.list_recent_messages("s1", 3)] == ["m37", "m38", "m39"]
+        assert len(read) == 3
+        assert [text(sm) for sm in manager.list_recent_messages("s1", 3, roles=("user",))] == ["m34", "m36", "m38"]
+        assert len(manager.list_recent_messages("s1", 100)) == 40
+
+    def test_per_agent_ids_and_recent_messages(self, tmp_path):
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        for n in range(3):
+            manager.create_message("s1", "default", SessionMessage.from_message(message("user", f"text{n}"), n))
+            manager.create_message("s1", "voice", SessionMessage.from_message(message("user", f"voice{n}"), n))
+
+        assert manager.next_message_id("s1", "default") == 3
+        assert manager.count_messages("s1") == 6
+        assert [text(sm) for sm in manager.list_recent_messages("s1", 2, agent_id="default")] == ["text1", "text2"]
+        assert [text(sm) for sm in manager.list_recent_messages("s1", 2)] == ["text2", "voice2"]
+
+    def test_recent_messages_include_buffered(self, tmp_path):
+        from agent.session.local_session_buffer import LocalSessionBuffer
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        manager = UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+        buffer = LocalSessionBuffer(base_manager=manager, session_id="s1", batch_size=3)
+        for n in range(4):
+            buffer.append_message(message("user", f"m{n}"), object())
+
+        recent = buffer.list_recent_messages("s1", 2)
+        assert [text(sm) for sm in recent] == ["m2", "m3"]
+        assert [sm.message_id for sm in recent] == [2, 3]  # m3 is still buffered
@@ -0,0 +1,167 @@
+"""
+Tests for append-only JSONL message segments.
+
+Focuses on meaningful logic:
+- Ids are assigned from an in-memory counter that survives a restart (rescan)
+- Large bytes go to deduplicated sidecar blobs and read back unchanged
+- Legacy message_<N>.json files are read and migrated on the first append
+- Updates append a newer record that wins; torn writes do not lose later records
+- UnifiedFileSessionManager and LocalSessionBuffer share the same storage
+"""
+import hashlib
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.types.session import SessionMessage
+
+from agent.session.message_segments import MessageSegmentStore, message_dirs
+
+
+def text(sm):
+    return sm.message["content"][0]["text"]
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return message_dirs(str(tmp_path), "s1", "default")
+
+
+class TestMessageSegmentStore:
+    """Writing and reading one agent's messages."""
+
+    def test_sequential_ids_across_restart(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        assert store.append_messages([{"role": "user", "content": [{"text": "a"}]}]) == [0]
+        assert store.append_messages([
+            {"role": "assistant", "content": [{"text": "b"}]},
+            {"role": "user", "content": [{"text": "c"}]},
+        ]) == [1, 2]
+
+        restarted = MessageSegmentStore(*dirs)
+        assert restarted.next_message_id() == 3
+        assert [text(sm) for sm in restarted.read_messages()] == ["a", "b", "c"]
+        assert restarted.count() == 3
+
+    def test_records_are_compact_single_lines(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        store.append_messages([{"role": "user", "content": [{"text": "héllo"}]}])
+
+        lines = open(os.path.join(dirs[0], "segment_000000.jsonl"), encoding="utf-8").read().splitlines()
+        assert len(lines) == 1
+        assert lines[0].startswith('{"message_id":0,"message":{"role":"user"')
+        assert "héllo" in lines[0]
+
+    def test_large_bytes_go_to_deduplicated_blobs(self, dirs):
+        image = b"\x89PNG" + os.urandom(10_000)
+        store = MessageSegmentStore(*dirs)
+        message = {"role": "user", "content": [{"image": {"format": "png", "source": {"bytes": image}}}]}
+        store.append_messages([message, message])
+
+        assert os.listdir(dirs[1]) == [hashlib.sha256(image).hexdigest()]
+        segment = open(os.path.join(dirs[0], "segment_000000.jsonl"), encoding="utf-8").read()
+        assert len(segment) < 1000
+        for sm in store.read_messages():
+            assert sm.message["content"][0]["image"]["source"]["bytes"] == image
+
+    def test_small_bytes_stay_inline(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        store.append_messages([{"role": "user", "content": [{"document": {"source": {"bytes": b"%PDF"}}}]}])
+
+        assert not os.path.exists(dirs[1])
+        assert store.read_message(0).message["content"][0]["document"]["source"]["bytes"] == b"%PDF"
+
+    def test_legacy_files_read_and_migrated(self, dirs):
+        os.makedirs(dirs[0])
+        for n in range(3):
+            sm = SessionMessage.from_message({"role": "user", "content": [{"text": f"legacy {n}"}]}, n)
+            with open(os.path.join(dirs[0], f"message_{n}.json"), "w") as f:
+                json.dump(sm.to_dict(), f, indent=2)
+
+        store = MessageSegmentStore(*dirs)
+        assert [text(sm) for sm in store.read_messages()] == ["legacy 0", "legacy 1", "legacy 2"]
+
+        assert store.append_messages([{"role": "assistant", "content": [{"text": "new"}]}]) == [3]
+        assert os.listdir(dirs[0]) == ["segment_000000.jsonl"]
+        assert [text(sm) for sm in MessageSegmentStore(*dirs).read_messages()] == [
+            "legacy 0", "legacy 1", "legacy 2", "new"
+        ]
+
+    def test_file_added_by_another_writer_is_picked_up(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        store.append_messages([{"role": "user", "content": [{"text": "a"}]}])
+
+        sm = SessionMessage.from_message({"role": "assistant", "content": [{"text": "sdk"}]}, 1)
+        with open(os.path.join(dirs[0], "message_1.json"), "w") as f:
+            json.dump(sm.to_dict(), f)
+
+        assert store.next_message_id() == 2
+
+    def test_update_appends_winning_record(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        store.append_messages([{"role": "user", "content": [{"text": "secret"}]}])
+        store.append([SessionMessage(
+            message={"role": "user", "content": [{"text": "secret"}]},
+            message_id=0,
+            redact_message={"role": "user", "content": [{"text": "[redacted]"}]},
+        )])
+
+        messages = store.read_messages()
+        assert len(messages) == 1
+        assert messages[0].to_message()["content"][0]["text"] == "[redacted]"
+
+    def test_torn_write_does_not_swallow_next_record(self, dirs):
+        store = MessageSegmentStore(*dirs)
+        store.append_messages([{"role": "user", "content": [{"text": "a"}]}])
+        with open(os.path.join(dirs[0], "segment_000000.jsonl"), "a") as f:
+            f.write('{"message_id":1,"message":{"role":"assis')  # Crash mid-write
+
+        restarted = MessageSegmentStore(*dirs)
+        restarted.append_messages([{"role": "assistant", "content": [{"text": "b"}]}])
+
+        assert [text(sm) for sm in MessageSegmentStore(*dirs).read_messages()] == ["a", "b"]
+
+    def test_segments_rotate(self, dirs):
+        store = MessageSegmentStore(*dirs, segment_max_bytes=300)
+        for n in range(10):
+            store.append_messages([{"role": "user", "content": [{"text": f"message {n} " + "x" * 100}]}])
+
+        segments = sorted(f for f in os.listdir(dirs[0]) if f.startswith("segment_"))
+        assert len(segments) > 3
+        assert [sm.message_id for sm in MessageSegmentStore(*dirs).read_messages()] == list(range(10))
+
+
+class TestLocalSessionStorage:
+    """Session managers on top of the segments."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+        return UnifiedFileSessionManager(session_id="s1", storage_dir=str(tmp_path))
+
+    def test_unified_manager_roundtrip(self, manager):
+        manager.create_message("s1", "voice", SessionMessage.from_message({"role": "user", "content": [{"text": "hi"}]}, 0))
+        manager.create_message("s1", "voice", SessionMessage.from_message({"role": "assistant", "content": [{"text": "hello"}]}, 1))
+
+        assert manager.read_message("s1", "voice", 1).message["content"][0]["text"] == "hello"
+        assert [text(sm) for sm in manager.list_messages("s1", "default")] == ["hi", "hello"]
+
+        manager.update_message("s1", "voice", SessionMessage.from_message({"role": "assistant", "content": [{"text": "edited"}]}, 1))
+        assert [text(sm) for sm in manager.list_messages("s1", "default")] == ["hi", "edited"]
+
+    def test_buffer_flush_is_visible_to_manager(self, manager, tmp_path):
+        from agent.session.local_session_buffer import LocalSessionBuffer
+
+        buffer = LocalSessionBuffer(base_manager=manager, session_id="s1", batch_size=10)
+        for n in range(3):
+            buffer.append_message({"role": "user", "content": [{"text": f"m{n}"}]}, MagicMock())
+        buffer.flush()
+
+        assert [text(sm) for sm in buffer.list_messages("s1", "default")] == ["m0", "m1", "m2"]
+        assert [sm.message_id for sm in buffer.list_messages("s1", "default")] == [0, 1, 2]
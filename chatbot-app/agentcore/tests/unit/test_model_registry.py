@@ -0,0 +1,97 @@
+"""
+Unit tests for ModelRegistry (shared Bedrock clients and models).
+
+Focuses on meaningful logic:
+- Model reuse per (model_id, temperature, max_tokens, retry/timeouts, cache_config)
+- Client reuse per retry/timeout profile
+- Connection pool / keep-alive settings on shared clients
+- Hit/miss counters and the LRU cap on models
+"""
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from agent.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry():
+    """Create a registry with a mocked boto3 Session and BedrockModel."""
+    session = MagicMock()
+    session.client.side_effect = lambda **kwargs: MagicMock(name="client")
+
+    def bedrock_model(boto_session, **kwargs):
+        # Like BedrockModel: the client comes from the session it is given
+        return MagicMock(config=kwargs, client=boto_session.client(service_name="bedrock-runtime"))
+
+    with patch('agent.model_registry.boto3.Session', return_value=session), \
+         patch('agent.model_registry.BedrockModel', side_effect=bedrock_model):
+        yield ModelRegistry(region="us-west-2", max_pool_connections=64, tcp_keepalive=True)
+
+
+class TestModelRegistry:
+    """Tests for ModelRegistry caching."""
+
+    def test_same_config_returns_same_model(self, registry):
+        """Identical model settings share one BedrockModel."""
+        a = registry.get_model("model-a", temperature=0.7)
+        b = registry.get_model("model-a", temperature=0.7)
+
+        assert a is b
+        assert registry.model_hits == 1
+        assert registry.model_misses == 1
+
+    def test_different_settings_build_new_model(self, registry):
+        """Temperature, max_tokens and cache_config are part of the key."""
+        base = registry.get_model("model-a", temperature=0.7)
+
+        assert registry.get_model("model-a", temperature=0.3) is not base
+        assert registry.get_model("model-a", temperature=0.7, max_tokens=4096) is not base
+        assert registry.get_model("model-a", temperature=0.7, cache_config="auto") is not base
+        assert registry.model_misses == 4
+
+    def test_models_share_client_per_profile(self, registry):
+        """Models with the same retry/timeout profile share one client."""
+        a = registry.get_model("model-a", temperature=0.7)
+        b = registry.get_model("model-b", temperature=0.3)
+        c = registry.get_model("model-a", read_timeout=120)
+
+        assert a.client is b.client
+        assert c.client is not a.client
+        assert registry.get_stats()["clients"] == 2
+        assert registry._session.client.call_count == 2  # No per-model client is created
+
+    def test_models_capped_lru(self, registry):
+        """Beyond max_models the least recently used model is dropped."""
+        registry.max_models = 2
+        a = registry.get_model("model-a")
+        registry.get_model("model-b")
+        registry.get_model("model-a")  # a is now the most recently used
+        registry.get_model("model-c")
+
+        assert registry.get_model("model-a") is a
+        assert registry.get_stats()["models"] == 2
+        assert registry.model_evictions == 1
+        registry.get_model("model-b")
+        assert registry.model_misses == 4
+
+    def test_client_config_tuned(self, registry):
+        """Shared clients get the configured pool size and keep-alive."""
+        registry.get_model("model-a", max_attempts=5, read_timeout=180)
+
+        config = registry._session.client.call_args.kwargs["config"]
+        assert config.max_pool_connections == 64
+        assert config.tcp_keepalive is True
+        assert config.read_timeout == 180
+        assert config.retries == {"max_attempts": 5, "mode": "adaptive"}
+
+    def test_clear_closes_clients(self, registry):
+        """clear() drops cached entries and closes clients."""
+        model = registry.get_model("model-a")
+        registry.clear()
+
+        model.client.close.assert_called_once()
+        assert registry.get_model("model-a") is not model
@@ -0,0 +1,100 @@
+"""
+Unit tests for incremental tool input completeness tracking.
+
+Focuses on meaningful logic:
+- Input is complete exactly when the top-level container closes
+- Brackets and quotes inside strings (and escapes split across deltas) are ignored
+- json.loads runs once per complete input, not once per delta
+- A shorter input restarts the tracker
+- process_stream emits tool_use once and tool_progress for large inputs
+"""
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming import partial_json
+from streaming.event_processor import StreamEventProcessor
+from streaming.partial_json import JsonCompletenessTracker
+
+
+def prefixes(text, size):
+    return [text[:i] for i in range(size, len(text) + size, size)]
+
+
+class TestJsonCompletenessTracker:
+    """Tests for JsonCompletenessTracker."""
+
+    def test_complete_only_at_close(self):
+        text = json.dumps({"code": "def f(x):\n    return {'a': [x, \"}\"]}\n", "n": [1, {"b": 2}]})
+        for size in (1, 3, 17):
+            tracker = JsonCompletenessTracker()
+            results = [tracker.update(p) for p in prefixes(text, size)]
+            assert results[-1] is True
+            assert not any(results[:-1])
+            assert tracker.value == json.loads(text)
+
+    def test_escaped_quote_split_across_deltas(self):
+        tracker = JsonCompletenessTracker()
+        assert not tracker.update('{"q": "say \\')
+        assert not tracker.update('{"q": "say \\"}')
+        assert tracker.update('{"q": "say \\"}"}')
+        assert tracker.value == {"q": 'say "}'}
+
+    def test_parses_once_per_complete_input(self):
+        text = json.dumps({"code": "x = 1\n" * 2000})
+        tracker = JsonCompletenessTracker()
+        with patch.object(partial_json.json, "loads", wraps=json.loads) as loads:
+            for p in prefixes(text, 10):
+                tracker.update(p)
+            tracker.update(text)  # Repeated final event
+        assert loads.call_count == 1
+        assert tracker.value == json.loads(text)
+
+    def test_shorter_input_resets(self):
+        tracker = JsonCompletenessTracker()
+        assert tracker.update('{"a": 1}')
+        assert not tracker.update('{"b": ')
+        assert tracker.update('{"b": 2}')
+        assert tracker.value == {"b": 2}
+
+    def test_scalar_top_level_falls_back_to_parse(self):
+        tracker = JsonCompletenessTracker()
+        assert not tracker.update('"abc')
+        assert tracker.update('"abc"')
+        assert tracker.value == "abc"
+
+
+class TestProcessStreamToolInput:
+    """Streamed current_tool_use inputs in StreamEventProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_large_input_progress_then_single_tool_use(self):
+        text = json.dumps({"code": "print('hello')\n" * 1000})
+        events = [
+            {"current_tool_use": {"toolUseId": "t1", "name": "create_word_document", "input": p}}
+            for p in prefixes(text, 100)
+        ]
+        agent = MagicMock()
+
+        async def stream_async(*args, **kwargs):
+            for event in events:
+                yield event
+
+        agent.stream_async = stream_async
+
+        with patch.dict(os.environ, {"TOOL_INPUT_PROGRESS_BYTES": "4096"}):
+            processor = StreamEventProcessor()
+        frames = [json.loads(f[len("data: "):]) async for f in processor.process_stream(agent, "hi", session_id="s1")]
+
+        progress = [e for e in frames if e["type"] == "tool_progress"]
+        assert [e["inputSize"] // 4096 for e in progress] == [1, 2, 3]
+        assert progress[0]["toolUseId"] == "t1"
+
+        tool_uses = [e for e in frames if e["type"] == "tool_use"]
+        assert len(tool_uses) == 1
+        assert tool_uses[0]["input"] == json.loads(text)
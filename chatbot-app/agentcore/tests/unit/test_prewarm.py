@@ -0,0 +1,252 @@
+"""
+Unit tests for the startup prewarm stage and the SSM parameter cache.
+
+Focuses on meaningful logic:
+- Items run concurrently with per-item status and timings
+- Failures and timeouts are recorded without failing the whole stage
+- Concurrent run() calls share one in-flight run
+- Later runs (warmup pings) only retry items that failed or timed out
+- PREWARM_* environment configuration
+- SSM parameter values are cached, failures are not
+- The prewarmed Gateway tool listing is reused by FilteredMCPClients
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from agent.prewarm import PREWARM_ITEMS, Prewarmer
+
+
+class TestPrewarmer:
+    """Tests for Prewarmer run/status behaviour."""
+
+    def test_items_report_status_and_timing(self):
+        """ok / skipped / error / timeout are recorded per item."""
+        def slow():
+            time.sleep(0.5)
+            return "late"
+
+        def broken():
+            raise RuntimeError("boom")
+
+        prewarmer = Prewarmer(
+            items={
+                "ok": lambda: "cached",
+                "skipped": lambda: None,
+                "error": broken,
+                "timeout": slow,
+            },
+            timeout_seconds=0.05,
+        )
+        assert prewarmer.ready is False
+
+        status = asyncio.run(prewarmer.run())
+
+        assert status["ready"] is True
+        assert status["runs"] == 1
+        items = status["items"]
+        assert items["ok"] == {"status": "ok", "detail": "cached", "ms": items["ok"]["ms"]}
+        assert items["skipped"]["status"] == "skipped"
+        assert items["error"]["status"] == "error"
+        assert "boom" in items["error"]["detail"]
+        assert items["timeout"]["status"] == "timeout"
+
+    def test_items_run_concurrently(self):
+        """Items run in worker threads at the same time, not one after another."""
+        barrier = threading.Barrier(3, timeout=2)
+
+        def item():
+            barrier.wait()
+            return "done"
+
+        prewarmer = Prewarmer(items={"a": item, "b": item, "c": item}, timeout_seconds=5)
+        status = asyncio.run(prewarmer.run())
+
+        assert all(r["status"] == "ok" for r in status["items"].values())
+
+    def test_concurrent_runs_share_one_execution(self):
+        """Warmup during the startup run joins it instead of starting another."""
+        calls = []
+
+        def item():
+            calls.append(1)
+            time.sleep(0.05)
+            return "ok"
+
+        prewarmer = Prewarmer(items={"item": item})
+
+        async def scenario():
+            prewarmer.start()
+            return await asyncio.gather(prewarmer.run(), prewarmer.run())
+
+        first, second = asyncio.run(scenario())
+
+        assert len(calls) == 1
+        assert first["runs"] == second["runs"] == 1
+
+    def test_later_runs_retry_only_failed_items(self):
+        """Completed items are cached; failed ones run again."""
+        calls = {"ok": 0, "skipped": 0, "flaky": 0}
+
+        def ok():
+            calls["ok"] += 1
+            return "cached"
+
+        def skipped():
+            calls["skipped"] += 1
+            return None
+
+        def flaky():
+            calls["flaky"] += 1
+            if calls["flaky"] == 1:
+                raise RuntimeError("throttled")
+            return "cached"
+
+        prewarmer = Prewarmer(items={"ok": ok, "skipped": skipped, "flaky": flaky})
+
+        assert asyncio.run(prewarmer.run())["items"]["flaky"]["status"] == "error"
+        status = asyncio.run(prewarmer.run())
+        asyncio.run(prewarmer.run())
+
+        assert status["items"]["flaky"]["status"] == "ok"
+        assert calls == {"ok": 1, "skipped": 1, "flaky": 2}
+        assert status["runs"] == 2
+
+    def test_ready_without_startup_prewarm(self):
+        """Nothing is pending when startup prewarm is disabled."""
+        prewarmer = Prewarmer(items={}, on_startup=False)
+
+        assert prewarmer.get_status()["ready"] is True
+
+    def test_from_env_selects_items(self):
+        """PREWARM_ITEMS selects a subset; unknown names are ignored."""
+        env = {
+            "PREWARM_ITEMS": "gateway_url, tool_config, nope",
+            "PREWARM_ON_STARTUP": "false",
+            "PREWARM_TIMEOUT_SECONDS": "5",
+        }
+        with patch.dict(os.environ, env):
+            prewarmer = Prewarmer.from_env()
+
+        assert list(prewarmer.items) == ["gateway_url", "tool_config"]
+        assert prewarmer.on_startup is False
+        assert prewarmer.timeout_seconds == 5.0
+
+    def test_from_env_defaults_to_all_items(self):
+        """Without PREWARM_ITEMS every known item runs."""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PREWARM_ITEMS", None)
+            prewarmer = Prewarmer.from_env()
+
+        assert set(prewarmer.items) == set(PREWARM_ITEMS)
+
+
+class TestSsmParameterCache:
+    """Tests for get_ssm_parameter caching."""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        from agent.config.parameters import clear_parameter_cache
+        clear_parameter_cache()
+        yield
+        clear_parameter_cache()
+
+    def test_values_are_cached(self):
+        """A parameter is fetched once per (region, name)."""
+        from agent.config.parameters import get_ssm_parameter
+
+        client = MagicMock()
+        client.get_parameter.return_value = {"Parameter": {"Value": "ci-123"}}
+        with patch("agent.config.parameters.boto3.client", return_value=client) as factory:
+            assert get_ssm_parameter("/p/dev/x", "us-west-2") == "ci-123"
+            assert get_ssm_parameter("/p/dev/x", "us-west-2") == "ci-123"
+
+        assert client.get_parameter.call_count == 1
+        assert factory.call_count == 1
+
+    def test_failures_are_not_cached(self):
+        """A missing parameter is looked up again on the next call."""
+        from agent.config.parameters import get_ssm_parameter
+
+        client = MagicMock()
+        client.get_parameter.side_effect = [
+            Exception("ParameterNotFound"),
+            {"Parameter": {"Value": "late"}},
+        ]
+        with patch("agent.config.parameters.boto3.client", return_value=client):
+            with pytest.raises(Exception):
+                get_ssm_parameter("/p/dev/y", "us-west-2")
+            assert get_ssm_parameter("/p/dev/y", "us-west-2") == "late"
+
+
+class TestGatewayToolListingCache:
+    """Tests for the shared Gateway list_tools cache."""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        from agent.gateway.mcp_client import clear_gateway_tool_listing
+        clear_gateway_tool_listing()
+        yield
+        clear_gateway_tool_listing()
+
+    @staticmethod
+    def listing(client, token=None):
+        from mcp.types import Tool
+        from strands.tools.mcp import MCPAgentTool
+        from strands.types import PaginatedList
+
+        tools = [
+            Tool(name="wikipedia-search___wikipedia_search", inputSchema={"type": "object"}),
+            Tool(name="arxiv-search___arxiv_search", inputSchema={"type": "object"}),
+        ]
+        return PaginatedList([MCPAgentTool(tool, client) for tool in tools], token=token)
+
+    def prewarm(self, token=None):
+        from agent.prewarm import prewarm_gateway_tools
+
+        client = MagicMock()
+        client.list_tools_sync.return_value = self.listing(client, token)
+        with patch("agent.gateway.mcp_client.GATEWAY_ENABLED", True), \
+             patch("agent.gateway.mcp_client.create_gateway_mcp_client", return_value=client):
+            return prewarm_gateway_tools()
+
+    def test_filtered_client_reuses_prewarmed_listing(self):
+        """A new agent's FilteredMCPClient does not list Gateway again."""
+        from strands.tools.mcp import MCPClient
+        from agent.gateway.mcp_client import FilteredMCPClient
+
+        assert self.prewarm() == "2 tools"
+
+        client = FilteredMCPClient(lambda: None, ["gateway_wikipedia_search"])
+        with patch.object(MCPClient, "list_tools_sync") as gateway_listing:
+            tools = client.list_tools_sync()
+
+        gateway_listing.assert_not_called()
+        assert [tool.tool_name for tool in tools] == ["wikipedia_search"]
+        assert tools[0].mcp_client is client
+        assert client._tool_name_map == {"wikipedia_search": "wikipedia-search___wikipedia_search"}
+
+    def test_partial_or_expired_listing_is_not_reused(self):
+        """Paginated listings are not cached; an expired listing is fetched again."""
+        from strands.tools.mcp import MCPClient
+        from agent.gateway.mcp_client import FilteredMCPClient, get_cached_gateway_tool_listing
+
+        assert self.prewarm(token="next") == "2 tools (paginated, not cached)"
+        assert get_cached_gateway_tool_listing() is None
+
+        with patch.dict(os.environ, {"GATEWAY_TOOLS_CACHE_TTL_SECONDS": "0"}):
+            self.prewarm()
+
+        client = FilteredMCPClient(lambda: None, ["gateway_arxiv_search"])
+        with patch.object(MCPClient, "list_tools_sync", return_value=self.listing(client)) as gateway_listing:
+            tools = client.list_tools_sync()
+
+        gateway_listing.assert_called_once()
+        assert [tool.tool_name for tool in tools] == ["arxiv_search"]
@@ -0,0 +1,95 @@
+"""
+Unit tests for request context (contextvars-based session state).
+
+Focuses on meaningful logic:
+- Concurrent streams in one process keep their own session
+- Propagation into asyncio.to_thread (Strands sync tools) and executors
+- Defaults outside a request
+"""
+import os
+import sys
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from agent.request_context import (
+    set_request_context,
+    reset_request_context,
+    get_session_id,
+    get_user_id,
+    get_stream_processor,
+    run_in_executor,
+    submit_with_context,
+)
+
+
+class TestRequestContext:
+    """Tests for set/get/reset of request context."""
+
+    def test_defaults_outside_request(self):
+        """Nothing set -> None or the given default."""
+        assert get_session_id() is None
+        assert get_user_id("default_user") == "default_user"
+        assert get_stream_processor() is None
+
+    def test_user_defaults_to_session(self):
+        """user_id falls back to session_id (same as BaseAgent)."""
+        tokens = set_request_context("session-1")
+        try:
+            assert get_user_id() == "session-1"
+        finally:
+            reset_request_context(tokens)
+        assert get_session_id() is None
+
+    def test_concurrent_streams_are_isolated(self):
+        """Two overlapping streams each see their own session."""
+        seen = {}
+
+        async def stream(session_id, processor):
+            set_request_context(session_id, f"user-{session_id}", processor)
+            await asyncio.sleep(0.01)  # Let the other stream run in between
+            # Sync tools run in a worker thread via asyncio.to_thread
+            seen[session_id] = await asyncio.to_thread(
+                lambda: (get_session_id(), get_user_id(), get_stream_processor())
+            )
+
+        async def main():
+            await asyncio.gather(
+                asyncio.create_task(stream("a", "proc-a")),
+                asyncio.create_task(stream("b", "proc-b")),
+            )
+
+        asyncio.run(main())
+
+        assert seen["a"] == ("a", "user-a", "proc-a")
+        assert seen["b"] == ("b", "user-b", "proc-b")
+
+    def test_run_in_executor_carries_context(self):
+        """run_in_executor() copies the context into the executor thread."""
+        async def main():
+            set_request_context("session-x", "user-x")
+            return await run_in_executor(None, get_session_id)
+
+        assert asyncio.run(main()) == "session-x"
+
+    def test_submit_with_context(self):
+        """submit_with_context() copies the context into pool threads."""
+        result = {}
+
+        def worker():
+            tokens = set_request_context("session-y", "user-y")
+            try:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    result["plain"] = executor.submit(get_session_id).result()
+                    result["context"] = submit_with_context(executor, get_session_id).result()
+            finally:
+                reset_request_context(tokens)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert result["plain"] is None
+        assert result["context"] == "session-y"
@@ -0,0 +1,197 @@
+"""
+Unit tests for SSE text coalescing.
+
+Focuses on meaningful logic:
+- Size and time budgets trigger a flush
+- Idle model streams still flush buffered text on time
+- Non-text events flush buffered text first (ordering)
+- process_stream emits far fewer frames than text deltas
+- Stop / disconnect still save the partial response
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming.coalescer import FLUSH_DUE, TextCoalescer, iterate_with_deadlines
+from streaming.event_processor import StreamEventProcessor
+
+
+def make_agent(events, delay=0.0):
+    """Mock agent whose stream_async yields events with an optional pause between them."""
+    agent = MagicMock()
+
+    async def stream_async(*args, **kwargs):
+        for event in events:
+            if delay:
+                await asyncio.sleep(delay)
+            yield event
+
+    agent.stream_async = stream_async
+    return agent
+
+
+def parse(frame):
+    return json.loads(frame[len("data: "):])
+
+
+async def collect(processor, agent):
+    return [parse(f) async for f in processor.process_stream(agent, "hi", session_id="s1")]
+
+
+class TestTextCoalescer:
+    """Tests for TextCoalescer budgets."""
+
+    def test_size_budget_flushes(self):
+        """Reaching max_bytes renders one frame with all buffered text."""
+        coalescer = TextCoalescer(lambda text: text, max_delay_ms=10_000, max_bytes=10)
+
+        assert coalescer.add("hello") is None
+        assert coalescer.add("world!") == "helloworld!"
+        assert coalescer.flush() is None
+        assert coalescer.get_stats() == {"deltas": 2, "frames": 1}
+
+    def test_time_budget(self):
+        """time_until_flush counts down from the oldest buffered delta."""
+        coalescer = TextCoalescer(lambda text: text, max_delay_ms=20, max_bytes=1024)
+
+        assert coalescer.time_until_flush() is None
+        coalescer.add("a")
+        assert 0 < coalescer.time_until_flush() <= 0.02
+        time.sleep(0.03)
+        assert coalescer.time_until_flush() == 0
+        assert coalescer.add("b") == "ab"
+
+    def test_zero_delay_disables_buffering(self):
+        """max_delay_ms=0 sends every delta as its own frame."""
+        coalescer = TextCoalescer(lambda text: text, max_delay_ms=0)
+
+        assert coalescer.add("a") == "a"
+        assert coalescer.add("b") == "b"
+
+
+class TestIterateWithDeadlines:
+    """Tests for the producer-task iterator."""
+
+    @pytest.mark.asyncio
+    async def test_flush_due_while_source_idle(self):
+        """FLUSH_DUE arrives while the source is waiting for its next event."""
+        async def source():
+            yield 1
+            await asyncio.sleep(0.1)
+            yield 2
+
+        coalescer = TextCoalescer(lambda text: text, max_delay_ms=10)
+        items = []
+        async for item in iterate_with_deadlines(source(), coalescer.time_until_flush):
+            items.append(item)
+            if item == 1:
+                coalescer.add("x")
+            elif item is FLUSH_DUE:
+                coalescer.flush()
+
+        assert items == [1, FLUSH_DUE, 2]
+
+    @pytest.mark.asyncio
+    async def test_source_errors_propagate(self):
+        """Exceptions raised by the source surface in the consumer."""
+        async def source():
+            yield 1
+            raise RuntimeError("model failed")
+
+        with pytest.raises(RuntimeError, match="model failed"):
+            async for _ in iterate_with_deadlines(source(), lambda: None):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_producer(self):
+        """Closing the iterator cancels the source mid-stream."""
+        cancelled = asyncio.Event()
+
+        async def source():
+            try:
+                yield 1
+                await asyncio.sleep(10)
+                yield 2
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        events = iterate_with_deadlines(source(), lambda: None)
+        assert await events.__anext__() == 1
+        await asyncio.sleep(0)
+        await events.aclose()
+
+        assert cancelled.is_set()
+
+
+class TestProcessStreamCoalescing:
+    """End-to-end coalescing in StreamEventProcessor.process_stream."""
+
+    @pytest.fixture
+    def processor(self):
+        return StreamEventProcessor()
+
+    @pytest.mark.asyncio
+    async def test_many_deltas_few_frames(self, processor):
+        """A burst of deltas is merged; the full text is preserved."""
+        deltas = [f"tok{i} " for i in range(200)]
+        agent = make_agent([{"data": d} for d in deltas])
+
+        with patch.dict(os.environ, {"SSE_COALESCE_MAX_DELAY_MS": "10000", "SSE_COALESCE_MAX_BYTES": "1024"}):
+            events = await collect(processor, agent)
+
+        responses = [e for e in events if e["type"] == "response"]
+        assert "".join(e["text"] for e in responses) == "".join(deltas)
+        assert len(responses) < len(deltas) / 10
+
+    @pytest.mark.asyncio
+    async def test_tool_use_flushes_buffered_text_first(self, processor):
+        """Buffered text goes out before the tool_use event, which is not delayed."""
+        agent = make_agent([
+            {"data": "Let me check. "},
+            {"current_tool_use": {"toolUseId": "t1", "name": "calculator", "input": '{"x": 1}'}},
+            {"data": "Done."},
+        ])
+
+        with patch.dict(os.environ, {"SSE_COALESCE_MAX_DELAY_MS": "10000"}):
+            events = await collect(processor, agent)
+
+        types = [e["type"] for e in events]
+        assert types == ["init", "response", "tool_use", "response"]
+        assert events[1]["text"] == "Let me check. "
+
+    @pytest.mark.asyncio
+    async def test_idle_model_flushes_on_time(self, processor):
+        """Text is sent within the time budget even if the next event is slow."""
+        agent = make_agent([{"data": "first"}, {"data": "second"}], delay=0.15)
+
+        received = []
+        with patch.dict(os.environ, {"SSE_COALESCE_MAX_DELAY_MS": "16"}):
+            async for frame in processor.process_stream(agent, "hi", session_id="s1"):
+                received.append((time.monotonic(), parse(frame)))
+
+        responses = [event for _, event in received if event["type"] == "response"]
+        assert [e["text"] for e in responses] == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_saves_partial_response(self, processor):
+        """Closing the stream mid-answer still saves the partial response."""
+        agent = make_agent([{"data": "partial "}, {"data": "answer"}], delay=0.05)
+        agent.session_manager = MagicMock()
+
+        stream = processor.process_stream(agent, "hi", session_id="s1")
+        async for frame in stream:
+            if parse(frame)["type"] == "response":
+                break
+        await stream.aclose()
+
+        saved = agent.session_manager.append_message.call_args[0][0]
+        assert "partial" in saved["content"][0]["text"]
+        assert "[Response interrupted by user]" in saved["content"][0]["text"]
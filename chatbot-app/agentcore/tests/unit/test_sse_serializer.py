@@ -0,0 +1,71 @@
+"""
+Unit tests for the bytes SSE serializer.
+
+Focuses on meaningful logic:
+- Byte templates produce the same events as the generic encoder
+- orjson and stdlib backends produce identical frames
+- Pydantic events serialize like model_dump() + json
+- Non-serializable payloads become an error frame
+"""
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming import sse
+from streaming.sse import (
+    encode_event,
+    encode_model,
+    parse_frame,
+    reasoning_frame,
+    response_frame,
+    thinking_frame,
+)
+
+
+class TestTemplates:
+    """Pre-built templates match the generic encoder."""
+
+    def test_response_and_reasoning(self):
+        text = 'He said "hi"\n\tünïcode ✓ </script>'
+        assert response_frame(text) == encode_event({"type": "response", "text": text, "step": "answering"})
+        assert reasoning_frame(text) == encode_event({"type": "reasoning", "text": text, "step": "thinking"})
+
+    def test_thinking(self):
+        assert parse_frame(thinking_frame()) == {"type": "thinking", "message": "Processing your request..."}
+        assert parse_frame(thinking_frame("Working")) == {"type": "thinking", "message": "Working"}
+
+    def test_frame_shape(self):
+        frame = response_frame("x")
+        assert isinstance(frame, bytes)
+        assert frame.startswith(b"data: ")
+        assert frame.endswith(b"\n\n")
+
+
+class TestEncoding:
+    """Generic encoder behaviour."""
+
+    def test_stdlib_backend_matches(self):
+        """The stdlib fallback emits the same compact frames."""
+        event = {"type": "tool_use", "toolUseId": "t1", "input": {"q": "ü", "n": [1, 2.5, None, True]}}
+        fast = encode_event(event)
+        with patch.object(sse, "orjson", None):
+            assert encode_event(event) == fast
+
+    def test_non_serializable_becomes_error_frame(self):
+        frame = encode_event({"type": "tool_result", "blob": object()})
+        data = parse_frame(frame)
+        assert data["type"] == "error"
+        assert "Serialization error" in data["message"]
+
+    def test_pydantic_model_without_dict_round_trip(self):
+        from models.composer_schemas import WritingProgressEvent, WritingTaskStatus
+        from models.swarm_schemas import SwarmHandoffEvent
+
+        progress = WritingProgressEvent(task=2, task_name="Outline", status=WritingTaskStatus.IN_PROGRESS)
+        handoff = SwarmHandoffEvent(from_node="coordinator", to_node="coder", context={"k": [1]})
+
+        for model in (progress, handoff):
+            assert parse_frame(encode_model(model)) == json.loads(json.dumps(model.model_dump(mode="json")))
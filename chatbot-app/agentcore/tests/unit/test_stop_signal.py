@@ -12,6 +12,7 @@ import os
 import sys
 import pytest
 import threading
+import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
@@ -316,3 +317,84 @@ class TestStopSignalEdgeCases:
         """Test clearing a signal that doesn't exist doesn't raise error."""
         # Should not raise any exception
         local_provider.clear_stop_signal("nonexistent_user", "nonexistent_session")
+
+
+# ============================================================
+# Event-driven Stop (subscribe / immediate cancellation)
+# ============================================================
+
+class TestStopSignalSubscription:
+    """Tests for stop events and immediate stream cancellation."""
+
+    @pytest.fixture
+    def local_provider(self):
+        LocalStopSignalProvider._instance = None
+        return LocalStopSignalProvider()
+
+    @pytest.mark.asyncio
+    async def test_request_stop_wakes_subscriber(self, local_provider):
+        """request_stop sets the subscribed event, also from another thread."""
+        event = local_provider.subscribe("user", "session")
+        assert not event.is_set()
+
+        thread = threading.Thread(target=local_provider.request_stop, args=("user", "session"))
+        thread.start()
+        await asyncio.wait_for(event.wait(), timeout=1)
+        thread.join()
+
+        local_provider.unsubscribe("user", "session", event)
+        assert local_provider._waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_pending_stop_sets_event_on_subscribe(self, local_provider):
+        local_provider.request_stop("user", "session")
+        event = local_provider.subscribe("user", "session")
+        assert event.is_set()
+
+        other = local_provider.subscribe("user", "other_session")
+        assert not other.is_set()
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_long_tool_call(self, local_provider):
+        """A stop during a long tool call ends the stream at once and saves the partial answer."""
+        from streaming.event_processor import StreamEventProcessor
+
+        tool_cancelled = asyncio.Event()
+
+        async def stream_async(*args, **kwargs):
+            yield {"data": "Running the analysis "}
+            try:
+                await asyncio.sleep(180)  # Long Code Interpreter call
+            except asyncio.CancelledError:
+                tool_cancelled.set()
+                raise
+            yield {"data": "never sent"}
+
+        agent = MagicMock()
+        agent.stream_async = stream_async
+        agent.session_manager = MagicMock()
+
+        processor = StreamEventProcessor()
+        processor.stop_signal_provider = local_provider
+
+        async def stop_soon():
+            await asyncio.sleep(0.05)
+            local_provider.request_stop("user", "session")
+
+        stopper = asyncio.create_task(stop_soon())
+        frames = await asyncio.wait_for(_collect(processor.process_stream(
+            agent, "hi", session_id="session", invocation_state={"user_id": "user"}
+        )), timeout=2)
+        await stopper
+
+        assert tool_cancelled.is_set()
+        assert b"Stream stopped by user" in frames[-1]
+        assert not any(b"never sent" in f for f in frames)
+        saved = agent.session_manager.append_message.call_args[0][0]
+        assert "Running the analysis" in saved["content"][0]["text"]
+        assert local_provider.is_stop_requested("user", "session") is False
+        assert local_provider._waiters == {}
+
+
+async def _collect(stream):
+    return [frame async for frame in stream]
@@ -0,0 +1,468 @@
+"""
+Unit tests for resumable SSE streams.
+
+Focuses on meaningful logic:
+- Frames get `<run>-<n>` ids with a monotonically increasing counter
+- An id from another run of the session is refused instead of skipping frames
+- A reconnect replays missed frames, then follows the running producer
+- The ring buffer is bounded by count and bytes
+- The run is cancelled only when no reader comes back within the grace period
+- The /invocations resume path (body field and Last-Event-ID header)
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming.replay import ResumableStream, StreamReplayRegistry, parse_event_id, with_event_id
+from streaming.sse import encode_event, parse_frame
+
+
+def frame(n):
+    return encode_event({"type": "response", "text": str(n)})
+
+
+def raw_event_id(framed):
+    return framed.split(b"\n", 1)[0][len(b"id: "):].decode()
+
+
+def event_id(framed):
+    return parse_event_id(raw_event_id(framed))[1]
+
+
+async def gated_source(count, gate):
+    """Yields `count` frames, waiting on gate before each one after the first."""
+    for n in range(count):
+        if n:
+            await gate.get()
+        yield frame(n)
+
+
+class TestEventIds:
+    """Id framing."""
+
+    def test_id_line_is_ignored_by_parse_frame(self):
+        framed = with_event_id("abc-7", frame(1))
+        assert framed.startswith(b"id: abc-7\ndata: ")
+        assert parse_frame(framed) == {"type": "response", "text": "1"}
+
+    def test_str_frames_are_encoded(self):
+        assert with_event_id("abc-1", 'data: {"type":"init"}\n\n') == b'id: abc-1\ndata: {"type":"init"}\n\n'
+
+    def test_parse_event_id(self):
+        assert parse_event_id("3f9a0c-12") == ("3f9a0c", 12)
+        for invalid in ("12", "-12", "abc-", "abc-x"):
+            with pytest.raises(ValueError):
+                parse_event_id(invalid)
+
+    @pytest.mark.asyncio
+    async def test_ids_are_monotonic(self):
+        async def source():
+            for n in range(5):
+                yield frame(n)
+
+        stream = ResumableStream("s1", "u1", source())
+        frames = [f async for f in stream.subscribe()]
+
+        assert [event_id(f) for f in frames] == [1, 2, 3, 4, 5]
+        assert {parse_event_id(raw_event_id(f))[0] for f in frames} == {stream.run_id}
+        assert [parse_frame(f)["text"] for f in frames] == ["0", "1", "2", "3", "4"]
+
+    @pytest.mark.asyncio
+    async def test_runs_get_distinct_tokens(self):
+        async def source():
+            yield frame(0)
+
+        first = ResumableStream("s1", "u1", source())
+        second = ResumableStream("s1", "u1", source())
+        await first.wait_closed()
+        await second.wait_closed()
+
+        assert first.run_id != second.run_id
+
+
+class TestResume:
+    """Reconnect semantics."""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replays_then_follows_live_producer(self):
+        gate = asyncio.Queue()
+        stream = ResumableStream("s1", "u1", gated_source(6, gate), grace_seconds=5)
+
+        first = stream.subscribe()
+        received = [await first.__anext__()]
+        for _ in range(2):
+            gate.put_nowait(None)
+            received.append(await first.__anext__())
+        await first.aclose()  # Connection drops after id 3
+
+        gate.put_nowait(None)  # Producer keeps running without a reader
+        await asyncio.sleep(0.01)
+        assert stream.last_event_id == 4
+        assert not stream.done
+
+        resumed = stream.subscribe(last_event_id=3)
+        replayed = await resumed.__anext__()
+        assert event_id(replayed) == 4
+
+        gate.put_nowait(None)
+        gate.put_nowait(None)
+        rest = [f async for f in resumed]
+
+        assert [event_id(f) for f in received] == [1, 2, 3]
+        assert [event_id(f) for f in rest] == [5, 6]
+        assert stream.done
+        assert stream.replayed == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_of_finished_stream_returns_tail(self):
+        async def source():
+            for n in range(4):
+                yield frame(n)
+
+        stream = ResumableStream("s1", "u1", source())
+        await stream.wait_closed()
+
+        tail = [f async for f in stream.subscribe(last_event_id=2)]
+        assert [event_id(f) for f in tail] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_buffer_is_bounded(self):
+        async def source():
+            for n in range(50):
+                yield frame(n)
+
+        stream = ResumableStream("s1", "u1", source(), max_events=10)
+        await stream.wait_closed()
+
+        assert stream.first_event_id == 41
+        assert stream.dropped == 40
+        # Frames older than the buffer are skipped, the rest still replays in order
+        tail = [f async for f in stream.subscribe(last_event_id=5)]
+        assert [event_id(f) for f in tail] == list(range(41, 51))
+
+    @pytest.mark.asyncio
+    async def test_byte_budget_keeps_newest_frame(self):
+        async def source():
+            yield encode_event({"type": "tool_result", "data": "x" * 1000})
+            yield encode_event({"type": "tool_result", "data": "y" * 1000})
+
+        stream = ResumableStream("s1", "u1", source(), max_bytes=100)
+        await stream.wait_closed()
+
+        tail = [f async for f in stream.subscribe()]
+        assert [event_id(f) for f in tail] == [2]
+
+
+    @pytest.mark.asyncio
+    async def test_sequence_of_refuses_ids_of_other_runs(self):
+        async def source():
+            for n in range(3):
+                yield frame(n)
+
+        stream = ResumableStream("s1", "u1", source())
+        await stream.wait_closed()
+
+        assert stream.sequence_of(None) == 0
+        assert stream.sequence_of(stream.event_id(2)) == 2
+        with pytest.raises(LookupError):
+            stream.sequence_of("0123456789ab-2")  # Earlier run of the session
+        with pytest.raises(LookupError):
+            stream.sequence_of(stream.event_id(500))  # Not issued by this run
+
+
+    @pytest.mark.asyncio
+    async def test_sequence_of_refuses_ids_behind_the_buffer(self):
+        async def source():
+            for n in range(50):
+                yield frame(n)
+
+        stream = ResumableStream("s1", "u1", source(), max_events=10)
+        await stream.wait_closed()
+
+        assert stream.sequence_of(stream.event_id(40)) == 40  # Next frame (41) is still buffered
+        with pytest.raises(LookupError):
+            stream.sequence_of(stream.event_id(5))  # Frames 6-40 were evicted
+        with pytest.raises(LookupError):
+            stream.sequence_of(None)
+
+
+class TestGracePeriod:
+    """Producer lifetime without readers."""
+
+    @pytest.mark.asyncio
+    async def test_run_cancelled_after_grace_without_reader(self):
+        cancelled = asyncio.Event()
+
+        async def source():
+            yield frame(0)
+            try:
+                await asyncio.sleep(180)  # Long tool call
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        stream = ResumableStream("s1", "u1", source(), grace_seconds=0.05)
+        reader = stream.subscribe()
+        await reader.__anext__()
+        await reader.aclose()
+
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        await asyncio.wait_for(stream.wait_closed(), timeout=1)
+        assert cancelled.is_set()
+        assert stream.done
+
+    @pytest.mark.asyncio
+    async def test_reconnect_within_grace_keeps_run(self):
+        gate = asyncio.Queue()
+        stream = ResumableStream("s1", "u1", gated_source(3, gate), grace_seconds=0.05)
+
+        reader = stream.subscribe()
+        await reader.__anext__()
+        await reader.aclose()
+
+        resumed = stream.subscribe(last_event_id=1)
+        gate.put_nowait(None)
+        assert event_id(await resumed.__anext__()) == 2
+
+        await asyncio.sleep(0.1)  # Past the grace period while attached
+        gate.put_nowait(None)
+        assert event_id(await resumed.__anext__()) == 3
+        await resumed.aclose()
+
+    @pytest.mark.asyncio
+    async def test_zero_grace_cancels_on_disconnect(self):
+        async def source():
+            yield frame(0)
+            await asyncio.sleep(180)
+
+        stream = ResumableStream("s1", "u1", source(), grace_seconds=0)
+        reader = stream.subscribe()
+        await reader.__anext__()
+        await reader.aclose()
+
+        await asyncio.wait_for(stream.wait_closed(), timeout=1)
+        assert stream.done
+
+
+class TestRegistry:
+    """Per-session lookup."""
+
+    @pytest.mark.asyncio
+    async def test_get_checks_owner(self):
+        async def source():
+            yield frame(0)
+
+        registry = StreamReplayRegistry()
+        stream = registry.start("s1", "u1", source())
+
+        assert registry.get("s1", "u1") is stream
+        assert registry.get("s1", "someone-else") is None
+        assert registry.get("unknown", "u1") is None
+        await stream.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_finished_streams_expire(self):
+        async def source():
+            yield frame(0)
+
+        registry = StreamReplayRegistry(retain_seconds=0)
+        await registry.start("s1", "u1", source()).wait_closed()
+
+        assert registry.get("s1", "u1") is None
+        assert registry.get_stats()["streams"] == 0
+
+    @pytest.mark.asyncio
+    async def test_supersede_stops_previous_run_and_waits_for_cleanup(self):
+        cleaned_up = asyncio.Event()
+
+        async def long_run():
+            yield frame(0)
+            try:
+                await asyncio.sleep(180)
+            finally:
+                await asyncio.sleep(0.01)  # Partial response save
+                cleaned_up.set()
+
+        registry = StreamReplayRegistry(grace_seconds=30)
+        previous = registry.start("s1", "u1", long_run())
+        reader = previous.subscribe()
+        await reader.__anext__()
+        await reader.aclose()  # Waiting out its grace period
+
+        await registry.supersede("s1", "someone-else")
+        assert not previous.done
+
+        await asyncio.wait_for(registry.supersede("s1", "u1"), timeout=1)
+        assert cleaned_up.is_set()
+        assert previous.done
+
+    def test_zero_events_disables(self):
+        assert not StreamReplayRegistry(max_events=0).enabled
+
+
+class TestInvocationsResume:
+    """Resume path of /invocations."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from routers.chat import router
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        registry = StreamReplayRegistry(grace_seconds=0)
+        monkeypatch.setattr("routers.chat.get_stream_replay_registry", lambda: registry)
+        return registry
+
+    def _invoke(self, client, **extra):
+        body = {"input": {"user_id": "u1", "session_id": "s1", "message": "Hello", **extra}}
+        return client.post("/invocations", json=body)
+
+    def test_resume_replays_after_last_event_id(self, client, registry, monkeypatch):
+        from unittest.mock import MagicMock
+
+        agent = MagicMock()
+
+        async def agent_stream(*args, **kwargs):
+            for n in range(3):
+                yield frame(n)
+
+        agent.stream_async = agent_stream
+        monkeypatch.setattr("routers.chat.create_agent", lambda **kwargs: agent)
+
+        response = self._invoke(client)
+        first_id = raw_event_id(response.content)
+        run_id, sequence = parse_event_id(first_id)
+        assert sequence == 1
+
+        resumed = self._invoke(client, action="resume", last_event_id=first_id)
+        assert resumed.status_code == 200
+        assert [event_id(f) for f in resumed.content.split(b"\n\n") if f] == [2, 3]
+
+        by_header = client.post(
+            "/invocations",
+            json={"input": {"user_id": "u1", "session_id": "s1"}},
+            headers={"Last-Event-ID": f"{run_id}-2"},
+        )
+        assert [event_id(f) for f in by_header.content.split(b"\n\n") if f] == [3]
+
+    def test_resume_with_id_of_previous_run_is_409(self, client, registry, monkeypatch):
+        from unittest.mock import MagicMock
+
+        agent = MagicMock()
+
+        async def agent_stream(*args, **kwargs):
+            for n in range(3):
+                yield frame(n)
+
+        agent.stream_async = agent_stream
+        monkeypatch.setattr("routers.chat.create_agent", lambda **kwargs: agent)
+
+        previous_last = raw_event_id(self._invoke(client).content.rstrip(b"\n").rsplit(b"\n\n", 1)[-1])
+        self._invoke(client, message="Next turn")
+
+        # Without the run token, id 3 of the previous run would skip the new run's first 3 frames
+        resumed = self._invoke(client, action="resume", last_event_id=previous_last)
+        assert resumed.status_code == 409
+
+    def test_resume_behind_the_replay_buffer_is_409(self, client, monkeypatch):
+        from unittest.mock import MagicMock
+
+        registry = StreamReplayRegistry(max_events=2, grace_seconds=0)
+        monkeypatch.setattr("routers.chat.get_stream_replay_registry", lambda: registry)
+        agent = MagicMock()
+
+        async def agent_stream(*args, **kwargs):
+            for n in range(5):
+                yield frame(n)
+
+        agent.stream_async = agent_stream
+        monkeypatch.setattr("routers.chat.create_agent", lambda **kwargs: agent)
+
+        run_id, _ = parse_event_id(raw_event_id(self._invoke(client).content))
+
+        # Frames 2-3 are gone: replaying 4-5 would silently drop them
+        resumed = self._invoke(client, action="resume", last_event_id=f"{run_id}-1")
+        assert resumed.status_code == 409
+
+    def test_resume_without_stream_is_404(self, client, registry):
+        response = self._invoke(client, action="resume", last_event_id="0123456789ab-4")
+        assert response.status_code == 404
+
+    def test_invalid_header_is_400(self, client, registry):
+        response = client.post(
+            "/invocations",
+            json={"input": {"user_id": "u1", "session_id": "s1"}},
+            headers={"Last-Event-ID": "abc"},
+        )
+        assert response.status_code == 400
+
+
+class TestInvocationsSupersede:
+    """A new turn while the session's previous run is still alive."""
+
+    @pytest.mark.asyncio
+    async def test_second_turn_during_grace_window_waits_for_previous_run(self, monkeypatch):
+        from unittest.mock import MagicMock
+        from agents.pool import AgentPool
+        from models.schemas import InvocationRequest
+        from routers.chat import invocations
+
+        registry = StreamReplayRegistry(grace_seconds=30)
+        monkeypatch.setattr("routers.chat.get_stream_replay_registry", lambda: registry)
+        monkeypatch.setattr("routers.chat.get_agent_pool", lambda: AgentPool())
+        timeline = []
+
+        def create_agent(**kwargs):
+            timeline.append("create_agent")
+            agent = MagicMock()
+            turn = timeline.count("create_agent")
+
+            async def agent_stream(*args, **kwargs):
+                yield frame(turn)
+                if turn == 1:
+                    try:
+                        await asyncio.sleep(180)  # Long tool call
+                    finally:
+                        timeline.append("turn 1 saved")
+
+            agent.stream_async = agent_stream
+            return agent
+
+        monkeypatch.setattr("routers.chat.create_agent", create_agent)
+
+        def request(message):
+            return InvocationRequest(input={"user_id": "u1", "session_id": "s1", "message": message})
+
+        http_request = MagicMock()
+        http_request.headers = {}
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        http_request.receive = receive
+
+        first = await invocations(request("First"), http_request)
+        body = first.body_iterator
+        await body.__anext__()
+        await body.aclose()  # BFF connection dropped; the run waits out its grace period
+        previous = registry.get("s1", "u1")
+        assert not previous.done
+
+        second = await invocations(request("Second"), http_request)
+        frames = [f async for f in second.body_iterator]
+
+        assert previous.done
+        assert timeline == ["create_agent", "turn 1 saved", "create_agent"]
+        assert [parse_frame(f)["text"] for f in frames] == ["2"]
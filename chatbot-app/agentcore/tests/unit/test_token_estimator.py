@@ -0,0 +1,317 @@
+"""
+Tests for the pre-turn token estimator.
+
+Focuses on meaningful logic:
+- Raw estimates scale with content and charge images/documents a flat or size-based cost
+- Calibration learns the model's factor from consecutive calls and its fixed overhead
+- Anchored predictions only depend on the change since the previous call
+- initialize() applies the checkpoint before the model call when the estimate crosses the threshold
+- Warm turns (pooled agents) re-apply Stage 1 truncation and the pre-turn estimate
+- update_after_turn() records estimate-vs-actual error and the next anchor
+"""
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.types.session import SessionMessage
+
+from agent.session.token_estimator import (
+    IMAGE_TOKENS,
+    IncrementalEstimate,
+    TokenEstimator,
+    estimate_message,
+    estimate_text,
+    model_key_for,
+)
+
+
+def text_message(text, role="user"):
+    return {"role": role, "content": [{"text": text}]}
+
+
+class TestRawEstimate:
+    """Uncalibrated estimate of a message list."""
+
+    def test_ascii_text_is_four_chars_per_token(self):
+        assert estimate_text("a" * 4000) == 1000
+
+    def test_non_ascii_text_counts_each_char(self):
+        assert estimate_text("안녕하세요" * 100) == 500
+        assert estimate_text("ab" * 2 + "é") == 2
+
+    def test_tool_blocks_are_counted(self):
+        message = {"role": "assistant", "content": [
+            {"toolUse": {"toolUseId": "t1", "name": "search", "input": {"query": "q" * 4000}}},
+        ]}
+        result = {"role": "user", "content": [
+            {"toolResult": {"toolUseId": "t1", "content": [{"text": "r" * 4000}, {"json": {"rows": "x" * 4000}}]}},
+        ]}
+        assert estimate_message(message) > 1000
+        assert estimate_message(result) > 2000
+
+    def test_images_cost_flat_and_documents_by_size(self):
+        image = {"role": "user", "content": [{"image": {"format": "png", "source": {"bytes": b"x" * 10_000_000}}}]}
+        document = {"role": "user", "content": [{"document": {"name": "a", "source": {"bytes": b"x" * 60_000}}}]}
+        assert IMAGE_TOKENS <= estimate_message(image) < IMAGE_TOKENS + 20
+        assert 10_000 <= estimate_message(document) < 10_020
+
+    def test_unknown_shapes_do_not_raise(self):
+        assert TokenEstimator.estimate_messages([{"role": "user"}, {"role": "user", "content": [None, {"other": 1}]}]) > 0
+
+    def test_incremental_estimate_walks_only_changed_messages(self):
+        messages = [text_message("a" * 400), text_message("b" * 400, role="assistant")]
+        incremental = IncrementalEstimate()
+        assert incremental.estimate(messages) == TokenEstimator.estimate_messages(messages)
+
+        messages.append(text_message("c" * 4000))
+        messages[0] = text_message("a" * 40)  # Replaced copy-on-write
+        assert incremental.estimate(messages) == TokenEstimator.estimate_messages(messages)
+        assert incremental.walked == 4
+
+
+class TestCalibration:
+    """Per-model factor and overhead learned from actual inputTokens."""
+
+    @staticmethod
+    def calls(factor, overhead, raws):
+        return [(raw, int(factor * raw + overhead)) for raw in raws]
+
+    def test_uncalibrated_prediction_is_raw(self):
+        assert TokenEstimator().predict("m", 5000) == 5000
+
+    def test_learns_factor_and_overhead(self):
+        estimator = TokenEstimator()
+        for turn in range(10):
+            base = 2000 + turn * 3000
+            estimator.observe("m", self.calls(1.3, 4000, [base, base + 1000, base + 2500]))
+
+        assert estimator.predict("m", 50_000) == pytest.approx(1.3 * 50_000 + 4000, rel=0.01)
+        assert estimator.get_stats()["models"]["m"]["factor"] == pytest.approx(1.3, abs=0.01)
+
+    def test_small_deltas_do_not_move_factor(self):
+        estimator = TokenEstimator()
+        estimator.observe("m", [(1000, 5000), (1050, 9000)])
+        assert estimator.get_stats()["models"]["m"]["factor"] == 1.0
+
+    def test_models_are_calibrated_separately(self):
+        estimator = TokenEstimator()
+        estimator.observe("a", self.calls(2.0, 0, [1000, 3000]))
+        assert estimator.predict("b", 1000) == 1000
+
+    def test_anchor_cancels_overhead(self):
+        estimator = TokenEstimator()
+        estimator.observe("m", self.calls(1.5, 0, [1000, 3000]))
+        # The anchor's 20k of system prompt/tools is carried over as is
+        assert estimator.predict("m", 12_000, anchor=(10_000, 35_000)) == 38_000
+
+    def test_error_stats(self):
+        estimator = TokenEstimator()
+        estimator.record_error("m", 1100, 1000)
+        estimator.record_error("m", 900, 1000)
+
+        stats = estimator.get_stats()["models"]["m"]
+        assert stats["predictions"] == 2
+        assert stats["mean_abs_error_pct"] == 10.0
+        assert stats["mean_error_pct"] == 0.0
+        assert (stats["last_predicted"], stats["last_actual"]) == (900, 1000)
+
+    def test_model_key_from_agent(self):
+        agent = MagicMock()
+        agent.model.config = {"model_id": "anthropic.claude"}
+        assert model_key_for(agent) == "anthropic.claude"
+        assert model_key_for(object()) == "default"
+
+
+class TestPreTurnCompaction:
+    """CompactingSessionManager estimates the context in initialize()."""
+
+    @pytest.fixture(autouse=True)
+    def estimator(self, monkeypatch):
+        estimator = TokenEstimator()
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_token_estimator", lambda: estimator)
+        return estimator
+
+    @staticmethod
+    def history(turns):
+        messages = []
+        for n in range(turns):
+            messages.append(SessionMessage.from_message(text_message(f"question {n} " + "q" * 400), 0))
+            messages.append(SessionMessage.from_message(text_message(f"answer {n} " + "a" * 4000, "assistant"), 0))
+        return messages
+
+    def make_manager(self, state, turns=10, **kwargs):
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager
+
+            manager = CompactingSessionManager(
+                agentcore_memory_config=MagicMock(), region_name='us-west-2', protected_turns=2, **kwargs
+            )
+        manager.config = MagicMock(memory_id="mem", actor_id="u1", session_id="s1")
+        manager.session_id = "s1"
+        manager._latest_agent_message = {}
+        manager.session_repository = MagicMock()
+        manager.session_repository.read_agent.return_value = MagicMock(state={}, conversation_manager_state={})
+        manager.load_compaction_state = MagicMock(return_value=state)
+        manager.save_compaction_state = MagicMock()
+        manager._retrieve_session_summaries = MagicMock(return_value=[])
+        messages = self.history(turns)
+        manager._load_messages_for_init = MagicMock(
+            return_value=(messages, [f"e{n}" for n in range(len(messages))], 0, "full")
+        )
+        return manager
+
+    @staticmethod
+    def make_agent():
+        agent = MagicMock(agent_id="default")
+        agent.model.config = {"model_id": "test-model"}
+        agent.conversation_manager.restore_from_session.return_value = []
+        agent.conversation_manager.removed_message_count = 0
+        return agent
+
+    def test_checkpoint_applied_before_the_turn(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        state = CompactionState()
+        manager = self.make_manager(state, token_threshold=5000)
+        agent = self.make_agent()
+        manager.initialize(agent)
+
+        assert state.checkpoint == 16  # Last 2 turns kept
+        assert state.checkpointEventId == "e16"
+        manager.save_compaction_state.assert_called_once_with(state)
+        assert manager.last_init_info["pre_turn_checkpoint"] is True
+        assert manager.last_init_info["estimated_input_tokens"] < 5000
+        assert len(agent.messages) == 4
+        assert agent.messages[0]["content"][0]["text"].startswith("<conversation_summary>")
+
+    def test_below_threshold_keeps_history(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        manager = self.make_manager(CompactionState(), token_threshold=100_000)
+        agent = self.make_agent()
+        manager.initialize(agent)
+
+        assert manager.last_init_info["pre_turn_checkpoint"] is False
+        assert len(agent.messages) == 20
+        manager.save_compaction_state.assert_not_called()
+
+    def test_disabled(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        manager = self.make_manager(CompactionState(), token_threshold=5000, pre_turn_compaction=False)
+        agent = self.make_agent()
+        manager.initialize(agent)
+
+        assert manager.last_init_info["pre_turn_checkpoint"] is False
+        assert manager.last_init_info["estimated_input_tokens"] > 5000
+        assert len(agent.messages) == 20
+
+    def test_warm_turn_refreshes_context(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        manager = self.make_manager(CompactionState(), turns=2, token_threshold=100_000)
+        agent = self.make_agent()
+        manager.initialize(agent)
+        agent.messages = list(agent.messages)
+
+        manager._refresh_warm_context(agent)  # First turn: built by initialize()
+        first_estimate = manager._pre_turn_estimate
+        assert first_estimate is not None
+
+        # Turns served warm: a tool result that has left the protected turns since
+        served = [
+            text_message("look it up"),
+            {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": "search", "input": {}}}]},
+            {"role": "user", "content": [{"toolResult": {"toolUseId": "t1", "content": [{"text": "r" * 5000}]}}]},
+            text_message("found it", "assistant"),
+        ]
+        for n in range(2):
+            served += [text_message(f"more {n}"), text_message(f"sure {n}", "assistant")]
+        for message in served:
+            agent.messages.append(message)
+            manager._track_appended_message(message)
+
+        manager._refresh_warm_context(agent)
+        assert len(agent.messages) == 4 + len(served)
+        result = agent.messages[6]["content"][0]["toolResult"]["content"][0]["text"]
+        assert len(result) < 1000
+        assert manager._pre_turn_estimate > first_estimate
+
+    def test_warm_turn_applies_checkpoint(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        state = CompactionState()
+        manager = self.make_manager(state, turns=2, token_threshold=5000)
+        agent = self.make_agent()
+        manager.initialize(agent)
+        manager._refresh_warm_context(agent)
+        assert state.checkpoint == 0
+
+        for n in range(8):
+            message = text_message(f"question {n} " + "q" * 400)
+            answer = text_message(f"answer {n} " + "a" * 4000, "assistant")
+            agent.messages = agent.messages + [message, answer]
+            manager._track_appended_message(message)
+            manager._track_appended_message(answer)
+
+        manager._refresh_warm_context(agent)
+        assert state.checkpoint == 16
+        assert len(agent.messages) == 4
+        manager.save_compaction_state.assert_called_once_with(state)
+
+    def test_warm_rebuild_matches_initialize(self):
+        from agent.session.compacting_session_manager import CompactionState
+
+        manager = self.make_manager(CompactionState(), turns=2, token_threshold=100_000)
+        agent = self.make_agent()
+        agent.conversation_manager.restore_from_session.return_value = [text_message("restored", "assistant")]
+        manager.initialize(agent)
+        manager._refresh_warm_context(agent)
+
+        message, answer = text_message("next"), text_message("reply", "assistant")
+        agent.messages = agent.messages + [message, answer]
+        manager._track_appended_message(message)
+        manager._track_appended_message(answer)
+        manager._refresh_warm_context(agent)
+        warm = list(agent.messages)
+
+        reloaded = self.make_manager(CompactionState(), turns=2, token_threshold=100_000)
+        reloaded._load_messages_for_init.return_value = (
+            [SessionMessage.from_message(m, 0) for m in manager._all_messages_for_summary],
+            [f"e{n}" for n in range(6)], 0, "full",
+        )
+        cold = self.make_agent()
+        cold.conversation_manager.restore_from_session.return_value = [text_message("restored", "assistant")]
+        reloaded.initialize(cold)
+
+        assert warm[0]["content"][0]["text"] == "restored"
+        assert warm == cold.messages
+
+    def test_disabled_from_env(self, monkeypatch):
+        monkeypatch.setenv("COMPACTION_PRE_TURN", "false")
+        from agent.session.compacting_session_manager import CompactionState
+
+        assert self.make_manager(CompactionState()).pre_turn_compaction is False
+
+    def test_update_after_turn_records_error_and_anchor(self, estimator):
+        from agent.session.compacting_session_manager import CompactionState
+
+        state = CompactionState(lastInputTokens=20_000, lastEstimatedTokens=5000)
+        manager = self.make_manager(state, token_threshold=100_000)
+        manager.initialize(self.make_agent())
+        assert manager._token_anchor == (5000, 20_000)
+
+        manager.update_after_turn(27_000, "default", llm_calls=[(6000, 21_500), (9000, 27_000)])
+
+        stats = estimator.get_stats()["models"]["test-model"]
+        assert stats["predictions"] == 1
+        assert stats["last_predicted"] == 21_000  # Anchor + 1000 raw tokens, uncalibrated
+        assert stats["last_actual"] == 21_500
+        assert stats["factor"] > 1.0
+        assert state.lastEstimatedTokens == 9000
+        assert manager._token_anchor == (9000, 27_000)
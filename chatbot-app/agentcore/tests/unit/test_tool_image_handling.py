@@ -234,7 +234,7 @@ class TestEventFormatterImageProcessing:
         event_str = StreamEventFormatter.create_tool_result_event(tool_result)
 
         # Parse SSE event
-        assert event_str.startswith("data: ")
+        assert event_str.startswith(b"data: ")
         data = json.loads(event_str[6:-2])
 
         # Verify structure
@@ -545,7 +545,7 @@ class TestImageToolFullFlow:
         sse_event = StreamEventFormatter.create_tool_result_event(tool_result)
 
         # 4. Parse as frontend would
-        assert sse_event.startswith("data: ")
+        assert sse_event.startswith(b"data: ")
         frontend_data = json.loads(sse_event[6:-2])
 
         # 5. Verify frontend can use the data
@@ -0,0 +1,110 @@
+"""
+Unit tests for LazyToolRegistry.
+
+Focuses on meaningful logic:
+- Membership, iteration and len() never import tool modules
+- Lookup imports the defining module once and records its import time
+- Broken modules only disable their own tools
+- Default registry covers local_tools and builtin_tools declarations
+"""
+import os
+import sys
+import types
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from agent.tool_registry import LazyToolRegistry
+
+
+@pytest.fixture
+def fake_module():
+    """Install a throwaway tool module and count how often it is imported."""
+    name = "_fake_tools_for_registry_test"
+    module = types.ModuleType(name)
+    module.tool_a = object()
+    module.tool_b = object()
+    sys.modules.pop(name, None)
+
+    imports = []
+
+    class Finder:
+        def find_spec(self, fullname, path=None, target=None):
+            if fullname != name:
+                return None
+            import importlib.util
+
+            class Loader:
+                def create_module(self, spec):
+                    imports.append(fullname)
+                    return module
+
+                def exec_module(self, mod):
+                    pass
+
+            return importlib.util.spec_from_loader(fullname, Loader())
+
+    finder = Finder()
+    sys.meta_path.insert(0, finder)
+    yield name, module, imports
+    sys.meta_path.remove(finder)
+    sys.modules.pop(name, None)
+
+
+class TestLazyToolRegistry:
+    """Tests for LazyToolRegistry behaviour."""
+
+    def test_membership_and_iteration_do_not_import(self, fake_module):
+        """`in`, iteration and len() only use the import path table."""
+        name, _, imports = fake_module
+        registry = LazyToolRegistry({"tool_a": (name, "tool_a"), "tool_b": (name, "tool_b")})
+
+        assert "tool_a" in registry
+        assert "missing" not in registry
+        assert sorted(registry) == ["tool_a", "tool_b"]
+        assert len(registry) == 2
+        assert imports == []
+
+    def test_lookup_imports_once(self, fake_module):
+        """First lookup imports the module; other tools of it reuse the import."""
+        name, module, imports = fake_module
+        registry = LazyToolRegistry({"tool_a": (name, "tool_a"), "tool_b": (name, "tool_b")})
+
+        assert registry["tool_a"] is module.tool_a
+        assert registry.get("tool_b") is module.tool_b
+        assert imports == [name]
+        assert list(registry.get_import_report()) == [name]
+
+    def test_broken_module_reports_missing(self):
+        """Import failures surface as missing tools, not exceptions."""
+        registry = LazyToolRegistry({
+            "broken": ("_no_such_module_for_registry_test", "broken"),
+        })
+
+        assert registry.get("broken") is None
+        with pytest.raises(KeyError):
+            registry["broken"]
+        assert "_no_such_module_for_registry_test" in registry.get_failed_imports()
+
+    def test_register_existing_tool(self):
+        """Already-imported tools can be registered directly."""
+        registry = LazyToolRegistry({})
+        tool = object()
+        registry.register("custom", tool)
+
+        assert registry["custom"] is tool
+        assert registry.is_loaded("custom")
+
+    def test_default_registry_lists_all_tools(self):
+        """Default registry exposes calculator, local and builtin tool IDs."""
+        import builtin_tools
+        import local_tools
+
+        registry = LazyToolRegistry()
+
+        assert "calculator" in registry
+        for tool_id in list(local_tools.__all__) + list(builtin_tools.__all__):
+            assert tool_id in registry
+        assert registry.get_import_path("browser_act") == (
+            "builtin_tools.nova_act_browser_tools", "browser_act"
+        )
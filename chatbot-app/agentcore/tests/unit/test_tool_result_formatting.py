@@ -0,0 +1,85 @@
+"""
+Unit tests for the single-parse tool result pipeline.
+
+Focuses on meaningful logic:
+- Each text payload is json.loads'ed at most once per tool result
+- Lambda-wrapped Gateway results are unwrapped
+- Screenshot data is stripped from the displayed text without touching the parsed payload
+- A2A metadata (browserSessionId) is still extracted
+"""
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming import event_formatter
+from streaming.event_formatter import StreamEventFormatter, ToolResultPayloads
+from streaming.sse import parse_frame
+
+
+def format_result(tool_result):
+    with patch.object(event_formatter.json, "loads", wraps=json.loads) as loads:
+        frame = StreamEventFormatter.create_tool_result_event(tool_result)
+    return parse_frame(frame), loads.call_count
+
+
+class TestSingleParse:
+    """Parse counts across the formatting steps."""
+
+    def test_plain_json_parsed_once(self):
+        event, parses = format_result({
+            "toolUseId": "t1",
+            "content": [{"text": json.dumps({"results": [{"title": "a"}]})}],
+        })
+        assert json.loads(event["result"]) == {"results": [{"title": "a"}]}
+        assert parses == 1
+
+    def test_lambda_unwrap(self):
+        inner = json.dumps({"results": [1, 2]})
+        wrapper = json.dumps({"statusCode": 200, "body": json.dumps({"content": [{"text": inner}]})})
+
+        event, parses = format_result({"toolUseId": "t1", "content": [{"text": wrapper}]})
+
+        assert event["result"] == inner
+        assert parses == 3  # wrapper, body, inner payload
+
+    def test_a2a_screenshot_and_metadata(self):
+        payload = {
+            "status": "success",
+            "screenshot": {"format": "png", "data": "QUJD" * 1000},
+            "metadata": {"browserSessionId": "arn:session/1"},
+        }
+        event, parses = format_result({"toolUseId": "t1", "content": [{"text": json.dumps(payload)}]})
+
+        assert parses == 1
+        assert event["images"] == [{"format": "png", "data": "QUJD" * 1000}]
+        assert event["metadata"]["browserSessionId"] == "arn:session/1"
+        displayed = json.loads(event["result"])
+        assert displayed["screenshot"]["size"] == "4000 characters"
+        assert "data" not in displayed["screenshot"]
+
+    def test_plain_text_not_parsed(self):
+        event, parses = format_result({"toolUseId": "t1", "content": [{"text": "just text"}]})
+        assert event["result"] == "just text"
+        assert parses == 1  # the metadata step still checks the final text once
+
+
+class TestStripImageData:
+    """Screenshot stripping without a deep copy."""
+
+    def test_parsed_payload_untouched(self):
+        parsed = {"screenshot": {"format": "png", "data": "xyz"}, "steps": ["a"]}
+        text, cleaned = StreamEventFormatter._strip_image_data(json.dumps(parsed), parsed)
+
+        assert parsed["screenshot"]["data"] == "xyz"
+        assert cleaned["steps"] is parsed["steps"]
+        assert json.loads(text)["screenshot"]["note"] == "Image data extracted and displayed separately"
+
+    def test_payloads_memo(self):
+        payloads = ToolResultPayloads()
+        first = payloads.loads('{"a": 1}')
+        assert payloads.loads('{"a": 1}') is first
+        assert payloads.loads("not json") is event_formatter.NOT_JSON
+        assert payloads.loads("null") is None
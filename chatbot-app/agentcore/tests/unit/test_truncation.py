@@ -0,0 +1,177 @@
+"""
+Tests for copy-on-write tool content truncation.
+
+Focuses on meaningful logic:
+- json_length matches json.dumps(ensure_ascii=False) and stops early at the limit
+- Input messages are never modified; untouched blocks are shared, not copied
+- Rewrites are cached per history position and reused on the next turn
+- A message whose shape changed (summary prepended) is truncated again
+"""
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from agent.session.truncation import (
+    ToolContentTruncator,
+    TruncationCache,
+    json_length,
+)
+
+
+def tool_turn(n, result_chars=2000):
+    """User question, assistant toolUse, user toolResult."""
+    return [
+        {"role": "user", "content": [{"text": f"question {n}"}]},
+        {"role": "assistant", "content": [
+            {"text": "Searching"},
+            {"toolUse": {"toolUseId": f"t{n}", "name": "search", "input": {"query": "q" * 800}}},
+        ]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": f"t{n}", "status": "success", "content": [
+            {"text": "r" * result_chars},
+            {"json": {"rows": list(range(400))}},
+            {"text": "short"},
+        ]}}]},
+    ]
+
+
+class TestJsonLength:
+    """Size measurement without serialization."""
+
+    @pytest.mark.parametrize("value", [
+        {},
+        [],
+        {"a": 1, "b": [1, 2.5, None, True, False], "c": {"d": "e"}},
+        {"unicode": "héllo wörld ✓", "escapes": "line\nbreak \"quoted\" \\ tab\t \x01"},
+        {1: "int key"},
+        {2.5: "float key"},
+        {True: "bool key"},
+        {None: "none key"},
+        [float("nan"), float("inf"), float("-inf"), -0.0, 1e300, 12345678901234567890],
+        ("tuple", ["nested", ("deep",)]),
+    ])
+    def test_matches_json_dumps(self, value):
+        assert json_length(value) == len(json.dumps(value, ensure_ascii=False))
+
+    def test_stops_once_limit_exceeded(self):
+        value = {"items": ["x" * 100] * 1000}
+        length = json_length(value, limit=500)
+        assert 500 < length < len(json.dumps(value, ensure_ascii=False))
+
+    def test_under_limit_is_exact(self):
+        value = {"query": "hello"}
+        assert json_length(value, limit=500) == len(json.dumps(value))
+
+    def test_unserializable_raises_like_dumps(self):
+        with pytest.raises(TypeError):
+            json_length({"data": object()})
+
+
+class TestToolContentTruncator:
+    """Copy-on-write truncation and the per-message cache."""
+
+    def test_input_not_modified_and_untouched_blocks_shared(self):
+        messages = tool_turn(0)
+        original = copy.deepcopy(messages)
+
+        result, count, saved = ToolContentTruncator(500).truncate(messages)
+
+        assert messages == original
+        assert count == 3  # toolUse input, long text, json
+        assert saved > 0
+        # Untouched blocks are the caller's objects, rewritten ones are new
+        assert result[0]["content"][0] is messages[0]["content"][0]
+        assert result[1]["content"][0] is messages[1]["content"][0]
+        assert result[1]["content"][1] is not messages[1]["content"][1]
+        result_content = result[2]["content"][0]["toolResult"]["content"]
+        assert result_content[2] is messages[2]["content"][0]["toolResult"]["content"][2]
+        assert "[truncated," in result_content[0]["text"]
+        assert "json" not in result_content[1] and "[truncated," in result_content[1]["text"]
+        assert "_truncated" in result[1]["content"][1]["toolUse"]["input"]
+        # Containers are new: appending to a result does not touch the input
+        assert result[0] is not messages[0] and result[0]["content"] is not messages[0]["content"]
+
+    def test_protected_messages_kept(self):
+        messages = tool_turn(0)
+        result, count, _ = ToolContentTruncator(500).truncate(messages, protected_indices={1, 2})
+        assert count == 0
+        assert result == messages
+
+    def test_images_replaced_with_placeholder(self):
+        messages = [{"role": "user", "content": [
+            {"image": {"format": "png", "source": {"bytes": b"\x89PNG" * 100}}},
+        ]}]
+        result, count, saved = ToolContentTruncator(500).truncate(messages)
+        assert result[0]["content"][0] == {"text": "[Image placeholder: format=png, original_size=400 bytes]"}
+        assert (count, saved) == (1, 400)
+
+    def test_rewrites_reused_for_seen_positions(self):
+        cache = TruncationCache()
+        truncator = ToolContentTruncator(500, cache=cache)
+        history = tool_turn(0) + tool_turn(1)
+
+        first, count1, saved1 = truncator.truncate(history, cache_key=("u1", "s1"))
+        assert cache.get_stats()["misses"] == 6
+
+        history += tool_turn(2)
+        second, count2, saved2 = truncator.truncate(history, cache_key=("u1", "s1"))
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 6 and stats["misses"] == 9
+        assert second[:6] == first
+        assert (count2, saved2) == (count1 * 3 // 2, saved1 * 3 // 2)
+        # Cached replacement blocks are copied, never shared between turns
+        assert second[1]["content"][1] is not first[1]["content"][1]
+
+    def test_base_index_maps_to_history_positions(self):
+        cache = TruncationCache()
+        truncator = ToolContentTruncator(500, cache=cache)
+        history = tool_turn(0) + tool_turn(1)
+
+        truncator.truncate(history, cache_key=("u1", "s1"))
+        tail, _, _ = truncator.truncate(history[3:], cache_key=("u1", "s1"), base_index=3)
+
+        assert cache.get_stats()["hits"] == 3
+        assert tail == ToolContentTruncator(500).truncate(history[3:])[0]
+
+    def test_changed_message_is_recomputed(self):
+        cache = TruncationCache()
+        truncator = ToolContentTruncator(500, cache=cache)
+        history = tool_turn(0)
+        truncator.truncate(history, cache_key=("u1", "s1"))
+
+        changed = [{**history[0], "content": [{"text": "<conversation_summary>...</conversation_summary>question 0"}]}]
+        result, _, _ = truncator.truncate(changed + history[1:], cache_key=("u1", "s1"))
+
+        assert result[0]["content"][0]["text"].startswith("<conversation_summary>")
+        assert cache.get_stats()["misses"] == 4
+
+    def test_settings_are_part_of_the_key(self):
+        cache = TruncationCache()
+        history = tool_turn(0)
+        ToolContentTruncator(500, cache=cache).truncate(history, cache_key=("u1", "s1"))
+        result, count, _ = ToolContentTruncator(5000, cache=cache).truncate(history, cache_key=("u1", "s1"))
+
+        assert count == 0
+        assert cache.get_stats()["sessions"] == 2
+
+    def test_disabled_cache(self):
+        cache = TruncationCache(max_sessions=0)
+        truncator = ToolContentTruncator(500, cache=cache)
+        truncator.truncate(tool_turn(0), cache_key=("u1", "s1"))
+        assert cache.get_stats() == {
+            "enabled": False, "sessions": 0, "messages": 0, "hits": 0, "misses": 0, "evicted": 0,
+        }
+
+    def test_lru_eviction(self):
+        cache = TruncationCache(max_sessions=1)
+        truncator = ToolContentTruncator(500, cache=cache)
+        truncator.truncate(tool_turn(0), cache_key=("u1", "s1"))
+        truncator.truncate(tool_turn(0), cache_key=("u1", "s2"))
+
+        stats = cache.get_stats()
+        assert stats["sessions"] == 1 and stats["evicted"] == 1
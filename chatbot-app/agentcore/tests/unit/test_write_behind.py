@@ -0,0 +1,279 @@
+"""
+Tests for write-behind persistence of AgentCore Memory events.
+
+Focuses on meaningful logic:
+- Items are written in queue order; items queued during a write go out together
+- Batches respect the per-event item and byte limits
+- A failed write keeps its items for retry; flush() raises when they still fail
+- CompactingSessionManager turns a tool-heavy turn into few create_event calls
+- Batched events read back in order (history, agent state, checkpoint anchor)
+"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from strands.types.session import SessionAgent
+
+from agent.session.history_cache import SessionHistoryCache
+from agent.session.write_behind import MemoryWriteQueue, PendingWrite
+
+
+def item(n, size=1):
+    return PendingWrite(payload={"n": n}, size=size)
+
+
+class RecordingWriter:
+    """write_batch that records batches; can block the first write or fail."""
+
+    def __init__(self, block_first=False, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block_first:
+            self.release.set()
+
+    def __call__(self, batch):
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("throttled")
+        self.batches.append([i.payload["n"] for i in batch])
+        return f"e{len(self.batches)}"
+
+
+class TestMemoryWriteQueue:
+    """Ordering, batching and failure handling."""
+
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=4)
+        yield executor
+        executor.shutdown(wait=True)
+
+    def test_items_queued_during_a_write_are_batched(self, executor):
+        writer = RecordingWriter(block_first=True)
+        queue = MemoryWriteQueue(writer, executor=executor)
+
+        queue.put(item(0))
+        assert writer.started.wait(timeout=5)
+        for n in range(1, 6):
+            queue.put(item(n))  # First write still in flight
+        writer.release.set()
+        queue.flush()
+
+        assert writer.batches == [[0], [1, 2, 3, 4, 5]]
+        assert queue.get_stats()["batches"] == 2
+
+    def test_batch_limits(self, executor):
+        writer = RecordingWriter(block_first=True)
+        queue = MemoryWriteQueue(writer, max_batch_items=2, max_batch_bytes=10, executor=executor)
+
+        queue.put(item(0))
+        assert writer.started.wait(timeout=5)
+        queue.put(item(1))
+        queue.put(item(2))
+        queue.put(item(3, size=9))
+        queue.put(item(4, size=50))  # Larger than the budget: sent alone
+        writer.release.set()
+        queue.flush()
+
+        assert writer.batches == [[0], [1, 2], [3], [4]]
+
+    def test_failed_write_is_retried_by_flush(self, executor):
+        writer = RecordingWriter(fail_times=1)
+        queue = MemoryWriteQueue(writer, executor=executor)
+
+        queue.put(item(0))
+        queue.put(item(1))
+        queue.flush()
+
+        assert [n for batch in writer.batches for n in batch] == [0, 1]
+        assert queue.get_stats()["failures"] == 1
+        assert queue.pending == 0
+
+    def test_flush_raises_when_writes_keep_failing(self, executor):
+        writer = RecordingWriter(fail_times=10)
+        queue = MemoryWriteQueue(writer, executor=executor)
+
+        queue.put(item(0))
+        with pytest.raises(RuntimeError):
+            queue.flush()
+        assert queue.pending == 1
+
+        writer.fail_times = 0
+        queue.flush()
+        assert writer.batches == [[0]]
+
+
+class FakeMemoryService:
+    """create_event / list_events of one session (list_events pages newest first)."""
+
+    def __init__(self):
+        self.events = []
+        self.create_calls = 0
+
+    def create_event(self, **params):
+        self.create_calls += 1
+        event_id = f"e{len(self.events) + 1:05d}"
+        self.events.append({"eventId": event_id, "payload": params["payload"]})
+        return {"event": {"eventId": event_id}}
+
+    def list_events(self, memoryId, actorId, sessionId, maxResults, includePayloads, nextToken=None):
+        newest_first = list(reversed(self.events))
+        start = int(nextToken or 0)
+        response = {"events": newest_first[start:start + maxResults]}
+        if start + maxResults < len(newest_first):
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+
+class TestManagerWriteBehind:
+    """CompactingSessionManager with write_behind=True."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = SessionHistoryCache()
+        monkeypatch.setattr("agent.session.compacting_session_manager.get_session_history_cache", lambda: cache)
+        return cache
+
+    @pytest.fixture
+    def service(self):
+        return FakeMemoryService()
+
+    def make_manager(self, service, write_behind=True):
+        from bedrock_agentcore.memory.integrations.strands.bedrock_converter import AgentCoreMemoryConverter
+        from bedrock_agentcore.memory.integrations.strands.config import PersistenceMode
+
+        with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__') as mock_init:
+            mock_init.return_value = None
+            from agent.session.compacting_session_manager import CompactingSessionManager
+
+            manager = CompactingSessionManager(
+                agentcore_memory_config=MagicMock(), region_name='us-west-2', write_behind=write_behind
+            )
+        manager.config = MagicMock(
+            memory_id="mem", actor_id="u1", session_id="s1", batch_size=1,
+            default_metadata=None, metadata_provider=None,
+        )
+        manager.session_id = "s1"
+        manager.persistence_mode = PersistenceMode.FULL
+        manager.converter = AgentCoreMemoryConverter
+        manager._timestamp_lock = threading.Lock()
+        manager._last_timestamp = None
+        manager._latest_agent_message = {}
+        manager.memory_client = MagicMock()
+        manager.memory_client.create_event.side_effect = lambda **kw: service.create_event(payload=[
+            {"conversational": {"content": {"text": text}, "role": role.upper()}} for text, role in kw["messages"]
+        ])
+        manager.memory_client.gmdp_client.create_event.side_effect = service.create_event
+        manager.memory_client.gmdp_client.list_events.side_effect = service.list_events
+        manager.memory_client.list_events.side_effect = lambda **kw: list(reversed(service.events))[:kw["max_results"]]
+        manager.compaction_state = MagicMock()
+        return manager
+
+    @staticmethod
+    def hold_writes(manager, service):
+        """Block create_event until the returned gate is set; in_flight is set once a write started."""
+        in_flight, gate = threading.Event(), threading.Event()
+
+        def create_event(**params):
+            in_flight.set()
+            gate.wait(timeout=5)
+            return service.create_event(**params)
+
+        manager.memory_client.gmdp_client.create_event.side_effect = create_event
+        return in_flight, gate
+
+    @staticmethod
+    def tool_turn(manager, tool_calls=5):
+        """A user message, tool_calls tool round-trips and a final answer, each followed by a state sync."""
+        agent = MagicMock(agent_id="default")
+        messages = [{"role": "user", "content": [{"text": "question"}]}]
+        for n in range(tool_calls):
+            messages.append({"role": "assistant", "content": [{"toolUse": {"toolUseId": f"t{n}", "name": "search", "input": {}}}]})
+            messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": f"t{n}", "content": [{"text": "ok"}]}}]})
+        messages.append({"role": "assistant", "content": [{"text": "answer"}]})
+
+        for state, message in enumerate(messages):
+            manager._append_message_tracked(message, agent)
+            manager.create_agent("s1", SessionAgent(agent_id="default", state={"step": state}, conversation_manager_state={}))
+        return messages
+
+    def test_turn_is_written_in_few_events(self, cache, service):
+        manager = self.make_manager(service)
+        messages = self.tool_turn(manager)
+        manager.flush()
+
+        metrics = manager.get_api_metrics()
+        assert service.create_calls == metrics["api_call_count"]
+        assert service.create_calls < len(messages)
+        assert metrics["write_queue"]["queued"] == 2 * len(messages)
+
+        loaded = manager._list_messages_unified("s1")
+        assert [sm.message for sm in loaded] == messages
+
+    def test_inline_writes_one_event_per_call(self, cache, service):
+        manager = self.make_manager(service, write_behind=False)
+        messages = self.tool_turn(manager)
+
+        assert service.create_calls == 2 * len(messages)
+        assert manager.get_api_metrics()["api_call_count"] == len(messages)  # create_agent is not tracked here
+
+    def test_only_latest_agent_state_of_a_batch_is_written(self, cache, service):
+        manager = self.make_manager(service)
+        in_flight, gate = self.hold_writes(manager, service)
+
+        manager.create_agent("s1", SessionAgent(agent_id="default", state={"v": 0}, conversation_manager_state={}))
+        assert in_flight.wait(timeout=5)
+        for v in range(1, 4):
+            manager.create_agent("s1", SessionAgent(agent_id="default", state={"v": v}, conversation_manager_state={}))
+        gate.set()
+        manager.flush()
+
+        states = [json.loads(p["blob"])["state"]["v"] for e in service.events for p in e["payload"]]
+        assert states == [0, 3]
+        assert manager._read_agent_unified("s1", "default").state == {"v": 3}
+
+    def test_write_through_cache_and_event_ids(self, cache, service):
+        manager = self.make_manager(service)
+        cache.store("u1", "s1", [], [], "e00000")  # Warm entry of an earlier load
+        manager._history_watermark = "e00000"
+
+        self.tool_turn(manager, tool_calls=2)
+        manager.flush()
+
+        cached, event_ids, watermark = cache.snapshot("u1", "s1")
+        assert len(cached) == 6
+        assert watermark == service.events[-1]["eventId"]
+        assert event_ids == [
+            manager._event_anchor(manager._message_event_ids, pos)[0] for pos in range(6)
+        ]
+
+    def test_checkpoint_anchor_inside_batched_event(self, cache, service):
+        manager = self.make_manager(service)
+        in_flight, gate = self.hold_writes(manager, service)
+
+        agent = MagicMock(agent_id="default")
+        for n in range(4):
+            manager._append_message_tracked({"role": "user" if n % 2 == 0 else "assistant", "content": [{"text": f"m{n}"}]}, agent)
+            if n == 0:
+                assert in_flight.wait(timeout=5)
+        gate.set()
+        manager.flush()
+
+        event_id, offset = manager._event_anchor(manager._message_event_ids, 2)
+        assert event_id == service.events[-1]["eventId"]
+        assert offset == 1  # m0 alone, then m1..m3 batched
+
+        cache.invalidate("u1", "s1")
+        tail = manager._load_history_tail("s1", event_id, offset)
+        assert [sm.message["content"][0]["text"] for sm in tail[0]] == ["m2", "m3"]
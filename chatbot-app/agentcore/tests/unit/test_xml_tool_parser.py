@@ -0,0 +1,108 @@
+"""
+Unit tests for incremental <use_tools> parsing.
+
+Focuses on meaningful logic:
+- Plain text passes through unchanged
+- Tags split across deltas are still detected
+- A held-back "<" prefix that turns out to be text is released
+- Multiple blocks and surrounding text keep their order
+- Unterminated blocks come back as text on flush
+- process_stream emits tool_use for a block split across deltas
+"""
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from streaming.event_processor import StreamEventProcessor
+from streaming.xml_tool_parser import XmlToolCallParser
+
+BLOCK = (
+    '<use_tools><invoke name="web_search">'
+    '<parameter name="query">aws news</parameter>'
+    '<parameter name="options">{"max": 3}</parameter>'
+    '</invoke></use_tools>'
+)
+
+
+def feed_all(parser, deltas):
+    segments = []
+    for delta in deltas:
+        segments.extend(parser.feed(delta))
+    segments.extend(parser.flush())
+    return segments
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestXmlToolCallParser:
+    """Tests for XmlToolCallParser."""
+
+    def test_plain_text_passthrough(self):
+        parser = XmlToolCallParser()
+        assert parser.feed("Hello world") == ["Hello world"]
+        assert parser.flush() == []
+
+    def test_block_split_at_every_position(self):
+        """The same tool call is found however the deltas are cut."""
+        text = "Before " + BLOCK + " after"
+        for size in (1, 2, 3, 7, 11, len(text)):
+            segments = feed_all(XmlToolCallParser(), split_every(text, size))
+            calls = [s for s in segments if isinstance(s, dict)]
+            assert calls == [{"name": "web_search", "input": {"query": "aws news", "options": {"max": 3}}}]
+            assert "".join(s for s in segments if isinstance(s, str)) == "Before  after"
+
+    def test_held_prefix_released_as_text(self):
+        """'<use' followed by something else is plain text."""
+        parser = XmlToolCallParser()
+        assert parser.feed("a <use") == ["a "]
+        assert parser.feed("r> b") == ["<user> b"]
+
+        parser = XmlToolCallParser()
+        assert parser.feed("x < y and a <b") == ["x < y and a <b"]
+
+    def test_order_with_multiple_blocks(self):
+        parser = XmlToolCallParser()
+        segments = feed_all(parser, ["one ", BLOCK, " two ", BLOCK.replace("web_search", "calculator"), " three"])
+
+        kinds = [s if isinstance(s, str) else s["name"] for s in segments]
+        assert kinds == ["one ", "web_search", " two ", "calculator", " three"]
+
+    def test_unterminated_block_flushed_as_text(self):
+        parser = XmlToolCallParser()
+        assert parser.feed('text <use_tools><invoke name="x">') == ["text "]
+        assert parser.in_block
+        assert parser.flush() == ['<use_tools><invoke name="x">']
+        assert not parser.in_block
+
+
+class TestProcessStreamXmlToolCalls:
+    """Streamed XML tool calls in StreamEventProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_split_block_emits_tool_use(self):
+        agent = MagicMock()
+
+        async def stream_async(*args, **kwargs):
+            for delta in ["Let me search. ", BLOCK[:15], BLOCK[15:60], BLOCK[60:], " Done."]:
+                yield {"data": delta}
+
+        agent.stream_async = stream_async
+
+        processor = StreamEventProcessor()
+        events = [json.loads(f[len("data: "):]) async for f in processor.process_stream(agent, "hi", session_id="s1")]
+
+        tool_uses = [e for e in events if e["type"] == "tool_use"]
+        assert len(tool_uses) == 1
+        assert tool_uses[0]["name"] == "web_search"
+        assert tool_uses[0]["input"] == {"query": "aws news", "options": {"max": 3}}
+
+        text = "".join(e["text"] for e in events if e["type"] == "response")
+        assert "<use_tools>" not in text and "invoke" not in text
+        assert text == "Let me search.  Done."
@@ -4,6 +4,7 @@ import {
   parseBlobEvent,
   parseAgentCoreEvent,
   parseAgentCoreEvents,
+  parseAgentCoreEventPayloads,
   mergeMessageMetadata,
   AgentCoreEvent,
   ParsedMessage
@@ -496,6 +497,63 @@ describe('historyParser', () => {
     })
   })
 
+  describe('parseAgentCoreEventPayloads', () => {
+    // Write-behind batches several messages into one event
+    const batched: AgentCoreEvent = {
+      eventId: 'evt-batch',
+      eventTime: '2024-01-01T12:00:00Z',
+      payload: [
+        {
+          conversational: {
+            content: {
+              text: JSON.stringify({ message: { role: 'user', content: [{ text: 'Look it up' }] } })
+            }
+          }
+        },
+        {
+          blob: JSON.stringify([
+            JSON.stringify({ message: { role: 'assistant', content: [{ text: 'x'.repeat(10000) }] } }),
+            'assistant'
+          ])
+        },
+        { blob: JSON.stringify({ _payload_type: 'agent_state', _agent_id: 'default', state: {} }) },
+        {
+          conversational: {
+            content: {
+              text: JSON.stringify({ message: { role: 'user', content: [{ text: 'Thanks' }] } })
+            }
+          }
+        }
+      ]
+    }
+
+    it('should read every payload in order with its own id', () => {
+      const messages = parseAgentCoreEventPayloads(batched, 'session-1', 0)
+
+      expect(messages.map(m => m.role)).toEqual(['user', 'assistant', 'user'])
+      expect(messages.map(m => m.id)).toEqual(['evt-batch:0', 'evt-batch:1', 'evt-batch:3'])
+      expect(messages[1].content[0].text).toHaveLength(10000)
+      expect(messages.every(m => m.timestamp === '2024-01-01T12:00:00Z')).toBe(true)
+    })
+
+    it('should keep the plain eventId for single-payload events', () => {
+      const single: AgentCoreEvent = { ...batched, payload: batched.payload!.slice(0, 1) }
+
+      expect(parseAgentCoreEventPayloads(single, 'session-1', 0).map(m => m.id)).toEqual(['evt-batch'])
+    })
+
+    it('should count generated ids across payloads when eventId is missing', () => {
+      const messages = parseAgentCoreEvents(
+        [{ ...batched, eventId: undefined }, { ...batched, eventId: undefined }],
+        'session-1'
+      )
+
+      expect(messages).toHaveLength(6)
+      expect(new Set(messages.map(m => m.id)).size).toBe(6)
+      expect(messages[5].id).toBe('msg-session-1-5')
+    })
+  })
+
   describe('mergeMessageMetadata', () => {
     it('should return messages unchanged when no metadata', () => {
       const messages: ParsedMessage[] = [
@@ -3,6 +3,8 @@ import {
   extractBlobImages,
   extractToolResultImages,
   extractToolResultText,
+  getImageSrc,
+  isBlobImage,
   ImageData
 } from '@/utils/imageExtractor'
 
@@ -428,4 +430,36 @@ describe('imageExtractor', () => {
       expect(result).toBe('Part 1 Part 2')
     })
   })
+
+  describe('getImageSrc', () => {
+    const hash = 'a'.repeat(64)
+
+    it('should proxy blob references through the BFF with session and user', () => {
+      const image: ImageData = {
+        format: 'png',
+        hash,
+        url: `/blobs/${hash}?session_id=s%201&user_id=u1`,
+        thumbnail: 'thumb'
+      }
+
+      expect(isBlobImage(image)).toBe(true)
+      expect(getImageSrc(image)).toBe(`/api/blobs/${hash}?session_id=s%201&user_id=u1`)
+    })
+
+    it('should build data URIs for inline images', () => {
+      const image: ImageData = { format: 'jpeg', data: 'abc' }
+
+      expect(isBlobImage(image)).toBe(false)
+      expect(getImageSrc(image)).toBe('data:image/jpeg;base64,abc')
+    })
+
+    it('should use the web URL, then the thumbnail, for URL images', () => {
+      expect(getImageSrc({ type: 'url', url: 'https://example.com/a.jpg' })).toBe('https://example.com/a.jpg')
+      expect(getImageSrc({ type: 'url', url: '', thumbnail: 'https://example.com/t.jpg' })).toBe('https://example.com/t.jpg')
+    })
+
+    it('should return empty string when there is nothing to show', () => {
+      expect(getImageSrc({ format: 'png', data: '' })).toBe('')
+    })
+  })
 })
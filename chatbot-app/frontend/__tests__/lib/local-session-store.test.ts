@@ -0,0 +1,118 @@
+// @vitest-environment node
+/**
+ * Tests for reading local AgentCore session messages (getSessionMessages)
+ *
+ * Tests cover:
+ * - JSONL segments: last record of a message_id wins, torn trailing record skipped
+ * - Legacy message_<N>.json files, and their migrated copies in segments
+ * - Sidecar blob references decoded to the SDK's {__bytes_encoded__, data} form
+ * - Attachment stubs resolved into image/document blocks from blobs/
+ */
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import crypto from 'crypto'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+
+import { getSessionMessages } from '@/lib/local-session-store'
+
+const SESSION_ID = 'test_session_1'
+const IMAGE = Buffer.from('\x89PNG image bytes')
+const SCREENSHOT = Buffer.alloc(5000, 'y')
+
+function sha256(data: Buffer): string {
+  return crypto.createHash('sha256').update(data).digest('hex')
+}
+
+function record(messageId: number, message: any, createdAt: string): string {
+  return JSON.stringify({
+    message_id: messageId,
+    message,
+    redact_message: null,
+    created_at: createdAt,
+    updated_at: createdAt,
+  })
+}
+
+describe('getSessionMessages', () => {
+  let root: string
+  let sessionDir: string
+  let messagesDir: string
+
+  beforeEach(() => {
+    root = fs.mkdtempSync(path.join(os.tmpdir(), 'local-session-store-'))
+    fs.mkdirSync(path.join(root, 'frontend'))
+    vi.spyOn(process, 'cwd').mockReturnValue(path.join(root, 'frontend'))
+
+    sessionDir = path.join(root, 'agentcore', 'sessions', `session_${SESSION_ID}`)
+    messagesDir = path.join(sessionDir, 'agents', 'agent_default', 'messages')
+    fs.mkdirSync(messagesDir, { recursive: true })
+    fs.mkdirSync(path.join(sessionDir, 'blobs'))
+    fs.writeFileSync(path.join(sessionDir, 'blobs', sha256(IMAGE)), IMAGE)
+    fs.writeFileSync(path.join(sessionDir, 'blobs', sha256(SCREENSHOT)), SCREENSHOT)
+  })
+
+  afterEach(() => {
+    vi.restoreAllMocks()
+    fs.rmSync(root, { recursive: true, force: true })
+  })
+
+  it('should read segment records in message_id order, last record winning', () => {
+    fs.writeFileSync(path.join(messagesDir, 'segment_000000.jsonl'), [
+      record(0, { role: 'user', content: [{ text: 'Hello' }] }, '2024-01-01T12:00:00Z'),
+      record(1, { role: 'assistant', content: [{ text: 'Draft' }] }, '2024-01-01T12:00:01Z'),
+    ].join('\n') + '\n')
+    fs.writeFileSync(path.join(messagesDir, 'segment_000001.jsonl'), [
+      record(1, { role: 'assistant', content: [{ text: '[redacted]' }] }, '2024-01-01T12:00:01Z'),
+      '{"message_id":2,"message":{"role":"us',  // Torn by a crash
+    ].join('\n'))
+
+    const messages = getSessionMessages(SESSION_ID)
+
+    expect(messages.map(m => m.content[0].text)).toEqual(['Hello', '[redacted]'])
+    expect(messages[1].timestamp).toBe('2024-01-01T12:00:01Z')
+  })
+
+  it('should read legacy message files and prefer their migrated copy', () => {
+    fs.writeFileSync(
+      path.join(messagesDir, 'message_0.json'),
+      record(0, { role: 'user', content: [{ text: 'Legacy' }] }, '2024-01-01T12:00:00Z')
+    )
+    fs.writeFileSync(
+      path.join(messagesDir, 'message_1.json'),
+      record(1, { role: 'assistant', content: [{ text: 'Not migrated yet' }] }, '2024-01-01T12:00:01Z')
+    )
+    fs.writeFileSync(
+      path.join(messagesDir, 'segment_000000.jsonl'),
+      record(0, { role: 'user', content: [{ text: 'Migrated' }] }, '2024-01-01T12:00:00Z') + '\n'
+    )
+
+    const messages = getSessionMessages(SESSION_ID)
+
+    expect(messages.map(m => m.content[0].text)).toEqual(['Migrated', 'Not migrated yet'])
+  })
+
+  it('should decode blob references and resolve attachment stubs', () => {
+    const stub = `<attachment sha256="${sha256(IMAGE)}" kind="image" format="png" size="${IMAGE.length}">` +
+      'Uploaded image from an earlier turn, not included again.</attachment>'
+    const missing = `<attachment sha256="${'0'.repeat(64)}" kind="document" format="pdf" size="10" name="a &amp; b">` +
+      'Uploaded document from an earlier turn, not included again.</attachment>'
+    fs.writeFileSync(path.join(messagesDir, 'segment_000000.jsonl'), [
+      record(0, { role: 'user', content: [{ text: 'What is this?' }, { text: stub }, { text: missing }] }, '2024-01-01T12:00:00Z'),
+      record(1, { role: 'user', content: [{ toolResult: { toolUseId: 't1', content: [
+        { image: { format: 'png', source: { bytes: { __blob__: sha256(SCREENSHOT), size: SCREENSHOT.length } } } },
+      ] } }] }, '2024-01-01T12:00:01Z'),
+    ].join('\n') + '\n')
+
+    const [upload, toolResult] = getSessionMessages(SESSION_ID)
+
+    expect(upload.content[1]).toEqual({
+      image: { format: 'png', source: { bytes: { __bytes_encoded__: true, data: IMAGE.toString('base64') } } },
+    })
+    expect(upload.content[2]).toEqual({ text: missing })  // Bytes not available: stub kept
+    expect(toolResult.content[0].toolResult.content[0].image.source.bytes).toEqual({
+      __bytes_encoded__: true,
+      data: SCREENSHOT.toString('base64'),
+    })
+  })
+})
@@ -5,7 +5,8 @@ import {
   parseSSEChunk,
   validateStreamEvent,
   createMockEvent,
-  serializeToSSE
+  serializeToSSE,
+  createSSEResumeTracker
 } from '@/utils/sseParser'
 import type { StreamEvent } from '@/types/events'
 
@@ -603,4 +604,45 @@ describe('sseParser', () => {
       })
     })
   })
+
+  describe('createSSEResumeTracker', () => {
+    it('should forward only complete messages', () => {
+      const tracker = createSSEResumeTracker()
+
+      expect(tracker.push('id: r1-1\ndata: {"type":"init"}\n\nid: r1-2\nda')).toBe(
+        'id: r1-1\ndata: {"type":"init"}\n\n'
+      )
+      expect(tracker.lastEventId).toBe('r1-1')
+
+      expect(tracker.push('ta: {"type":"response","text":"Hi"}\n\n')).toBe(
+        'id: r1-2\ndata: {"type":"response","text":"Hi"}\n\n'
+      )
+      expect(tracker.lastEventId).toBe('r1-2')
+    })
+
+    it('should keep the last id when messages have none', () => {
+      const tracker = createSSEResumeTracker()
+
+      tracker.push('id: r1-5\ndata: {"type":"init"}\n\n: keep-alive\n\n')
+
+      expect(tracker.lastEventId).toBe('r1-5')
+    })
+
+    it('should not take the id of an incomplete message', () => {
+      const tracker = createSSEResumeTracker()
+
+      tracker.push('id: r1-1\ndata: {"type":"init"}\n\nid: r1-2\ndata: {"ty')
+
+      expect(tracker.lastEventId).toBe('r1-1')
+      expect(tracker.flush()).toBe('id: r1-2\ndata: {"ty')
+      expect(tracker.flush()).toBe('')
+    })
+
+    it('should return null before any id', () => {
+      const tracker = createSSEResumeTracker()
+
+      expect(tracker.push('data: {"type":"init"}\n\n')).toBe('data: {"type":"init"}\n\n')
+      expect(tracker.lastEventId).toBeNull()
+    })
+  })
 })
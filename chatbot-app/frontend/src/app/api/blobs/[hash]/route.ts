@@ -0,0 +1,72 @@
+/**
+ * Blob proxy endpoint
+ * Serves tool result images that the backend streamed as blob references
+ * (SSE_IMAGE_TRANSPORT=blob) instead of inline base64.
+ *
+ * Image references carry url "/blobs/<sha256>?session_id=..."; the UI requests
+ * /api + url with its auth header (see LazyImage) and this route forwards it to
+ * the container's GET /blobs/{hash}, which only serves the blob to the session's
+ * user. The user always comes from the request's auth, never from the query
+ * string. AgentCore Runtime only routes /invocations, so the blob transport
+ * (and this route) works in local mode only.
+ *
+ * Usage: GET /api/blobs/<sha256>?session_id=...
+ */
+import { NextRequest, NextResponse } from 'next/server'
+import { extractUserFromRequest } from '@/lib/auth-utils'
+
+const IS_LOCAL = process.env.NEXT_PUBLIC_AGENTCORE_LOCAL === 'true'
+const AGENTCORE_URL = process.env.NEXT_PUBLIC_AGENTCORE_URL || 'http://localhost:8080'
+
+const HASH_PATTERN = /^[0-9a-f]{64}$/
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ hash: string }> }
+) {
+  try {
+    const { hash } = await params
+    if (!HASH_PATTERN.test(hash)) {
+      return NextResponse.json({ error: 'Invalid blob hash' }, { status: 400 })
+    }
+
+    const sessionId = request.nextUrl.searchParams.get('session_id')
+    if (!sessionId) {
+      return NextResponse.json({ error: 'session_id required' }, { status: 400 })
+    }
+
+    // A user_id in the query string is ignored: the owner check needs the caller's identity
+    const { userId } = extractUserFromRequest(request)
+
+    if (!IS_LOCAL) {
+      return NextResponse.json({ error: 'Blob transport is only available in local mode' }, { status: 404 })
+    }
+
+    const query = new URLSearchParams({ session_id: sessionId, user_id: userId })
+    const headers: Record<string, string> = {}
+    const ifNoneMatch = request.headers.get('if-none-match')
+    if (ifNoneMatch) {
+      headers['If-None-Match'] = ifNoneMatch
+    }
+
+    const response = await fetch(`${AGENTCORE_URL}/blobs/${hash}?${query}`, { headers })
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: { ETag: response.headers.get('etag') || `"${hash}"` } })
+    }
+    if (!response.ok) {
+      return NextResponse.json({ error: 'Blob not found or expired' }, { status: response.status === 404 ? 404 : 502 })
+    }
+
+    return new NextResponse(await response.arrayBuffer(), {
+      status: 200,
+      headers: {
+        'Content-Type': response.headers.get('content-type') || 'application/octet-stream',
+        'Cache-Control': response.headers.get('cache-control') || 'private, max-age=31536000, immutable',
+        ETag: response.headers.get('etag') || `"${hash}"`,
+      },
+    })
+  } catch (error) {
+    console.error('[Blob Proxy] Error:', error)
+    return NextResponse.json({ error: 'Failed to fetch blob' }, { status: 500 })
+  }
+}
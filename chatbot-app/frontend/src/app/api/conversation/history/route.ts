@@ -3,6 +3,7 @@
  */
 import { NextRequest, NextResponse } from 'next/server'
 import { extractUserFromRequest } from '@/lib/auth-utils'
+import { parseAgentCoreEventPayloads } from '@/utils/historyParser'
 
 // Check if running in local development mode
 const IS_LOCAL = process.env.NEXT_PUBLIC_AGENTCORE_LOCAL === 'true'
@@ -137,9 +138,10 @@ export async function GET(request: NextRequest) {
       // Events are returned newest-first, reverse to get chronological order
       const reversedEvents = [...events].reverse()
 
-      // AgentCore Memory SDK stores messages in ONE of two formats (not both):
+      // AgentCore Memory SDK stores each message in ONE of two formats (not both):
       // - conversational: messages under 9000 chars
       // - blob: messages 9000 chars or more
+      // (parsed by utils/historyParser)
       //
       // SDK logic (session_manager.py create_message):
       //   if not exceeds_conversational_limit: create conversational event
@@ -178,77 +180,13 @@ export async function GET(request: NextRequest) {
         console.log(`[API] Loaded ${artifacts.length} artifacts from AgentCore Memory agent_state`)
       }
 
-      for (let i = 0; i < reversedEvents.length; i++) {
-        const event = reversedEvents[i]
-        const payload = event.payload?.[0]
-
-        if (!payload) continue
-
-        // Case 1: Conversational event (message < 9000 chars)
-        if (payload.conversational) {
-          const conv = payload.conversational
-          const content = conv.content?.text || ''
-
-          if (!content) {
-            console.warn(`[API] Event ${event.eventId} has no content, skipping`)
-            continue
-          }
-
-          let parsed
-          try {
-            parsed = JSON.parse(content)
-          } catch (e) {
-            console.error(`[API] Failed to parse conversational content:`, e)
-            continue
-          }
-
-          // Skip agent_state payloads (already processed above)
-          if (parsed._payload_type === 'agent_state') {
-            continue
-          }
-
-          if (!parsed.message) {
-            console.warn(`[API] Event ${event.eventId} missing "message" key, skipping`)
-            continue
-          }
-
-          const message = {
-            ...parsed.message,
-            id: event.eventId || `msg-${sessionId}-${msgIndex}`,
-            timestamp: event.eventTime || new Date().toISOString()
-          }
-          msgIndex++
-          messages.push(message)
-        }
-        // Case 2: Blob event (message >= 9000 chars)
-        else if (payload.blob && typeof payload.blob === 'string') {
-          try {
-            const blobParsed = JSON.parse(payload.blob)
-
-            // Skip agent_state blobs (already processed above)
-            if (typeof blobParsed === 'object' && blobParsed._payload_type === 'agent_state') {
-              continue
-            }
-
-            // Blob format from SDK: ["message_json", "role"] tuple
-            if (Array.isArray(blobParsed) && blobParsed.length >= 1) {
-              const blobMessageData = JSON.parse(blobParsed[0])
-
-              if (blobMessageData?.message) {
-                const message = {
-                  ...blobMessageData.message,
-                  id: event.eventId || `msg-${sessionId}-${msgIndex}`,
-                  timestamp: event.eventTime || new Date().toISOString()
-                }
-                msgIndex++
-                messages.push(message)
-                console.log(`[API] Restored blob message (role: ${message.role}, content items: ${message.content?.length || 0})`)
-              }
-            }
-          } catch (e) {
-            console.error(`[API] Failed to parse blob:`, e)
-          }
-        }
+      for (const event of reversedEvents) {
+        // Every payload of an event is a message: the backend's write-behind
+        // queue batches several messages into one event. agent_state payloads
+        // (processed above) do not parse as messages and are skipped.
+        const eventMessages = parseAgentCoreEventPayloads(event, sessionId, msgIndex)
+        msgIndex += eventMessages.length
+        messages.push(...eventMessages)
       }
 
       console.log(`[API] Loaded ${messages.length} messages for session ${sessionId}`)
@@ -3,10 +3,11 @@
  * Invokes AgentCore Runtime and streams responses
  */
 import { NextRequest } from 'next/server'
-import { invokeAgentCoreRuntime } from '@/lib/agentcore-runtime-client'
+import { invokeAgentCoreRuntime, stopAgentCoreRuntime } from '@/lib/agentcore-runtime-client'
 import { extractUserFromRequest, getSessionId, ensureSessionExists } from '@/lib/auth-utils'
 import { createDefaultHookManager } from '@/lib/chat-hooks'
 import { getSystemPrompt } from '@/lib/system-prompts'
+import { createSSEResumeTracker } from '@/utils/sseParser'
 // Note: browser-session-poller is dynamically imported when browser-use-agent is enabled
 
 // Check if running in local mode
@@ -15,6 +16,11 @@ const IS_LOCAL = process.env.NEXT_PUBLIC_AGENTCORE_LOCAL === 'true'
 export const runtime = 'nodejs'
 export const maxDuration = 1800 // 30 minutes for long-running agent tasks (self-hosted, no Vercel limits)
 
+// Reconnects to a still-running AgentCore stream after a dropped connection
+// (must fit within the runtime's SSE_RESUME_GRACE_SECONDS)
+const MAX_RESUME_ATTEMPTS = 3
+const RESUME_DELAY_MS = 500
+
 export async function POST(request: NextRequest) {
   try {
     // Check if request is FormData (file upload) or JSON (text only)
@@ -245,6 +251,8 @@ export async function POST(request: NextRequest) {
         let lastActivityTime = Date.now()
         let keepAliveInterval: NodeJS.Timeout | null = null
         let agentStarted = false
+        let agentInvoked = false // Set before the invoke: the run may start before AgentCore responds
+        let agentFinished = false
 
         // Send initial keep-alive immediately to establish connection
         controller.enqueue(encoder.encode(`: connected ${new Date().toISOString()}\n\n`))
@@ -276,9 +284,21 @@ export async function POST(request: NextRequest) {
         const agentCoreAbortController = new AbortController()
         let agentCoreReader: ReadableStreamDefaultReader<Uint8Array> | null = null
 
+        // The browser is gone: stop the run now instead of letting the runtime
+        // wait out its resume grace period (kept for BFF <-> AgentCore drops)
+        let stopSent = false
+        const stopRunOnClientDisconnect = () => {
+          if (!agentInvoked || agentFinished || stopSent) return
+          stopSent = true
+          stopAgentCoreRuntime(userId, sessionId).catch(err => {
+            console.warn('[BFF] Failed to send stop signal on client disconnect:', err)
+          })
+        }
+
         // Listen for client disconnect via request.signal
         request.signal.addEventListener('abort', () => {
           console.log('[BFF] Client disconnected (request.signal aborted), cancelling AgentCore stream')
+          stopRunOnClientDisconnect()
           agentCoreAbortController.abort()
           if (agentCoreReader) {
             agentCoreReader.cancel().catch(err => {
@@ -337,7 +357,7 @@ export async function POST(request: NextRequest) {
             finalSystemPrompt = `${modelConfig.system_prompt}\n\n${system_prompt}`
           }
 
-          const agentStream = await invokeAgentCoreRuntime(
+          const invokeAgentCore = (lastEventId?: string) => invokeAgentCoreRuntime(
             userId,
             sessionId,
             message,
@@ -350,33 +370,75 @@ export async function POST(request: NextRequest) {
             agentCoreAbortController.signal, // Pass abort signal for cancellation
             request_type, // Request type: normal, swarm, compose
             selected_artifact_id, // Selected artifact ID for tool context
-            userApiKeys // User API keys for tool authentication
+            userApiKeys, // User API keys for tool authentication
+            lastEventId // Resume: last SSE id forwarded to the client
           )
-          agentStarted = true
 
-          // Read from AgentCore stream and forward chunks
-          const reader = agentStream.getReader()
-          agentCoreReader = reader // Store for abort handler
+          agentInvoked = true
+          let agentStream = await invokeAgentCore()
+          agentStarted = true
 
-          while (true) {
-            const { done, value } = await reader.read()
+          // Forward whole SSE messages only, tracking the last `id:`. When the
+          // AgentCore connection drops mid-turn, reattach to the running stream
+          // after that id instead of failing the turn (no model or tool re-run)
+          const tracker = createSSEResumeTracker()
+          let resumeAttempts = 0
 
-            if (done) break
+          forwardLoop: while (true) {
+            const reader = agentStream.getReader()
+            agentCoreReader = reader // Store for abort handler
+            const decoder = new TextDecoder()
 
-            // Check if controller is still open before enqueueing
             try {
-              controller.enqueue(value)
-              lastActivityTime = Date.now()
-            } catch (err) {
-              // Controller closed (client disconnected) - gracefully cancel AgentCore stream
-              console.log('[BFF] Controller closed, cancelling AgentCore stream for graceful shutdown')
-              try {
-                await reader.cancel()
-                console.log('[BFF] AgentCore stream cancelled successfully')
-              } catch (cancelErr) {
-                console.error('[BFF] Error cancelling AgentCore stream:', cancelErr)
+              while (true) {
+                const { done, value } = await reader.read()
+
+                if (done) {
+                  const rest = tracker.flush() + decoder.decode()
+                  if (rest) {
+                    try {
+                      controller.enqueue(encoder.encode(rest))
+                    } catch (err) {
+                      // Controller already closed, ignore
+                    }
+                  }
+                  break forwardLoop
+                }
+
+                const complete = tracker.push(decoder.decode(value, { stream: true }))
+                if (!complete) continue
+
+                // Check if controller is still open before enqueueing
+                try {
+                  controller.enqueue(encoder.encode(complete))
+                  lastActivityTime = Date.now()
+                } catch (err) {
+                  // Controller closed (client disconnected) - gracefully cancel AgentCore stream
+                  console.log('[BFF] Controller closed, cancelling AgentCore stream for graceful shutdown')
+                  stopRunOnClientDisconnect()
+                  try {
+                    await reader.cancel()
+                    console.log('[BFF] AgentCore stream cancelled successfully')
+                  } catch (cancelErr) {
+                    console.error('[BFF] Error cancelling AgentCore stream:', cancelErr)
+                  }
+                  break forwardLoop
+                }
+              }
+            } catch (error) {
+              const lastEventId = tracker.lastEventId
+              if (agentCoreAbortController.signal.aborted || !lastEventId || resumeAttempts >= MAX_RESUME_ATTEMPTS) {
+                throw error
               }
-              break
+
+              resumeAttempts++
+              console.warn(
+                `[BFF] AgentCore stream dropped after event ${lastEventId}, resuming (attempt ${resumeAttempts}/${MAX_RESUME_ATTEMPTS}):`,
+                error
+              )
+              tracker.flush() // The partial message is replayed in full
+              await new Promise(resolve => setTimeout(resolve, RESUME_DELAY_MS * resumeAttempts))
+              agentStream = await invokeAgentCore(lastEventId)
             }
           }
 
@@ -394,6 +456,8 @@ export async function POST(request: NextRequest) {
             console.log('[BFF] Controller closed, cannot send error event')
           }
         } finally {
+          agentFinished = true
+
           // Update session metadata after message processing
           try {
             let currentSession: any = null
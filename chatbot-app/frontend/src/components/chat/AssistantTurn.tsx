@@ -11,6 +11,7 @@ import { StreamingText } from './StreamingText'
 import { ToolExecutionContainer } from './ToolExecutionContainer'
 import { ResearchContainer } from '@/components/ResearchContainer'
 import { LazyImage } from '@/components/ui/LazyImage'
+import { getImageSrc } from '@/utils/imageExtractor'
 import { fetchAuthSession } from 'aws-amplify/auth'
 
 // Parse artifact creation message pattern
@@ -513,11 +514,7 @@ export const AssistantTurn = React.memo<AssistantTurnProps>(({ messages, current
                       {item.images.map((image, idx) => {
                         // Type guard for URL-based images
                         const isUrlImage = 'type' in image && image.type === 'url';
-                        const imageSrc = isUrlImage
-                          ? (image.url || image.thumbnail || '')
-                          : 'data' in image
-                          ? `data:image/${image.format};base64,${image.data}`
-                          : '';
+                        const imageSrc = getImageSrc(image);
                         const imageFormat = isUrlImage
                           ? 'WEB'
                           : 'format' in image
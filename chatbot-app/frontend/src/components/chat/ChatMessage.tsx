@@ -5,6 +5,7 @@ import { Message } from '@/types/chat'
 import { Markdown } from '@/components/ui/Markdown'
 import { ToolExecutionContainer } from './ToolExecutionContainer'
 import { LazyImage } from '@/components/ui/LazyImage'
+import { getImageSrc } from '@/utils/imageExtractor'
 import { AIIcon } from '@/components/ui/AIIcon'
 
 // Check if this is a compose request JSON (user message to hide)
@@ -225,11 +226,7 @@ export const ChatMessage = React.memo<ChatMessageProps>(({ message, sessionId })
                 {message.images.map((image, idx) => {
                   // Type guard for URL-based images
                   const isUrlImage = 'type' in image && image.type === 'url';
-                  const imageSrc = isUrlImage
-                    ? (image.url || image.thumbnail || '')
-                    : 'data' in image
-                    ? `data:image/${image.format};base64,${image.data}`
-                    : '';
+                  const imageSrc = getImageSrc(image);
                   const imageFormat = isUrlImage
                     ? 'WEB'
                     : 'format' in image
@@ -11,6 +11,7 @@ import { Markdown } from '@/components/ui/Markdown'
 import { LazyImage } from '@/components/ui/LazyImage'
 import { getApiUrl } from '@/config/environment'
 import { cn } from '@/lib/utils'
+import { getImageSrc, isBlobImage } from '@/utils/imageExtractor'
 import type { ImageData } from '@/utils/imageExtractor'
 
 // Word document tool names
@@ -659,7 +660,7 @@ export const ToolExecutionContainer = React.memo<ToolExecutionContainerProps>(({
                           {toolExecution.images
                             .filter((image) => {
                               const isUrlImage = 'type' in image && image.type === 'url';
-                              const hasValidSource = isUrlImage
+                              const hasValidSource = isUrlImage || isBlobImage(image)
                                 ? (image.thumbnail || image.url)
                                 : ('data' in image && image.data);
                               return !!hasValidSource;
@@ -669,8 +670,8 @@ export const ToolExecutionContainer = React.memo<ToolExecutionContainerProps>(({
                               const isUrlImage = 'type' in image && image.type === 'url';
 
                               let imageSrc: string = '';
-                              if (isUrlImage) {
-                                imageSrc = image.url || image.thumbnail || '';
+                              if (isUrlImage || isBlobImage(image)) {
+                                imageSrc = getImageSrc(image);
                               } else if ('data' in image && 'format' in image) {
                                 const imageData = typeof image.data === 'string'
                                   ? image.data
@@ -745,12 +746,13 @@ export const ToolExecutionContainer = React.memo<ToolExecutionContainerProps>(({
           onClick={() => setSelectedImage(null)}
         >
           <div className="relative max-w-[80vw] max-h-[80vh]">
-            <img
-              src={selectedImage.src}
-              alt={selectedImage.alt}
-              className="max-w-full max-h-[80vh] object-contain rounded-lg cursor-zoom-out"
-              onClick={(e) => e.stopPropagation()}
-            />
+            <div onClick={(e) => e.stopPropagation()}>
+              <LazyImage
+                src={selectedImage.src}
+                alt={selectedImage.alt}
+                className="max-w-full max-h-[80vh] object-contain rounded-lg cursor-zoom-out"
+              />
+            </div>
             <button
               onClick={() => setSelectedImage(null)}
               className="absolute top-2 right-2 bg-black/60 hover:bg-black/80 text-white rounded-full p-2 transition-colors"
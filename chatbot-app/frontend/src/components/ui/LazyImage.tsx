@@ -1,6 +1,7 @@
 'use client'
 
 import React, { useEffect, useState } from 'react'
+import { apiFetch } from '@/lib/api-client'
 
 interface LazyImageProps {
   src: string
@@ -10,6 +11,10 @@ interface LazyImageProps {
   onClick?: () => void
 }
 
+// Blob proxy images need the auth header (the BFF takes the user from it),
+// which a plain <img src> request does not send
+const BLOB_PROXY_PREFIX = '/api/blobs/'
+
 export const LazyImage: React.FC<LazyImageProps> = ({
   src,
   alt,
@@ -19,6 +24,8 @@ export const LazyImage: React.FC<LazyImageProps> = ({
 }) => {
   const [isLoaded, setIsLoaded] = useState(false)
   const [hasError, setHasError] = useState(false)
+  const [blobUrl, setBlobUrl] = useState<string | null>(null)
+  const isBlobProxy = src.startsWith(BLOB_PROXY_PREFIX)
 
   // Reset loading state when src changes
   useEffect(() => {
@@ -26,21 +33,53 @@ export const LazyImage: React.FC<LazyImageProps> = ({
     setHasError(false)
   }, [src])
 
+  // Fetch blob proxy images with auth and show them from an object URL
+  useEffect(() => {
+    if (!isBlobProxy) return
+
+    let objectUrl: string | null = null
+    let cancelled = false
+    setBlobUrl(null)
+
+    apiFetch(src.slice('/api/'.length), { method: 'GET' })
+      .then(response => {
+        if (!response.ok) throw new Error(`Blob request failed (${response.status})`)
+        return response.blob()
+      })
+      .then(blob => {
+        if (cancelled) return
+        objectUrl = URL.createObjectURL(blob)
+        setBlobUrl(objectUrl)
+      })
+      .catch(() => {
+        if (!cancelled) setHasError(true)
+      })
+
+    return () => {
+      cancelled = true
+      if (objectUrl) URL.revokeObjectURL(objectUrl)
+    }
+  }, [src, isBlobProxy])
+
+  const imgSrc = isBlobProxy ? blobUrl : src
+
   return (
     <div className={`relative ${className}`} style={style}>
       {!isLoaded && !hasError && (
         <div className="absolute inset-0 bg-gray-200 animate-pulse rounded" />
       )}
-      <img
-        src={src}
-        alt={alt}
-        loading="lazy"
-        className={`${className} ${!isLoaded ? 'opacity-0' : 'opacity-100'} transition-opacity duration-300`}
-        style={style}
-        onLoad={() => setIsLoaded(true)}
-        onError={() => setHasError(true)}
-        onClick={onClick}
-      />
+      {imgSrc && (
+        <img
+          src={imgSrc}
+          alt={alt}
+          loading="lazy"
+          className={`${className} ${!isLoaded ? 'opacity-0' : 'opacity-100'} transition-opacity duration-300`}
+          style={style}
+          onLoad={() => setIsLoaded(true)}
+          onError={() => setHasError(true)}
+          onClick={onClick}
+        />
+      )}
     </div>
   )
 }
@@ -688,6 +688,45 @@ export const useChatAPI = ({
     return text.replace(/<uploaded_files>[\s\S]*?<\/uploaded_files>/g, '').trim()
   }
 
+  /**
+   * Parse an <attachment .../> stub (uploaded file kept out of persisted history)
+   * into a file badge. Returns null for any other text block.
+   */
+  const parseAttachmentStub = (text: string): { name: string; type: string; size: number } | null => {
+    const match = text.match(/^<attachment ((?:\w+="[^"]*" ?)+)>[^<]*<\/attachment>$/)
+    if (!match) return null
+
+    const attributes: Record<string, string> = {}
+    const attributePattern = /(\w+)="([^"]*)"/g
+    let attribute: RegExpExecArray | null
+    while ((attribute = attributePattern.exec(match[1])) !== null) {
+      attributes[attribute[1]] = attribute[2]
+        .replace(/&quot;/g, '"').replace(/&#x27;/g, "'").replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&')
+    }
+
+    const format = attributes.format || 'unknown'
+    const mimeTypeMap: Record<string, string> = {
+      'png': 'image/png',
+      'jpeg': 'image/jpeg',
+      'jpg': 'image/jpeg',
+      'gif': 'image/gif',
+      'webp': 'image/webp',
+      'pdf': 'application/pdf',
+      'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+      'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+      'csv': 'text/csv',
+      'txt': 'text/plain',
+      'md': 'text/markdown',
+      'html': 'text/html'
+    }
+
+    return {
+      name: attributes.kind === 'image' ? `image.${format}` : `${attributes.name || 'document'}.${format}`,
+      type: mimeTypeMap[format] || 'application/octet-stream',
+      size: Number(attributes.size) || 0
+    }
+  }
+
   /**
    * Parse swarm context from assistant message text
    * Returns the agents used, shared context, and removes the tag from text
@@ -824,9 +863,14 @@ export const useChatAPI = ({
 
           if (Array.isArray(msg.content)) {
             msg.content.forEach((item: any) => {
-              // Extract text content
+              // Extract text content (attachment stubs become file badges)
               if (item.text) {
-                text += item.text
+                const attachment = parseAttachmentStub(item.text)
+                if (attachment) {
+                  uploadedFiles.push(attachment)
+                } else {
+                  text += item.text
+                }
               }
 
               // Extract document ContentBlocks for file badge display
@@ -96,7 +96,8 @@ async function invokeLocalAgentCore(
   abortSignal?: AbortSignal,
   requestType?: string,
   selectedArtifactId?: string,
-  apiKeys?: Record<string, string>
+  apiKeys?: Record<string, string>,
+  lastEventId?: string
 ): Promise<ReadableStream> {
   console.log('[AgentCore] 🚀 Invoking LOCAL AgentCore via HTTP POST')
   console.log(`[AgentCore]    URL: ${AGENTCORE_URL}/invocations`)
@@ -150,6 +151,13 @@ async function invokeLocalAgentCore(
     console.log(`[AgentCore]    API keys provided: ${Object.keys(apiKeys).join(', ')}`)
   }
 
+  // Reattach to the still-running stream instead of starting a new turn
+  if (lastEventId) {
+    inputData.action = 'resume'
+    inputData.last_event_id = lastEventId
+    console.log(`[AgentCore]    Resuming after event: ${lastEventId}`)
+  }
+
   const payload = { input: inputData }
 
   // Log payload without bytes and api_keys (to avoid massive console output and security concerns)
@@ -207,7 +215,8 @@ async function invokeAwsAgentCore(
   abortSignal?: AbortSignal,
   requestType?: string,
   selectedArtifactId?: string,
-  apiKeys?: Record<string, string>
+  apiKeys?: Record<string, string>,
+  lastEventId?: string
 ): Promise<ReadableStream> {
   await initializeAwsClients()
   const runtimeArn = await getAgentCoreRuntimeArn()
@@ -264,6 +273,13 @@ async function invokeAwsAgentCore(
     console.log(`[AgentCore]    API keys provided: ${Object.keys(apiKeys).join(', ')}`)
   }
 
+  // Reattach to the still-running stream instead of starting a new turn
+  if (lastEventId) {
+    inputData.action = 'resume'
+    inputData.last_event_id = lastEventId
+    console.log(`[AgentCore]    Resuming after event: ${lastEventId}`)
+  }
+
   const payload = { input: inputData }
 
   // Log payload without bytes and api_keys (to avoid massive console output and security concerns)
@@ -408,13 +424,14 @@ export async function invokeAgentCoreRuntime(
   abortSignal?: AbortSignal,
   requestType?: string,
   selectedArtifactId?: string,
-  apiKeys?: Record<string, string>
+  apiKeys?: Record<string, string>,
+  lastEventId?: string
 ): Promise<ReadableStream> {
   try {
     if (IS_LOCAL) {
-      return await invokeLocalAgentCore(userId, sessionId, message, modelId, enabledTools, files, temperature, systemPrompt, cachingEnabled, abortSignal, requestType, selectedArtifactId, apiKeys)
+      return await invokeLocalAgentCore(userId, sessionId, message, modelId, enabledTools, files, temperature, systemPrompt, cachingEnabled, abortSignal, requestType, selectedArtifactId, apiKeys, lastEventId)
     } else {
-      return await invokeAwsAgentCore(userId, sessionId, message, modelId, enabledTools, files, temperature, systemPrompt, cachingEnabled, abortSignal, requestType, selectedArtifactId, apiKeys)
+      return await invokeAwsAgentCore(userId, sessionId, message, modelId, enabledTools, files, temperature, systemPrompt, cachingEnabled, abortSignal, requestType, selectedArtifactId, apiKeys, lastEventId)
     }
   } catch (error) {
     console.error('[AgentCore] ❌ Failed to invoke Runtime:', error)
@@ -424,6 +441,53 @@ export async function invokeAgentCoreRuntime(
   }
 }
 
+/**
+ * Stop the session's running turn (action="stop")
+ * Used by the stop button and when the browser disconnects mid-turn
+ */
+export async function stopAgentCoreRuntime(userId: string, sessionId: string): Promise<void> {
+  const payload = {
+    input: {
+      user_id: userId,
+      session_id: sessionId,
+      action: 'stop',
+      message: ''
+    }
+  }
+
+  if (IS_LOCAL) {
+    const response = await fetch(`${AGENTCORE_URL}/invocations`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload)
+    })
+
+    if (!response.ok) {
+      const errorText = await response.text()
+      throw new Error(`AgentCore returned ${response.status}: ${errorText}`)
+    }
+
+    console.log('[AgentCore] Local stop signal set:', await response.json())
+    return
+  }
+
+  await initializeAwsClients()
+  const runtimeArn = await getAgentCoreRuntimeArn()
+
+  // Same runtime session as the turn, so the stop reaches its container
+  const command = new InvokeAgentRuntimeCommand({
+    agentRuntimeArn: runtimeArn,
+    qualifier: 'DEFAULT',
+    contentType: 'application/json',
+    payload: Buffer.from(JSON.stringify(payload)),
+    runtimeUserId: userId,
+    runtimeSessionId: sessionId,
+  })
+
+  const response = await agentCoreClient.send(command)
+  console.log(`[AgentCore] Cloud stop signal set, traceId: ${response.traceId}`)
+}
+
 export async function pingAgentCoreRuntime(sessionId?: string, userId?: string): Promise<{
   success: boolean
   latencyMs: number
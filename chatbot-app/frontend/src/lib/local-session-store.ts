@@ -286,6 +286,148 @@ export function clearUserSessions(userId: string): void {
   console.log(`[LocalSessionStore] Cleared all sessions for user ${userId}`)
 }
 
+// Message files written by AgentCore's local session managers (agent/session/message_segments.py):
+// append-only JSONL segments, one record per line, the last record of a message_id wins;
+// legacy message_<N>.json files until the backend migrates them into a segment
+const SEGMENT_FILE = /^segment_\d+\.jsonl$/
+const LEGACY_MESSAGE_FILE = /^message_\d+\.json$/
+const SHA256 = /^[0-9a-f]{64}$/
+// Sidecar bytes reference inside a record (bytes of 4 KB or more are stored in blobs/<sha256>)
+const BLOB_KEY = '__blob__'
+// Uploaded file persisted as a stub (agent/session/attachments.py), bytes in blobs/<sha256>
+const ATTACHMENT_STUB = /^<attachment ((?:\w+="[^"]*" ?)+)>[^<]*<\/attachment>$/
+const ATTACHMENT_ATTRIBUTE = /(\w+)="([^"]*)"/
+
+/**
+ * Bytes stored in the session's content-addressed blobs directory, as base64 (null if absent)
+ */
+function readBlobBase64(blobsDir: string, digest: unknown): string | null {
+  if (typeof digest !== 'string' || !SHA256.test(digest)) {
+    return null
+  }
+  const blobPath = path.resolve(blobsDir, digest)
+  if (!isPathWithinBase(blobPath, blobsDir) || !fs.existsSync(blobPath) || fs.lstatSync(blobPath).isSymbolicLink()) {
+    return null
+  }
+  return fs.readFileSync(blobPath).toString('base64')
+}
+
+/**
+ * Replace sidecar blob references with the SDK's {__bytes_encoded__, data} form
+ */
+function decodeBlobReferences(value: any, blobsDir: string): any {
+  if (Array.isArray(value)) {
+    return value.map(item => decodeBlobReferences(item, blobsDir))
+  }
+  if (value && typeof value === 'object') {
+    if (BLOB_KEY in value) {
+      const data = readBlobBase64(blobsDir, value[BLOB_KEY])
+      return data === null ? value : { __bytes_encoded__: true, data }
+    }
+    return Object.fromEntries(
+      Object.entries(value).map(([key, item]) => [key, decodeBlobReferences(item, blobsDir)])
+    )
+  }
+  return value
+}
+
+function unescapeHtml(value: string): string {
+  return value
+    .replace(/&quot;/g, '"')
+    .replace(/&#x27;/g, "'")
+    .replace(/&lt;/g, '<')
+    .replace(/&gt;/g, '>')
+    .replace(/&amp;/g, '&')
+}
+
+/**
+ * Image/document block for an attachment stub whose bytes are in blobs/, else the block itself
+ */
+function resolveAttachmentStub(block: any, blobsDir: string): any {
+  const match = typeof block?.text === 'string' && Object.keys(block).length === 1
+    ? ATTACHMENT_STUB.exec(block.text)
+    : null
+  if (!match) {
+    return block
+  }
+
+  const attributes: Record<string, string> = {}
+  const attributePattern = new RegExp(ATTACHMENT_ATTRIBUTE.source, 'g')
+  let attribute: RegExpExecArray | null
+  while ((attribute = attributePattern.exec(match[1])) !== null) {
+    attributes[attribute[1]] = unescapeHtml(attribute[2])
+  }
+  const data = readBlobBase64(blobsDir, attributes.sha256)
+  if (data === null) {
+    return block
+  }
+
+  const bytes = { __bytes_encoded__: true, data }
+  if (attributes.kind === 'image') {
+    return { image: { format: attributes.format || 'png', source: { bytes } } }
+  }
+  if (attributes.kind === 'document') {
+    return { document: { format: attributes.format || 'txt', name: attributes.name || 'document', source: { bytes } } }
+  }
+  return block
+}
+
+/**
+ * Message of a stored record with its blob references and attachment stubs resolved
+ */
+function decodeStoredMessage(message: any, blobsDir: string): any {
+  const decoded = decodeBlobReferences(message, blobsDir)
+  if (!Array.isArray(decoded?.content)) {
+    return decoded
+  }
+  return { ...decoded, content: decoded.content.map((block: any) => resolveAttachmentStub(block, blobsDir)) }
+}
+
+/**
+ * Latest record per message_id: legacy message files first, then segments in order
+ */
+function readMessageRecords(messagesDir: string, baseDir: string): Map<number, any> {
+  const records = new Map<number, any>()
+  const filenames = fs.readdirSync(messagesDir)
+
+  for (const filename of filenames.filter(f => LEGACY_MESSAGE_FILE.test(f))) {
+    const filePath = path.resolve(messagesDir, filename)
+    if (!isPathWithinBase(filePath, baseDir)) {
+      continue
+    }
+    try {
+      const record = JSON.parse(fs.readFileSync(filePath, 'utf-8'))
+      const messageId = typeof record.message_id === 'number'
+        ? record.message_id
+        : parseInt(filename.slice('message_'.length), 10)
+      records.set(messageId, record)
+    } catch {
+      // Removed by a concurrent migration (the record is in a segment now) or unreadable
+    }
+  }
+
+  for (const filename of filenames.filter(f => SEGMENT_FILE.test(f)).sort()) {
+    const filePath = path.resolve(messagesDir, filename)
+    if (!isPathWithinBase(filePath, baseDir)) {
+      continue
+    }
+    const lines = fs.readFileSync(filePath, 'utf-8').split('\n')
+    lines.pop() // Empty after the last newline, or a record torn by a crash
+    for (const line of lines) {
+      try {
+        const record = JSON.parse(line)
+        if (typeof record?.message_id === 'number') {
+          records.set(record.message_id, record)
+        }
+      } catch {
+        // Blank separator after a torn record, or an unreadable record
+      }
+    }
+  }
+
+  return records
+}
+
 /**
  * Read messages from a specific agent directory
  */
@@ -301,6 +443,7 @@ function readAgentMessages(
   }
 
   const messagesDir = path.resolve(sessionDir, 'agents', `agent_${agentId}`, 'messages')
+  const blobsDir = path.resolve(sessionDir, 'blobs')
 
   // Verify path stays within base directory
   if (!messagesDir.startsWith(path.resolve(baseDir) + path.sep)) {
@@ -312,30 +455,16 @@ function readAgentMessages(
     return []
   }
 
-  const messageFiles = fs.readdirSync(messagesDir)
-    .filter(f => f.startsWith('message_') && f.endsWith('.json'))
-
-  return messageFiles.map(filename => {
-    // Validate filename format strictly
-    if (!/^message_\d+\.json$/.test(filename)) {
-      return null
-    }
-    const filePath = path.resolve(messagesDir, filename)
-
-    // Double-check path stays within base
-    if (!filePath.startsWith(path.resolve(baseDir) + path.sep)) {
-      return null
-    }
-
-    const content = fs.readFileSync(filePath, 'utf-8')
-    const messageData = JSON.parse(content)
+  const records = readMessageRecords(messagesDir, baseDir)
 
+  return Array.from(records.keys()).sort((a, b) => a - b).map(messageId => {
+    const record = records.get(messageId)
     return {
-      message: messageData.message,
-      timestamp: messageData.created_at || new Date().toISOString(),
+      message: decodeStoredMessage(record.message, blobsDir),
+      timestamp: record.created_at || new Date().toISOString(),
       source: agentId, // Track which agent created this message
     }
-  }).filter((msg): msg is NonNullable<typeof msg> => msg !== null)
+  })
 }
 
 /**
@@ -1,3 +1,15 @@
+// Tool result image streamed out-of-band (SSE_IMAGE_TRANSPORT=blob): bytes are
+// fetched from url, thumbnail is a tiny inline JPEG preview
+export interface BlobImageReference {
+  format: string
+  hash: string
+  url: string
+  size?: number
+  width?: number
+  height?: number
+  thumbnail?: string
+}
+
 export interface ToolExecution {
   id: string
   toolName: string
@@ -8,6 +20,7 @@ export interface ToolExecution {
   images?: Array<
     | { format: string; data: string }
     | { type: 'url'; url: string; thumbnail?: string }
+    | BlobImageReference
   >
   isComplete: boolean
   isCancelled?: boolean
@@ -25,6 +38,7 @@ export interface Message {
   images?: Array<
     | { format: string; data: string }
     | { type: 'url'; url: string; thumbnail?: string }
+    | BlobImageReference
   >
   documents?: Array<{
     filename: string
@@ -1,5 +1,5 @@
 // SDK-standard event types for improved type safety
-import type { ToolExecution } from '@/types/chat';
+import type { BlobImageReference, ToolExecution } from '@/types/chat';
 
 export interface ReasoningEvent {
   type: 'reasoning';
@@ -54,7 +54,7 @@ export interface ToolResultEvent {
   images?: Array<{
     format: string;
     data: string;
-  }>;
+  } | BlobImageReference>;
   metadata?: Record<string, any>;
   node_id?: string;  // Swarm mode: which agent produced the result
 }
@@ -75,7 +75,7 @@ export interface CompleteEvent {
   images?: Array<{
     format: string;
     data: string;
-  }>;
+  } | BlobImageReference>;
   documents?: Array<{
     filename: string;
     tool_type: string;
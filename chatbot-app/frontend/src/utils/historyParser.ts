@@ -30,6 +30,23 @@ export interface ParseResult {
   error?: string
 }
 
+/**
+ * Message id for one payload of an event
+ * Single-payload events keep the plain eventId (the key of existing message
+ * metadata); batched events (write-behind) get `${eventId}:${payloadIndex}`
+ */
+export function payloadMessageId(
+  event: AgentCoreEvent,
+  payloadIndex: number,
+  sessionId: string,
+  msgIndex: number
+): string {
+  if (!event.eventId) {
+    return `msg-${sessionId}-${msgIndex}`
+  }
+  return (event.payload?.length || 0) > 1 ? `${event.eventId}:${payloadIndex}` : event.eventId
+}
+
 /**
  * Parse a conversational event (message < 9000 chars)
  * AgentCore stores short messages in conversational.content.text as JSON
@@ -37,9 +54,10 @@ export interface ParseResult {
 export function parseConversationalEvent(
   event: AgentCoreEvent,
   sessionId: string,
-  msgIndex: number
+  msgIndex: number,
+  payloadIndex: number = 0
 ): ParseResult {
-  const payload = event.payload?.[0]
+  const payload = event.payload?.[payloadIndex]
 
   if (!payload?.conversational) {
     return { success: false, error: 'Not a conversational event' }
@@ -65,7 +83,7 @@ export function parseConversationalEvent(
 
   const message: ParsedMessage = {
     ...parsed.message,
-    id: event.eventId || `msg-${sessionId}-${msgIndex}`,
+    id: payloadMessageId(event, payloadIndex, sessionId, msgIndex),
     timestamp: event.eventTime || new Date().toISOString()
   }
 
@@ -79,9 +97,10 @@ export function parseConversationalEvent(
 export function parseBlobEvent(
   event: AgentCoreEvent,
   sessionId: string,
-  msgIndex: number
+  msgIndex: number,
+  payloadIndex: number = 0
 ): ParseResult {
-  const payload = event.payload?.[0]
+  const payload = event.payload?.[payloadIndex]
 
   if (!payload?.blob || typeof payload.blob !== 'string') {
     return { success: false, error: 'Not a valid blob event' }
@@ -112,7 +131,7 @@ export function parseBlobEvent(
 
   const message: ParsedMessage = {
     ...blobMessageData.message,
-    id: event.eventId || `msg-${sessionId}-${msgIndex}`,
+    id: payloadMessageId(event, payloadIndex, sessionId, msgIndex),
     timestamp: event.eventTime || new Date().toISOString()
   }
 
@@ -120,14 +139,15 @@ export function parseBlobEvent(
 }
 
 /**
- * Parse a single AgentCore event (either conversational or blob)
+ * Parse one payload of an AgentCore event (either conversational or blob)
  */
 export function parseAgentCoreEvent(
   event: AgentCoreEvent,
   sessionId: string,
-  msgIndex: number
+  msgIndex: number,
+  payloadIndex: number = 0
 ): ParseResult {
-  const payload = event.payload?.[0]
+  const payload = event.payload?.[payloadIndex]
 
   if (!payload) {
     return { success: false, error: 'No payload in event' }
@@ -135,17 +155,38 @@ export function parseAgentCoreEvent(
 
   // Try conversational first (more common)
   if (payload.conversational) {
-    return parseConversationalEvent(event, sessionId, msgIndex)
+    return parseConversationalEvent(event, sessionId, msgIndex, payloadIndex)
   }
 
   // Then try blob
   if (payload.blob && typeof payload.blob === 'string') {
-    return parseBlobEvent(event, sessionId, msgIndex)
+    return parseBlobEvent(event, sessionId, msgIndex, payloadIndex)
   }
 
   return { success: false, error: 'Event has neither conversational nor blob payload' }
 }
 
+/**
+ * Parse every payload of an AgentCore event, in order
+ * The backend's write-behind queue batches several messages into one event
+ */
+export function parseAgentCoreEventPayloads(
+  event: AgentCoreEvent,
+  sessionId: string,
+  msgIndex: number
+): ParsedMessage[] {
+  const messages: ParsedMessage[] = []
+
+  for (let payloadIndex = 0; payloadIndex < (event.payload?.length || 0); payloadIndex++) {
+    const result = parseAgentCoreEvent(event, sessionId, msgIndex + messages.length, payloadIndex)
+    if (result.success && result.message) {
+      messages.push(result.message)
+    }
+  }
+
+  return messages
+}
+
 /**
  * Parse multiple AgentCore events into messages
  * Events are expected to be in chronological order
@@ -155,14 +196,9 @@ export function parseAgentCoreEvents(
   sessionId: string
 ): ParsedMessage[] {
   const messages: ParsedMessage[] = []
-  let msgIndex = 0
 
   for (const event of events) {
-    const result = parseAgentCoreEvent(event, sessionId, msgIndex)
-    if (result.success && result.message) {
-      messages.push(result.message)
-      msgIndex++
-    }
+    messages.push(...parseAgentCoreEventPayloads(event, sessionId, messages.length))
   }
 
   return messages
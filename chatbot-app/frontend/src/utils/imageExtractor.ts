@@ -1,10 +1,36 @@
 /**
  * Image extraction utilities for AgentCore Memory blob handling
  */
+import type { BlobImageReference } from '@/types/chat'
 
 export type ImageData =
   | { format: string; data: string }
   | { type: 'url'; url: string; thumbnail?: string; title?: string; width?: number; height?: number }
+  | BlobImageReference
+
+/**
+ * Whether an image is a blob reference (bytes served by GET /blobs/{hash}, not inline)
+ */
+export function isBlobImage(image: any): image is BlobImageReference {
+  return !!image && typeof image.hash === 'string' && typeof image.url === 'string' && !('data' in image)
+}
+
+/**
+ * Source for an <img>: web URL, data URI of inline base64, or the BFF blob
+ * proxy (/api/blobs/...) for blob references. Empty when there is nothing to show.
+ */
+export function getImageSrc(image: ImageData): string {
+  if ('type' in image && image.type === 'url') {
+    return image.url || image.thumbnail || ''
+  }
+  if (isBlobImage(image)) {
+    return image.url.startsWith('/blobs/') ? `/api${image.url}` : image.url
+  }
+  if ('data' in image && image.data) {
+    return `data:image/${image.format};base64,${image.data}`
+  }
+  return ''
+}
 
 /**
  * Extract blob images from message, matched by toolUseId
@@ -11,7 +11,7 @@ import { STREAM_EVENT_TYPES } from '@/types/events'
  * SSE format: "event: type\ndata: json\n\n"
  */
 export interface SSELine {
-  type: 'event' | 'data' | 'comment' | 'retry' | 'empty'
+  type: 'event' | 'data' | 'id' | 'comment' | 'retry' | 'empty'
   value: string
 }
 
@@ -32,6 +32,10 @@ export function parseSSELine(line: string): SSELine {
     return { type: 'data', value: line.slice(5).trim() }
   }
 
+  if (line.startsWith('id:')) {
+    return { type: 'id', value: line.slice(3).trim() }
+  }
+
   if (line.startsWith('retry:')) {
     return { type: 'retry', value: line.slice(6).trim() }
   }
@@ -95,6 +99,7 @@ export function parseSSEChunk(chunk: string): ParsedSSEChunk {
           // SSE allows multiple data lines; concatenate them
           eventData += (eventData ? '\n' : '') + parsed.value
           break
+        case 'id':
         case 'comment':
         case 'retry':
         case 'empty':
@@ -116,6 +121,55 @@ export function parseSSEChunk(chunk: string): ParsedSSEChunk {
   return { events, errors }
 }
 
+/**
+ * Split a byte stream into whole SSE messages and remember the last `id:`
+ * seen, so a dropped upstream connection can be resumed from that id
+ */
+export interface SSEResumeTracker {
+  /** Add a decoded chunk; returns the complete messages it finished (may be '') */
+  push(chunk: string): string
+  /** Take the incomplete trailing message (forwarded at end of stream, dropped before a resume) */
+  flush(): string
+  /** Last `id:` value of a complete message, or null */
+  readonly lastEventId: string | null
+}
+
+export function createSSEResumeTracker(): SSEResumeTracker {
+  let pending = ''
+  let lastEventId: string | null = null
+
+  return {
+    push(chunk: string): string {
+      pending += chunk
+      const end = pending.lastIndexOf('\n\n')
+      if (end === -1) {
+        return ''
+      }
+
+      const complete = pending.slice(0, end + 2)
+      pending = pending.slice(end + 2)
+
+      for (const line of complete.split('\n')) {
+        const parsed = parseSSELine(line)
+        if (parsed.type === 'id' && parsed.value) {
+          lastEventId = parsed.value
+        }
+      }
+      return complete
+    },
+
+    flush(): string {
+      const rest = pending
+      pending = ''
+      return rest
+    },
+
+    get lastEventId(): string | null {
+      return lastEventId
+    }
+  }
+}
+
 /**
  * Validate a StreamEvent has required fields based on its type
  */
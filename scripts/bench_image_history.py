@@ -0,0 +1,140 @@
+#!/usr/bin/env python3 -u
+"""
+Image History Benchmark - screenshots sent per model call in a browser task
+
+Browser tools return a JPEG screenshot with almost every step and all of them
+stayed in the agent's messages, so every model call of a long browsing task
+re-sent every earlier screenshot. ImageHistoryPolicy
+(agent/session/image_history.py) keeps only the newest keep_last of them,
+evicting in batches and optionally downscaling the kept ones.
+
+A task of --steps browser steps is simulated the way the event loop grows the
+messages: each step appends an assistant toolUse (browser_navigate /
+browser_act / browser_extract, round robin) and a user toolResult with a
+short text and a --width x --height JPEG screenshot, then the policy runs as
+ImageHistoryHook does before the next model call. Reported per setting,
+summed over all model calls of the task:
+- images: screenshots sent
+- image MB: screenshot bytes sent (before base64)
+- image ktok: image input tokens (width * height / 750, at most 1,600 each)
+- prefix changes: calls whose earlier messages changed (prompt cache misses)
+- policy ms: total time spent in apply()
+
+Usage:
+    python bench_image_history.py                          # 30 steps
+    python bench_image_history.py --steps 60 --keep-last 3 --downscale-px 640
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, '..', 'chatbot-app', 'agentcore', 'src')
+sys.path.insert(0, SRC_DIR)
+
+TOOLS = ["browser_navigate", "browser_act", "browser_extract"]
+
+
+def screenshot(width: int, height: int, seed: int) -> bytes:
+    """JPEG of a page-like image (flat blocks plus noise, compresses like a screenshot)."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(60):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randrange(40, 400), y + rng.randrange(10, 60)], fill=color)
+    image = Image.blend(image, Image.effect_noise((width, height), 40).convert("RGB"), 0.15)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=75)
+    return buffer.getvalue()
+
+
+def image_tokens(data: bytes) -> int:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+    return min(width * height // 750, 1600)
+
+
+def sent_images(messages):
+    for message in messages:
+        for block in message["content"]:
+            for result_block in block.get("toolResult", {}).get("content", []):
+                if "image" in result_block:
+                    yield result_block["image"]["source"]["bytes"]
+
+
+def run(policy, steps: int, width: int, height: int):
+    messages = [{"role": "user", "content": [{"text": "Find the cheapest flight to Lisbon"}]}]
+    tokens_by_image = {}
+    images = image_bytes = tokens = prefix_changes = 0
+    policy_ms = 0.0
+
+    for step in range(steps):
+        tool_use_id = f"tool-{step}"
+        data = screenshot(width, height, step)
+        messages.append({"role": "assistant", "content": [
+            {"toolUse": {"toolUseId": tool_use_id, "name": TOOLS[step % len(TOOLS)], "input": {"instruction": "next"}}}
+        ]})
+        messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": tool_use_id, "status": "success", "content": [
+            {"text": f"Step {step}: page loaded"},
+            {"image": {"format": "jpeg", "source": {"bytes": data}}},
+        ]}}]})
+
+        before = list(messages[:-2])
+        start = time.perf_counter()
+        if policy is not None:
+            policy.apply(messages)
+        policy_ms += (time.perf_counter() - start) * 1000
+        if any(a is not b for a, b in zip(before, messages)):
+            prefix_changes += 1
+
+        for sent in sent_images(messages):
+            if id(sent) not in tokens_by_image:
+                tokens_by_image[id(sent)] = (sent, image_tokens(sent))
+            images += 1
+            image_bytes += len(sent)
+            tokens += tokens_by_image[id(sent)][1]
+
+    return images, image_bytes / 1e6, tokens / 1000, prefix_changes, policy_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image history policy benchmark")
+    parser.add_argument("--steps", type=int, default=30, help="Browser steps (model calls)")
+    parser.add_argument("--keep-last", type=int, default=5)
+    parser.add_argument("--evict-batch", type=int, default=5)
+    parser.add_argument("--downscale-px", type=int, default=640, help="For the downscaling setting")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    from agent.session.image_history import ImageHistoryPolicy
+
+    settings = [
+        ("all images", None),
+        (f"keep {args.keep_last}", ImageHistoryPolicy(keep_last=args.keep_last, evict_batch=args.evict_batch)),
+        (f"keep {args.keep_last}, {args.downscale_px}px", ImageHistoryPolicy(
+            keep_last=args.keep_last, evict_batch=args.evict_batch, downscale_px=args.downscale_px
+        )),
+    ]
+
+    print(f"{args.steps} browser steps, {args.width}x{args.height} JPEG screenshots, evict batch {args.evict_batch}\n")
+    header = f"{'setting':<20} {'images':>7} {'image MB':>9} {'image ktok':>11} {'prefix changes':>15} {'policy ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, policy in settings:
+        images, megabytes, ktokens, prefix_changes, policy_ms = run(policy, args.steps, args.width, args.height)
+        print(f"{name:<20} {images:>7} {megabytes:>9.1f} {ktokens:>11.1f} {prefix_changes:>15} {policy_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3 -u
+"""
+Local Session Benchmark - flush and load cost of long local sessions
+
+LocalSessionBuffer wrote one pretty-printed message_<N>.json per message and
+listed the messages directory for every buffered message to find the next
+index; UnifiedFileSessionManager.list_messages opened and parsed every file.
+Messages are now appended to JSONL segments (agent/session/message_segments.py)
+with an in-memory id counter and image bytes in sidecar blobs, and indexed in
+a per-session manifest (agent/session/message_manifest.py).
+
+A session of --messages messages is written through LocalSessionBuffer
+(batch size 5, as in local text mode); every --image-every-th user message
+carries a --image-kb JPEG-sized payload. Reported per implementation:
+- flush ms: total time spent in flush() over the session
+- last flush ms: the final flush (the O(n) listdir made it grow with history)
+- load ms: one list_messages() of the full history
+- tail ms: count + the last 20 messages (count_messages() and an offset
+  where available, otherwise the full list sliced, as callers did)
+- disk KiB: size of the session directory
+
+Usage:
+    python bench_local_sessions.py                          # current tree only
+    python bench_local_sessions.py --baseline HEAD~1        # compare with a git revision
+    python bench_local_sessions.py --messages 200 1000 3000 --image-every 10
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, '..', 'chatbot-app', 'agentcore', 'src')
+sys.path.insert(0, SRC_DIR)
+
+SESSION_DIR = "chatbot-app/agentcore/src/agent/session"
+
+
+def load_baseline_modules(revision: str):
+    """(LocalSessionBuffer, UnifiedFileSessionManager) from a git revision."""
+    importlib.import_module("agent.session")  # Parent package for the modules' imports
+
+    repo_root = os.path.join(SCRIPTS_DIR, '..')
+    classes = []
+    for module_name, class_name in (
+        ("local_session_buffer", "LocalSessionBuffer"),
+        ("unified_file_session_manager", "UnifiedFileSessionManager"),
+    ):
+        path = f"{SESSION_DIR}/{module_name}.py"
+        source = subprocess.check_output(["git", "show", f"{revision}:{path}"], cwd=repo_root, text=True)
+        spec = importlib.util.spec_from_loader(f"agent.session._baseline_{module_name}", loader=None)
+        module = importlib.util.module_from_spec(spec)
+        module.__package__ = "agent.session"
+        exec(compile(source, f"{revision}:{path}", "exec"), module.__dict__)
+        classes.append(getattr(module, class_name))
+    return tuple(classes)
+
+
+def make_message(n: int, image_every: int, image: bytes):
+    if n % 2:
+        return {"role": "assistant", "content": [{"text": f"Answer {n}: " + "lorem ipsum dolor sit amet " * 40}]}
+    content = [{"text": f"Question {n}: what about this?"}]
+    if image_every and (n // 2) % image_every == 0:
+        content.append({"image": {"format": "jpeg", "source": {"bytes": image}}})
+    return {"role": "user", "content": content}
+
+
+def dir_size_kib(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / 1024
+
+
+def run(buffer_cls, manager_cls, messages: int, image_every: int, image: bytes):
+    storage_dir = tempfile.mkdtemp(prefix="bench_sessions_")
+    try:
+        manager = manager_cls(session_id="bench", storage_dir=storage_dir)
+        buffer = buffer_cls(base_manager=manager, session_id="bench", batch_size=10**9)
+        agent = object()
+
+        flush_ms, last_flush_ms = 0.0, 0.0
+        for n in range(messages):
+            buffer.append_message(make_message(n, image_every, image), agent)
+            if len(buffer.pending_messages) == 5 or n == messages - 1:
+                start = time.perf_counter()
+                buffer.flush()
+                last_flush_ms = (time.perf_counter() - start) * 1000
+                flush_ms += last_flush_ms
+
+        start = time.perf_counter()
+        loaded = manager.list_messages("bench", "default")
+        load_ms = (time.perf_counter() - start) * 1000
+        assert len(loaded) == messages, f"loaded {len(loaded)} of {messages}"
+
+        start = time.perf_counter()
+        if hasattr(manager, "count_messages"):
+            total = manager.count_messages("bench")
+            tail = manager.list_messages("bench", "default", offset=max(0, total - 20))
+        else:
+            everything = manager.list_messages("bench", "default")
+            total, tail = len(everything), everything[-20:]
+        tail_ms = (time.perf_counter() - start) * 1000
+        assert total == messages and len(tail) == min(20, messages)
+
+        return flush_ms, last_flush_ms, load_ms, tail_ms, dir_size_kib(storage_dir)
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local session flush/load benchmark")
+    parser.add_argument("--messages", type=int, nargs="+", default=[200, 1000, 3000], help="Messages per session")
+    parser.add_argument("--image-every", type=int, default=10, help="Every Nth user message has an image (0: none)")
+    parser.add_argument("--image-kb", type=int, default=150, help="Image size")
+    parser.add_argument("--baseline", help="Git revision to compare against")
+    args = parser.parse_args()
+
+    from agent.session.local_session_buffer import LocalSessionBuffer
+    from agent.session.unified_file_session_manager import UnifiedFileSessionManager
+
+    implementations = [("segments", LocalSessionBuffer, UnifiedFileSessionManager)]
+    if args.baseline:
+        implementations.insert(0, (args.baseline, *load_baseline_modules(args.baseline)))
+
+    image = os.urandom(args.image_kb * 1024)
+    print(f"image every {args.image_every} user messages ({args.image_kb} KiB), flush every 5 messages\n")
+    header = f"{'messages':>8} | {'impl':<10} {'flush ms':>9} {'last flush ms':>13} {'load ms':>8} {'tail ms':>8} {'disk KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for messages in args.messages:
+        for i, (name, buffer_cls, manager_cls) in enumerate(implementations):
+            flush_ms, last_flush_ms, load_ms, tail_ms, size_kib = run(buffer_cls, manager_cls, messages, args.image_every, image)
+            label = f"{messages:>8}" if i == 0 else " " * 8
+            print(f"{label} | {name[:10]:<10} {flush_ms:>9.1f} {last_flush_ms:>13.2f} {load_ms:>8.1f} {tail_ms:>8.2f} {size_kib:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
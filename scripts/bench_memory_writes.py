@@ -0,0 +1,145 @@
+#!/usr/bin/env python3 -u
+"""
+Memory Write Benchmark - inline create_event vs. write-behind batches
+
+CompactingSessionManager persisted every MessageAddedEvent inline: one
+create_event for the message and one for the agent state sync, each blocking
+the agent loop. With write-behind (MEMORY_WRITE_BEHIND) the writes are queued
+per session and persisted in ordered batches, flushed at turn end.
+
+AgentCore Memory is simulated in-process with a fixed create_event latency.
+A turn is a user message, --tool-calls tool round-trips and a final answer;
+every message is followed by a state sync, as the session hooks do. Between
+messages the agent "thinks" for --model-ms (streaming / tool execution), which
+is when queued writes go out.
+
+Reported per mode:
+- api calls / api ms: create_event calls made and their total latency
+- blocking ms: time the agent loop spent in session writes (incl. turn-end flush)
+
+Usage:
+    python bench_memory_writes.py                         # default workload
+    python bench_memory_writes.py --tool-calls 5 10 20    # tool calls per turn
+    python bench_memory_writes.py --latency-ms 60         # create_event latency
+    python bench_memory_writes.py --model-ms 0            # back-to-back messages
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'chatbot-app', 'agentcore', 'src'))
+
+
+class SimulatedMemory:
+    """create_event with a fixed latency (thread-safe, like the service)."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def create_event(self, **params):
+        time.sleep(self.latency_s)
+        with self._lock:
+            self.events += 1
+            return {"event": {"eventId": f"e{self.events:06d}"}}
+
+
+def make_manager(memory: SimulatedMemory, write_behind: bool):
+    from bedrock_agentcore.memory.integrations.strands.bedrock_converter import AgentCoreMemoryConverter
+    from bedrock_agentcore.memory.integrations.strands.config import PersistenceMode
+
+    from agent.session.compacting_session_manager import CompactingSessionManager
+
+    with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__', return_value=None):
+        manager = CompactingSessionManager(
+            agentcore_memory_config=MagicMock(), region_name="us-west-2", write_behind=write_behind
+        )
+    manager.config = MagicMock(
+        memory_id="mem", actor_id="bench-user", session_id="bench-session", batch_size=1,
+        default_metadata=None, metadata_provider=None,
+    )
+    manager.session_id = "bench-session"
+    manager.persistence_mode = PersistenceMode.FULL
+    manager.converter = AgentCoreMemoryConverter
+    manager._timestamp_lock = threading.Lock()
+    manager._last_timestamp = None
+    manager._latest_agent_message = {}
+    manager.memory_client = MagicMock()
+    manager.memory_client.create_event.side_effect = memory.create_event
+    manager.memory_client.gmdp_client.create_event.side_effect = memory.create_event
+    return manager
+
+
+def run_turn(manager, tool_calls: int, model_s: float) -> float:
+    """Wall-clock ms of one simulated turn."""
+    from strands.types.session import SessionAgent
+
+    agent = MagicMock(agent_id="default")
+    messages = [{"role": "user", "content": [{"text": "Compare the three latest reports"}]}]
+    for n in range(tool_calls):
+        messages.append({"role": "assistant", "content": [
+            {"text": f"Looking up report {n}"},
+            {"toolUse": {"toolUseId": f"tool_{n}", "name": "search", "input": {"q": f"report {n}"}}},
+        ]})
+        messages.append({"role": "user", "content": [
+            {"toolResult": {"toolUseId": f"tool_{n}", "status": "success", "content": [{"text": "result " * 300}]}},
+        ]})
+    messages.append({"role": "assistant", "content": [{"text": "Summary " * 200}]})
+
+    # sync_agent's read/compare is not what is measured: write the state directly
+    def sync(step):
+        start = time.time()
+        manager.create_agent("bench-session", SessionAgent(agent_id="default", state={"step": step}, conversation_manager_state={}))
+        manager._write_blocking_ms += (time.time() - start) * 1000
+        if manager._write_queue is None:
+            manager._api_call_count += 1
+            manager._api_call_total_ms += (time.time() - start) * 1000
+
+    start = time.perf_counter()
+    for step, message in enumerate(messages):
+        manager._append_message_tracked(message, agent)
+        sync(step)
+        time.sleep(model_s)
+    manager.flush()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory write benchmark (inline vs. write-behind)")
+    parser.add_argument("--tool-calls", type=int, nargs="+", default=[1, 5, 10, 20], help="Tool calls per turn")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Simulated create_event latency")
+    parser.add_argument("--model-ms", type=float, default=20.0, help="Agent work between messages")
+    args = parser.parse_args()
+
+    from agent.session import compacting_session_manager
+    from agent.session.history_cache import SessionHistoryCache
+
+    disabled = SessionHistoryCache(max_sessions=0)
+    compacting_session_manager.get_session_history_cache = lambda: disabled
+
+    print(f"create_event latency: {args.latency_ms:.0f} ms  agent work between messages: {args.model_ms:.0f} ms\n")
+    print(f"{'tools':>5} | {'mode':<12} {'api calls':>9} {'api ms':>8} {'blocking ms':>11} {'turn ms':>8}")
+    print("-" * 62)
+
+    for tool_calls in args.tool_calls:
+        for write_behind in (False, True):
+            memory = SimulatedMemory(args.latency_ms / 1000)
+            manager = make_manager(memory, write_behind)
+            turn_ms = run_turn(manager, tool_calls, args.model_ms / 1000)
+            metrics = manager.get_api_metrics()
+
+            mode = "write-behind" if write_behind else "inline"
+            label = f"{tool_calls:>5}" if not write_behind else " " * 5
+            print(
+                f"{label} | {mode:<12} {metrics['api_call_count']:>9} {metrics['api_call_total_ms']:>8.0f} "
+                f"{metrics['blocking_ms']:>11.0f} {turn_ms:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3 -u
+"""
+Session Loading Benchmark - full history vs. post-checkpoint tail
+
+CompactingSessionManager.initialize used to load every event of a session and
+slice off the messages before the compaction checkpoint in memory. With the
+checkpoint anchored to its Memory event (CompactionState.checkpointEventId),
+a cold container pages list_events newest-first and stops at the checkpoint.
+
+AgentCore Memory is simulated in-process (newest-first pages of 100 events,
+a fixed latency per page); the history cache is disabled so every load is a
+cold one. For each history length the checkpoint leaves --tail messages.
+
+Usage:
+    python bench_session_loading.py                          # default workload
+    python bench_session_loading.py --lengths 100 500 2000   # history lengths (messages)
+    python bench_session_loading.py --tail 20                # messages after the checkpoint
+    python bench_session_loading.py --page-latency-ms 0      # parsing cost only
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'chatbot-app', 'agentcore', 'src'))
+
+
+class SimulatedMemory:
+    """Events of one session; list_events pages newest first with a fixed latency."""
+
+    def __init__(self, page_latency_s: float):
+        self.page_latency_s = page_latency_s
+        self.events = []
+        self.pages = 0
+        self.events_served = 0
+
+    def add(self, payload: dict) -> str:
+        event_id = f"e{len(self.events) + 1:06d}"
+        self.events.append({"eventId": event_id, "payload": [{"blob": json.dumps(payload)}]})
+        return event_id
+
+    def list_events(self, memoryId, actorId, sessionId, maxResults, includePayloads, nextToken=None):
+        time.sleep(self.page_latency_s)
+        start = int(nextToken or 0)
+        newest_first = self.events[::-1]
+        page = newest_first[start:start + maxResults]
+        self.pages += 1
+        self.events_served += len(page)
+        response = {"events": page}
+        if start + maxResults < len(self.events):
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+
+def build_session(length: int, page_latency_s: float) -> SimulatedMemory:
+    """Alternating user / assistant turns; every 4th assistant message carries a tool result."""
+    from strands.types.session import SessionMessage
+
+    memory = SimulatedMemory(page_latency_s)
+    for n in range(length):
+        if n % 2 == 0:
+            message = {"role": "user", "content": [{"text": f"Question {n}: " + "lorem ipsum " * 40}]}
+        elif n % 8 == 7:
+            message = {"role": "assistant", "content": [{"toolResult": {
+                "toolUseId": f"tool_{n}", "status": "success", "content": [{"text": "result " * 700}],
+            }}]}
+        else:
+            message = {"role": "assistant", "content": [{"text": f"Answer {n}: " + "dolor sit amet " * 80}]}
+        memory.add({"_payload_type": "message", **SessionMessage.from_message(message, n).to_dict()})
+        if n % 2:
+            memory.add({"_payload_type": "agent_state", "_agent_id": "default", "agent_id": "default", "state": {}})
+    return memory
+
+
+def checkpoint_for(memory: SimulatedMemory, length: int, tail: int):
+    """(checkpoint index, event id of the checkpoint message) leaving `tail` messages."""
+    checkpoint = max(0, length - tail)
+    checkpoint -= checkpoint % 2  # Cutoffs are at user messages
+    marker = f'"Question {checkpoint}: '
+    for event in memory.events:
+        if marker in event["payload"][0]["blob"]:
+            return checkpoint, event["eventId"]
+    return checkpoint, None
+
+
+def make_manager(memory: SimulatedMemory, state):
+    from agent.session.compacting_session_manager import CompactingSessionManager
+
+    with patch('agent.session.compacting_session_manager.AgentCoreMemorySessionManager.__init__', return_value=None):
+        manager = CompactingSessionManager(agentcore_memory_config=MagicMock(), region_name="us-west-2")
+    manager.config = MagicMock(memory_id="mem", actor_id="bench-user", session_id="bench-session")
+    manager.session_id = "bench-session"
+    manager._latest_agent_message = {}
+    manager.memory_client = MagicMock()
+    manager.memory_client.gmdp_client.list_events.side_effect = memory.list_events
+    manager.session_repository = MagicMock()
+    manager.session_repository.read_agent.return_value = MagicMock(state={}, conversation_manager_state={})
+    manager.load_compaction_state = MagicMock(return_value=state)
+    return manager
+
+
+def make_agent():
+    agent = MagicMock(agent_id="default")
+    agent.conversation_manager.restore_from_session.return_value = []
+    agent.conversation_manager.removed_message_count = 0
+    return agent
+
+
+def run_load(memory: SimulatedMemory, state):
+    """(ms, peak KiB, pages, events, messages loaded) of one cold initialize()."""
+    memory.pages = memory.events_served = 0
+    manager = make_manager(memory, state)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    manager.initialize(make_agent())
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, peak / 1024, memory.pages, memory.events_served, manager.last_init_info["loaded_messages"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session loading benchmark (full vs. checkpoint tail)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 100, 250, 500, 1000], help="History lengths (messages)")
+    parser.add_argument("--tail", type=int, default=40, help="Messages after the checkpoint")
+    parser.add_argument("--page-latency-ms", type=float, default=40.0, help="Simulated list_events latency per page")
+    args = parser.parse_args()
+
+    from agent.session import compacting_session_manager
+    from agent.session.compacting_session_manager import CompactionState
+    from agent.session.history_cache import SessionHistoryCache
+
+    # Cold container: no cached history
+    disabled = SessionHistoryCache(max_sessions=0)
+    compacting_session_manager.get_session_history_cache = lambda: disabled
+
+    print(f"tail: {args.tail} messages  list_events latency: {args.page_latency_ms:.0f} ms/page\n")
+    print(f"{'messages':>8} | {'mode':<5} {'ms':>8} {'peak KiB':>9} {'pages':>6} {'events':>7} {'loaded':>7}")
+    print("-" * 60)
+
+    for length in args.lengths:
+        memory = build_session(length, args.page_latency_ms / 1000)
+        checkpoint, anchor = checkpoint_for(memory, length, args.tail)
+
+        results = [
+            ("full", CompactionState(checkpoint=checkpoint)),
+            ("tail", CompactionState(checkpoint=checkpoint, checkpointEventId=anchor)),
+        ]
+        for mode, state in results:
+            ms, peak_kib, pages, events, loaded = run_load(memory, state)
+            label = f"{length:>8}" if mode == "full" else " " * 8
+            print(f"{label} | {mode:<5} {ms:>8.1f} {peak_kib:>9.0f} {pages:>6} {events:>7} {loaded:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3 -u
+"""
+SSE Serializer Micro-benchmark
+
+Compares per-event CPU cost of the previous SSE formatting
+(json.dumps into an f-string, then str -> bytes in StreamingResponse; Pydantic
+events via model_dump() first) against streaming.sse (bytes frames, orjson
+when installed, byte templates, direct Pydantic serialization).
+
+All streams of a container share one event loop, so per-event CPU cost
+multiplies with the number of concurrent streams; the summary shows the
+serialization time of one turn across N streams.
+
+Usage:
+    python bench_sse_serializer.py                   # default workload
+    python bench_sse_serializer.py --events 200000   # more iterations
+    python bench_sse_serializer.py --streams 200     # concurrency for the summary
+    python bench_sse_serializer.py --stdlib          # force the stdlib json backend
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'chatbot-app', 'agentcore', 'src'))
+
+
+def legacy_format(event_data: dict) -> bytes:
+    """Previous formatter + the str->bytes encode Starlette did for every chunk."""
+    return f"data: {json.dumps(event_data)}\n\n".encode("utf-8")
+
+
+def legacy_format_model(model) -> bytes:
+    return legacy_format(model.model_dump())
+
+
+def bench(fn, args_list, iterations: int) -> float:
+    """Nanoseconds per call."""
+    n = len(args_list)
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        fn(*args_list[i % n])
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE serializer micro-benchmark")
+    parser.add_argument("--events", type=int, default=100_000, help="Iterations per case")
+    parser.add_argument("--streams", type=int, default=100, help="Concurrent streams for the summary")
+    parser.add_argument("--turn-events", type=int, default=1_500, help="SSE events per turn for the summary")
+    parser.add_argument("--stdlib", action="store_true", help="Force the stdlib json backend")
+    args = parser.parse_args()
+
+    from streaming import sse
+    if args.stdlib:
+        sse.orjson = None
+        sse.JSON_BACKEND = "json"
+
+    from models.swarm_schemas import SwarmNodeStartEvent
+    from models.composer_schemas import WritingProgressEvent, WritingTaskStatus
+
+    deltas = [(t,) for t in ["Hello", " world", ", this", " is a", " streamed", " answer ", "with ünïcode ✓", "\n\n- item"]]
+    tool_use = [({
+        "type": "tool_use",
+        "toolUseId": "tooluse_abc123",
+        "name": "web_search",
+        "input": {"query": "latest AWS re:Invent announcements", "max_results": 5},
+    },)]
+    swarm_models = [(SwarmNodeStartEvent(node_id="web_researcher", node_description="Searches the web"),)]
+    composer_models = [(WritingProgressEvent(task=3, task_name="Body Writing", status=WritingTaskStatus.IN_PROGRESS, details="Section 2/5"),)]
+
+    cases = [
+        ("response delta", lambda text: legacy_format({"type": "response", "text": text, "step": "answering"}), sse.response_frame, deltas),
+        ("reasoning delta", lambda text: legacy_format({"type": "reasoning", "text": text, "step": "thinking"}), sse.reasoning_frame, deltas),
+        ("tool_use", legacy_format, sse.encode_event, tool_use),
+        ("swarm node_start", legacy_format_model, sse.encode_model, swarm_models),
+        ("composer progress", legacy_format_model, sse.encode_model, composer_models),
+    ]
+
+    print(f"JSON backend: {sse.JSON_BACKEND}  iterations/case: {args.events:,}\n")
+    print(f"{'event':<20} {'legacy ns':>10} {'bytes ns':>10} {'speedup':>8}")
+    print("-" * 52)
+
+    delta_costs = None
+    for name, legacy_fn, new_fn, case_args in cases:
+        legacy_ns = bench(legacy_fn, case_args, args.events)
+        new_ns = bench(new_fn, case_args, args.events)
+        print(f"{name:<20} {legacy_ns:>10.0f} {new_ns:>10.0f} {legacy_ns / new_ns:>7.2f}x")
+        if delta_costs is None:
+            delta_costs = (legacy_ns, new_ns)
+
+    legacy_ns, new_ns = delta_costs
+    total = args.turn_events * args.streams
+    print(f"\n{args.streams} concurrent streams x {args.turn_events:,} response events:")
+    print(f"  legacy: {legacy_ns * total / 1e6:8.1f} ms event-loop CPU")
+    print(f"  bytes:  {new_ns * total / 1e6:8.1f} ms event-loop CPU")
+
+
+if __name__ == "__main__":
+    main()
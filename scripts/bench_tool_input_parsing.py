@@ -0,0 +1,70 @@
+#!/usr/bin/env python3 -u
+"""
+Streamed Tool Input Parsing Benchmark
+
+Compares the CPU cost of detecting when a streamed tool input is complete:
+the previous approach (json.loads on the whole accumulated string for every
+`current_tool_use` delta, O(n^2)) against JsonCompletenessTracker (scan only
+the new suffix, parse once when the top-level object closes).
+
+Usage:
+    python bench_tool_input_parsing.py                  # 20KB input, 20-byte deltas
+    python bench_tool_input_parsing.py --size 100000    # larger input
+    python bench_tool_input_parsing.py --delta 5        # smaller deltas
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'chatbot-app', 'agentcore', 'src'))
+
+
+def legacy_detect(accumulated_inputs) -> int:
+    """Previous behaviour: try a full parse per delta."""
+    completed = 0
+    for text in accumulated_inputs:
+        try:
+            json.loads(text)
+            completed += 1
+        except json.JSONDecodeError:
+            pass
+    return completed
+
+
+def tracker_detect(accumulated_inputs) -> int:
+    from streaming.partial_json import JsonCompletenessTracker
+
+    tracker = JsonCompletenessTracker()
+    return sum(1 for text in accumulated_inputs if tracker.update(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamed tool input parsing benchmark")
+    parser.add_argument("--size", type=int, default=20_000, help="Approximate tool input size in bytes")
+    parser.add_argument("--delta", type=int, default=20, help="Characters per streamed delta")
+    args = parser.parse_args()
+
+    line = "    doc.add_paragraph(f\"Row {i}: {{value}}\", style='List Bullet')  # \"quoted\" [x]\n"
+    code = line * max(1, args.size // len(line))
+    text = json.dumps({"code": code, "filename": "report.docx"})
+    accumulated = [text[:i] for i in range(args.delta, len(text) + args.delta, args.delta)]
+
+    print(f"Input: {len(text):,} bytes in {len(accumulated):,} deltas of {args.delta} chars\n")
+    print(f"{'approach':<12} {'total ms':>10} {'completions':>12}")
+    print("-" * 36)
+    results = {}
+    for name, fn in (("legacy", legacy_detect), ("tracker", tracker_detect)):
+        start = time.perf_counter()
+        completed = fn(accumulated)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        results[name] = elapsed_ms
+        print(f"{name:<12} {elapsed_ms:>10.2f} {completed:>12}")
+
+    print(f"\nSpeedup: {results['legacy'] / results['tracker']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3 -u
+"""
+Tool Result Formatting Benchmark
+
+Measures per-result CPU time and peak memory of
+StreamEventFormatter.create_tool_result_event over tool results shaped like
+the ones recorded from Gateway (Lambda-wrapped), A2A, MCP and local tools:
+large search results, base64 browser screenshots, Bedrock image blocks.
+
+With --baseline, the formatter from another git revision is loaded and
+measured side by side (e.g. the revision before the single-parse pipeline).
+
+Usage:
+    python bench_tool_result_formatting.py                        # current formatter only
+    python bench_tool_result_formatting.py --baseline HEAD~1      # compare with a git revision
+    python bench_tool_result_formatting.py --iterations 200
+"""
+
+import argparse
+import base64
+import contextlib
+import copy
+import importlib.util
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'chatbot-app', 'agentcore', 'src')
+sys.path.insert(0, SRC_DIR)
+
+FORMATTER_PATH = "chatbot-app/agentcore/src/streaming/event_formatter.py"
+
+
+def load_baseline_formatter(revision: str):
+    """Load StreamEventFormatter from a git revision as streaming._baseline_event_formatter."""
+    importlib.import_module("streaming")  # Parent package for the relative imports
+
+    repo_root = os.path.join(os.path.dirname(__file__), '..')
+    source = subprocess.check_output(["git", "show", f"{revision}:{FORMATTER_PATH}"], cwd=repo_root, text=True)
+    spec = importlib.util.spec_from_loader("streaming._baseline_event_formatter", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "streaming"
+    exec(compile(source, f"{revision}:{FORMATTER_PATH}", "exec"), module.__dict__)
+    return module.StreamEventFormatter
+
+
+def build_results():
+    """Tool results modelled on recorded payloads (sizes match typical traffic)."""
+    search_hits = [
+        {
+            "title": f"Result {i}: AWS re:Invent announcement roundup",
+            "url": f"https://example.com/articles/{i}",
+            "content": "Amazon Bedrock AgentCore adds memory, gateway and browser tools. " * 20,
+            "score": 0.9 - i / 100,
+        }
+        for i in range(40)
+    ]
+    screenshot_b64 = base64.b64encode(os.urandom(600_000)).decode()
+    png_bytes = os.urandom(250_000)
+
+    return {
+        "gateway search (Lambda)": {
+            "toolUseId": "tooluse_gw",
+            "status": "success",
+            "content": [{"text": json.dumps({
+                "statusCode": 200,
+                "body": json.dumps({"content": [{"text": json.dumps({"results": search_hits})}]}),
+            })}],
+        },
+        "google search + images": {
+            "toolUseId": "tooluse_google",
+            "status": "success",
+            "content": [{"text": json.dumps({
+                "results": search_hits[:20],
+                "images": [{"link": f"https://img.example.com/{i}.jpg", "thumbnail": f"https://img.example.com/t{i}.jpg",
+                            "title": f"Image {i}", "width": 800, "height": 600} for i in range(10)],
+            })}],
+        },
+        "A2A browser (screenshot)": {
+            "toolUseId": "tooluse_a2a",
+            "status": "success",
+            "content": [{"text": json.dumps({
+                "status": "success",
+                "url": "https://example.com/checkout",
+                "screenshot": {"format": "png", "data": screenshot_b64},
+                "metadata": {"browserSessionId": "arn:aws:bedrock-agentcore:us-west-2:123:browser-session/abc"},
+                "steps": [f"Step {i}: clicked element #{i}" for i in range(30)],
+            })}],
+        },
+        "MCP wrapped text+image": {
+            "toolUseId": "tooluse_mcp",
+            "status": "success",
+            "content": [{"text": json.dumps({
+                "status": "success",
+                "content": [{"text": "Rendered chart for Q3 revenue"},
+                            {"image": {"format": "png", "source": {"data": screenshot_b64[:200_000]}}}],
+            })}],
+        },
+        "local diagram (bytes)": {
+            "toolUseId": "tooluse_diagram",
+            "status": "success",
+            "content": [{"text": "Diagram generated"}, {"image": {"format": "png", "source": {"bytes": png_bytes}}}],
+        },
+    }
+
+
+def measure(formatter, tool_result, iterations: int):
+    """(mean ms per result, peak KiB of one call)."""
+    inputs = [copy.deepcopy(tool_result) for _ in range(iterations + 1)]
+
+    # Older formatters print() on the hot path; keep the table readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        formatter.create_tool_result_event(inputs[-1])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            formatter.create_tool_result_event(inputs[i])
+        elapsed = time.perf_counter() - start
+    return elapsed * 1000 / iterations, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool result formatting benchmark")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per tool result")
+    parser.add_argument("--baseline", help="Git revision of the formatter to compare against")
+    args = parser.parse_args()
+
+    # INFO logging on, as in the container
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    from streaming.event_formatter import StreamEventFormatter
+
+    formatters = [("current", StreamEventFormatter)]
+    if args.baseline:
+        formatters.insert(0, (args.baseline, load_baseline_formatter(args.baseline)))
+
+    results = build_results()
+    header = f"{'tool result':<26}" + "".join(f" {name + ' ms':>14} {name + ' peak KiB':>18}" for name, _ in formatters)
+    print(header)
+    print("-" * len(header))
+    for label, tool_result in results.items():
+        row = f"{label:<26}"
+        for _, formatter in formatters:
+            ms, peak_kib = measure(formatter, tool_result, args.iterations)
+            row += f" {ms:>14.3f} {peak_kib:>18.0f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
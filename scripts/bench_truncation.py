@@ -0,0 +1,172 @@
+#!/usr/bin/env python3 -u
+"""
+Truncation Benchmark - Stage 1 compaction cost per turn
+
+CompactingSessionManager.initialize truncates old tool contents on every
+turn. It used to deep-copy the whole history and json.dumps every tool input
+and JSON result each time; the copy-on-write engine (agent/session/truncation.py)
+copies only rewritten blocks and caches each message's rewrite, so a turn
+only pays for the messages it has not seen yet.
+
+Sessions are built from the test_compaction.py scenarios: each user message
+of the scenario triggers --tools-per-turn tool calls of the scenario's tools
+(ddg_web_search returns the recorded web search fixtures, gateway tools
+return JSON) and a final answer. For every turn the history is truncated the
+way initialize does it (recent turns protected), and the time and peak
+memory of that call are reported.
+
+With --baseline, _truncate_tool_contents from another git revision is
+measured side by side (e.g. the revision before copy-on-write truncation).
+
+Usage:
+    python bench_truncation.py                           # travel scenario, 32 turns
+    python bench_truncation.py --scenario finance
+    python bench_truncation.py --baseline HEAD~1         # compare with a git revision
+    python bench_truncation.py --tools-per-turn 5 --max-length 500
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, '..', 'chatbot-app', 'agentcore', 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+MANAGER_PATH = "chatbot-app/agentcore/src/agent/session/compacting_session_manager.py"
+
+
+def load_scenario(name: str):
+    """(user messages, tool names) of a test_compaction.py scenario."""
+    import test_compaction
+
+    if name == "finance":
+        return test_compaction.FINANCE_ANALYSIS_MESSAGES, test_compaction.FINANCE_TOOLS
+    return test_compaction.TRAVEL_PLANNING_MESSAGES, test_compaction.TRAVEL_TOOLS
+
+
+def load_search_fixtures():
+    with open(os.path.join(SCRIPTS_DIR, "fixtures", "web_search_fixtures_large.json")) as f:
+        return list(json.load(f).values())
+
+
+def build_history(user_messages, tools, tools_per_turn: int):
+    """Messages of each turn: user question, tool round-trips, final answer."""
+    search_results = load_search_fixtures()
+    turns = []
+    for turn, question in enumerate(user_messages):
+        messages = [{"role": "user", "content": [{"text": question}]}]
+        for call in range(tools_per_turn):
+            tool = tools[(turn + call) % len(tools)]
+            tool_use_id = f"tooluse_{turn}_{call}"
+            if tool == "ddg_web_search":
+                result_block = {"text": json.dumps(search_results[(turn + call) % len(search_results)])}
+            else:
+                result_block = {"json": {
+                    "tool": tool,
+                    "query": question,
+                    "items": [{"id": i, "name": f"{tool} item {i}", "details": "detail " * 30} for i in range(15)],
+                }}
+            messages.append({"role": "assistant", "content": [
+                {"text": f"Calling {tool}"},
+                {"toolUse": {"toolUseId": tool_use_id, "name": tool, "input": {"query": question, "context": question * 8}}},
+            ]})
+            messages.append({"role": "user", "content": [
+                {"toolResult": {"toolUseId": tool_use_id, "status": "success", "content": [result_block]}},
+            ]})
+        messages.append({"role": "assistant", "content": [{"text": "Here is what I found. " * 40}]})
+        turns.append(messages)
+    return turns
+
+
+def make_manager(manager_cls, max_length: int):
+    with patch.object(manager_cls.__mro__[1], '__init__', return_value=None):
+        manager = manager_cls(agentcore_memory_config=MagicMock(), region_name="us-west-2", max_tool_content_length=max_length)
+    manager.config = MagicMock(actor_id="bench-user")
+    manager.session_id = "bench-session"
+    return manager
+
+
+def load_baseline_manager(revision: str):
+    """Load CompactingSessionManager from a git revision as agent.session._baseline_manager."""
+    importlib.import_module("agent.session")  # Parent package for the module's imports
+
+    repo_root = os.path.join(SCRIPTS_DIR, '..')
+    source = subprocess.check_output(["git", "show", f"{revision}:{MANAGER_PATH}"], cwd=repo_root, text=True)
+    spec = importlib.util.spec_from_loader("agent.session._baseline_manager", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "agent.session"
+    exec(compile(source, f"{revision}:{MANAGER_PATH}", "exec"), module.__dict__)
+    return module.CompactingSessionManager
+
+
+def truncate(manager, history, protected):
+    try:
+        manager._truncate_tool_contents(history, protected_indices=protected, base_index=0)
+    except TypeError:
+        # Revisions before the truncation cache take no base_index
+        manager._truncate_tool_contents(history, protected_indices=protected)
+
+
+def measure(manager, history):
+    """(ms, peak KiB) of one truncation pass as initialize runs it (peak from a second, traced pass)."""
+    protected = manager._find_protected_message_indices(history, manager.protected_turns)
+    start = time.perf_counter()
+    truncate(manager, history, protected)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    tracemalloc.start()
+    truncate(manager, history, protected)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage 1 truncation cost per turn")
+    parser.add_argument("--scenario", default="travel", choices=["travel", "finance"], help="test_compaction.py scenario")
+    parser.add_argument("--tools-per-turn", type=int, default=3, help="Tool calls per turn")
+    parser.add_argument("--max-length", type=int, default=500, help="max_tool_content_length")
+    parser.add_argument("--baseline", help="Git revision to compare against")
+    args = parser.parse_args()
+
+    from agent.session.compacting_session_manager import CompactingSessionManager
+
+    user_messages, tools = load_scenario(args.scenario)
+    turns = build_history(user_messages, tools, args.tools_per_turn)
+
+    managers = [("cow", make_manager(CompactingSessionManager, args.max_length))]
+    if args.baseline:
+        managers.insert(0, (args.baseline, make_manager(load_baseline_manager(args.baseline), args.max_length)))
+
+    print(f"scenario: {args.scenario}  tools/turn: {args.tools_per_turn}  max length: {args.max_length}\n")
+    header = f"{'turn':>4} {'messages':>8} |" + "".join(f" {name[:10]:>10} ms {'KiB':>7}" for name, _ in managers)
+    print(header)
+    print("-" * len(header))
+
+    totals = {name: 0.0 for name, _ in managers}
+    history = []
+    for turn, messages in enumerate(turns, 1):
+        history = history + messages
+        row = f"{turn:>4} {len(history):>8} |"
+        for name, manager in managers:
+            ms, peak_kib = measure(manager, history)
+            totals[name] += ms
+            row += f" {ms:>13.2f} {peak_kib:>7.0f}"
+        if turn in (1, 2, 5, 10, 15, 20, 25, 30) or turn == len(turns):
+            print(row)
+
+    print()
+    for name, total in totals.items():
+        print(f"  {name}: {total:8.1f} ms truncation over {len(turns)} turns")
+
+
+if __name__ == "__main__":
+    main()